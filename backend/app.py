@@ -8,17 +8,23 @@ backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, backend_dir)
 
 from config import SQLALCHEMY_DATABASE_URI, SQLALCHEMY_TRACK_MODIFICATIONS
-from database import db
+from database import db, engine_options, configure_engine
+from migrations import run_migrations
+from migrations.v003_progress_rollup import VERSION as ROLLUP_MIGRATION
 from routes.analyze import analyze_bp
 from routes.history import history_bp
 from routes.interview import interview_bp
 from routes.auth import auth_bp
 from routes.ai_assistant import ai_assistant_bp
 from middleware.auth_middleware import is_authenticated
+from services.persistence_queue import persistence_queue
+from services.knowledge_retrieval import start_knowledge_retriever
 
 # Import all models so SQLAlchemy knows about them
 from models.user import User
 from models.session import SpeechSession
+from models.progress_rollup import ProgressRollup, rebuild_progress_rollups
+from utils.text_compression import load_dictionaries
 
 def create_app():
     # Set template folder to the backend/templates directory
@@ -43,13 +49,28 @@ def create_app():
     # Configure database
     app.config["SQLALCHEMY_DATABASE_URI"] = SQLALCHEMY_DATABASE_URI
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = SQLALCHEMY_TRACK_MODIFICATIONS
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(SQLALCHEMY_DATABASE_URI)
     
     # Initialize database
     db.init_app(app)
     
-    # Create tables
+    # Create tables, then apply pending schema migrations
     with app.app_context():
+        configure_engine(db.engine)
         db.create_all()
+        applied = run_migrations(db.engine)
+        # Compressed session text is read with this database's dictionaries
+        load_dictionaries(db.engine)
+        
+        # Backfill rollups for sessions recorded before they existed
+        if ROLLUP_MIGRATION in applied:
+            rebuild_progress_rollups()
+    
+    # Analysis results are committed in the background
+    persistence_queue.start(app)
+    
+    # The chatbot's knowledge index is opened (or embedded) off the request path
+    start_knowledge_retriever()
     
     # Ensure upload directory exists
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -1,3 +1,80 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+import time
 
-db = SQLAlchemy()
\ No newline at end of file
+from config import (
+    SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS, SQLITE_BUSY_TIMEOUT_MS,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_WRITE_RETRIES
+)
+from utils.text_compression import register_sql_functions
+
+db = SQLAlchemy()
+
+def is_sqlite_uri(uri):
+    return uri.startswith("sqlite")
+
+def engine_options(uri):
+    """SQLALCHEMY_ENGINE_OPTIONS for a database URI"""
+    if is_sqlite_uri(uri):
+        if uri in ("sqlite://", "sqlite:///:memory:"):
+            # In-memory databases live in their single connection
+            return {}
+        return {
+            # Connections are shared across request threads via the pool
+            "connect_args": {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+        }
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Per-connection SQLite settings (journal mode is stored in the file, the rest are not)"""
+    # The full-text index triggers call speech_text() (see migrations/v006)
+    register_sql_functions(dbapi_connection)
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+def configure_engine(engine):
+    """Apply the SQLite pragmas to every new connection of an engine"""
+    if engine.dialect.name == "sqlite" and not event.contains(engine, "connect", set_sqlite_pragmas):
+        event.listen(engine, "connect", set_sqlite_pragmas)
+        # Connections opened before the listener was added do not have the settings
+        engine.dispose()
+
+def is_lock_error(error):
+    message = str(error.orig if getattr(error, "orig", None) is not None else error).lower()
+    return "database is locked" in message or "database is busy" in message
+
+def save_with_retry(*instances, retries=DB_WRITE_RETRIES):
+    """
+    Add and commit instances, retrying when the database is locked.
+
+    The busy timeout already makes writers wait for the lock; this covers
+    the waits that run out under heavy load. Other errors are raised
+    after a rollback.
+    """
+    for attempt in range(retries + 1):
+        try:
+            db.session.add_all(instances)
+            db.session.commit()
+            return
+        except OperationalError as e:
+            # Rollback makes the new instances transient again, so they can be re-added
+            db.session.rollback()
+            if attempt == retries or not is_lock_error(e):
+                raise
+            time.sleep(0.05 * 2 ** attempt)
+        except Exception:
+            db.session.rollback()
+            raise
@@ -0,0 +1,199 @@
+"""
+Conditional GET support for the per-user history endpoints
+
+Every response of a decorated view depends only on the current user's
+sessions, so it is versioned by the user's (max id, count, max updated_at)
+watermark: one query served by the (user_id, updated_at) index. The
+watermark becomes a weak ETag (per URL) and a Last-Modified header; a
+request that presents either gets a 304 without the view running. Bodies
+are also kept in a small per-user in-process cache that is dropped when
+the user's sessions change, so unchanged history is never rebuilt. Only
+URLs whose query string holds nothing but the parameters the view reads
+are cached (keyed on those, in a canonical order), and the cache is
+bounded by users, variants per user and total bytes. A
+view marks a response built from data that is not in the database yet
+(a session still in the write-behind queue) with Cache-Control: no-store;
+it is neither tagged nor cached.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import timezone
+from functools import wraps
+
+from urllib.parse import urlencode
+
+from flask import Response, make_response, request
+from sqlalchemy import event, func
+
+from database import db
+from models.session import SpeechSession
+from middleware.auth_middleware import get_current_user_id
+
+# Users whose responses are kept, least recently used dropped first
+RESPONSE_CACHE_USERS = 256
+
+# Responses kept per user (least recently used dropped first) and in total
+RESPONSE_CACHE_VARIANTS = 16
+RESPONSE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+def user_watermark(user_id):
+    """(max id, count, max updated_at) of a user's sessions; changes on any insert, update or delete"""
+    return tuple(db.session.query(
+        func.max(SpeechSession.id), func.count(SpeechSession.id), func.max(SpeechSession.updated_at)
+    ).filter(SpeechSession.user_id == user_id).one())
+
+def make_etag(user_id, variant, watermark):
+    """Weak ETag value for one URL of a user's history at a watermark"""
+    max_id, count, max_updated = watermark
+    raw = f"{user_id}|{variant}|{max_id}|{count}|{max_updated.isoformat() if max_updated else ''}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+class HistoryResponseCache:
+    """Rendered history responses per user, each tagged with the watermark it was built at"""
+
+    def __init__(self, max_users=RESPONSE_CACHE_USERS, max_variants=RESPONSE_CACHE_VARIANTS,
+                 max_bytes=RESPONSE_CACHE_MAX_BYTES):
+        self.max_users = max_users
+        self.max_variants = max_variants
+        self.max_bytes = max_bytes
+        self._users = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, user_id, variant, watermark):
+        with self._lock:
+            entries = self._users.get(user_id)
+            entry = entries.get(variant) if entries is not None else None
+            if entry is None or entry[0] != watermark:
+                self.misses += 1
+                return None
+            self._users.move_to_end(user_id)
+            entries.move_to_end(variant)
+            self.hits += 1
+            return entry[1:]
+
+    def set(self, user_id, variant, watermark, body, mimetype):
+        # One body may not crowd out everything else
+        if len(body) > self.max_bytes // 4:
+            return
+        with self._lock:
+            entries = self._users.setdefault(user_id, OrderedDict())
+            old = entries.pop(variant, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+            entries[variant] = (watermark, body, mimetype)
+            self._bytes += len(body)
+            self._users.move_to_end(user_id)
+            while len(entries) > self.max_variants:
+                self._bytes -= len(entries.popitem(last=False)[1][1])
+            while len(self._users) > self.max_users or self._bytes > self.max_bytes:
+                self._drop_oldest_user()
+
+    def _drop_oldest_user(self):
+        # Caller holds the lock
+        _, entries = self._users.popitem(last=False)
+        self._bytes -= sum(len(entry[1]) for entry in entries.values())
+
+    def count_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def invalidate(self, user_id):
+        with self._lock:
+            entries = self._users.pop(user_id, None)
+            if entries is not None:
+                self._bytes -= sum(len(entry[1]) for entry in entries.values())
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+            self._bytes = 0
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'users': len(self._users),
+                'responses': sum(len(entries) for entries in self._users.values()),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified
+            }
+
+# Global cache shared by the history routes
+history_responses = HistoryResponseCache()
+
+@event.listens_for(SpeechSession, 'after_insert')
+@event.listens_for(SpeechSession, 'after_update')
+@event.listens_for(SpeechSession, 'after_delete')
+def _invalidate_user(mapper, connection, target):
+    if target.user_id is not None:
+        history_responses.invalidate(target.user_id)
+
+def _not_modified(etag, last_modified):
+    # If-None-Match wins over If-Modified-Since when both are sent
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+def cache_variant(params):
+    """
+    Response cache key of the current URL: its path and the given query
+    parameters in a canonical order, or None when the query string holds
+    anything else
+    """
+    if any(name not in params for name in request.args):
+        return None
+    query = urlencode(sorted(request.args.items(multi=True)))
+    return f"{request.path}?{query}" if query else request.path
+
+def conditional_get(f=None, params=()):
+    """
+    Decorator adding ETag/Last-Modified, 304 responses and response caching
+    to a GET view whose output depends only on the current user's sessions
+
+    Args:
+        params: Query parameters the view reads; a URL with any other is
+            still tagged but its response is not cached
+    """
+    if f is None:
+        return lambda view: conditional_get(view, params)
+
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        user_id = get_current_user_id()
+        variant = cache_variant(params)
+        watermark = user_watermark(user_id)
+        etag = make_etag(user_id, request.full_path, watermark)
+        last_modified = watermark[2].replace(tzinfo=timezone.utc) if watermark[2] else None
+
+        if _not_modified(etag, last_modified):
+            history_responses.count_not_modified()
+            response = Response(status=304)
+        else:
+            cached = history_responses.get(user_id, variant, watermark) if variant else None
+            if cached is not None:
+                body, mimetype = cached
+                response = Response(body, mimetype=mimetype)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200 or response.cache_control.no_store:
+                    # Errors (e.g. an unknown session id) and uncommitted data are not tagged or cached
+                    return response
+                if variant:
+                    history_responses.set(user_id, variant, watermark, response.get_data(), response.mimetype)
+
+        response.set_etag(etag, weak=True)
+        if last_modified:
+            response.last_modified = last_modified
+        # Per-user data: browsers may store it but must revalidate before use
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return decorated_function
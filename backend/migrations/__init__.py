@@ -0,0 +1,150 @@
+"""
+Versioned Schema Migrations
+
+Each module named vNNN_<description>.py in this package is one migration
+with VERSION, DESCRIPTION, upgrade(cursor) and downgrade(cursor). Applied
+versions are recorded in the schema_version table. upgrade() applies every
+pending migration in order and downgrade() rolls back to a target version;
+each migration runs in its own transaction, so a failing one leaves the
+schema at the previous version.
+
+The app applies pending migrations at startup (run_migrations); use
+migrate.py in the repository root to inspect or roll back a database.
+"""
+
+import re
+import sqlite3
+import logging
+import importlib
+import pkgutil
+from datetime import datetime
+from types import ModuleType
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+_MODULE_NAME = re.compile(r'^v\d{3}_\w+$')
+
+
+class MigrationError(Exception):
+    """Raised when a migration fails (its changes are rolled back)"""
+    pass
+
+
+def load_migrations() -> List[ModuleType]:
+    """Migration modules of this package, ordered by version"""
+    modules = [importlib.import_module(f'.{info.name}', __name__)
+               for info in pkgutil.iter_modules(__path__) if _MODULE_NAME.match(info.name)]
+    modules.sort(key=lambda module: module.VERSION)
+    versions = [module.VERSION for module in modules]
+    if len(set(versions)) != len(versions):
+        raise MigrationError(f"Duplicate migration versions: {versions}")
+    return modules
+
+
+def is_sqlite(connection) -> bool:
+    """True for sqlite3 connections, including SQLAlchemy's pooled proxies of them"""
+    raw = getattr(connection, 'dbapi_connection', None) or getattr(connection, 'connection', connection)
+    return isinstance(raw, sqlite3.Connection) or isinstance(connection, sqlite3.Connection)
+
+
+def column_names(cursor, table: str) -> List[str]:
+    """Columns of a table (empty if the table does not exist)"""
+    if isinstance(cursor, sqlite3.Cursor) or is_sqlite(cursor.connection):
+        cursor.execute(f'PRAGMA table_info("{table}")')
+        return [row[1] for row in cursor.fetchall()]
+    cursor.execute("SELECT column_name FROM information_schema.columns WHERE table_name = %s", (table,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _ensure_version_table(connection):
+    cursor = connection.cursor()
+    cursor.execute(
+        'CREATE TABLE IF NOT EXISTS schema_version ('
+        ' version INTEGER PRIMARY KEY, description VARCHAR(200) NOT NULL, applied_at VARCHAR(32) NOT NULL)'
+    )
+    connection.commit()
+
+
+def applied_versions(connection) -> List[int]:
+    """Versions recorded in schema_version, ascending"""
+    _ensure_version_table(connection)
+    cursor = connection.cursor()
+    cursor.execute('SELECT version FROM schema_version ORDER BY version')
+    return [row[0] for row in cursor.fetchall()]
+
+
+def current_version(connection) -> int:
+    versions = applied_versions(connection)
+    return versions[-1] if versions else 0
+
+
+def _run(connection, migration: ModuleType, direction: str):
+    """Run one migration step in a transaction and record it"""
+    placeholder = '?' if is_sqlite(connection) else '%s'
+    cursor = connection.cursor()
+    try:
+        if is_sqlite(connection):
+            # sqlite3 does not open a transaction for DDL on its own
+            cursor.execute('BEGIN')
+        if direction == 'upgrade':
+            migration.upgrade(cursor)
+            cursor.execute(
+                f'INSERT INTO schema_version (version, description, applied_at) '
+                f'VALUES ({placeholder}, {placeholder}, {placeholder})',
+                (migration.VERSION, migration.DESCRIPTION, datetime.utcnow().isoformat())
+            )
+        else:
+            migration.downgrade(cursor)
+            cursor.execute(f'DELETE FROM schema_version WHERE version = {placeholder}', (migration.VERSION,))
+        connection.commit()
+    except Exception as e:
+        connection.rollback()
+        raise MigrationError(f"{direction} of migration {migration.VERSION} ({migration.DESCRIPTION}) failed: {e}") from e
+    logger.info(f"Migration {migration.VERSION} {direction}d: {migration.DESCRIPTION}")
+
+
+def upgrade(connection, target: Optional[int] = None) -> List[int]:
+    """
+    Apply pending migrations up to target (default: all).
+
+    Returns:
+        Versions applied
+    """
+    done = set(applied_versions(connection))
+    applied = []
+    for migration in load_migrations():
+        if target is not None and migration.VERSION > target:
+            break
+        if migration.VERSION not in done:
+            _run(connection, migration, 'upgrade')
+            applied.append(migration.VERSION)
+    return applied
+
+
+def downgrade(connection, target: int) -> List[int]:
+    """
+    Roll back applied migrations above target, newest first.
+
+    Returns:
+        Versions rolled back
+    """
+    done = set(applied_versions(connection))
+    rolled_back = []
+    for migration in reversed(load_migrations()):
+        if migration.VERSION > target and migration.VERSION in done:
+            _run(connection, migration, 'downgrade')
+            rolled_back.append(migration.VERSION)
+    return rolled_back
+
+
+def run_migrations(engine) -> List[int]:
+    """Apply pending migrations through a SQLAlchemy engine (called at app startup)"""
+    connection = engine.raw_connection()
+    try:
+        applied = upgrade(connection)
+    finally:
+        connection.close()
+    if applied:
+        logger.info(f"Applied schema migrations {applied}")
+    return applied
@@ -0,0 +1,63 @@
+"""
+Baseline: bring databases created before the current models up to date
+
+Adds the authentication columns of user and the extended analysis columns
+of speech_session when they are missing (formerly migrate_user_table.py
+and migrate_database_comprehensive.py). Databases created by
+db.create_all() already have them, so this is a no-op there.
+"""
+
+from . import column_names
+
+VERSION = 1
+DESCRIPTION = "Baseline user and speech_session columns"
+
+USER_COLUMNS = [
+    ("first_name", "VARCHAR(50)"),
+    ("last_name", "VARCHAR(50)"),
+    ("phone", "VARCHAR(20)"),
+    ("password_hash", "VARCHAR(255)"),
+    ("is_active", "BOOLEAN DEFAULT TRUE"),
+]
+
+SPEECH_SESSION_COLUMNS = [
+    ("user_id", 'INTEGER REFERENCES "user" (id)'),
+    ("word_count", "INTEGER"),
+    ("filler_percentage", "REAL"),
+    ("grammar_score", "REAL"),
+    ("vocabulary_diversity", "REAL"),
+    ("unique_words", "INTEGER"),
+    ("pronunciation_clarity", "REAL"),
+    ("engagement_level", "VARCHAR(20)"),
+    ("skill_level", "VARCHAR(30)"),
+    ("pace_assessment", "TEXT"),
+    ("filler_assessment", "TEXT"),
+    ("grammar_assessment", "TEXT"),
+    ("vocabulary_assessment", "TEXT"),
+    ("tone_assessment", "TEXT"),
+    ("general_impression", "TEXT"),
+    ("strengths", "TEXT"),
+    ("improvements", "TEXT"),
+    ("actionable_tips", "TEXT"),
+    ("grammar_errors", "TEXT"),
+]
+
+
+def _add_missing(cursor, table, columns):
+    existing = column_names(cursor, table)
+    if not existing:
+        # Table not created yet; db.create_all() creates it with every column
+        return
+    for name, column_type in columns:
+        if name not in existing:
+            cursor.execute(f'ALTER TABLE "{table}" ADD COLUMN {name} {column_type}')
+
+
+def upgrade(cursor):
+    _add_missing(cursor, 'user', USER_COLUMNS)
+    _add_missing(cursor, 'speech_session', SPEECH_SESSION_COLUMNS)
+
+
+def downgrade(cursor):
+    # The models need these columns; rolling back the baseline only forgets the version
+    pass
@@ -0,0 +1,21 @@
+"""
+Index speech_session for the history query paths
+
+/history and /api/history filter by user_id and order by created_at, and
+/session/<id> looks a session up by id and user_id (served by the primary
+key). The composite (user_id, created_at) index serves the filter and
+both sort directions without a table scan or a sort step.
+"""
+
+VERSION = 2
+DESCRIPTION = "Index speech_session on (user_id, created_at)"
+
+
+def upgrade(cursor):
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS ix_speech_session_user_created ON speech_session (user_id, created_at)'
+    )
+
+
+def downgrade(cursor):
+    cursor.execute('DROP INDEX IF EXISTS ix_speech_session_user_created')
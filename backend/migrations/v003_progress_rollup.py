@@ -0,0 +1,33 @@
+"""
+Per-user daily and weekly progress rollups
+
+Creates progress_rollup (models/progress_rollup.py), which is kept up to
+date as sessions are inserted. create_app() fills it from existing
+sessions when this migration is first applied; rebuild_progress_rollups.py
+recomputes it at any time.
+"""
+
+from . import is_sqlite
+
+VERSION = 3
+DESCRIPTION = "Create progress_rollup"
+
+METRICS = ['confidence', 'wpm', 'fillers', 'grammar_score']
+
+
+def upgrade(cursor):
+    id_column = 'id INTEGER PRIMARY KEY' if is_sqlite(cursor.connection) else 'id SERIAL PRIMARY KEY'
+    metric_columns = ', '.join(
+        f'{m}_count INTEGER NOT NULL DEFAULT 0, {m}_sum FLOAT NOT NULL DEFAULT 0, {m}_min FLOAT, {m}_max FLOAT'
+        for m in METRICS
+    )
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS progress_rollup ({id_column},'
+        ' user_id INTEGER NOT NULL REFERENCES "user" (id), period VARCHAR(8) NOT NULL, period_start DATE NOT NULL,'
+        f' session_count INTEGER NOT NULL DEFAULT 0, {metric_columns},'
+        ' CONSTRAINT uq_progress_rollup_period UNIQUE (user_id, period, period_start))'
+    )
+
+
+def downgrade(cursor):
+    cursor.execute('DROP TABLE IF EXISTS progress_rollup')
@@ -0,0 +1,64 @@
+"""
+Full-text index over speech_session transcripts
+
+On SQLite, creates speech_session_fts, an FTS5 external-content table
+over speech_session (transcript and user_id; the text is not copied) kept
+in sync by insert, update and delete triggers, and indexes the existing
+rows. user_id is indexed as a token so a search is restricted to one
+user inside the full-text index rather than after it. On PostgreSQL, a
+GIN index over the transcript's tsvector serves the same searches.
+"""
+
+from . import is_sqlite
+
+VERSION = 4
+DESCRIPTION = "Full-text search index over speech_session transcripts"
+
+TRIGGERS = {
+    'speech_session_fts_insert': (
+        'AFTER INSERT ON speech_session BEGIN'
+        ' INSERT INTO speech_session_fts (rowid, transcript, user_id) VALUES (new.id, new.transcript, new.user_id);'
+        ' END'
+    ),
+    'speech_session_fts_delete': (
+        'AFTER DELETE ON speech_session BEGIN'
+        ' INSERT INTO speech_session_fts (speech_session_fts, rowid, transcript, user_id)'
+        " VALUES ('delete', old.id, old.transcript, old.user_id);"
+        ' END'
+    ),
+    'speech_session_fts_update': (
+        'AFTER UPDATE OF transcript, user_id ON speech_session BEGIN'
+        ' INSERT INTO speech_session_fts (speech_session_fts, rowid, transcript, user_id)'
+        " VALUES ('delete', old.id, old.transcript, old.user_id);"
+        ' INSERT INTO speech_session_fts (rowid, transcript, user_id) VALUES (new.id, new.transcript, new.user_id);'
+        ' END'
+    ),
+}
+
+
+def upgrade(cursor):
+    if not is_sqlite(cursor.connection):
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS ix_speech_session_transcript_fts ON speech_session'
+            " USING GIN (to_tsvector('english', coalesce(transcript, '')))"
+        )
+        return
+
+    cursor.execute(
+        'CREATE VIRTUAL TABLE IF NOT EXISTS speech_session_fts USING fts5('
+        " transcript, user_id, content='speech_session', content_rowid='id', tokenize='porter unicode61')"
+    )
+    for name, body in TRIGGERS.items():
+        cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+    # Index the sessions recorded so far
+    cursor.execute("INSERT INTO speech_session_fts (speech_session_fts) VALUES ('rebuild')")
+
+
+def downgrade(cursor):
+    if not is_sqlite(cursor.connection):
+        cursor.execute('DROP INDEX IF EXISTS ix_speech_session_transcript_fts')
+        return
+
+    for name in TRIGGERS:
+        cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+    cursor.execute('DROP TABLE IF EXISTS speech_session_fts')
@@ -0,0 +1,28 @@
+"""
+Track when sessions change, for conditional GETs of the history endpoints
+
+Adds speech_session.updated_at (set to created_at for existing rows) and
+an index on (user_id, updated_at). The index covers a user's
+(max id, count, max updated_at) watermark, which the history endpoints
+turn into ETag and Last-Modified headers without reading the table.
+"""
+
+from . import is_sqlite, column_names
+
+VERSION = 5
+DESCRIPTION = "Add speech_session.updated_at and index it by user"
+
+
+def upgrade(cursor):
+    if 'updated_at' not in column_names(cursor, 'speech_session'):
+        column_type = 'DATETIME' if is_sqlite(cursor.connection) else 'TIMESTAMP'
+        cursor.execute(f'ALTER TABLE speech_session ADD COLUMN updated_at {column_type}')
+    cursor.execute('UPDATE speech_session SET updated_at = created_at WHERE updated_at IS NULL')
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS ix_speech_session_user_updated ON speech_session (user_id, updated_at)'
+    )
+
+
+def downgrade(cursor):
+    cursor.execute('DROP INDEX IF EXISTS ix_speech_session_user_updated')
+    # The column is left in place (dropping columns needs a table rebuild on older SQLite)
@@ -0,0 +1,159 @@
+"""
+Compress stored transcripts and assessment text
+
+On SQLite, trains a preset dictionary from the stored sessions (kept in
+compression_dictionary), rewrites the transcript and the six assessment
+columns of existing rows compressed, in batches of BATCH_SIZE rows, and
+logs the space saved. The full-text index stops reading speech_session
+directly: it is rebuilt over speech_session_text, a view that decompresses
+transcripts with the speech_text() function, and its triggers index the
+decompressed text. Every connection that writes sessions therefore needs
+speech_text() (the app registers it on connect). Freed pages are reused
+by new rows; run VACUUM to return them to the filesystem.
+
+PostgreSQL already compresses long text values (TOAST), so nothing
+changes there.
+"""
+
+import sqlite3
+import logging
+
+from . import is_sqlite
+from . import v004_transcript_search
+from utils.text_compression import (
+    register_sql_functions, use_dictionaries, train_stored_dictionary, compress_text, decompress_text
+)
+
+VERSION = 6
+DESCRIPTION = "Compress speech_session transcripts and assessments"
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = (
+    'transcript', 'pace_assessment', 'filler_assessment', 'grammar_assessment',
+    'vocabulary_assessment', 'tone_assessment', 'general_impression',
+)
+
+BATCH_SIZE = 500
+
+TRIGGERS = {
+    'speech_session_fts_insert': (
+        'AFTER INSERT ON speech_session BEGIN'
+        ' INSERT INTO speech_session_fts (rowid, transcript, user_id)'
+        ' VALUES (new.id, speech_text(new.transcript), new.user_id);'
+        ' END'
+    ),
+    'speech_session_fts_delete': (
+        'AFTER DELETE ON speech_session BEGIN'
+        ' INSERT INTO speech_session_fts (speech_session_fts, rowid, transcript, user_id)'
+        " VALUES ('delete', old.id, speech_text(old.transcript), old.user_id);"
+        ' END'
+    ),
+    'speech_session_fts_update': (
+        'AFTER UPDATE OF transcript, user_id ON speech_session BEGIN'
+        ' INSERT INTO speech_session_fts (speech_session_fts, rowid, transcript, user_id)'
+        " VALUES ('delete', old.id, speech_text(old.transcript), old.user_id);"
+        ' INSERT INTO speech_session_fts (rowid, transcript, user_id)'
+        ' VALUES (new.id, speech_text(new.transcript), new.user_id);'
+        ' END'
+    ),
+}
+
+
+def _ensure_speech_text(cursor):
+    """Register speech_text() unless the connection already has it (e.g. from the app's connect hook)"""
+    try:
+        cursor.execute('SELECT speech_text(NULL)')
+    except sqlite3.OperationalError:
+        register_sql_functions(cursor.connection)
+
+
+def _drop_search_index(cursor):
+    for name in TRIGGERS:
+        cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+    cursor.execute('DROP TABLE IF EXISTS speech_session_fts')
+    cursor.execute('DROP VIEW IF EXISTS speech_session_text')
+
+
+def _rewrite(cursor, convert):
+    """Apply convert to every stored text, BATCH_SIZE rows at a time; returns (bytes before, bytes after)"""
+    before = after = 0
+    last_id = 0
+    while True:
+        cursor.execute(
+            f'SELECT id, {", ".join(COLUMNS)} FROM speech_session WHERE id > ? ORDER BY id LIMIT ?',
+            (last_id, BATCH_SIZE)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            return before, after
+        updates = []
+        for row in rows:
+            values = [convert(value) if value is not None else None for value in row[1:]]
+            before += sum(_size(value) for value in row[1:])
+            after += sum(_size(value) for value in values)
+            updates.append((*values, row[0]))
+        cursor.executemany(
+            f'UPDATE speech_session SET {", ".join(f"{column} = ?" for column in COLUMNS)} WHERE id = ?',
+            updates
+        )
+        last_id = rows[-1][0]
+
+
+def _size(value):
+    if value is None:
+        return 0
+    return len(value) if isinstance(value, bytes) else len(value.encode('utf-8'))
+
+
+def upgrade(cursor):
+    if not is_sqlite(cursor.connection):
+        return
+
+    _ensure_speech_text(cursor)
+    cursor.execute(
+        'CREATE TABLE IF NOT EXISTS compression_dictionary ('
+        ' id INTEGER PRIMARY KEY, data BLOB NOT NULL, sample_texts INTEGER, created_at DATETIME)'
+    )
+    cursor.execute('SELECT id, data FROM compression_dictionary')
+    use_dictionaries(cursor.fetchall())
+    # Too few sessions yet (e.g. a fresh install): retrain_compression_dictionary.py adds one later
+    dictionary_id = train_stored_dictionary(cursor)
+
+    # The old triggers would index the compressed bytes
+    _drop_search_index(cursor)
+    before, after = _rewrite(cursor, lambda value: compress_text(decompress_text(value), dictionary_id or 0))
+    if before:
+        logger.info(
+            f"Compressed session text from {before:,} to {after:,} bytes "
+            f"({100 * (before - after) / before:.1f}% smaller, dictionary {dictionary_id or 'none'})"
+        )
+
+    cursor.execute(
+        'CREATE VIEW speech_session_text AS'
+        ' SELECT id, user_id, speech_text(transcript) AS transcript FROM speech_session'
+    )
+    cursor.execute(
+        'CREATE VIRTUAL TABLE speech_session_fts USING fts5('
+        " transcript, user_id, content='speech_session_text', content_rowid='id', tokenize='porter unicode61')"
+    )
+    for name, body in TRIGGERS.items():
+        cursor.execute(f'CREATE TRIGGER {name} {body}')
+    cursor.execute("INSERT INTO speech_session_fts (speech_session_fts) VALUES ('rebuild')")
+
+
+def downgrade(cursor):
+    if not is_sqlite(cursor.connection):
+        return
+
+    _ensure_speech_text(cursor)
+    cursor.execute('SELECT id, data FROM compression_dictionary')
+    use_dictionaries(cursor.fetchall())
+
+    _drop_search_index(cursor)
+    before, after = _rewrite(cursor, decompress_text)
+    if before:
+        logger.info(f"Decompressed session text from {before:,} to {after:,} bytes")
+    cursor.execute('DROP TABLE compression_dictionary')
+    # Back to the index over the plain column
+    v004_transcript_search.upgrade(cursor)
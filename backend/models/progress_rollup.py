@@ -0,0 +1,186 @@
+from database import db
+from datetime import timedelta
+from sqlalchemy import case, event, literal, null
+from models.session import SpeechSession
+
+# Session metrics aggregated per user and period
+ROLLUP_METRICS = ['confidence', 'wpm', 'fillers', 'grammar_score']
+
+PERIODS = ('day', 'week')
+
+def period_start(created_at, period):
+    """First day of the (UTC) day or Monday-based week a timestamp falls in"""
+    day = created_at.date()
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    return day
+
+class ProgressRollup(db.Model):
+    """Daily and weekly aggregates of a user's session metrics"""
+    __tablename__ = 'progress_rollup'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'period', 'period_start', name='uq_progress_rollup_period'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    period = db.Column(db.String(8), nullable=False)  # 'day' or 'week'
+    period_start = db.Column(db.Date, nullable=False)
+    session_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Per metric: sessions with a value, their sum, min and max (mean = sum / count)
+    confidence_count = db.Column(db.Integer, nullable=False, default=0)
+    confidence_sum = db.Column(db.Float, nullable=False, default=0.0)
+    confidence_min = db.Column(db.Float)
+    confidence_max = db.Column(db.Float)
+    wpm_count = db.Column(db.Integer, nullable=False, default=0)
+    wpm_sum = db.Column(db.Float, nullable=False, default=0.0)
+    wpm_min = db.Column(db.Float)
+    wpm_max = db.Column(db.Float)
+    fillers_count = db.Column(db.Integer, nullable=False, default=0)
+    fillers_sum = db.Column(db.Float, nullable=False, default=0.0)
+    fillers_min = db.Column(db.Float)
+    fillers_max = db.Column(db.Float)
+    grammar_score_count = db.Column(db.Integer, nullable=False, default=0)
+    grammar_score_sum = db.Column(db.Float, nullable=False, default=0.0)
+    grammar_score_min = db.Column(db.Float)
+    grammar_score_max = db.Column(db.Float)
+
+    def mean(self, metric):
+        count = getattr(self, f'{metric}_count')
+        return round(getattr(self, f'{metric}_sum') / count, 2) if count else None
+
+    def to_dict(self):
+        """Aggregates for one period, for the chart endpoints"""
+        data = {
+            'period': self.period,
+            'period_start': self.period_start.isoformat(),
+            'session_count': self.session_count
+        }
+        for metric in ROLLUP_METRICS:
+            data[metric] = {
+                'mean': self.mean(metric),
+                'min': getattr(self, f'{metric}_min'),
+                'max': getattr(self, f'{metric}_max')
+            }
+        return data
+
+def session_contribution(session):
+    """Column values one session adds to the rollups of its periods"""
+    values = {'session_count': 1}
+    for metric in ROLLUP_METRICS:
+        value = getattr(session, metric)
+        present = value is not None
+        values[f'{metric}_count'] = 1 if present else 0
+        values[f'{metric}_sum'] = float(value) if present else 0.0
+        values[f'{metric}_min'] = float(value) if present else None
+        values[f'{metric}_max'] = float(value) if present else None
+    return values
+
+def _merge_expressions(table, incoming):
+    """SET clause adding incoming values to an existing rollup row (NULL-safe min/max)"""
+    merged = {'session_count': table.c.session_count + incoming['session_count']}
+    for metric in ROLLUP_METRICS:
+        count, total = f'{metric}_count', f'{metric}_sum'
+        merged[count] = table.c[count] + incoming[count]
+        merged[total] = table.c[total] + incoming[total]
+        for bound, better in ((f'{metric}_min', lambda new, old: new < old),
+                              (f'{metric}_max', lambda new, old: new > old)):
+            new, old = incoming[bound], table.c[bound]
+            merged[bound] = case(
+                (new.is_(None), old),
+                (old.is_(None) | better(new, old), new),
+                else_=old
+            )
+    return merged
+
+def apply_session(connection, session):
+    """Add one session to its user's day and week rollups on the given connection"""
+    if session.user_id is None or session.created_at is None:
+        return
+
+    table = ProgressRollup.__table__
+    contribution = session_contribution(session)
+    for period in PERIODS:
+        row = dict(contribution, user_id=session.user_id, period=period,
+                   period_start=period_start(session.created_at, period))
+        dialect = connection.dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            if dialect == 'sqlite':
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            statement = insert(table).values(**row)
+            connection.execute(statement.on_conflict_do_update(
+                index_elements=['user_id', 'period', 'period_start'],
+                set_=_merge_expressions(table, statement.excluded)
+            ))
+        else:
+            key = (table.c.user_id == row['user_id']) & (table.c.period == period) & \
+                (table.c.period_start == row['period_start'])
+            incoming = {name: literal(value) if value is not None else null()
+                        for name, value in contribution.items()}
+            updated = connection.execute(table.update().where(key).values(**_merge_expressions(table, incoming)))
+            if updated.rowcount == 0:
+                connection.execute(table.insert().values(**row))
+
+@event.listens_for(SpeechSession, 'after_insert')
+def _update_rollups(mapper, connection, target):
+    # Runs inside the flush, so the rollups commit (or roll back) with the session row
+    apply_session(connection, target)
+
+def merge_contribution(totals, contribution):
+    """Add one session's contribution to an in-memory rollup row"""
+    totals['session_count'] += contribution['session_count']
+    for metric in ROLLUP_METRICS:
+        totals[f'{metric}_count'] += contribution[f'{metric}_count']
+        totals[f'{metric}_sum'] += contribution[f'{metric}_sum']
+        for bound, pick in ((f'{metric}_min', min), (f'{metric}_max', max)):
+            new, old = contribution[bound], totals[bound]
+            totals[bound] = old if new is None else new if old is None else pick(new, old)
+
+def rebuild_progress_rollups(user_id=None, batch_size=500):
+    """
+    Recompute rollups from speech_session (for backfills or after bulk changes).
+
+    Args:
+        user_id: Only rebuild this user's rollups (default: everyone's)
+        batch_size: Rows fetched per round trip
+
+    Returns:
+        Number of sessions aggregated
+    """
+    table = ProgressRollup.__table__
+    delete = table.delete()
+    query = db.session.query(
+        SpeechSession.user_id, SpeechSession.created_at, *[getattr(SpeechSession, m) for m in ROLLUP_METRICS]
+    ).filter(SpeechSession.user_id.isnot(None), SpeechSession.created_at.isnot(None))
+    if user_id is not None:
+        delete = delete.where(table.c.user_id == user_id)
+        query = query.filter(SpeechSession.user_id == user_id)
+
+    rollups = {}
+    count = 0
+    for session in query.yield_per(batch_size):
+        contribution = session_contribution(session)
+        for period in PERIODS:
+            key = (session.user_id, period, period_start(session.created_at, period))
+            if key in rollups:
+                merge_contribution(rollups[key], contribution)
+            else:
+                rollups[key] = dict(contribution, user_id=key[0], period=period, period_start=key[2])
+        count += 1
+
+    # Replace the old rows in one transaction
+    connection = db.session.connection()
+    connection.execute(delete)
+    if rollups:
+        connection.execute(table.insert(), list(rollups.values()))
+    db.session.commit()
+    return count
+
+def query_rollups(user_id, period):
+    """A user's rollups for one period type, oldest first"""
+    return ProgressRollup.query.filter_by(user_id=user_id, period=period).order_by(
+        ProgressRollup.period_start.asc()
+    ).all()
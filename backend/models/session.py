@@ -1,13 +1,124 @@
 from database import db
 from datetime import datetime, timezone, timedelta
+from sqlalchemy.types import TypeDecorator
+from utils.text_compression import compress_text, decompress_text
+import json
+
+
+def to_local_time(created_at):
+    """Convert a UTC timestamp to local timezone (simplified)"""
+    if created_at:
+        # For simplicity, we'll assume the user is in their local timezone
+        # In a production app, you'd store user timezone preferences
+        try:
+            # Get local timezone offset
+            import time
+            local_offset = time.timezone if time.daylight == 0 else time.altzone
+            local_offset_hours = -local_offset // 3600
+            
+            # Apply offset to UTC time
+            local_time = created_at + timedelta(hours=local_offset_hours)
+            return local_time
+        except:
+            # Fallback to original time if conversion fails
+            return created_at
+    return None
+
+def format_timestamp(created_at, format_type='full'):
+    """Format a session timestamp for display (also used for column-only queries)"""
+    if not created_at:
+        return "Unknown"
+    
+    # Get local time (or fallback to UTC)
+    display_time = to_local_time(created_at) or created_at
+    
+    if format_type == 'full':
+        return display_time.strftime("%B %d, %Y at %I:%M %p")
+    elif format_type == 'short':
+        return display_time.strftime("%m/%d/%Y %H:%M")
+    elif format_type == 'chart':
+        return display_time.strftime("%m-%d %H:%M")
+    elif format_type == 'friendly':
+        return display_time.strftime("%d %b %Y, %H:%M")
+    else:
+        return display_time.strftime("%d-%m-%Y %H:%M")
+
+def json_list(value):
+    """A list-valued JSON field as a list (JSON text is parsed; None or bad JSON gives [])"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        try:
+            value = json.loads(value) if value else []
+        except ValueError:
+            return []
+    return value if isinstance(value, list) else []
+
+class JSONList(TypeDecorator):
+    """
+    List stored as JSON: a native JSONB column on PostgreSQL and JSON text
+    elsewhere (the format the columns have always held). Rows written as
+    json.dumps strings and rows with unparseable text still load, as lists.
+    """
+    impl = db.Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import JSONB
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(db.Text())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        value = json_list(value)
+        return value if dialect.name == 'postgresql' else json.dumps(value)
+
+    def process_result_value(self, value, dialect):
+        return json_list(value)
+
+# Loaded together, and only when one of them is accessed or undeferred
+JSON_LIST_GROUP = 'json_lists'
+
+class CompressedText(TypeDecorator):
+    """
+    Text stored compressed on SQLite (see utils/text_compression); plain
+    text elsewhere, where the database compresses long values itself.
+    Uncompressed rows load unchanged.
+    """
+    impl = db.Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name != 'sqlite':
+            return value
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        return decompress_text(value)
+
+    def coerce_compared_value(self, op, value):
+        # Values compared with the column (e.g. LIKE patterns) are bound as they are
+        return db.Text()
+
+# The assessment texts are shown together, so they load together
+ASSESSMENT_GROUP = 'assessments'
 
 class SpeechSession(db.Model):
+    # History pages filter by user and order by time (see migrations/v002);
+    # the updated_at index covers the conditional GET watermark (v005)
+    __table_args__ = (
+        db.Index('ix_speech_session_user_created', 'user_id', 'created_at'),
+        db.Index('ix_speech_session_user_updated', 'user_id', 'updated_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)
     
-    # Basic data
-    transcript = db.Column(db.Text)
+    # Basic data (the transcript is compressed and loaded only when accessed)
+    transcript = db.deferred(db.Column(CompressedText))
     wpm = db.Column(db.Float)
     fillers = db.Column(db.Integer)
     sentiment = db.Column(db.Float)
@@ -24,96 +135,46 @@ class SpeechSession(db.Model):
     engagement_level = db.Column(db.String(20))
     skill_level = db.Column(db.String(30))
     
-    # Assessment text fields
-    pace_assessment = db.Column(db.Text)
-    filler_assessment = db.Column(db.Text)
-    grammar_assessment = db.Column(db.Text)
-    vocabulary_assessment = db.Column(db.Text)
-    tone_assessment = db.Column(db.Text)
-    general_impression = db.Column(db.Text)
+    # Assessment text fields (compressed, loaded together when one is accessed)
+    pace_assessment = db.deferred(db.Column(CompressedText), group=ASSESSMENT_GROUP)
+    filler_assessment = db.deferred(db.Column(CompressedText), group=ASSESSMENT_GROUP)
+    grammar_assessment = db.deferred(db.Column(CompressedText), group=ASSESSMENT_GROUP)
+    vocabulary_assessment = db.deferred(db.Column(CompressedText), group=ASSESSMENT_GROUP)
+    tone_assessment = db.deferred(db.Column(CompressedText), group=ASSESSMENT_GROUP)
+    general_impression = db.deferred(db.Column(CompressedText), group=ASSESSMENT_GROUP)
     
-    # JSON fields for complex data
-    strengths = db.Column(db.Text)  # JSON string
-    improvements = db.Column(db.Text)  # JSON string
-    actionable_tips = db.Column(db.Text)  # JSON string
-    grammar_errors = db.Column(db.Text)  # JSON string
+    # JSON fields for complex data (lists; deferred so listings that do not
+    # return them never load or parse them)
+    strengths = db.deferred(db.Column(JSONList), group=JSON_LIST_GROUP)
+    improvements = db.deferred(db.Column(JSONList), group=JSON_LIST_GROUP)
+    actionable_tips = db.deferred(db.Column(JSONList), group=JSON_LIST_GROUP)
+    grammar_errors = db.deferred(db.Column(JSONList), group=JSON_LIST_GROUP)
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def get_local_time(self):
         """Convert UTC time to local timezone (simplified)"""
-        if self.created_at:
-            # For simplicity, we'll assume the user is in their local timezone
-            # In a production app, you'd store user timezone preferences
-            try:
-                # Get local timezone offset
-                import time
-                local_offset = time.timezone if time.daylight == 0 else time.altzone
-                local_offset_hours = -local_offset // 3600
-                
-                # Apply offset to UTC time
-                local_time = self.created_at + timedelta(hours=local_offset_hours)
-                return local_time
-            except:
-                # Fallback to original time if conversion fails
-                return self.created_at
-        return None
+        return to_local_time(self.created_at)
     
     def format_datetime(self, format_type='full'):
         """Format datetime for display"""
-        if not self.created_at:
-            return "Unknown"
-        
-        # Get local time (or fallback to UTC)
-        display_time = self.get_local_time() or self.created_at
-        
-        if format_type == 'full':
-            return display_time.strftime("%B %d, %Y at %I:%M %p")
-        elif format_type == 'short':
-            return display_time.strftime("%m/%d/%Y %H:%M")
-        elif format_type == 'chart':
-            return display_time.strftime("%m-%d %H:%M")
-        elif format_type == 'friendly':
-            return display_time.strftime("%d %b %Y, %H:%M")
-        else:
-            return display_time.strftime("%d-%m-%Y %H:%M")
+        return format_timestamp(self.created_at, format_type)
     
+    # The columns are parsed once when loaded; these also accept values
+    # assigned as JSON strings that have not been flushed yet
     def get_strengths_list(self):
-        """Parse strengths JSON string to list"""
-        if self.strengths:
-            try:
-                import json
-                return json.loads(self.strengths)
-            except:
-                return []
-        return []
+        """Strengths as a list"""
+        return json_list(self.strengths)
     
     def get_improvements_list(self):
-        """Parse improvements JSON string to list"""
-        if self.improvements:
-            try:
-                import json
-                return json.loads(self.improvements)
-            except:
-                return []
-        return []
+        """Improvements as a list"""
+        return json_list(self.improvements)
     
     def get_actionable_tips_list(self):
-        """Parse actionable tips JSON string to list"""
-        if self.actionable_tips:
-            try:
-                import json
-                return json.loads(self.actionable_tips)
-            except:
-                return []
-        return []
+        """Actionable tips as a list"""
+        return json_list(self.actionable_tips)
     
     def get_grammar_errors_list(self):
-        """Parse grammar errors JSON string to list"""
-        if self.grammar_errors:
-            try:
-                import json
-                return json.loads(self.grammar_errors)
-            except:
-                return []
-        return []
\ No newline at end of file
+        """Grammar errors as a list"""
+        return json_list(self.grammar_errors)
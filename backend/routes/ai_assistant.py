@@ -3,9 +3,14 @@ Smart AI Interview Assistant API Routes
 Provides endpoints for the Smart AI Interview Assistant functionality
 """
 
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, request, jsonify, session, Response, stream_with_context
 from services.universal_chatbot import universal_chatbot
-from middleware.auth_middleware import login_required
+from services.conversation_store import conversation_key
+from services.streaming import StreamTimer, sse_stream, stream_metrics, paragraph_chunks, SSE_HEADERS
+from services.answer_bank import answer_bank, answer_prompt, should_store
+from services.intent_router import intent_router
+from utils.interview_questions import PRACTICE_QUESTIONS
+from middleware.auth_middleware import login_required, get_current_user_id
 import logging
 
 # Create blueprint
@@ -35,14 +40,21 @@ def get_ai_answer():
         # Get optional context
         job_role = data.get('job_role', '')
         company = data.get('company', '')
+        use_cache = not data.get('no_cache', False)
+        key = conversation_key(get_current_user_id(), data.get('conversation_id'))
         
-        # Generate AI response using Universal Chatbot
-        if job_role or company:
-            # Add context for job-specific responses
-            context_message = f"This is for a {job_role} position at {company}. {question}"
-            response = universal_chatbot.get_response(context_message)
-        else:
-            response = universal_chatbot.get_response(question)
+        # Precomputed (or previously generated) answers are served from the answer bank
+        response = answer_bank.get(question, job_role, company) if use_cache else None
+        from_answer_bank = response is not None
+        if not from_answer_bank:
+            # Generate AI response using Universal Chatbot (job context is added to the message)
+            timer = StreamTimer('chat')
+            response, source = universal_chatbot.respond(
+                answer_prompt(question, job_role, company), use_cache=use_cache, conversation_key=key, timer=timer
+            )
+            # The bank is shared by every user: only answers written without this conversation's turns
+            if timer.completed and not timer.with_history and should_store(source):
+                answer_bank.put(question, response, job_role, company)
         
         # Get model info for debugging
         model_info = {
@@ -56,6 +68,7 @@ def get_ai_answer():
             'success': True,
             'question': question,
             'answer': response,
+            'from_answer_bank': from_answer_bank,
             'ai_powered': model_info['ai_powered'],
             'model_info': model_info,
             'timestamp': 'now'
@@ -68,6 +81,50 @@ def get_ai_answer():
             'error': 'Failed to generate AI response'
         }), 500
 
+@ai_assistant_bp.route('/ai-assistant/answer/stream', methods=['POST'])
+@login_required
+def stream_ai_answer():
+    """Stream a Smart AI interview answer as Server-Sent Events"""
+    data = request.get_json() or {}
+    question = (data.get('question') or '').strip()
+    
+    if not question:
+        return jsonify({
+            'success': False,
+            'error': 'Question is required'
+        }), 400
+    
+    job_role = data.get('job_role', '')
+    company = data.get('company', '')
+    use_cache = not data.get('no_cache', False)
+    
+    banked = answer_bank.get(question, job_role, company) if use_cache else None
+    if banked is not None:
+        timer = StreamTimer('answer_bank')
+        pieces = paragraph_chunks(banked)
+    else:
+        timer = StreamTimer('chat')
+        pieces = _banking_stream(question, job_role, company, universal_chatbot.stream_response(
+            answer_prompt(question, job_role, company),
+            use_cache=use_cache,
+            conversation_key=conversation_key(get_current_user_id(), data.get('conversation_id')),
+            timer=timer
+        ), timer)
+    return Response(stream_with_context(sse_stream(pieces, timer)),
+                    mimetype='text/event-stream', headers=SSE_HEADERS)
+
+def _banking_stream(question, job_role, company, pieces, timer):
+    """
+    Forward a live stream, storing the answer in the answer bank when it is
+    complete and did not depend on earlier turns of the conversation
+    """
+    parts = []
+    for piece in pieces:
+        parts.append(piece)
+        yield piece
+    if timer.completed and not timer.with_history and should_store(timer.source):
+        answer_bank.put(question, ''.join(parts), job_role, company)
+
 @ai_assistant_bp.route('/ai-assistant/model-info', methods=['GET'])
 @login_required
 def get_model_info():
@@ -77,7 +134,14 @@ def get_model_info():
             'model_loaded': True,
             'model_name': 'Universal Chatbot with Comprehensive Knowledge Base',
             'ai_powered': True,
-            'fallback_available': True
+            'fallback_available': True,
+            'response_cache': universal_chatbot.cache.get_stats(),
+            'conversations': universal_chatbot.conversations.get_stats(),
+            'streaming': stream_metrics.get_stats(),
+            'llm_client': universal_chatbot.llm.get_stats(),
+            'prompts': universal_chatbot.prompts.get_stats(),
+            'intent_router': intent_router.get_stats(),
+            'answer_bank': answer_bank.get_stats()
         }
         
         return jsonify({
@@ -97,56 +161,7 @@ def get_model_info():
 def get_practice_questions():
     """Get common interview questions for practice"""
     try:
-        practice_questions = [
-            {
-                'category': 'General',
-                'questions': [
-                    'Tell me about yourself',
-                    'Why do you want to work here?',
-                    'What are your greatest strengths?',
-                    'What is your biggest weakness?',
-                    'Where do you see yourself in 5 years?',
-                    'Why are you leaving your current job?',
-                    'Do you have any questions for us?'
-                ]
-            },
-            {
-                'category': 'Behavioral',
-                'questions': [
-                    'Tell me about a time you showed leadership',
-                    'Describe a challenging situation you faced at work',
-                    'Give me an example of when you worked in a team',
-                    'Tell me about a time you failed',
-                    'Describe a time you had to learn something new quickly',
-                    'Tell me about a conflict you had with a coworker',
-                    'Give me an example of when you went above and beyond'
-                ]
-            },
-            {
-                'category': 'Technical',
-                'questions': [
-                    'What programming languages are you most comfortable with?',
-                    'How do you approach debugging a complex problem?',
-                    'Explain your experience with databases',
-                    'What development methodologies have you used?',
-                    'How do you ensure code quality?',
-                    'Describe your experience with version control',
-                    'What tools do you use for testing?'
-                ]
-            },
-            {
-                'category': 'Situational',
-                'questions': [
-                    'How would you handle a tight deadline?',
-                    'What would you do if you disagreed with your manager?',
-                    'How do you prioritize multiple tasks?',
-                    'What would you do if you made a mistake?',
-                    'How do you handle criticism?',
-                    'What would you do if a project was falling behind?',
-                    'How do you stay updated with new technologies?'
-                ]
-            }
-        ]
+        practice_questions = PRACTICE_QUESTIONS
         
         return jsonify({
             'success': True,
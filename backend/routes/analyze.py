@@ -11,6 +11,7 @@ from services.emotion import analyze_emotion, get_emotion_feedback, analyze_emot
 # Database imports
 from database import db
 from models.session import SpeechSession
+from services.persistence_queue import persistence_queue
 
 # Authentication middleware
 from middleware.auth_middleware import login_required, get_current_user_id
@@ -292,9 +293,8 @@ def analyze():
                 emotion_feedback = "Emotion analysis completed based on available data."
         
         # Save analysis results to database (fail-safe)
+        session_id = None
         try:
-            import json
-            
             session_obj = SpeechSession(
                 user_id=get_current_user_id(),  # Associate with current user
                 transcript=text,
@@ -323,15 +323,14 @@ def analyze():
                 general_impression=get_general_impression(confidence),
                 
                 # JSON fields for complex data
-                strengths=json.dumps(generate_strengths(metrics, confidence)),
-                improvements=json.dumps(generate_improvements(metrics, confidence)),
-                actionable_tips=json.dumps(generate_actionable_tips(metrics, confidence)),
-                grammar_errors=json.dumps(metrics.get('grammar_errors', []))
+                strengths=generate_strengths(metrics, confidence),
+                improvements=generate_improvements(metrics, confidence),
+                actionable_tips=generate_actionable_tips(metrics, confidence),
+                grammar_errors=metrics.get('grammar_errors', [])
             )
             
-            db.session.add(session_obj)
-            db.session.commit()
-            print(f"Analysis saved to database (ID: {session_obj.id})")
+            session_id = persistence_queue.save(session_obj)
+            print(f"Analysis queued for saving (ID: {session_id})")
             
         except Exception as e:
             db.session.rollback()
@@ -340,6 +339,7 @@ def analyze():
         
         return jsonify({
             'success': True,
+            'session_id': session_id,
             'analysis': {
                 'transcript': text,
                 'overall_score': {
@@ -1,10 +1,29 @@
-from flask import Blueprint, render_template, jsonify, session
-from models.session import SpeechSession
+from flask import Blueprint, render_template, jsonify, session, request
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import load_only, undefer, undefer_group
+from database import db
+from models.session import SpeechSession, format_timestamp, JSON_LIST_GROUP, ASSESSMENT_GROUP
+from models.progress_rollup import query_rollups, PERIODS
 from middleware.auth_middleware import login_required, get_current_user_id
-import json
+from middleware.conditional_get import conditional_get, history_responses
+from services.persistence_queue import persistence_queue
+from services.response_cache import MemoryCacheBackend
+from utils.downsampling import downsample, parse_max_points
+from utils.transcript_search import search_transcripts, highlight, SearchError, MAX_SEARCH_OFFSET
+from utils.pagination import (
+    encode_cursor, decode_cursor, parse_limit, parse_offset, parse_fields, PaginationError
+)
 
 history_bp = Blueprint("history", __name__)
 
+# Columns behind the progress chart series
+CHART_COLUMNS = ['confidence', 'wpm', 'fillers']
+
+# Downsampled chart series, keyed by (user, max_points, last session id, session count);
+# a new or deleted session changes the key, so entries never go stale
+chart_cache = MemoryCacheBackend(max_entries=500)
+CHART_CACHE_TTL = 24 * 3600
+
 def serialize_sessions(sessions):
     return {
         "labels": [s.format_datetime('chart') for s in sessions],
@@ -15,20 +34,23 @@ def serialize_sessions(sessions):
 
 @history_bp.route("/history")
 @login_required
+@conditional_get
 def history():
     # Get current user ID
     current_user_id = get_current_user_id()
     
-    # Get sessions in ascending order for charts (natural progression) - filtered by user
-    sessions_for_charts = SpeechSession.query.filter_by(user_id=current_user_id).order_by(
-        SpeechSession.created_at.asc()
-    ).all()
-    
     # Get sessions in descending order for table (newest first) - filtered by user
-    sessions_for_table = SpeechSession.query.filter_by(user_id=current_user_id).order_by(
-        SpeechSession.created_at.desc()
+    # The table shows transcripts and the grammar error count; the assessments
+    # and the other JSON lists stay unloaded (and compressed)
+    sessions_for_table = SpeechSession.query.options(
+        undefer(SpeechSession.transcript), undefer(SpeechSession.grammar_errors)
+    ).filter_by(user_id=current_user_id).order_by(
+        SpeechSession.created_at.desc(), SpeechSession.id.desc()
     ).all()
     
+    # Charts show natural progression: the same rows, oldest first
+    sessions_for_charts = list(reversed(sessions_for_table))
+    
     chart_data = serialize_sessions(sessions_for_charts)
     
     return render_template(
@@ -37,94 +59,201 @@ def history():
         chart_data=chart_data         # Charts show natural progression
     )
 
+def serialize_session(session, fields):
+    """JSON-ready dict of a session's id, timestamps and the requested columns"""
+    session_data = {'id': session.id}
+    for field in fields:
+        # JSON list columns load as lists, and only when requested
+        session_data[field] = getattr(session, field)
+    session_data['created_at'] = session.format_datetime('friendly')
+    session_data['created_at_chart'] = session.format_datetime('chart')
+    return session_data
+
 @history_bp.route("/api/history")
 @login_required
+@conditional_get(params=('fields', 'limit', 'cursor'))
 def api_history():
-    """Get history data as JSON for React frontend"""
+    """
+    Get history data as JSON for React frontend
+    
+    Without parameters every session is returned with chart data (the
+    original response). With limit= and/or cursor= one page of sessions is
+    returned newest first, keyed on (created_at, id), with a next_cursor
+    for the following page. fields= limits the columns loaded and returned.
+    """
     # Get current user ID
     current_user_id = get_current_user_id()
     
-    # Get sessions in ascending order for charts (natural progression) - filtered by user
-    sessions_for_charts = SpeechSession.query.filter_by(user_id=current_user_id).order_by(
-        SpeechSession.created_at.asc()
-    ).all()
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        paginated = 'limit' in request.args or 'cursor' in request.args
+        limit = parse_limit(request.args.get('limit')) if paginated else None
+        cursor = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+    except PaginationError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     
-    # Get sessions in descending order for table (newest first) - filtered by user
-    sessions_for_table = SpeechSession.query.filter_by(user_id=current_user_id).order_by(
-        SpeechSession.created_at.desc()
-    ).all()
+    # Only the requested columns (and the chart series for the full response) are loaded
+    columns = ['id', 'created_at'] + fields
+    if not paginated:
+        columns += [name for name in CHART_COLUMNS if name not in fields]
+    query = SpeechSession.query.options(
+        load_only(*[getattr(SpeechSession, name) for name in columns])
+    ).filter_by(user_id=current_user_id)
     
-    # Serialize sessions for table
-    sessions_data = []
-    for session in sessions_for_table:
-        session_data = {
-            'id': session.id,
-            'transcript': session.transcript,
-            'wpm': session.wpm,
-            'fillers': session.fillers,
-            'sentiment': session.sentiment,
-            'confidence': session.confidence,
-            'emotion': session.emotion,
-            'word_count': session.word_count,
-            'filler_percentage': session.filler_percentage,
-            'grammar_score': session.grammar_score,
-            'vocabulary_diversity': session.vocabulary_diversity,
-            'unique_words': session.unique_words,
-            'pronunciation_clarity': session.pronunciation_clarity,
-            'engagement_level': session.engagement_level,
-            'skill_level': session.skill_level,
-            'pace_assessment': session.pace_assessment,
-            'filler_assessment': session.filler_assessment,
-            'grammar_assessment': session.grammar_assessment,
-            'vocabulary_assessment': session.vocabulary_assessment,
-            'tone_assessment': session.tone_assessment,
-            'general_impression': session.general_impression,
-            'created_at': session.format_datetime('friendly'),
-            'created_at_chart': session.format_datetime('chart')
-        }
+    # Newest first (table order); served by the (user_id, created_at) index
+    query = query.order_by(SpeechSession.created_at.desc(), SpeechSession.id.desc())
+    
+    if not paginated:
+        sessions_for_table = query.all()
+        sessions_data = [serialize_session(s, fields) for s in sessions_for_table]
         
-        # Parse JSON fields safely
-        try:
-            session_data['strengths'] = json.loads(session.strengths) if session.strengths else []
-        except:
-            session_data['strengths'] = []
-            
-        try:
-            session_data['improvements'] = json.loads(session.improvements) if session.improvements else []
-        except:
-            session_data['improvements'] = []
-            
-        try:
-            session_data['actionable_tips'] = json.loads(session.actionable_tips) if session.actionable_tips else []
-        except:
-            session_data['actionable_tips'] = []
-            
-        try:
-            session_data['grammar_errors'] = json.loads(session.grammar_errors) if session.grammar_errors else []
-        except:
-            session_data['grammar_errors'] = []
+        # Charts show natural progression: the same rows, oldest first
+        chart_data = serialize_sessions(list(reversed(sessions_for_table)))
         
-        sessions_data.append(session_data)
+        return jsonify({
+            'success': True,
+            'sessions': sessions_data,
+            'chart_data': chart_data,
+            'total_sessions': len(sessions_data)
+        })
     
-    # Chart data
-    chart_data = serialize_sessions(sessions_for_charts)
+    if cursor is not None:
+        query = query.filter(tuple_(SpeechSession.created_at, SpeechSession.id) < cursor)
+    
+    # One extra row tells whether another page follows
+    rows = query.limit(limit + 1).all()
+    page, has_more = rows[:limit], len(rows) > limit
+    
+    return jsonify({
+        'success': True,
+        'sessions': [serialize_session(s, fields) for s in page],
+        'has_more': has_more,
+        'next_cursor': encode_cursor(page[-1].created_at, page[-1].id) if has_more else None,
+        'limit': limit
+    })
+
+@history_bp.route("/api/history/chart")
+@login_required
+def api_history_chart():
+    """
+    Chart series only (oldest first), without loading any text columns
+    
+    period=day or period=week returns the per-period aggregates from the
+    progress rollups instead of one point per session. max_points= caps
+    the points returned, picked with LTTB so the shape of the series is kept.
+    """
+    current_user_id = get_current_user_id()
+    
+    period = request.args.get('period')
+    if period:
+        if period not in PERIODS:
+            return jsonify({'success': False, 'error': f"period must be one of {', '.join(PERIODS)}"}), 400
+        rollups = [rollup.to_dict() for rollup in query_rollups(current_user_id, period)]
+        return jsonify({
+            'success': True,
+            'period': period,
+            'rollups': rollups,
+            'total_sessions': sum(rollup['session_count'] for rollup in rollups)
+        })
+    
+    try:
+        max_points = parse_max_points(request.args.get('max_points'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    if max_points is None:
+        return jsonify({'success': True, **chart_series(current_user_id)})
+    
+    # Cheap check (served by the user index) that decides whether the cached series still hold
+    last_id, count = db.session.query(func.max(SpeechSession.id), func.count(SpeechSession.id)).filter(
+        SpeechSession.user_id == current_user_id
+    ).one()
+    key = f"{current_user_id}:{max_points}:{last_id}:{count}"
+    cached = chart_cache.get(key)
+    hit = cached is not None
+    if not hit:
+        cached = chart_series(current_user_id, max_points)
+        chart_cache.set(key, cached, CHART_CACHE_TTL)
+    return jsonify({'success': True, 'cached': hit, **cached})
+
+def chart_series(user_id, max_points=None):
+    """A user's chart series, oldest first, reduced to max_points with LTTB when given"""
+    rows = db.session.query(
+        SpeechSession.created_at, SpeechSession.confidence, SpeechSession.wpm, SpeechSession.fillers
+    ).filter(SpeechSession.user_id == user_id).order_by(
+        SpeechSession.created_at.asc(), SpeechSession.id.asc()
+    ).all()
+    
+    labels = [format_timestamp(row.created_at, 'chart') for row in rows]
+    series = [[row.confidence for row in rows], [row.wpm for row in rows], [row.fillers for row in rows]]
+    if max_points is not None:
+        labels, series = downsample(labels, series, max_points)
+    
+    return {
+        'chart_data': {
+            'labels': labels,
+            'confidence': series[0],
+            'wpm': series[1],
+            'fillers': series[2],
+        },
+        'total_sessions': len(rows),
+        'points': len(labels)
+    }
+
+@history_bp.route("/api/history/search")
+@login_required
+def api_history_search():
+    """
+    Search the current user's transcripts (q=), best match first
+    
+    Returns one page (limit=, offset=) of matching sessions with a
+    highlighted snippet of the transcript around the matched words.
+    """
+    current_user_id = get_current_user_id()
+    
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        offset = parse_offset(request.args.get('offset'), MAX_SEARCH_OFFSET)
+        rows, has_more = search_transcripts(db.session, current_user_id, request.args.get('q', ''), limit, offset)
+    except (PaginationError, SearchError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     
     return jsonify({
         'success': True,
-        'sessions': sessions_data,
-        'chart_data': chart_data,
-        'total_sessions': len(sessions_data)
+        'query': request.args.get('q'),
+        'results': [{
+            'id': row.id,
+            'created_at': format_timestamp(row.created_at, 'friendly'),
+            'wpm': row.wpm,
+            'confidence': row.confidence,
+            'snippet': highlight(row.snippet),
+            'score': round(-row.score, 4)
+        } for row in rows],
+        'has_more': has_more,
+        'next_offset': offset + len(rows) if has_more else None,
+        'limit': limit
     })
 
 @history_bp.route("/session/<int:session_id>")
 @login_required
+@conditional_get
 def get_session(session_id):
     """Get individual session data as JSON"""
     # Get current user ID
     current_user_id = get_current_user_id()
     
-    # Get session only if it belongs to the current user
-    session_obj = SpeechSession.query.filter_by(id=session_id, user_id=current_user_id).first()
+    # A session still waiting in the write-behind queue is served from there
+    session_obj = persistence_queue.get_pending(session_id)
+    pending = session_obj is not None
+    if pending and session_obj.user_id != current_user_id:
+        session_obj = None
+    elif not pending:
+        # Get session only if it belongs to the current user
+        session_obj = SpeechSession.query.options(
+            undefer(SpeechSession.transcript), undefer_group(ASSESSMENT_GROUP), undefer_group(JSON_LIST_GROUP)
+        ).filter_by(
+            id=session_id, user_id=current_user_id
+        ).first()
     
     if not session_obj:
         return jsonify({'error': 'Session not found or access denied'}), 404
@@ -159,4 +288,18 @@ def get_session(session_id):
         'created_at': session_obj.format_datetime('friendly')
     }
     
-    return jsonify(session_data)
\ No newline at end of file
+    response = jsonify(session_data)
+    if pending:
+        # Not committed yet, so not worth an ETag or a cached copy
+        response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@history_bp.route("/api/history/persistence")
+@login_required
+def persistence_stats():
+    """Depth and throughput of the write-behind queue for analysis results"""
+    return jsonify({
+        'success': True,
+        'persistence_queue': persistence_queue.get_stats(),
+        'response_cache': history_responses.get_stats()
+    })
\ No newline at end of file
@@ -1,26 +1,45 @@
-from flask import Blueprint, render_template, request, jsonify, session
+from flask import Blueprint, render_template, request, jsonify, session, Response, stream_with_context
 import os
 from werkzeug.utils import secure_filename
 
-from utils.interview_questions import INTERVIEW_QUESTIONS, get_questions_by_category, get_all_categories
+from utils.interview_questions import INTERVIEW_QUESTIONS, get_questions_by_category, get_all_categories, get_all_questions
 from services.audio_processing import process_audio
 from services.speech_to_text import speech_to_text
 from services.text_analysis import analyze_text
 from services.confidence import calculate_confidence
 from services.emotion import analyze_emotion_from_text, get_emotion_feedback
-from services.question_relevance_simple import QuestionRelevanceAnalyzer
+from services.relevance_cascade import RelevanceCascade, CascadeConfig
 from services.interview_chatbot import interview_chatbot
 from services.universal_chatbot import universal_chatbot
+from services.conversation_store import conversation_key
+from services.streaming import StreamTimer, sse_stream, SSE_HEADERS
 
 # Database imports for storing interview sessions
 from database import db
 from models.session import SpeechSession
+from services.persistence_queue import persistence_queue
 
 # Authentication middleware
 from middleware.auth_middleware import login_required, get_current_user_id
 
+from config import (
+    RELEVANCE_AMBIGUOUS_LOW, RELEVANCE_AMBIGUOUS_HIGH, RELEVANCE_LONG_ANSWER_WORDS,
+    RELEVANCE_MAX_ESCALATION_RATE, RELEVANCE_SHADOW_RATE, RELEVANCE_SEMANTIC_ENABLED
+)
+
 interview_bp = Blueprint("interview", __name__)
 
+# Shared relevance cascade (keyword tier first, semantic tier when ambiguous)
+relevance_cascade = RelevanceCascade(CascadeConfig(
+    ambiguous_low=RELEVANCE_AMBIGUOUS_LOW,
+    ambiguous_high=RELEVANCE_AMBIGUOUS_HIGH,
+    long_answer_words=RELEVANCE_LONG_ANSWER_WORDS,
+    max_escalation_rate=RELEVANCE_MAX_ESCALATION_RATE,
+    shadow_rate=RELEVANCE_SHADOW_RATE,
+    semantic_enabled=RELEVANCE_SEMANTIC_ENABLED
+))
+relevance_cascade.warm_question_types(get_all_questions())
+
 def get_interview_specific_feedback(question, transcript, metrics, confidence):
     """Generate interview-specific feedback based on the question and answer"""
     
@@ -158,8 +177,7 @@ def analyze_interview():
         
         # Question relevance analysis
         try:
-            relevance_analyzer = QuestionRelevanceAnalyzer()
-            relevance_result = relevance_analyzer.analyze_relevance(question, transcript)
+            relevance_result = relevance_cascade.analyze_relevance(question, transcript)
         except Exception as e:
             print(f"Relevance analysis failed: {e}")
             # Create fallback relevance result
@@ -186,6 +204,7 @@ def analyze_interview():
         interview_feedback = get_interview_specific_feedback(question, transcript, metrics, confidence)
         
         # Save to database as interview session (optional - can be separated later)
+        session_id = None
         try:
             import json
             
@@ -217,15 +236,14 @@ def analyze_interview():
                 general_impression=f"Interview answer analysis",
                 
                 # JSON fields for complex data
-                strengths=json.dumps(interview_feedback.get("specific_tips", [])),
-                improvements=json.dumps([]),
-                actionable_tips=json.dumps([]),
-                grammar_errors=json.dumps(metrics.get('grammar_errors', []))
+                strengths=interview_feedback.get("specific_tips", []),
+                improvements=[],
+                actionable_tips=[],
+                grammar_errors=metrics.get('grammar_errors', [])
             )
             
-            db.session.add(session_obj)
-            db.session.commit()
-            print(f"Interview session saved to database (ID: {session_obj.id})")
+            session_id = persistence_queue.save(session_obj)
+            print(f"Interview session queued for saving (ID: {session_id})")
             
         except Exception as e:
             db.session.rollback()
@@ -234,6 +252,7 @@ def analyze_interview():
         
         return jsonify({
             'success': True,
+            'session_id': session_id,
             'analysis': {
                 'question': question,
                 'category': category,
@@ -265,7 +284,8 @@ def analyze_interview():
                         'suggestions': relevance_result.feedback.specific_suggestions,
                         'examples': relevance_result.feedback.example_elements
                     },
-                    'processing_time': relevance_result.processing_time
+                    'processing_time': relevance_result.processing_time,
+                    'decided_by': relevance_result.decided_by
                 }
             }
         })
@@ -281,6 +301,16 @@ def analyze_interview():
             except:
                 pass
 
+@interview_bp.route("/interview/relevance/report")
+@login_required
+def relevance_cascade_report():
+    """Report the relevance cascade's tier mix, latency saved and accuracy kept"""
+    return jsonify({
+        'success': True,
+        'report': relevance_cascade.get_report(),
+        'question_classifier': relevance_cascade.keyword_analyzer.question_classifier.get_stats()
+    })
+
 @interview_bp.route("/interview/question/<category>")
 @login_required
 def get_category_questions(category):
@@ -304,12 +334,17 @@ def interview_chatbot_endpoint():
         if not user_message:
             return jsonify({'error': 'No message provided'}), 400
         
+        # Each user (and each of their open conversations) keeps its own history and context
+        key = conversation_key(get_current_user_id(), data.get('conversation_id'))
+        
         # Update chatbot context if provided
         if context:
-            universal_chatbot.update_context(**context)
+            universal_chatbot.update_context(key, **context)
         
         # Get intelligent response from Universal Chatbot (with OpenAI and enhanced fallback)
-        response = universal_chatbot.get_response(user_message)
+        # Clients can set no_cache to force a fresh reply
+        response = universal_chatbot.get_response(user_message, use_cache=not data.get('no_cache', False),
+                                                  conversation_key=key)
         
         return jsonify({
             'success': True,
@@ -320,6 +355,29 @@ def interview_chatbot_endpoint():
     except Exception as e:
         return jsonify({'error': f'Chatbot error: {str(e)}'}), 500
 
+@interview_bp.route("/interview/chatbot/stream", methods=["POST"])
+@login_required
+def interview_chatbot_stream():
+    """Stream a chatbot reply as Server-Sent Events (token events, then a done event)"""
+    
+    data = request.get_json() or {}
+    user_message = data.get('message', '').strip()
+    context = data.get('context', {})
+    
+    if not user_message:
+        return jsonify({'error': 'No message provided'}), 400
+    
+    key = conversation_key(get_current_user_id(), data.get('conversation_id'))
+    if context:
+        universal_chatbot.update_context(key, **context)
+    
+    timer = StreamTimer('chat')
+    pieces = universal_chatbot.stream_response(
+        user_message, use_cache=not data.get('no_cache', False), conversation_key=key, timer=timer
+    )
+    return Response(stream_with_context(sse_stream(pieces, timer)),
+                    mimetype='text/event-stream', headers=SSE_HEADERS)
+
 @interview_bp.route("/interview/chatbot/stage", methods=["POST"])
 @login_required
 def interview_chatbot_stage():
@@ -0,0 +1,184 @@
+"""
+Precomputed Answer Bank for the Smart AI Assistant
+
+Answers to the practice questions and the interview question bank,
+including common job-role variants, are generated offline
+(build_answer_bank.py) and stored in a local SQLite table indexed by
+(normalized question, job role, company). /ai-assistant/answer serves
+those directly and only generates answers for questions it has not seen,
+writing the generated answer back so the next request is served from the
+bank.
+
+Configure with ANSWER_BANK_PATH and ANSWER_BANK_ENABLED.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+import logging
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from .question_classifier import normalize_question
+
+logger = logging.getLogger(__name__)
+
+ANSWER_BANK_PATH = os.getenv(
+    'ANSWER_BANK_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'answer_bank.db')
+)
+ANSWER_BANK_ENABLED = os.getenv('ANSWER_BANK_ENABLED', 'true').lower() == 'true'
+
+OFFLINE = 'offline'
+LIVE = 'live'
+
+
+def _normalize_field(value: Optional[str]) -> str:
+    return ' '.join((value or '').lower().split())
+
+
+def answer_prompt(question: str, job_role: str = '', company: str = '') -> str:
+    """Message sent to the chatbot for a question, with job context when given"""
+    if job_role or company:
+        return f"This is for a {job_role} position at {company}. {question}"
+    return question
+
+
+class AnswerBank:
+    """
+    SQLite store of generated answers keyed by question, job role and company
+    """
+
+    def __init__(self, path: str = ANSWER_BANK_PATH, enabled: bool = True):
+        self.path = path
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+        self._connection = None
+        if not enabled:
+            return
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS answer_bank ('
+            ' question_key TEXT NOT NULL, job_role TEXT NOT NULL, company TEXT NOT NULL,'
+            ' question TEXT NOT NULL, answer TEXT NOT NULL, source TEXT NOT NULL, created_at REAL NOT NULL,'
+            ' PRIMARY KEY (question_key, job_role, company))'
+        )
+        self._connection.commit()
+
+    @staticmethod
+    def _key(question: str, job_role: str, company: str) -> Tuple[str, str, str]:
+        return normalize_question(question), _normalize_field(job_role), _normalize_field(company)
+
+    def get(self, question: str, job_role: str = '', company: str = '') -> Optional[str]:
+        """Stored answer for a question and job context, or None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT answer FROM answer_bank WHERE question_key = ? AND job_role = ? AND company = ?',
+                self._key(question, job_role, company)
+            ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, question: str, answer: str, job_role: str = '', company: str = '', source: str = LIVE):
+        """Store (or replace) the answer for a question and job context"""
+        if not self.enabled or not answer:
+            return
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO answer_bank'
+                ' (question_key, job_role, company, question, answer, source, created_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                self._key(question, job_role, company) + (question, answer, source, time.time())
+            )
+            self._connection.commit()
+        self.writes += 1
+
+    def __contains__(self, item: Tuple[str, str, str]) -> bool:
+        question, job_role, company = item
+        if not self.enabled:
+            return False
+        with self._lock:
+            return self._connection.execute(
+                'SELECT 1 FROM answer_bank WHERE question_key = ? AND job_role = ? AND company = ?',
+                self._key(question, job_role, company)
+            ).fetchone() is not None
+
+    def __len__(self) -> int:
+        if not self.enabled:
+            return 0
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM answer_bank').fetchone()[0]
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'answers': len(self),
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None
+        }
+
+
+def build_answer_bank(bank: AnswerBank, questions: Iterable[str], job_roles: Iterable[str],
+                      generate: Callable[[str], Tuple[str, str]], skip_existing: bool = True) -> Dict:
+    """
+    Generate and store answers for every question and job-role variant.
+
+    Args:
+        bank: Store to fill
+        questions: Questions to answer
+        job_roles: Roles to precompute variants for (the role-less answer is always included)
+        generate: Maps a chatbot message to (answer, source)
+        skip_existing: Keep answers that are already stored
+
+    Returns:
+        Counts of generated, skipped and fallback-only answers
+    """
+    counts = {'generated': 0, 'skipped': 0, 'not_stored': 0}
+    variants = [''] + [role for role in job_roles if role]
+    for question in questions:
+        for job_role in variants:
+            if skip_existing and (question, job_role, '') in bank:
+                counts['skipped'] += 1
+                continue
+            answer, source = generate(answer_prompt(question, job_role))
+            if should_store(source):
+                bank.put(question, answer, job_role=job_role, source=OFFLINE)
+                counts['generated'] += 1
+            else:
+                counts['not_stored'] += 1
+    return counts
+
+
+def should_store(source: str) -> bool:
+    """Only model-generated answers are banked; local fallback text is cheap to recompute"""
+    return source in ('openai', 'cache')
+
+
+def create_answer_bank() -> AnswerBank:
+    """Open the bank configured by the ANSWER_BANK_* environment variables"""
+    if ANSWER_BANK_ENABLED:
+        try:
+            return AnswerBank(ANSWER_BANK_PATH)
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Could not open answer bank at {ANSWER_BANK_PATH}: {e}")
+    return AnswerBank(enabled=False)
+
+
+# Global answer bank used by the Smart AI Assistant routes
+answer_bank = create_answer_bank()
@@ -0,0 +1,205 @@
+"""
+Versioned Binary Artifact Files
+
+Single-file container for artifacts that are built offline (exemplar
+indexes, per-question artifacts, knowledge base embeddings) and
+memory-mapped by the service at startup.
+
+Layout:
+    MAGIC (8 bytes) | header length (uint32, little endian) | JSON header |
+    padding | array blocks (each aligned to 64 bytes)
+
+The JSON header records the artifact kind, its schema version, free-form
+metadata and the dtype/shape/offset of every array block. Large string
+lists belong in array blocks too (pack_strings/StringArray), not in the
+header, so loading does not parse or hold every string.
+"""
+
+import json
+import mmap
+import os
+import struct
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+MAGIC = b'SPAART\x00\x01'
+_ALIGNMENT = 64
+_LENGTH_FORMAT = '<I'
+
+
+class ArtifactVersionError(Exception):
+    """Raised when an artifact file has the wrong kind or schema version"""
+
+
+@dataclass
+class Artifact:
+    """A loaded artifact: metadata plus memory-mapped arrays"""
+    kind: str
+    version: int
+    meta: Dict
+    arrays: Dict[str, np.ndarray]
+    _mmap: Optional[mmap.mmap] = field(default=None, repr=False)
+
+    def close(self):
+        """Release the memory map (arrays become invalid afterwards)"""
+        self.arrays = {}
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Views handed out earlier are still alive; the map is
+                # released when they are garbage collected.
+                pass
+            self._mmap = None
+
+
+class StringArray(Sequence):
+    """Strings stored as UTF-8 bytes plus offsets, each decoded when read"""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("string index out of range")
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return self.data[start:end].tobytes().decode('utf-8')
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], name: str) -> 'StringArray':
+        """The strings stored under name by pack_strings"""
+        return cls(arrays[f'{name}_data'], arrays[f'{name}_offsets'])
+
+
+def pack_strings(name: str, strings: Iterable[str]) -> Dict[str, np.ndarray]:
+    """Array blocks (name_data, name_offsets) holding strings for StringArray"""
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    return {f'{name}_data': data, f'{name}_offsets': offsets}
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def write_artifact(path: str, kind: str, version: int, meta: Dict,
+                   arrays: Dict[str, np.ndarray]) -> int:
+    """
+    Write an artifact file atomically.
+
+    Args:
+        path: Destination file path
+        kind: Artifact kind, checked again when loading
+        version: Schema version of this artifact kind
+        meta: JSON-serializable metadata
+        arrays: Named numpy arrays to store
+
+    Returns:
+        Size of the written file in bytes
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+
+    # Offsets are relative to the start of the data section, so the header
+    # can be serialized before its own length is known.
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _align(offset)
+        layout[name] = {
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+            'offset': offset
+        }
+        offset += array.nbytes
+
+    header = json.dumps({
+        'kind': kind,
+        'version': version,
+        'meta': meta,
+        'arrays': layout
+    }, separators=(',', ':')).encode('utf-8')
+
+    data_start = _align(len(MAGIC) + struct.calcsize(_LENGTH_FORMAT) + len(header))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack(_LENGTH_FORMAT, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]['offset'])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+        size = f.tell()
+
+    os.replace(tmp_path, path)
+    return size
+
+
+def load_artifact(path: str, kind: str, version: int) -> Artifact:
+    """
+    Memory-map an artifact file.
+
+    Args:
+        path: Artifact file path
+        kind: Expected artifact kind
+        version: Expected schema version
+
+    Returns:
+        Artifact whose arrays are read-only views into the mapped file
+    """
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        if mapped[:len(MAGIC)] != MAGIC:
+            raise ArtifactVersionError(f"{path} is not an artifact file")
+
+        length_start = len(MAGIC)
+        header_start = length_start + struct.calcsize(_LENGTH_FORMAT)
+        (header_length,) = struct.unpack(_LENGTH_FORMAT, mapped[length_start:header_start])
+        header = json.loads(mapped[header_start:header_start + header_length].decode('utf-8'))
+
+        if header.get('kind') != kind:
+            raise ArtifactVersionError(f"{path} holds '{header.get('kind')}', expected '{kind}'")
+        if header.get('version') != version:
+            raise ArtifactVersionError(
+                f"{path} is version {header.get('version')}, expected {version}; rebuild it"
+            )
+
+        data_start = _align(header_start + header_length)
+        arrays = {}
+        for name, spec in header['arrays'].items():
+            dtype = np.dtype(spec['dtype'])
+            shape = tuple(spec['shape'])
+            count = int(np.prod(shape)) if shape else 1
+            array = np.frombuffer(mapped, dtype=dtype, count=count,
+                                  offset=data_start + spec['offset'])
+            arrays[name] = array.reshape(shape)
+    except Exception:
+        mapped.close()
+        raise
+
+    return Artifact(
+        kind=kind,
+        version=header['version'],
+        meta=header.get('meta', {}),
+        arrays=arrays,
+        _mmap=mapped
+    )
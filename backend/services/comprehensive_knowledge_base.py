@@ -3,6 +3,10 @@ Comprehensive Knowledge Base for Perfect Question Answering
 Handles ANY question with detailed, accurate responses
 """
 
+import threading
+
+from .keyword_automaton import AhoCorasick
+
 class ComprehensiveKnowledgeBase:
     def __init__(self):
         self.knowledge_base = {
@@ -1364,31 +1368,47 @@ F = G(m₁m₂)/r²
         
         # Merge additional topics
         self.knowledge_base.update(additional_topics)
+        
+        # Keyword automaton: one pass over a message finds the longest matching keyword
+        self._automaton = AhoCorasick()
+        self._topic_order = {}
+        self._automaton_lock = threading.Lock()
+        # Bumped on every change so derived indexes (e.g. embedding retrieval) can resync
+        self.version = 0
+        for topic, data in self.knowledge_base.items():
+            self._index_topic(topic, data['keywords'])
+    
+    def _index_topic(self, topic: str, keywords: list):
+        """Add a topic's keywords to the automaton"""
+        order = self._topic_order.setdefault(topic, len(self._topic_order))
+        for position, keyword in enumerate(keywords):
+            # Longer keywords win; ties go to the earlier topic, then the earlier keyword
+            self._automaton.add(keyword, topic, (len(keyword), -order, -position))
     
     def get_response(self, question: str) -> str:
         """Get a comprehensive response for any question"""
         question_lower = question.lower().strip()
         
         # Check knowledge base for matches, prioritizing longer/more specific keywords
-        best_match = None
-        best_match_length = 0
-        
-        for topic, data in self.knowledge_base.items():
-            for keyword in data['keywords']:
-                if keyword in question_lower:
-                    # Prioritize longer, more specific matches
-                    if len(keyword) > best_match_length:
-                        best_match = data['response']
-                        best_match_length = len(keyword)
-        
-        return best_match
+        topic = self._automaton.best_match(question_lower)
+        if topic is None:
+            return None
+        return self.knowledge_base[topic]['response']
     
     def add_knowledge(self, topic: str, keywords: list, response: str):
         """Add new knowledge to the base"""
-        self.knowledge_base[topic] = {
-            'keywords': keywords,
-            'response': response
-        }
+        with self._automaton_lock:
+            previous = self.knowledge_base.get(topic)
+            if previous is not None:
+                for keyword in previous['keywords']:
+                    self._automaton.remove(keyword, topic)
+            
+            self.knowledge_base[topic] = {
+                'keywords': keywords,
+                'response': response
+            }
+            self._index_topic(topic, keywords)
+            self.version += 1
     
     def get_all_topics(self):
         """Get list of all available topics"""
@@ -0,0 +1,268 @@
+"""
+Per-User Conversation Store
+
+Replaces the chatbots' single shared conversation_history list and
+user_context dict. Each conversation is keyed by user and client
+conversation id. It keeps the most recent messages in a fixed-size ring
+buffer plus its own context dict. Conversations idle for longer than the
+TTL are dropped. When there are too many, the least recently active ones
+are evicted, so memory stays bounded no matter how many users there are
+(conversations x messages x message length).
+
+An optional SQLite tier (CONVERSATION_STORE_PATH) writes every message
+through to disk. Conversations evicted from memory can then be reloaded
+when their user returns.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGES = int(os.getenv('CONVERSATION_MAX_MESSAGES', '20'))
+MAX_CONVERSATIONS = int(os.getenv('CONVERSATION_MAX_CONVERSATIONS', '1000'))
+IDLE_TTL_SECONDS = float(os.getenv('CONVERSATION_IDLE_TTL', '1800'))
+MAX_MESSAGE_CHARS = int(os.getenv('CONVERSATION_MAX_MESSAGE_CHARS', '4000'))
+PERSIST_PATH = os.getenv('CONVERSATION_STORE_PATH')  # Unset keeps conversations in memory only
+
+DEFAULT_CONVERSATION_ID = 'default'
+
+
+def conversation_key(user_id=None, conversation_id: Optional[str] = None) -> str:
+    """Key for a user's conversation; anonymous callers share the 'anonymous' user"""
+    user = str(user_id) if user_id is not None else 'anonymous'
+    return f"{user}:{conversation_id or DEFAULT_CONVERSATION_ID}"
+
+
+# Used when a caller does not identify the conversation (scripts, tests, older callers)
+DEFAULT_CONVERSATION_KEY = conversation_key()
+
+
+@dataclass
+class Conversation:
+    """Bounded message history and context for one user conversation"""
+    key: str
+    messages: Deque[Dict]
+    context: Dict
+    last_active: float = field(default_factory=time.time)
+
+
+class ConversationStore:
+    """
+    LRU map of conversations with ring-buffer histories and idle expiry
+    """
+
+    def __init__(self, namespace: str, default_context: Optional[Dict] = None,
+                 max_messages: int = MAX_MESSAGES, max_conversations: int = MAX_CONVERSATIONS,
+                 idle_ttl: float = IDLE_TTL_SECONDS, max_message_chars: int = MAX_MESSAGE_CHARS,
+                 persist_path: Optional[str] = PERSIST_PATH):
+        """
+        Initialize the store.
+
+        Args:
+            namespace: Owner of the store (e.g. "universal"); keeps chatbots apart on disk
+            default_context: Context a new conversation starts with
+            max_messages: Ring buffer size per conversation
+            max_conversations: Conversations kept in memory
+            idle_ttl: Seconds of inactivity after which a conversation expires
+            max_message_chars: Longer messages are truncated before storing
+            persist_path: SQLite file for the persistence tier, or None
+        """
+        self.namespace = namespace
+        self.default_context = dict(default_context or {})
+        self.max_messages = max_messages
+        self.max_conversations = max_conversations
+        self.idle_ttl = idle_ttl
+        self.max_message_chars = max_message_chars
+        self._conversations: 'OrderedDict[str, Conversation]' = OrderedDict()
+        self._lock = threading.RLock()
+        self.evictions = 0
+        self.expirations = 0
+
+        self._db = None
+        if persist_path:
+            try:
+                self._db = _open_database(persist_path)
+            except (sqlite3.Error, OSError) as e:
+                logger.error(f"Conversation persistence disabled, could not open {persist_path}: {e}")
+
+    def get(self, key: str) -> Conversation:
+        """Return the conversation for a key, creating or reloading it as needed"""
+        now = time.time()
+        with self._lock:
+            self._expire_idle(now)
+            conversation = self._conversations.get(key)
+            if conversation is None:
+                conversation = self._load(key) or Conversation(
+                    key, deque(maxlen=self.max_messages), dict(self.default_context), now
+                )
+                self._conversations[key] = conversation
+                self._evict_overflow()
+            conversation.last_active = now
+            self._conversations.move_to_end(key)
+            return conversation
+
+    def append(self, key: str, role: str, content: str, **extra) -> Dict:
+        """
+        Add a message to a conversation.
+
+        Args:
+            key: Conversation key from conversation_key()
+            role: "user" or "assistant"
+            content: Message text (truncated to max_message_chars)
+            extra: Additional fields stored with the message
+        """
+        message = dict(extra, role=role, content=(content or '')[:self.max_message_chars], timestamp=time.time())
+        with self._lock:
+            conversation = self.get(key)
+            conversation.messages.append(message)
+            if self._db is not None:
+                self._persist_message(key, message)
+        return message
+
+    def history(self, key: str, limit: Optional[int] = None) -> List[Dict]:
+        """Most recent messages of a conversation, oldest first"""
+        with self._lock:
+            messages = list(self.get(key).messages)
+        return messages[-limit:] if limit else messages
+
+    def get_context(self, key: str) -> Dict:
+        """A copy of the conversation's context"""
+        with self._lock:
+            return dict(self.get(key).context)
+
+    def update_context(self, key: str, **kwargs):
+        """Update one conversation's context without touching other users"""
+        with self._lock:
+            conversation = self.get(key)
+            conversation.context.update(kwargs)
+            if self._db is not None:
+                self._persist_context(key, conversation.context)
+
+    def clear(self, key: str):
+        """Forget a conversation in memory and on disk"""
+        with self._lock:
+            self._conversations.pop(key, None)
+            if self._db is not None:
+                self._db.execute('DELETE FROM conversation_messages WHERE conversation = ?', (self._db_key(key),))
+                self._db.execute('DELETE FROM conversation_context WHERE conversation = ?', (self._db_key(key),))
+                self._db.commit()
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    def get_stats(self) -> Dict:
+        """Occupancy and eviction counters"""
+        with self._lock:
+            return {
+                'conversations': len(self._conversations),
+                'messages': sum(len(c.messages) for c in self._conversations.values()),
+                'max_conversations': self.max_conversations,
+                'max_messages': self.max_messages,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'persistent': self._db is not None
+            }
+
+    def _expire_idle(self, now: float):
+        """Drop idle conversations; the OrderedDict is sorted by last activity"""
+        while self._conversations:
+            key, oldest = next(iter(self._conversations.items()))
+            if now - oldest.last_active < self.idle_ttl:
+                break
+            del self._conversations[key]
+            self.expirations += 1
+
+    def _evict_overflow(self):
+        while len(self._conversations) > self.max_conversations:
+            self._conversations.popitem(last=False)
+            self.evictions += 1
+
+    def _db_key(self, key: str) -> str:
+        return f"{self.namespace}/{key}"
+
+    def _load(self, key: str) -> Optional[Conversation]:
+        """Reload a conversation from the persistence tier"""
+        if self._db is None:
+            return None
+        db_key = self._db_key(key)
+        row = self._db.execute(
+            'SELECT context, last_active FROM conversation_context WHERE conversation = ?', (db_key,)
+        ).fetchone()
+        rows = self._db.execute(
+            'SELECT message FROM conversation_messages WHERE conversation = ? ORDER BY id DESC LIMIT ?',
+            (db_key, self.max_messages)
+        ).fetchall()
+        if row is None and not rows:
+            return None
+
+        messages = deque((json.loads(r[0]) for r in reversed(rows)), maxlen=self.max_messages)
+        context = dict(self.default_context)
+        if row is not None:
+            context.update(json.loads(row[0]))
+        return Conversation(key, messages, context, time.time())
+
+    def _persist_message(self, key: str, message: Dict):
+        db_key = self._db_key(key)
+        try:
+            self._db.execute(
+                'INSERT INTO conversation_messages (conversation, message) VALUES (?, ?)',
+                (db_key, json.dumps(message, default=str))
+            )
+            # Keep the on-disk history bounded the same way as the ring buffer
+            self._db.execute(
+                'DELETE FROM conversation_messages WHERE conversation = ? AND id NOT IN ('
+                ' SELECT id FROM conversation_messages WHERE conversation = ? ORDER BY id DESC LIMIT ?)',
+                (db_key, db_key, self.max_messages)
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to persist conversation message: {e}")
+
+    def _persist_context(self, key: str, context: Dict):
+        try:
+            self._db.execute(
+                'INSERT OR REPLACE INTO conversation_context (conversation, context, last_active) VALUES (?, ?, ?)',
+                (self._db_key(key), json.dumps(context, default=str), time.time())
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to persist conversation context: {e}")
+
+
+_databases: Dict[str, sqlite3.Connection] = {}
+_databases_lock = threading.Lock()
+
+
+def _open_database(path: str) -> sqlite3.Connection:
+    """Open (once per process) the SQLite file shared by all conversation stores"""
+    with _databases_lock:
+        if path in _databases:
+            return _databases[path]
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS conversation_messages ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT, conversation TEXT NOT NULL, message TEXT NOT NULL)'
+        )
+        connection.execute(
+            'CREATE INDEX IF NOT EXISTS ix_conversation_messages_conversation'
+            ' ON conversation_messages (conversation, id)'
+        )
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS conversation_context ('
+            ' conversation TEXT PRIMARY KEY, context TEXT NOT NULL, last_active REAL NOT NULL)'
+        )
+        connection.commit()
+        _databases[path] = connection
+        return connection
@@ -0,0 +1,80 @@
+"""
+Shared Sentence Embedding Models
+
+Loads sentence transformer models once per process so the semantic
+similarity engine, the exemplar index and other embedding consumers
+share a single copy of the weights.
+"""
+
+import threading
+import logging
+from typing import Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+_models: Dict[str, object] = {}
+_models_lock = threading.Lock()
+
+
+def get_sentence_model(model_name: str = DEFAULT_MODEL_NAME):
+    """
+    Get a loaded sentence transformer model, loading it on first use.
+
+    Args:
+        model_name: Name of the sentence transformer model
+
+    Returns:
+        SentenceTransformer instance shared across callers
+    """
+    model = _models.get(model_name)
+    if model is not None:
+        return model
+
+    with _models_lock:
+        model = _models.get(model_name)
+        if model is None:
+            from sentence_transformers import SentenceTransformer
+
+            logger.info(f"Loading sentence transformer model: {model_name}")
+            model = SentenceTransformer(model_name)
+            _models[model_name] = model
+            logger.info("Sentence transformer model loaded successfully")
+    return model
+
+
+def encode_texts(texts: List[str], model_name: str = DEFAULT_MODEL_NAME,
+                 batch_size: int = 64) -> np.ndarray:
+    """
+    Encode texts into L2-normalized float32 embeddings.
+
+    Normalized rows let callers use a plain dot product as cosine similarity.
+
+    Args:
+        texts: Texts to encode
+        model_name: Name of the sentence transformer model
+        batch_size: Encoding batch size
+
+    Returns:
+        Array of shape (len(texts), dimension)
+    """
+    model = get_sentence_model(model_name)
+    if not texts:
+        return np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+    embeddings = model.encode(list(texts), batch_size=batch_size, convert_to_numpy=True)
+    return normalize_rows(np.asarray(embeddings, dtype=np.float32))
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row, leaving all-zero rows untouched"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        norm = np.linalg.norm(matrix)
+        return matrix / norm if norm > 0 else matrix
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
@@ -0,0 +1,379 @@
+"""
+Exemplar Answer Index for Nearest-Exemplar Relevance Scoring
+
+Known-good interview answers (the assistants' canned responses plus any
+curated user answers) are embedded offline into a vector index. At request
+time an answer is compared against the index to find the closest exemplars.
+
+Small banks use a flat index (exact search). Larger banks use an IVF index:
+vectors are clustered with spherical k-means and stored grouped by cluster,
+so a query only scores the few clusters whose centroids are closest.
+"""
+
+import os
+import time
+import json
+import logging
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Iterable
+
+import numpy as np
+
+from .artifact_store import write_artifact, load_artifact, pack_strings, StringArray, ArtifactVersionError
+from .embeddings import encode_texts, normalize_rows, DEFAULT_MODEL_NAME
+
+logger = logging.getLogger(__name__)
+
+INDEX_KIND = 'exemplar_index'
+# Version 2 moved the exemplar texts out of the JSON header
+INDEX_VERSION = 2
+
+DEFAULT_INDEX_PATH = os.getenv(
+    'EXEMPLAR_INDEX_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'exemplar_index.bin')
+)
+
+# Below this many exemplars exact search is already fast enough
+FLAT_INDEX_MAX_SIZE = 4096
+
+
+@dataclass
+class Exemplar:
+    """A known-good answer stored in the index"""
+    text: str
+    source: str
+    category: str
+
+
+@dataclass
+class ExemplarMatch:
+    """An exemplar returned by a nearest-neighbour query"""
+    text: str
+    source: str
+    category: str
+    similarity: float
+
+
+class StoredExemplars(Sequence):
+    """Exemplar records of a loaded index, read from the artifact when accessed"""
+
+    def __init__(self, texts: StringArray, sources: List[str], categories: List[str],
+                 source_ids: np.ndarray, category_ids: np.ndarray):
+        self.texts = texts
+        self.sources = sources
+        self.categories = categories
+        self.source_ids = source_ids
+        self.category_ids = category_ids
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return Exemplar(self.texts[index], self.sources[int(self.source_ids[index])],
+                        self.categories[int(self.category_ids[index])])
+
+
+class ExemplarIndex:
+    """
+    Memory-mapped flat or IVF index over normalized exemplar embeddings
+    """
+
+    def __init__(self, vectors: np.ndarray, exemplars: Sequence,
+                 centroids: Optional[np.ndarray] = None,
+                 list_offsets: Optional[np.ndarray] = None,
+                 row_ids: Optional[np.ndarray] = None,
+                 model_name: str = DEFAULT_MODEL_NAME,
+                 nprobe: int = 8,
+                 artifact=None):
+        """
+        Args:
+            vectors: Normalized exemplar vectors (grouped by list for IVF)
+            exemplars: Exemplar records (or StoredExemplars), indexed by original row id
+            centroids: IVF centroids, or None for a flat index
+            list_offsets: Start row of each IVF list plus a final end offset
+            row_ids: Original exemplar id of each stored vector row
+            model_name: Embedding model the vectors were built with
+            nprobe: Number of IVF lists scanned per query
+            artifact: Backing artifact, kept alive for the memory map
+        """
+        self.vectors = vectors
+        self.exemplars = exemplars
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.row_ids = row_ids
+        self.model_name = model_name
+        self.nprobe = nprobe
+        self._artifact = artifact
+
+    @property
+    def is_ivf(self) -> bool:
+        return self.centroids is not None and len(self.centroids) > 0
+
+    def __len__(self) -> int:
+        return len(self.exemplars)
+
+    def search(self, query: np.ndarray, k: int = 5) -> List[ExemplarMatch]:
+        """
+        Find the k exemplars most similar to a query vector.
+
+        Args:
+            query: Query embedding (normalized or not)
+            k: Number of exemplars to return
+
+        Returns:
+            Matches sorted by descending cosine similarity
+        """
+        if len(self.vectors) == 0 or k <= 0:
+            return []
+
+        query = normalize_rows(np.asarray(query, dtype=np.float32).ravel())
+
+        if self.is_ivf:
+            rows, scores = self._search_ivf(query)
+        else:
+            rows = None
+            scores = self.vectors @ query
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        matches = []
+        for position in top:
+            row = int(rows[position]) if rows is not None else int(position)
+            exemplar_id = int(self.row_ids[row]) if self.row_ids is not None else row
+            exemplar = self.exemplars[exemplar_id]
+            matches.append(ExemplarMatch(
+                text=exemplar.text,
+                source=exemplar.source,
+                category=exemplar.category,
+                similarity=float(scores[position])
+            ))
+        return matches
+
+    def _search_ivf(self, query: np.ndarray):
+        """Score only the vectors in the nprobe closest lists"""
+        centroid_scores = self.centroids @ query
+        nprobe = min(self.nprobe, len(centroid_scores))
+        probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+
+        row_blocks = []
+        score_blocks = []
+        for list_id in probe:
+            start = int(self.list_offsets[list_id])
+            end = int(self.list_offsets[list_id + 1])
+            if end > start:
+                row_blocks.append(np.arange(start, end))
+                score_blocks.append(self.vectors[start:end] @ query)
+
+        if not score_blocks:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        return np.concatenate(row_blocks), np.concatenate(score_blocks)
+
+    def search_text(self, text: str, k: int = 5) -> List[ExemplarMatch]:
+        """Embed a text with the index's model and search for it"""
+        if not text or not text.strip():
+            return []
+        query = encode_texts([text], model_name=self.model_name)[0]
+        return self.search(query, k)
+
+    # ------------------------------------------------------------------
+    # Building and persistence
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, exemplars: List[Exemplar],
+              n_lists: Optional[int] = None, model_name: str = DEFAULT_MODEL_NAME,
+              kmeans_iterations: int = 10, seed: int = 0) -> 'ExemplarIndex':
+        """
+        Build an index in memory from exemplar vectors.
+
+        Args:
+            vectors: One embedding per exemplar
+            exemplars: Exemplar records in the same order as vectors
+            n_lists: Number of IVF lists; None picks flat or sqrt(n) automatically,
+                     0 forces a flat index
+            model_name: Embedding model the vectors were built with
+            kmeans_iterations: Lloyd iterations for clustering
+            seed: Random seed for centroid initialization
+        """
+        vectors = normalize_rows(vectors)
+        count = len(vectors)
+
+        if n_lists is None:
+            n_lists = 0 if count <= FLAT_INDEX_MAX_SIZE else int(np.sqrt(count))
+        n_lists = min(n_lists, count)
+
+        if n_lists <= 1:
+            return cls(vectors, exemplars, model_name=model_name)
+
+        centroids, assignments = _spherical_kmeans(vectors, n_lists, kmeans_iterations, seed)
+
+        order = np.argsort(assignments, kind='stable')
+        counts = np.bincount(assignments, minlength=n_lists)
+        list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(counts, out=list_offsets[1:])
+
+        return cls(
+            np.ascontiguousarray(vectors[order]),
+            exemplars,
+            centroids=centroids,
+            list_offsets=list_offsets,
+            row_ids=order.astype(np.int64),
+            model_name=model_name
+        )
+
+    def save(self, path: str = DEFAULT_INDEX_PATH) -> int:
+        """Write the index to a versioned artifact file"""
+        arrays = {'vectors': self.vectors.astype(np.float32)}
+        if self.is_ivf:
+            arrays['centroids'] = self.centroids.astype(np.float32)
+            arrays['list_offsets'] = self.list_offsets.astype(np.int64)
+            arrays['row_ids'] = self.row_ids.astype(np.int64)
+
+        # Texts go in their own array blocks; the few distinct sources and
+        # categories stay in the header, referenced by id
+        sources = sorted({e.source for e in self.exemplars})
+        categories = sorted({e.category for e in self.exemplars})
+        source_ids = {source: i for i, source in enumerate(sources)}
+        category_ids = {category: i for i, category in enumerate(categories)}
+        arrays.update(pack_strings('texts', (e.text for e in self.exemplars)))
+        arrays['source_ids'] = np.array([source_ids[e.source] for e in self.exemplars], dtype=np.int32)
+        arrays['category_ids'] = np.array([category_ids[e.category] for e in self.exemplars], dtype=np.int32)
+
+        meta = {'model_name': self.model_name, 'sources': sources, 'categories': categories}
+        return write_artifact(path, INDEX_KIND, INDEX_VERSION, meta, arrays)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_INDEX_PATH, nprobe: int = 8) -> 'ExemplarIndex':
+        """Memory-map an index written by save()"""
+        artifact = load_artifact(path, INDEX_KIND, INDEX_VERSION)
+        arrays = artifact.arrays
+        exemplars = StoredExemplars(
+            StringArray.from_arrays(arrays, 'texts'),
+            artifact.meta['sources'],
+            artifact.meta['categories'],
+            arrays['source_ids'],
+            arrays['category_ids']
+        )
+        return cls(
+            arrays['vectors'],
+            exemplars,
+            centroids=arrays.get('centroids'),
+            list_offsets=arrays.get('list_offsets'),
+            row_ids=arrays.get('row_ids'),
+            model_name=artifact.meta.get('model_name', DEFAULT_MODEL_NAME),
+            nprobe=nprobe,
+            artifact=artifact
+        )
+
+
+def _spherical_kmeans(vectors: np.ndarray, n_clusters: int, iterations: int, seed: int):
+    """Cluster normalized vectors by cosine similarity"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    assignments = np.zeros(len(vectors), dtype=np.int64)
+
+    for _ in range(iterations):
+        assignments = _assign(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        empty = np.bincount(assignments, minlength=n_clusters) == 0
+        if empty.any():
+            # Re-seed empty clusters with random vectors
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        centroids = normalize_rows(sums)
+
+    return centroids.astype(np.float32), _assign(vectors, centroids)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, chunk_size: int = 8192) -> np.ndarray:
+    """Assign each vector to its most similar centroid, in chunks to bound memory"""
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), chunk_size):
+        block = vectors[start:start + chunk_size]
+        assignments[start:start + chunk_size] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+def collect_exemplars(curated_path: Optional[str] = None) -> List[Exemplar]:
+    """
+    Gather exemplar answers from the interview assistants and curated answers.
+
+    Args:
+        curated_path: Optional JSON file with a list of
+                      {"text": ..., "category": ...} curated user answers
+    """
+    from .ai_interview_assistant import ai_interview_assistant
+    from .smart_ai_assistant import smart_ai_assistant
+
+    exemplars = []
+    sources = [
+        ('ai_interview_assistant.behavioral', ai_interview_assistant.behavioral_responses),
+        ('ai_interview_assistant.technical', ai_interview_assistant.technical_responses),
+        ('smart_ai_assistant.enhanced', smart_ai_assistant.enhanced_responses),
+    ]
+    for source, responses in sources:
+        for category, answers in responses.items():
+            for answer in answers:
+                exemplars.append(Exemplar(answer, source, category))
+
+    if curated_path:
+        with open(curated_path, 'r', encoding='utf-8') as f:
+            for item in json.load(f):
+                exemplars.append(Exemplar(item['text'], 'curated', item.get('category', 'general')))
+
+    # Drop duplicate texts, keeping the first source
+    seen = set()
+    unique = []
+    for exemplar in exemplars:
+        if exemplar.text not in seen:
+            seen.add(exemplar.text)
+            unique.append(exemplar)
+    return unique
+
+
+def build_exemplar_index(path: str = DEFAULT_INDEX_PATH, curated_path: Optional[str] = None,
+                         model_name: str = DEFAULT_MODEL_NAME,
+                         n_lists: Optional[int] = None) -> ExemplarIndex:
+    """Embed all exemplars and write the index file"""
+    exemplars = collect_exemplars(curated_path)
+    vectors = encode_texts([e.text for e in exemplars], model_name=model_name)
+    index = ExemplarIndex.build(vectors, exemplars, n_lists=n_lists, model_name=model_name)
+    size = index.save(path)
+    logger.info(f"Wrote exemplar index with {len(exemplars)} exemplars ({size} bytes) to {path}")
+    return index
+
+
+_loaded_index = None
+_load_attempted = False
+
+
+def load_exemplar_index(path: str = DEFAULT_INDEX_PATH) -> Optional[ExemplarIndex]:
+    """
+    Load the exemplar index once per process.
+
+    Returns:
+        The index, or None if it has not been built
+    """
+    global _loaded_index, _load_attempted
+    if _load_attempted:
+        return _loaded_index
+
+    _load_attempted = True
+    if not os.path.exists(path):
+        logger.info(f"Exemplar index not found at {path}; nearest-exemplar scoring disabled")
+        return None
+
+    try:
+        start_time = time.time()
+        _loaded_index = ExemplarIndex.load(path)
+        logger.info(f"Loaded exemplar index ({len(_loaded_index)} exemplars) "
+                    f"in {(time.time() - start_time) * 1000:.1f}ms")
+    except (ArtifactVersionError, OSError, KeyError) as e:
+        logger.error(f"Failed to load exemplar index: {e}")
+        _loaded_index = None
+    return _loaded_index
@@ -0,0 +1,95 @@
+"""
+Intent Router for General Chatbot Questions
+
+The topic keywords of the universal chatbot's general-question handlers
+are compiled once into a word-boundary phrase index. A message is
+tokenized once and every intent is scored in the same pass by the number
+of distinct keywords it matched; the best intent is returned with a
+confidence (its share of all keyword hits). Ties go to the intent listed
+first, so a message that matches one keyword of several intents is routed
+like the old if/elif cascade.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .keyword_automaton import PhraseMatcher, tokenize
+
+# Intents in routing priority order, with the keywords that select them
+GENERAL_INTENTS: List[Tuple[str, List[str]]] = [
+    ('programming', ['programming', 'code', 'coding', 'python', 'javascript', 'java', 'react', 'node',
+                     'database', 'sql', 'api', 'web development', 'software']),
+    ('science', ['math', 'mathematics', 'science', 'physics', 'chemistry', 'biology', 'calculate',
+                 'formula', 'equation']),
+    ('business', ['business', 'marketing', 'finance', 'investment', 'startup', 'entrepreneur', 'money',
+                  'budget', 'economics']),
+    ('health', ['health', 'fitness', 'exercise', 'diet', 'nutrition', 'wellness', 'mental health', 'stress']),
+    ('education', ['learn', 'study', 'education', 'school', 'university', 'course', 'tutorial', 'skill']),
+    ('creative', ['write', 'writing', 'creative', 'story', 'blog', 'content', 'design', 'art']),
+    ('communication', ['communication', 'social', 'relationship', 'team', 'leadership', 'presentation',
+                       'public speaking']),
+    ('problem_solving', ['problem', 'solve', 'decision', 'choose', 'help me', 'advice', 'what should i']),
+    ('greeting', ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'how are you']),
+    ('thanks', ['thank', 'thanks', 'appreciate']),
+]
+
+
+@dataclass
+class IntentMatch:
+    """The routed intent and how strongly the message pointed at it"""
+    intent: str
+    confidence: float
+    scores: Dict[str, int]
+
+
+class IntentRouter:
+    """
+    Scores every intent against a message in one tokenize-and-lookup pass
+    """
+
+    def __init__(self, intents: Sequence[Tuple[str, Sequence[str]]] = GENERAL_INTENTS):
+        self.intents = [name for name, _ in intents]
+        self._order = {name: position for position, name in enumerate(self.intents)}
+        self._matcher = PhraseMatcher()
+        for name, keywords in intents:
+            for keyword in keywords:
+                # The (intent, keyword) payload lets distinct keyword hits be counted per intent
+                self._matcher.add(keyword, (name, keyword), expand_inflections=True)
+
+        self._lock = threading.Lock()
+        self.routed: Dict[str, int] = {}
+        self.unrouted = 0
+
+    def score(self, message: str) -> Dict[str, int]:
+        """Distinct keyword hits per intent (intents without hits are left out)"""
+        scores: Dict[str, int] = {}
+        for name, _ in self._matcher.match_tokens(tokenize(message)):
+            scores[name] = scores.get(name, 0) + 1
+        return scores
+
+    def route(self, message: str) -> Optional[IntentMatch]:
+        """Best intent for a message, or None if no intent keyword occurs in it"""
+        scores = self.score(message)
+        if not scores:
+            with self._lock:
+                self.unrouted += 1
+            return None
+
+        intent = max(scores, key=lambda name: (scores[name], -self._order[name]))
+        with self._lock:
+            self.routed[intent] = self.routed.get(intent, 0) + 1
+        return IntentMatch(intent, round(scores[intent] / sum(scores.values()), 3), scores)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'intents': len(self.intents),
+                'keywords': len(self._matcher),
+                'routed': dict(self.routed),
+                'unrouted': self.unrouted
+            }
+
+
+# Global router used by the universal chatbot
+intent_router = IntentRouter()
@@ -6,16 +6,18 @@ Provides intelligent responses and guidance for interview practice
 import re
 import random
 from typing import Dict, List, Tuple
+from .conversation_store import ConversationStore, DEFAULT_CONVERSATION_KEY
+from .knowledge_retrieval import retrieve_answer
 
 class InterviewChatbot:
     def __init__(self):
-        self.conversation_history = []
-        self.user_context = {
+        # Bounded history and context per user conversation
+        self.conversations = ConversationStore('interview', default_context={
             'selected_category': None,
             'selected_question': None,
             'analysis_results': None,
             'session_stage': 'initial'  # initial, practicing, analyzing, completed
-        }
+        })
         
         # Knowledge base for responses
         self.knowledge_base = {
@@ -82,19 +84,26 @@ class InterviewChatbot:
             'situational': "think through the scenario step-by-step and explain your reasoning"
         }
 
-    def update_context(self, **kwargs):
-        """Update the chatbot's context about the user's session"""
-        self.user_context.update(kwargs)
+    @property
+    def conversation_history(self) -> List[Dict]:
+        """History of the default conversation"""
+        return self.conversations.history(DEFAULT_CONVERSATION_KEY)
+
+    @property
+    def user_context(self) -> Dict:
+        """Context of the default conversation (a copy; use update_context to change it)"""
+        return self.conversations.get_context(DEFAULT_CONVERSATION_KEY)
 
-    def get_response(self, user_message: str) -> str:
+    def update_context(self, conversation_key: str = DEFAULT_CONVERSATION_KEY, **kwargs):
+        """Update the chatbot's context about one user's session"""
+        self.conversations.update_context(conversation_key, **kwargs)
+
+    def get_response(self, user_message: str, conversation_key: str = DEFAULT_CONVERSATION_KEY) -> str:
         """Generate an intelligent response based on user input and context"""
         user_message_lower = user_message.lower().strip()
         
-        # Add to conversation history
-        self.conversation_history.append({
-            'user': user_message,
-            'timestamp': 'now'  # In real implementation, use actual timestamp
-        })
+        # Add to this user's conversation history
+        self.conversations.append(conversation_key, 'user', user_message)
         
         # Check for knowledge base matches
         for topic, data in self.knowledge_base.items():
@@ -103,18 +112,23 @@ class InterviewChatbot:
         
         # Context-aware responses
         if 'help' in user_message_lower or 'tip' in user_message_lower:
-            return self._get_contextual_help()
+            return self._get_contextual_help(self.conversations.get_context(conversation_key))
         
         if any(word in user_message_lower for word in ['thank', 'thanks']):
             return "You're very welcome! 😊 I'm here to help you succeed. Remember, every interview is practice, and you're getting better each time! Is there anything specific you'd like to work on?"
         
+        # Paraphrased questions: closest knowledge base entry by embedding similarity
+        retrieved = retrieve_answer(user_message)
+        if retrieved:
+            return retrieved
+        
         # Default responses with context
         return self._get_default_response(user_message_lower)
 
-    def _get_contextual_help(self) -> str:
-        """Provide help based on current context"""
-        stage = self.user_context.get('session_stage', 'initial')
-        category = self.user_context.get('selected_category')
+    def _get_contextual_help(self, context: Dict) -> str:
+        """Provide help based on the user's current context"""
+        stage = context.get('session_stage', 'initial')
+        category = context.get('selected_category')
         
         if stage == 'initial':
             return "Here's how I can help you succeed in interviews:\n\n• **STAR Method**: Structure for behavioral questions (Situation, Task, Action, Result)\n• **Confidence Building**: Techniques to reduce anxiety and speak with authority\n• **Common Questions**: How to answer 'Tell me about yourself,' weaknesses, etc.\n• **Salary Discussion**: When and how to negotiate compensation\n• **Questions to Ask**: Thoughtful questions that impress interviewers\n• **Body Language**: Non-verbal communication tips\n\nJust ask me about any of these topics and I'll give you specific, actionable advice!"
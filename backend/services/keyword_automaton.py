@@ -0,0 +1,241 @@
+"""
+Keyword Matching Automata
+
+PhraseMatcher compiles a set of words and multi-word phrases into lookup
+tables. Text is tokenized once and every phrase is checked against it in a
+single pass; each match reports the payload registered for the phrase
+(typically the canonical keyword or category the phrase stands for).
+Matching respects word boundaries, so "cat" does not match inside
+"communicate".
+
+AhoCorasick is the character-level counterpart for callers that need
+plain substring semantics (e.g. the knowledge base keyword lookup).
+"""
+
+import string
+import threading
+from collections import deque
+from itertools import chain
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+# Punctuation is mapped to spaces so tokenizing is a C-level translate + split
+_PUNCTUATION = string.punctuation + "\u2018\u2019\u201c\u201d\u2013\u2014\u2026"
+_SEPARATORS = str.maketrans(_PUNCTUATION, " " * len(_PUNCTUATION))
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and split text into word tokens"""
+    if not text:
+        return []
+    return text.lower().translate(_SEPARATORS).split()
+
+
+def inflections(word: str) -> Set[str]:
+    """
+    Common English inflections of a word.
+
+    Used to keep matches like "achieve" -> "achieved" working once matching
+    is done on whole words instead of substrings.
+    """
+    forms = {word, word + 's', word + 'es', word + 'ed', word + 'ing', word + 'ment', word + 'ments'}
+    if word.endswith('e'):
+        forms.update({word + 'd', word[:-1] + 'ing'})
+    if word.endswith('y') and len(word) > 2:
+        forms.update({word[:-1] + 'ies', word[:-1] + 'ied'})
+    return forms
+
+
+class PhraseMatcher:
+    """
+    Word-boundary phrase matcher mapping matched phrases to payloads
+
+    Single-word phrases (the vast majority) are resolved with one set
+    intersection against the answer's vocabulary; multi-word phrases are
+    looked up in the space-joined token stream so they still only match on
+    whole words.
+    """
+
+    def __init__(self):
+        self._words: Dict[str, List[Hashable]] = {}
+        # Multi-word phrases keyed by first token, then by space-padded phrase
+        self._phrases: Dict[str, Dict[str, List[Hashable]]] = {}
+        self._vocabulary = frozenset()
+        self._phrase_heads = frozenset()
+        self._phrase_count = 0
+
+    def __len__(self) -> int:
+        return self._phrase_count
+
+    def add(self, phrase: str, payload: Hashable, expand_inflections: bool = False):
+        """
+        Register a phrase.
+
+        Args:
+            phrase: Word or multi-word phrase
+            payload: Value reported when the phrase matches
+            expand_inflections: Also match inflected forms of the last word
+        """
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+
+        last_forms = inflections(tokens[-1]) if expand_inflections else {tokens[-1]}
+        for last in last_forms:
+            if len(tokens) == 1:
+                payloads = self._words.setdefault(last, [])
+            else:
+                phrase_tokens = tokens[:-1] + [last]
+                phrases = self._phrases.setdefault(phrase_tokens[0], {})
+                payloads = phrases.setdefault(' ' + ' '.join(phrase_tokens) + ' ', [])
+            if payload not in payloads:
+                payloads.append(payload)
+                self._phrase_count += 1
+
+        self._vocabulary = frozenset(self._words)
+        self._phrase_heads = frozenset(self._phrases)
+
+    def add_all(self, phrases: Iterable[str], payload: Hashable, expand_inflections: bool = False):
+        """Register several phrases with the same payload"""
+        for phrase in phrases:
+            self.add(phrase, payload, expand_inflections)
+
+    def match_tokens(self, tokens: List[str]) -> Set[Hashable]:
+        """
+        Return the set of payloads whose phrases occur in the token list.
+
+        Args:
+            tokens: Output of tokenize()
+        """
+        hits = self._vocabulary.intersection(tokens)
+        found = set(chain.from_iterable(map(self._words.__getitem__, hits)))
+
+        heads = self._phrase_heads.intersection(tokens)
+        if heads:
+            joined = ' ' + ' '.join(tokens) + ' '
+            for head in heads:
+                for phrase, payloads in self._phrases[head].items():
+                    if phrase in joined:
+                        found.update(payloads)
+        return found
+
+    def match(self, text: str) -> Set[Hashable]:
+        """Return the set of payloads whose phrases occur in the text"""
+        return self.match_tokens(tokenize(text))
+
+
+class AhoCorasick:
+    """
+    Character-level Aho-Corasick automaton with substring semantics
+
+    Every keyword carries a payload and a priority; best_match() returns the
+    payload of the highest-priority keyword occurring anywhere in the text
+    in a single pass over its characters. Keywords can be added or removed
+    at any time: the trie is updated in place and the failure links are
+    recomputed once, lazily, before the next search.
+    """
+
+    def __init__(self):
+        # Parallel per-node arrays: children, failure link, own entries, best entry
+        self._children: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._entries: List[List[Tuple]] = [[]]
+        self._best: List[Optional[Tuple]] = [None]
+        self._keyword_count = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._keyword_count
+
+    def add(self, keyword: str, payload: Hashable, priority: Tuple = ()):
+        """
+        Register a keyword.
+
+        Args:
+            keyword: Substring to search for
+            payload: Value returned when the keyword wins
+            priority: Comparable value; higher wins when several keywords match
+        """
+        if not keyword:
+            return
+        with self._lock:
+            node = 0
+            for char in keyword:
+                child = self._children[node].get(char)
+                if child is None:
+                    child = len(self._children)
+                    self._children[node][char] = child
+                    self._children.append({})
+                    self._fail.append(0)
+                    self._entries.append([])
+                    self._best.append(None)
+                node = child
+            self._entries[node].append((priority, payload))
+            self._keyword_count += 1
+            self._dirty = True
+
+    def remove(self, keyword: str, payload: Hashable):
+        """Unregister a keyword previously added with this payload"""
+        with self._lock:
+            node = 0
+            for char in keyword:
+                node = self._children[node].get(char)
+                if node is None:
+                    return
+            remaining = [entry for entry in self._entries[node] if entry[1] != payload]
+            self._keyword_count -= len(self._entries[node]) - len(remaining)
+            self._entries[node] = remaining
+            self._dirty = True
+
+    def _build_links(self):
+        """Recompute failure links and per-node best entries (breadth first)"""
+        children, fail, entries, best = self._children, self._fail, self._entries, self._best
+        queue = deque()
+        for child in children[0].values():
+            fail[child] = 0
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            candidates = entries[node]
+            own = max(candidates, key=_entry_priority) if candidates else None
+            inherited = best[fail[node]]
+            if own is None or (inherited is not None and inherited[0] > own[0]):
+                own = inherited
+            best[node] = own
+
+            for char, child in children[node].items():
+                state = fail[node]
+                while state and char not in children[state]:
+                    state = fail[state]
+                fail[child] = children[state].get(char, 0)
+                queue.append(child)
+
+        self._dirty = False
+
+    def best_match(self, text: str) -> Optional[Hashable]:
+        """
+        Return the payload of the highest-priority keyword found in the text.
+
+        Ties keep the entry that was added first.
+        """
+        if self._dirty:
+            with self._lock:
+                if self._dirty:
+                    self._build_links()
+
+        children, fail, best = self._children, self._fail, self._best
+        node = 0
+        winner = None
+        for char in text:
+            while node and char not in children[node]:
+                node = fail[node]
+            node = children[node].get(char, 0)
+            candidate = best[node]
+            if candidate is not None and (winner is None or candidate[0] > winner[0]):
+                winner = candidate
+        return winner[1] if winner is not None else None
+
+
+def _entry_priority(entry: Tuple):
+    return entry[0]
@@ -0,0 +1,411 @@
+"""
+Embedding Retrieval over the Chatbot Knowledge Bases
+
+Every entry of the comprehensive knowledge base and the interview
+chatbot's knowledge base is embedded once into a normalized matrix that
+is persisted as a versioned artifact. A message that matches no literal
+keyword is embedded (with an LRU cache) and answered from the entry with
+the highest cosine similarity, if it clears a confidence threshold.
+Scoring is a single matrix-vector product over all entries.
+
+Build the file offline with build_knowledge_index.py; without it the
+matrix is embedded when the app starts. Either way the retriever is
+opened on a background thread, and messages are not answered by retrieval
+until it is ready. Configure with KNOWLEDGE_INDEX_PATH,
+KNOWLEDGE_RETRIEVAL_THRESHOLD and KNOWLEDGE_RETRIEVAL_ENABLED.
+"""
+
+import os
+import re
+import time
+import threading
+import logging
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .artifact_store import write_artifact, load_artifact, pack_strings, StringArray
+from .embeddings import encode_texts, normalize_rows, DEFAULT_MODEL_NAME
+
+logger = logging.getLogger(__name__)
+
+INDEX_KIND = 'knowledge_index'
+INDEX_VERSION = 2
+
+DEFAULT_INDEX_PATH = os.getenv(
+    'KNOWLEDGE_INDEX_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'knowledge_index.bin')
+)
+RETRIEVAL_THRESHOLD = float(os.getenv('KNOWLEDGE_RETRIEVAL_THRESHOLD', '0.55'))
+RETRIEVAL_ENABLED = os.getenv('KNOWLEDGE_RETRIEVAL_ENABLED', 'true').lower() == 'true'
+
+# Embedded messages kept for repeated questions
+QUERY_CACHE_SIZE = 2048
+
+COMPREHENSIVE = 'comprehensive'
+INTERVIEW = 'interview'
+
+_MARKDOWN = re.compile(r'[*_`#•]+')
+
+
+@dataclass
+class KnowledgeEntry:
+    """One knowledge base topic"""
+    source: str
+    topic: str
+    keywords: List[str]
+    response: str
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return (self.source, self.topic)
+
+    def document(self) -> str:
+        """Text embedded for the entry: topic, keywords and the response's opening line"""
+        first_line = _MARKDOWN.sub('', self.response.strip().split('\n', 1)[0]).strip()
+        label = self.topic.replace('_', ' ')
+        return f"{label}: {', '.join(self.keywords)}. {first_line}"
+
+
+class StoredKnowledgeEntries(Sequence):
+    """Knowledge entries of a loaded index, read from the artifact when accessed"""
+
+    def __init__(self, sources: List[str], source_ids: np.ndarray, topics: StringArray,
+                 keywords: StringArray, keyword_offsets: np.ndarray, responses: StringArray):
+        self.sources = sources
+        self.source_ids = source_ids
+        self.topics = topics
+        self.keywords = keywords
+        self.keyword_offsets = keyword_offsets
+        self.responses = responses
+
+    def __len__(self) -> int:
+        return len(self.topics)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        start, end = int(self.keyword_offsets[index]), int(self.keyword_offsets[index + 1])
+        return KnowledgeEntry(self.sources[int(self.source_ids[index])], self.topics[index],
+                              self.keywords[start:end], self.responses[index])
+
+    def keys(self) -> List[Tuple[str, str]]:
+        """(source, topic) of every entry, without reading the responses"""
+        return [(self.sources[int(source_id)], topic) for source_id, topic in zip(self.source_ids, self.topics)]
+
+
+@dataclass
+class KnowledgeMatch:
+    """An entry returned by retrieval"""
+    source: str
+    topic: str
+    response: str
+    similarity: float
+
+
+class KnowledgeRetriever:
+    """
+    Top-k cosine retrieval over a matrix of knowledge base entry embeddings
+    """
+
+    def __init__(self, entries: Sequence, vectors: np.ndarray,
+                 model_name: str = DEFAULT_MODEL_NAME, threshold: float = RETRIEVAL_THRESHOLD,
+                 encoder: Optional[Callable[[List[str]], np.ndarray]] = None, artifact=None,
+                 documents: Optional[Sequence] = None):
+        """
+        Args:
+            entries: Knowledge entries (or StoredKnowledgeEntries), one per matrix row
+            vectors: Normalized entry embeddings
+            model_name: Embedding model the vectors were built with
+            threshold: Minimum cosine similarity for answer()
+            encoder: Maps texts to embeddings (the shared sentence model by default)
+            artifact: Backing artifact, kept alive for the memory map
+            documents: Embedded text of each entry, if already known
+        """
+        self.entries = entries if isinstance(entries, StoredKnowledgeEntries) else list(entries)
+        self.vectors = vectors
+        self.model_name = model_name
+        self.threshold = threshold
+        self._encoder = encoder or (lambda texts: encode_texts(texts, model_name=model_name))
+        self._artifact = artifact
+        keys = self.entries.keys() if isinstance(self.entries, StoredKnowledgeEntries) else \
+            [entry.key for entry in self.entries]
+        self._rows = {key: row for row, key in enumerate(keys)}
+        self._documents = documents if documents is not None else [entry.document() for entry in self.entries]
+        self._query_cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.synced_version = None
+
+        self.queries = 0
+        self.cache_hits = 0
+        self.answered = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def from_entries(cls, entries: List[KnowledgeEntry], model_name: str = DEFAULT_MODEL_NAME,
+                     encoder: Optional[Callable[[List[str]], np.ndarray]] = None, **kwargs) -> 'KnowledgeRetriever':
+        """Embed entries into a new retriever"""
+        retriever = cls([], np.zeros((0, 0), dtype=np.float32), model_name=model_name, encoder=encoder, **kwargs)
+        retriever.sync(entries)
+        return retriever
+
+    def sync(self, entries: List[KnowledgeEntry]) -> int:
+        """
+        Embed entries that are new or whose text changed.
+
+        Returns:
+            Number of entries embedded
+        """
+        with self._lock:
+            changed = [entry for entry in entries
+                       if entry.key not in self._rows or self._documents[self._rows[entry.key]] != entry.document()]
+            if not changed:
+                return 0
+
+            new_vectors = normalize_rows(np.asarray(self._encoder([e.document() for e in changed]), dtype=np.float32))
+            # Entries read from the index file become plain lists once they change
+            self.entries = list(self.entries)
+            self._documents = list(self._documents)
+            vectors = np.array(self.vectors, dtype=np.float32) if len(self.entries) else \
+                np.zeros((0, new_vectors.shape[1]), dtype=np.float32)
+            appended = []
+            for entry, vector in zip(changed, new_vectors):
+                row = self._rows.get(entry.key)
+                if row is None:
+                    self._rows[entry.key] = len(self.entries) + len(appended)
+                    appended.append(vector)
+                    self.entries.append(entry)
+                    self._documents.append(entry.document())
+                else:
+                    vectors[row] = vector
+                    self.entries[row] = entry
+                    self._documents[row] = entry.document()
+            if appended:
+                vectors = np.vstack([vectors, np.stack(appended)])
+            self.vectors = vectors
+            return len(changed)
+
+    def embed_query(self, message: str) -> np.ndarray:
+        """Normalized message embedding, cached by normalized text"""
+        key = ' '.join(message.lower().split())
+        with self._lock:
+            self.queries += 1
+            cached = self._query_cache.get(key)
+            if cached is not None:
+                self._query_cache.move_to_end(key)
+                self.cache_hits += 1
+                return cached
+
+        vector = normalize_rows(np.asarray(self._encoder([message]), dtype=np.float32)[0])
+        with self._lock:
+            self._query_cache[key] = vector
+            while len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        return vector
+
+    def search(self, query: np.ndarray, k: int = 3) -> List[KnowledgeMatch]:
+        """The k entries most similar to a query vector, best first"""
+        if len(self.entries) == 0 or k <= 0:
+            return []
+
+        scores = self.vectors @ normalize_rows(np.asarray(query, dtype=np.float32).ravel())
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            KnowledgeMatch(
+                source=self.entries[row].source,
+                topic=self.entries[row].topic,
+                response=self.entries[row].response,
+                similarity=float(scores[row])
+            )
+            for row in top
+        ]
+
+    def retrieve(self, message: str, k: int = 3) -> List[KnowledgeMatch]:
+        """Top-k entries for a message"""
+        if not message or not message.strip():
+            return []
+        return self.search(self.embed_query(message), k)
+
+    def answer(self, message: str) -> Optional[KnowledgeMatch]:
+        """The best entry for a message, or None if it is below the confidence threshold"""
+        matches = self.retrieve(message, k=1)
+        if matches and matches[0].similarity >= self.threshold:
+            self.answered += 1
+            return matches[0]
+        return None
+
+    def get_stats(self) -> Dict:
+        return {
+            'entries': len(self.entries),
+            'threshold': self.threshold,
+            'queries': self.queries,
+            'query_cache_hits': self.cache_hits,
+            'answered': self.answered
+        }
+
+    def save(self, path: str = DEFAULT_INDEX_PATH) -> int:
+        """Write the entry matrix to a versioned artifact file"""
+        entries = list(self.entries)
+        arrays = {'vectors': np.asarray(self.vectors, dtype=np.float32)}
+
+        # Entry text goes in string array blocks; the two sources stay in the
+        # header, referenced by id
+        sources = sorted({entry.source for entry in entries})
+        source_ids = {source: i for i, source in enumerate(sources)}
+        arrays['source_ids'] = np.array([source_ids[entry.source] for entry in entries], dtype=np.int32)
+        arrays.update(pack_strings('topics', (entry.topic for entry in entries)))
+        arrays.update(pack_strings('responses', (entry.response for entry in entries)))
+        arrays.update(pack_strings('documents', self._documents))
+        # Keywords of entry i are keywords[keyword_offsets[i]:keyword_offsets[i + 1]]
+        arrays.update(pack_strings('keywords', (keyword for entry in entries for keyword in entry.keywords)))
+        keyword_offsets = np.zeros(len(entries) + 1, dtype=np.int64)
+        np.cumsum([len(entry.keywords) for entry in entries], out=keyword_offsets[1:])
+        arrays['keyword_offsets'] = keyword_offsets
+
+        meta = {'model_name': self.model_name, 'sources': sources}
+        return write_artifact(path, INDEX_KIND, INDEX_VERSION, meta, arrays)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_INDEX_PATH, **kwargs) -> 'KnowledgeRetriever':
+        """Memory-map a retriever written by save()"""
+        artifact = load_artifact(path, INDEX_KIND, INDEX_VERSION)
+        arrays = artifact.arrays
+        entries = StoredKnowledgeEntries(
+            artifact.meta['sources'],
+            arrays['source_ids'],
+            StringArray.from_arrays(arrays, 'topics'),
+            StringArray.from_arrays(arrays, 'keywords'),
+            arrays['keyword_offsets'],
+            StringArray.from_arrays(arrays, 'responses')
+        )
+        return cls(entries, arrays['vectors'], model_name=artifact.meta.get('model_name', DEFAULT_MODEL_NAME),
+                   artifact=artifact, documents=StringArray.from_arrays(arrays, 'documents'), **kwargs)
+
+
+def collect_knowledge_entries() -> List[KnowledgeEntry]:
+    """Current entries of both knowledge bases"""
+    from .comprehensive_knowledge_base import comprehensive_kb
+    from .interview_chatbot import interview_chatbot
+
+    entries = [KnowledgeEntry(COMPREHENSIVE, topic, list(data['keywords']), data['response'])
+               for topic, data in list(comprehensive_kb.knowledge_base.items())]
+    entries.extend(KnowledgeEntry(INTERVIEW, topic, list(data['keywords']), data['response'])
+                   for topic, data in interview_chatbot.knowledge_base.items())
+    return entries
+
+
+def build_knowledge_index(path: str = DEFAULT_INDEX_PATH, model_name: str = DEFAULT_MODEL_NAME) -> KnowledgeRetriever:
+    """Embed every knowledge base entry and write the index file"""
+    retriever = KnowledgeRetriever.from_entries(collect_knowledge_entries(), model_name=model_name)
+    size = retriever.save(path)
+    logger.info(f"Wrote knowledge index with {len(retriever)} entries ({size} bytes) to {path}")
+    return retriever
+
+
+_retriever = None
+_retriever_thread = None
+_retriever_lock = threading.Lock()
+# Knowledge base version of the last sync, successful or not
+_sync_attempted_version = None
+
+
+def start_knowledge_retriever(path: str = DEFAULT_INDEX_PATH) -> Optional[threading.Thread]:
+    """
+    Open the process-wide retriever on a background thread (once): load the
+    index file, or embed the knowledge bases when it is missing, which may
+    load the embedding model. Called at app startup.
+
+    Returns:
+        The loading thread, or None if retrieval is disabled
+    """
+    global _retriever_thread
+    if not RETRIEVAL_ENABLED:
+        return None
+    with _retriever_lock:
+        if _retriever_thread is None:
+            _retriever_thread = threading.Thread(target=_load_retriever, args=(path,),
+                                                 name='knowledge-retriever', daemon=True)
+            _retriever_thread.start()
+    return _retriever_thread
+
+
+def _load_retriever(path: str):
+    global _retriever
+    _retriever = _open_retriever(path)
+
+
+def get_knowledge_retriever(path: str = DEFAULT_INDEX_PATH, wait: bool = False) -> Optional[KnowledgeRetriever]:
+    """
+    The process-wide retriever once it is ready, kept in sync with knowledge
+    added at runtime. Starts loading it if the app has not.
+
+    Args:
+        path: Index file
+        wait: Block until loading has finished
+
+    Returns:
+        The retriever, or None if retrieval is disabled, still loading or
+        could not be opened (that is not retried)
+    """
+    global _sync_attempted_version
+    thread = start_knowledge_retriever(path)
+    if thread is None:
+        return None
+    if wait:
+        thread.join()
+
+    retriever = _retriever
+    if retriever is not None:
+        from .comprehensive_knowledge_base import comprehensive_kb
+        version = comprehensive_kb.version
+        # A failed sync is retried only when the knowledge changes again
+        if retriever.synced_version != version and _sync_attempted_version != version:
+            _sync_attempted_version = version
+            try:
+                retriever.sync(collect_knowledge_entries())
+                retriever.synced_version = version
+            except Exception as e:
+                logger.error(f"Failed to embed new knowledge entries: {e}")
+    return retriever
+
+
+def _open_retriever(path: str) -> Optional[KnowledgeRetriever]:
+    start_time = time.time()
+    try:
+        if os.path.exists(path):
+            retriever = KnowledgeRetriever.load(path)
+        else:
+            logger.info(f"Knowledge index not found at {path}; embedding the knowledge bases now")
+            retriever = KnowledgeRetriever.from_entries(collect_knowledge_entries())
+    except ImportError as e:
+        logger.info(f"Knowledge retrieval disabled, embedding model unavailable: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"Failed to open the knowledge index, retrieval disabled: {e}")
+        return None
+    logger.info(f"Knowledge retriever ready with {len(retriever)} entries "
+                f"in {(time.time() - start_time) * 1000:.1f}ms")
+    return retriever
+
+
+def retrieve_answer(message: str) -> Optional[str]:
+    """Answer a message from the closest knowledge entry, or None if nothing is close enough"""
+    try:
+        retriever = get_knowledge_retriever()
+        if retriever is None:
+            return None
+        match = retriever.answer(message)
+    except Exception as e:
+        logger.error(f"Knowledge retrieval failed: {e}")
+        return None
+    return match.response if match else None
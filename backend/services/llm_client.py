@@ -0,0 +1,293 @@
+"""
+Shared LLM Client
+
+One client for every OpenAI chat call in the backend:
+
+- a pooled HTTP session (keep-alive connections, no hidden retries)
+- a per-call deadline, so a slow API cannot hold a request thread for minutes
+- a circuit breaker that stops calling the API after repeated failures and
+  probes it again after a cool-down
+- hedged calls: the remote request runs on a worker pool, and if it has not
+  answered within the latency budget the caller's local answer is served
+  instead (a late remote answer, within a short grace period, can still be
+  cached for next time); when too many hedged calls are already pending the
+  local answer is served at once
+
+Configure with OPENAI_API_BASE, LLM_POOL_SIZE, LLM_MAX_PENDING,
+LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT, LLM_LATENCY_BUDGET,
+LLM_LATE_RESULT_GRACE, LLM_BREAKER_FAILURES and LLM_BREAKER_RESET.
+"""
+
+import os
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import openai
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+LLM_API_BASE = os.getenv('OPENAI_API_BASE')  # None uses the openai library default
+LLM_POOL_SIZE = int(os.getenv('LLM_POOL_SIZE', '10'))
+# Hedged calls running or queued at once (twice the pool by default)
+LLM_MAX_PENDING = int(os.getenv('LLM_MAX_PENDING', str(2 * LLM_POOL_SIZE)))
+LLM_CONNECT_TIMEOUT = float(os.getenv('LLM_CONNECT_TIMEOUT', '3'))
+LLM_READ_TIMEOUT = float(os.getenv('LLM_READ_TIMEOUT', '20'))
+LLM_LATENCY_BUDGET = float(os.getenv('LLM_LATENCY_BUDGET', '6'))
+# Seconds past the budget a hedged call may run to deliver a late answer
+LLM_LATE_RESULT_GRACE = float(os.getenv('LLM_LATE_RESULT_GRACE', '4'))
+LLM_BREAKER_FAILURES = int(os.getenv('LLM_BREAKER_FAILURES', '5'))
+LLM_BREAKER_RESET = float(os.getenv('LLM_BREAKER_RESET', '30'))
+
+# Response sources reported by hedged_chat
+REMOTE = 'remote'
+FALLBACK = 'fallback'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the API while the circuit breaker is open"""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after consecutive failures -> half-open after a cool-down
+    (one trial call) -> closed again on success
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = LLM_BREAKER_FAILURES, reset_timeout: float = LLM_BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    def is_open(self) -> bool:
+        """True while calls would be rejected (does not start a trial call)"""
+        with self._lock:
+            if self.state == self.OPEN:
+                return time.monotonic() - self.opened_at < self.reset_timeout
+            return self.state == self.HALF_OPEN
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead; moves an expired open breaker to half-open"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def get_stats(self) -> Dict:
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'times_opened': self.times_opened
+        }
+
+
+class LLMClient:
+    """
+    Pooled, deadline-bound and circuit-broken wrapper around openai.ChatCompletion
+    """
+
+    def __init__(self, api_key: Optional[str] = None, api_base: Optional[str] = LLM_API_BASE,
+                 pool_size: int = LLM_POOL_SIZE, connect_timeout: float = LLM_CONNECT_TIMEOUT,
+                 read_timeout: float = LLM_READ_TIMEOUT, latency_budget: float = LLM_LATENCY_BUDGET,
+                 late_result_grace: float = LLM_LATE_RESULT_GRACE, max_pending: int = LLM_MAX_PENDING,
+                 breaker: Optional[CircuitBreaker] = None):
+        """
+        Initialize the client.
+
+        Args:
+            api_key: OpenAI key (defaults to the openai library's configured key)
+            api_base: API base URL, e.g. a local fake server in tests
+            pool_size: Pooled connections and hedging worker threads
+            connect_timeout: Seconds to establish a connection
+            read_timeout: Seconds to wait for the server between bytes
+            latency_budget: Seconds hedged_chat waits before serving the local answer
+            late_result_grace: Seconds past the budget a hedged call keeps running
+            max_pending: Hedged calls running or queued at once; more are answered locally
+            breaker: Circuit breaker (one per client by default)
+        """
+        self.api_key = api_key
+        self.api_base = api_base
+        self.timeout = (connect_timeout, read_timeout)
+        self.latency_budget = latency_budget
+        self.late_result_grace = late_result_grace
+        self.breaker = breaker or CircuitBreaker()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='llm')
+        # The executor's own queue is unbounded; this caps what is handed to it
+        self.max_pending = max_pending
+        self._pending = threading.BoundedSemaphore(max_pending)
+
+        self.calls = 0
+        self.failures = 0
+        self.short_circuited = 0
+        self.hedged = 0
+        self.rejected = 0
+
+    def install(self):
+        """Make the openai library send every request through this client's pooled session"""
+        openai.requestssession = self.session
+
+    def _request_options(self, deadline: Optional[float]) -> Dict:
+        connect_timeout, read_timeout = self.timeout
+        options = {'request_timeout': (connect_timeout, min(read_timeout, deadline) if deadline else read_timeout)}
+        if self.api_key:
+            options['api_key'] = self.api_key
+        if self.api_base:
+            options['api_base'] = self.api_base
+        return options
+
+    def chat(self, messages: List[Dict], deadline: Optional[float] = None, **params) -> str:
+        """
+        Blocking chat completion.
+
+        Args:
+            messages: Chat messages
+            deadline: Optional tighter read timeout in seconds for this call
+            params: Model parameters (model, max_tokens, temperature, ...)
+
+        Raises:
+            CircuitOpenError: The breaker is open
+            openai.error.OpenAIError: The call failed or timed out
+        """
+        if not self.breaker.allow():
+            self.short_circuited += 1
+            raise CircuitOpenError("LLM circuit breaker is open")
+
+        self.calls += 1
+        try:
+            response = openai.ChatCompletion.create(messages=messages, **params, **self._request_options(deadline))
+            text = response.choices[0].message.content.strip()
+        except Exception:
+            self.failures += 1
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return text
+
+    def stream_chat(self, messages: List[Dict], **params) -> Iterator:
+        """Streaming chat completion; yields ChatCompletion chunks"""
+        if not self.breaker.allow():
+            self.short_circuited += 1
+            raise CircuitOpenError("LLM circuit breaker is open")
+
+        self.calls += 1
+        succeeded = False
+        try:
+            for chunk in openai.ChatCompletion.create(messages=messages, stream=True, **params,
+                                                      **self._request_options(None)):
+                # The API is answering; a consumer that stops reading here
+                # (GeneratorExit on a client disconnect) still counts as a success
+                succeeded = True
+                yield chunk
+            succeeded = True
+        except Exception:
+            succeeded = False
+            self.failures += 1
+            raise
+        finally:
+            # Every outcome is recorded, so a half-open trial call cannot be left pending
+            if succeeded:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+    def hedged_chat(self, messages: List[Dict], fallback: Callable[[], str], budget: Optional[float] = None,
+                    on_late_result: Optional[Callable[[str], None]] = None, **params) -> Tuple[str, str]:
+        """
+        Remote answer if it arrives within the budget, otherwise the local one.
+
+        Args:
+            messages: Chat messages
+            fallback: Produces the local answer
+            budget: Seconds to wait for the remote answer (latency_budget by default)
+            on_late_result: Called with a remote answer that arrives after the budget
+            params: Model parameters
+
+        Returns:
+            (response, REMOTE or FALLBACK)
+        """
+        if self.breaker.is_open():
+            self.short_circuited += 1
+            return fallback(), FALLBACK
+
+        if not self._pending.acquire(blocking=False):
+            self.rejected += 1
+            logger.warning(f"{self.max_pending} LLM calls already pending, serving the local answer")
+            return fallback(), FALLBACK
+
+        budget = self.latency_budget if budget is None else budget
+        # The worker gives up shortly after the caller does
+        future = self._executor.submit(self.chat, messages, deadline=budget + self.late_result_grace, **params)
+        future.add_done_callback(lambda f: self._pending.release())
+        try:
+            return future.result(timeout=budget), REMOTE
+        except FutureTimeout:
+            self.hedged += 1
+            logger.warning(f"LLM call exceeded the {budget}s budget, serving the local answer")
+            # A call still waiting for a worker is dropped rather than sent late
+            if not future.cancel() and on_late_result is not None:
+                future.add_done_callback(lambda f: _deliver_late_result(f, on_late_result))
+        except CircuitOpenError:
+            pass
+        except Exception as e:
+            logger.warning(f"LLM call failed, serving the local answer: {e}")
+        return fallback(), FALLBACK
+
+    def get_stats(self) -> Dict:
+        return {
+            'calls': self.calls,
+            'failures': self.failures,
+            'short_circuited': self.short_circuited,
+            'hedged': self.hedged,
+            'rejected': self.rejected,
+            'latency_budget_s': self.latency_budget,
+            'breaker': self.breaker.get_stats()
+        }
+
+
+def _deliver_late_result(future, callback: Callable[[str], None]):
+    if future.cancelled() or future.exception() is not None:
+        return
+    try:
+        callback(future.result())
+    except Exception as e:
+        logger.error(f"Failed to handle late LLM result: {e}")
+
+
+# Global client shared by the chatbots
+llm_client = LLMClient(api_key=os.getenv('OPENAI_API_KEY'))
+llm_client.install()
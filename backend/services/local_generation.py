@@ -0,0 +1,276 @@
+"""
+Shared Local Text-Generation Service
+
+One causal language model, loaded on first use, serves every local AI
+assistant. Concurrent prompts are queued and generated together in small
+batches (prompts with the same sampling parameters share a batch).
+Generation runs under torch.inference_mode with a fixed number of CPU
+threads, and max_new_tokens is capped.
+
+Configure with LOCAL_GENERATION_MODELS (comma-separated candidates, tried in
+order), LOCAL_GENERATION_MAX_NEW_TOKENS, LOCAL_GENERATION_BATCH_SIZE,
+LOCAL_GENERATION_BATCH_WAIT_MS and LOCAL_GENERATION_THREADS.
+"""
+
+import os
+import time
+import threading
+import logging
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+MODEL_CANDIDATES = [name.strip() for name in
+                    os.getenv('LOCAL_GENERATION_MODELS', 'distilgpt2,gpt2,microsoft/DialoGPT-small').split(',')
+                    if name.strip()]
+MAX_NEW_TOKENS = int(os.getenv('LOCAL_GENERATION_MAX_NEW_TOKENS', '120'))
+BATCH_SIZE = int(os.getenv('LOCAL_GENERATION_BATCH_SIZE', '8'))
+BATCH_WAIT_SECONDS = float(os.getenv('LOCAL_GENERATION_BATCH_WAIT_MS', '20')) / 1000
+NUM_THREADS = int(os.getenv('LOCAL_GENERATION_THREADS', str(max(1, (os.cpu_count() or 2) // 2))))
+
+# Queue-wait samples kept for the percentile report
+STATS_WINDOW = 500
+
+# (prompts, max_new_tokens, sampling params) -> [(generated text, generated token count)]
+BatchGenerator = Callable[[List[str], int, Dict], List[Tuple[str, int]]]
+
+
+class GenerationUnavailable(Exception):
+    """Raised when no local model could be loaded"""
+    pass
+
+
+@dataclass
+class _Request:
+    prompt: str
+    max_new_tokens: int
+    params: Dict
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def batch_key(self) -> Tuple:
+        return (self.max_new_tokens, tuple(sorted(self.params.items())))
+
+
+class LocalGenerationService:
+    """
+    Lazily loaded, batching text generator shared by the local assistants
+    """
+
+    def __init__(self, model_candidates: Sequence[str] = MODEL_CANDIDATES, max_new_tokens: int = MAX_NEW_TOKENS,
+                 batch_size: int = BATCH_SIZE, batch_wait: float = BATCH_WAIT_SECONDS,
+                 num_threads: int = NUM_THREADS, batch_generator: Optional[BatchGenerator] = None):
+        """
+        Initialize the service (nothing is loaded until the first generate()).
+
+        Args:
+            model_candidates: Hugging Face model names, tried in order
+            max_new_tokens: Upper bound on tokens generated per prompt
+            batch_size: Most prompts generated together
+            batch_wait: Seconds the worker waits for more prompts to join a batch
+            num_threads: CPU threads torch may use
+            batch_generator: Replaces the transformers model (used in tests)
+        """
+        self.model_candidates = list(model_candidates)
+        self.max_new_tokens = max_new_tokens
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.num_threads = num_threads
+
+        self.model = None
+        self.tokenizer = None
+        self.model_name: Optional[str] = None
+        self.device = 'cpu'
+        self.load_seconds: Optional[float] = None
+        self.load_error: Optional[str] = None
+        self._batch_generator = batch_generator
+        self._load_lock = threading.Lock()
+        self._load_attempted = batch_generator is not None
+
+        self._pending: deque = deque()
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+
+        self.requests = 0
+        self.batches = 0
+        self.generated_tokens = 0
+        self.generation_seconds = 0.0
+        self._queue_waits: deque = deque(maxlen=STATS_WINDOW)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._batch_generator is not None
+
+    def ensure_loaded(self) -> bool:
+        """Load the first model candidate that works; returns False if none does"""
+        if self._load_attempted:
+            return self.is_loaded
+        with self._load_lock:
+            if not self._load_attempted:
+                self._load()
+                self._load_attempted = True
+        return self.is_loaded
+
+    def _load(self):
+        try:
+            import torch
+            from transformers import AutoTokenizer, AutoModelForCausalLM
+        except ImportError as e:
+            self.load_error = f"AI libraries not available: {e}"
+            logger.info(self.load_error)
+            return
+
+        torch.set_num_threads(self.num_threads)
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        start_time = time.perf_counter()
+        for model_name in self.model_candidates:
+            try:
+                logger.info(f"Loading local generation model {model_name}")
+                tokenizer = AutoTokenizer.from_pretrained(model_name)
+                model = AutoModelForCausalLM.from_pretrained(
+                    model_name,
+                    torch_dtype=torch.float16 if self.device == "cuda" else torch.float32
+                ).to(self.device)
+                model.eval()
+            except Exception as e:
+                logger.warning(f"Failed to load {model_name}: {e}")
+                continue
+
+            # Decoder-only models need left padding so every prompt ends where generation starts
+            if tokenizer.pad_token is None:
+                tokenizer.pad_token = tokenizer.eos_token
+            tokenizer.padding_side = 'left'
+            tokenizer.truncation_side = 'left'
+
+            self.model, self.tokenizer, self.model_name = model, tokenizer, model_name
+            self.load_seconds = round(time.perf_counter() - start_time, 2)
+            self._batch_generator = self._generate_with_model
+            logger.info(f"Loaded {model_name} on {self.device} in {self.load_seconds}s "
+                        f"({self.num_threads} CPU threads)")
+            return
+
+        self.load_error = "Failed to load any local generation model"
+        logger.error(self.load_error)
+
+    def _generate_with_model(self, prompts: List[str], max_new_tokens: int, params: Dict) -> List[Tuple[str, int]]:
+        import torch
+
+        context_size = getattr(self.model.config, 'max_position_embeddings', None) or 1024
+        max_prompt_tokens = max(1, context_size - max_new_tokens)
+        inputs = self.tokenizer(prompts, return_tensors='pt', padding=True, truncation=True,
+                                max_length=max_prompt_tokens).to(self.device)
+        with torch.inference_mode():
+            outputs = self.model.generate(
+                **inputs,
+                max_new_tokens=max_new_tokens,
+                pad_token_id=self.tokenizer.pad_token_id,
+                **params
+            )
+
+        new_tokens = outputs[:, inputs['input_ids'].shape[1]:]
+        results = []
+        for row in new_tokens:
+            count = int((row != self.tokenizer.pad_token_id).sum())
+            results.append((self.tokenizer.decode(row, skip_special_tokens=True), count))
+        return results
+
+    def generate(self, prompt: str, max_new_tokens: Optional[int] = None, timeout: Optional[float] = None,
+                 **params) -> str:
+        """
+        Generate a continuation of the prompt (the prompt itself is not included).
+
+        Args:
+            prompt: Prompt text
+            max_new_tokens: Requested length, capped at the service maximum
+            timeout: Seconds to wait for the result
+            params: Sampling parameters passed to model.generate (temperature, do_sample, ...)
+
+        Raises:
+            GenerationUnavailable: No model could be loaded
+        """
+        if not self.ensure_loaded():
+            raise GenerationUnavailable(self.load_error or "Local generation is unavailable")
+
+        request = _Request(prompt, min(max_new_tokens or self.max_new_tokens, self.max_new_tokens), params)
+        with self._condition:
+            self._pending.append(request)
+            self._start_worker()
+            self._condition.notify()
+        return request.future.result(timeout=timeout)
+
+    def _start_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name='local-generation', daemon=True)
+            self._worker.start()
+
+    def _next_batch(self) -> List[_Request]:
+        """Wait for work, give other prompts a moment to join, then take one compatible batch"""
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+            deadline = time.perf_counter() + self.batch_wait
+            while len(self._pending) < self.batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            key = self._pending[0].batch_key
+            batch, rest = [], deque()
+            while self._pending:
+                request = self._pending.popleft()
+                if len(batch) < self.batch_size and request.batch_key == key:
+                    batch.append(request)
+                else:
+                    rest.append(request)
+            self._pending = rest
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            started = time.perf_counter()
+            for request in batch:
+                self._queue_waits.append(started - request.enqueued_at)
+            try:
+                results = self._batch_generator([r.prompt for r in batch], batch[0].max_new_tokens, batch[0].params)
+            except Exception as e:
+                logger.error(f"Local generation failed for a batch of {len(batch)}: {e}")
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+
+            self.generation_seconds += time.perf_counter() - started
+            self.batches += 1
+            self.requests += len(batch)
+            for request, (text, token_count) in zip(batch, results):
+                self.generated_tokens += token_count
+                request.future.set_result(text)
+
+    def get_stats(self) -> Dict:
+        """Load time, throughput and queue wait"""
+        waits = sorted(self._queue_waits)
+        pick = lambda q: round(waits[min(len(waits) - 1, int(q * len(waits)))] * 1000, 1) if waits else None
+        return {
+            'model_loaded': self.is_loaded,
+            'model_name': self.model_name,
+            'device': self.device,
+            'load_seconds': self.load_seconds,
+            'load_error': self.load_error,
+            'requests': self.requests,
+            'batches': self.batches,
+            'avg_batch_size': round(self.requests / self.batches, 2) if self.batches else None,
+            'tokens_per_second': round(self.generated_tokens / self.generation_seconds, 1)
+            if self.generation_seconds else None,
+            'queue_wait_ms': {'p50': pick(0.5), 'p95': pick(0.95)},
+            'max_new_tokens': self.max_new_tokens,
+            'num_threads': self.num_threads
+        }
+
+
+# Global service shared by the local AI assistants
+local_generator = LocalGenerationService()
@@ -8,6 +8,10 @@ import json
 from typing import Dict, List, Optional
 import openai
 from .interview_chatbot import interview_chatbot as fallback_chatbot
+from .response_cache import response_cache, score_bucket, SCORE_BUCKET_WIDTH
+from .llm_client import llm_client, REMOTE
+from .prompt_builder import PromptBuilder, SUMMARY_CONTEXT_KEY
+from .conversation_store import ConversationStore, DEFAULT_CONVERSATION_KEY
 
 class OpenAIChatbot:
     def __init__(self):
@@ -20,13 +24,30 @@ class OpenAIChatbot:
             self.openai_available = False
             print("Warning: OPENAI_API_KEY not found. Using fallback chatbot.")
         
-        self.conversation_history = []
-        self.user_context = {
+        self.cache = response_cache
+        self.llm = llm_client
+        self.chat_model_params = {
+            'model': "gpt-3.5-turbo",  # or "gpt-4" if available
+            'max_tokens': 500,
+            'temperature': 0.7,
+            'top_p': 1,
+            'frequency_penalty': 0.2,
+            'presence_penalty': 0.1
+        }
+        self.prompts = PromptBuilder(model=self.chat_model_params['model'])
+        self.stage_model_params = {
+            'model': "gpt-3.5-turbo",
+            'max_tokens': 200,
+            'temperature': 0.7
+        }
+        
+        # Bounded history and context per user conversation
+        self.conversations = ConversationStore('openai', default_context={
             'selected_category': None,
             'selected_question': None,
             'analysis_results': None,
             'session_stage': 'initial'
-        }
+        })
         
         # System prompt for interview coaching
         self.system_prompt = """You are an expert interview coach and career advisor. Your role is to help users prepare for job interviews by providing:
@@ -49,92 +70,74 @@ Key areas of expertise:
 
 Always provide immediate value with specific, actionable steps the user can implement right away. Be concise but comprehensive, and maintain a professional coaching tone."""
 
-    def update_context(self, **kwargs):
-        """Update the chatbot's context about the user's session"""
-        self.user_context.update(kwargs)
+    @property
+    def conversation_history(self) -> List[Dict]:
+        """History of the default conversation"""
+        return self.conversations.history(DEFAULT_CONVERSATION_KEY)
 
-    def get_response(self, user_message: str) -> str:
+    @property
+    def user_context(self) -> Dict:
+        """Context of the default conversation (a copy; use update_context to change it)"""
+        return self.conversations.get_context(DEFAULT_CONVERSATION_KEY)
+
+    def update_context(self, conversation_key: str = DEFAULT_CONVERSATION_KEY, **kwargs):
+        """Update the chatbot's context about one user's session"""
+        self.conversations.update_context(conversation_key, **kwargs)
+
+    def get_response(self, user_message: str, conversation_key: str = DEFAULT_CONVERSATION_KEY) -> str:
         """Generate an intelligent response using OpenAI or fallback"""
         
-        # Add to conversation history
-        self.conversation_history.append({
-            'role': 'user',
-            'content': user_message,
-            'timestamp': 'now'
-        })
+        # Add to this user's conversation history
+        self.conversations.append(conversation_key, 'user', user_message)
         
         # Try OpenAI first, fallback to local chatbot if unavailable
         if self.openai_available:
-            try:
-                response = self._get_openai_response(user_message)
-                self.conversation_history.append({
-                    'role': 'assistant',
-                    'content': response,
-                    'timestamp': 'now'
-                })
-                return response
-            except Exception as e:
-                print(f"OpenAI API error: {e}")
-                # Fall back to local chatbot
-                return fallback_chatbot.get_response(user_message)
+            # The local chatbot answers if OpenAI fails, its breaker is open or it misses the latency budget
+            response, source = self.llm.hedged_chat(
+                self._build_openai_messages(user_message, conversation_key),
+                fallback=lambda: fallback_chatbot.get_response(user_message, conversation_key=conversation_key),
+                **self.chat_model_params
+            )
+            if source == REMOTE:
+                self.conversations.append(conversation_key, 'assistant', response)
+            return response
         else:
             # Use fallback chatbot
-            return fallback_chatbot.get_response(user_message)
+            return fallback_chatbot.get_response(user_message, conversation_key=conversation_key)
 
-    def _get_openai_response(self, user_message: str) -> str:
-        """Get response from OpenAI GPT model"""
-        
-        # Build context-aware prompt
-        context_info = self._build_context_prompt()
-        
-        # Prepare messages for OpenAI
-        messages = [
-            {"role": "system", "content": self.system_prompt + context_info}
-        ]
-        
-        # Add recent conversation history (last 6 messages to stay within token limits)
-        recent_history = self.conversation_history[-6:] if len(self.conversation_history) > 6 else self.conversation_history
-        for msg in recent_history:
-            if msg['role'] in ['user', 'assistant']:
-                messages.append({
-                    "role": msg['role'],
-                    "content": msg['content']
-                })
-        
-        # Add current user message
-        messages.append({"role": "user", "content": user_message})
-        
-        # Call OpenAI API
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",  # or "gpt-4" if available
-            messages=messages,
-            max_tokens=500,
-            temperature=0.7,
-            top_p=1,
-            frequency_penalty=0.2,
-            presence_penalty=0.1
+    def _build_openai_messages(self, user_message: str, conversation_key: str) -> List[Dict]:
+        """System prompt with session context, summarized and recent history and the current message"""
+        
+        context = self.conversations.get_context(conversation_key)
+        # Older turns are folded into a running summary cached in the conversation context
+        plan = self.prompts.build(
+            self.system_prompt + self._build_context_prompt(context),
+            self.conversations.history(conversation_key),
+            user_message,
+            summary=context.get(SUMMARY_CONTEXT_KEY)
         )
-        
-        return response.choices[0].message.content.strip()
+        if plan.summary != context.get(SUMMARY_CONTEXT_KEY):
+            self.conversations.update_context(conversation_key, **{SUMMARY_CONTEXT_KEY: plan.summary})
+        return plan.messages
 
-    def _build_context_prompt(self) -> str:
-        """Build context-aware prompt based on current session state"""
+    def _build_context_prompt(self, context: Dict) -> str:
+        """Build context-aware prompt based on the user's session state"""
         context_parts = []
         
-        if self.user_context.get('selected_category'):
-            context_parts.append(f"Current interview category: {self.user_context['selected_category']}")
+        if context.get('selected_category'):
+            context_parts.append(f"Current interview category: {context['selected_category']}")
         
-        if self.user_context.get('selected_question'):
-            context_parts.append(f"Current question: {self.user_context['selected_question']}")
+        if context.get('selected_question'):
+            context_parts.append(f"Current question: {context['selected_question']}")
         
-        stage = self.user_context.get('session_stage', 'initial')
+        stage = context.get('session_stage', 'initial')
         if stage == 'practicing':
             context_parts.append("User is currently practicing their interview answer")
         elif stage == 'completed':
             context_parts.append("User has completed their practice and received analysis")
         
-        if self.user_context.get('analysis_results'):
-            analysis = self.user_context['analysis_results']
+        if context.get('analysis_results'):
+            analysis = context['analysis_results']
             if 'relevance_score' in analysis:
                 context_parts.append(f"Recent performance: {analysis['relevance_score']}% relevance score")
         
@@ -143,15 +146,20 @@ Always provide immediate value with specific, actionable steps the user can impl
         
         return ""
 
-    def get_stage_response(self, stage: str, **kwargs) -> str:
+    def get_stage_response(self, stage: str, use_cache: bool = True, **kwargs) -> str:
         """Get a response based on the current interview stage"""
         
+        category = kwargs.get('category', 'general')
+        
+        # Scores are bucketed so stage responses can be cached per (stage, category, bucket)
+        bucket = score_bucket(kwargs.get('relevance_score', 0))
+        
         # Build stage-specific prompt
         stage_prompts = {
-            'question_selected': f"The user has selected a {kwargs.get('category', 'general')} interview question. Provide encouraging tips specific to this question type.",
+            'question_selected': f"The user has selected a {category} interview question. Provide encouraging tips specific to this question type.",
             'recording_started': "The user just started recording their interview answer. Give brief, encouraging guidance.",
             'recording_long': "The user has been recording for a while. Gently suggest they wrap up their answer soon.",
-            'analysis_complete': f"The user completed their practice with a {kwargs.get('relevance_score', 0)}% relevance score. Provide specific feedback and encouragement."
+            'analysis_complete': f"The user completed their practice with a relevance score between {bucket}% and {bucket + SCORE_BUCKET_WIDTH}%. Provide specific feedback and encouragement."
         }
         
         prompt = stage_prompts.get(stage, "Provide helpful interview coaching advice.")
@@ -163,14 +171,18 @@ Always provide immediate value with specific, actionable steps the user can impl
                     {"role": "user", "content": prompt}
                 ]
                 
-                response = openai.ChatCompletion.create(
-                    model="gpt-3.5-turbo",
-                    messages=messages,
-                    max_tokens=200,
-                    temperature=0.7
+                cache_key = self.cache.stage_key(
+                    stage,
+                    category if stage == 'question_selected' else None,
+                    kwargs.get('relevance_score', 0) if stage == 'analysis_complete' else None,
+                    self.stage_model_params
                 )
-                
-                return response.choices[0].message.content.strip()
+                response, _ = self.cache.get_or_compute(
+                    cache_key,
+                    lambda: self.llm.chat(messages, **self.stage_model_params),
+                    use_cache=use_cache
+                )
+                return response
             except Exception as e:
                 print(f"OpenAI stage response error: {e}")
                 return fallback_chatbot.get_stage_response(stage, **kwargs)
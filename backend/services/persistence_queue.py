@@ -0,0 +1,370 @@
+"""
+Write-Behind Persistence Queue for Analysis Results
+
+The analysis routes hand their finished SpeechSession to this queue instead
+of committing it inline. The session id is allocated up front and returned
+at once; a background writer takes records from a bounded queue and
+commits them in small batches, one transaction per batch. Until a record
+is committed it is kept in a pending map, so /session/<id> can serve it
+(read-your-writes). A record that fails to commit is tried again after a
+growing delay, up to PERSISTENCE_MAX_ATTEMPTS attempts. After that (or
+when it fails during shutdown) its id has been handed out, so it is never
+dropped: it stays pending, is counted as failed and is written to a spool
+file, which start() replays after a restart. The queue is flushed on
+shutdown.
+
+Ids come from a per-process counter seeded from MAX(id) and the spooled
+ids (a sequence on PostgreSQL), so with SQLite every writer of
+speech_session should run in one process. When the queue is full or not
+running, records are committed inline as before.
+
+Configure with PERSISTENCE_QUEUE_ENABLED, PERSISTENCE_QUEUE_SIZE,
+PERSISTENCE_BATCH_SIZE, PERSISTENCE_FLUSH_INTERVAL,
+PERSISTENCE_MAX_ATTEMPTS, PERSISTENCE_RETRY_DELAY and
+PERSISTENCE_SPOOL_PATH (empty to disable the spool).
+"""
+
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import DateTime, func, inspect, text
+
+from database import db, save_with_retry
+from models.session import SpeechSession
+
+logger = logging.getLogger(__name__)
+
+PERSISTENCE_QUEUE_ENABLED = os.getenv('PERSISTENCE_QUEUE_ENABLED', 'true').lower() == 'true'
+PERSISTENCE_QUEUE_SIZE = int(os.getenv('PERSISTENCE_QUEUE_SIZE', '1000'))
+PERSISTENCE_BATCH_SIZE = int(os.getenv('PERSISTENCE_BATCH_SIZE', '20'))
+PERSISTENCE_FLUSH_INTERVAL = float(os.getenv('PERSISTENCE_FLUSH_INTERVAL', '0.2'))
+PERSISTENCE_MAX_ATTEMPTS = int(os.getenv('PERSISTENCE_MAX_ATTEMPTS', '3'))
+# Seconds before the first retry of a failed record; doubled for each further one
+PERSISTENCE_RETRY_DELAY = float(os.getenv('PERSISTENCE_RETRY_DELAY', '1.0'))
+PERSISTENCE_SPOOL_PATH = os.getenv(
+    'PERSISTENCE_SPOOL_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'persistence_spool.jsonl')
+)
+
+# How long a request waits for room in a full queue before committing inline
+ENQUEUE_TIMEOUT = 0.05
+
+_STOP = object()
+
+
+def column_values(record: SpeechSession) -> Dict:
+    """Column values set on a (transient) session, keyed by attribute name (unset ones get their defaults)"""
+    values = {attr.key: getattr(record, attr.key) for attr in inspect(SpeechSession).column_attrs}
+    return {key: value for key, value in values.items() if value is not None}
+
+
+def _datetime_columns() -> List[str]:
+    return [attr.key for attr in inspect(SpeechSession).column_attrs if isinstance(attr.columns[0].type, DateTime)]
+
+
+def encode_values(values: Dict) -> str:
+    """One spool line for a record's column values"""
+    return json.dumps({key: value.isoformat() if isinstance(value, datetime) else value
+                       for key, value in values.items()})
+
+
+def decode_values(line: str) -> Dict:
+    """Column values of a spool line written by encode_values"""
+    values = json.loads(line)
+    for key in _datetime_columns():
+        if key in values:
+            values[key] = datetime.fromisoformat(values[key])
+    return values
+
+
+class PersistenceQueue:
+    """
+    Bounded queue of new sessions committed in batches by a background thread
+    """
+
+    def __init__(self, maxsize: int = PERSISTENCE_QUEUE_SIZE, batch_size: int = PERSISTENCE_BATCH_SIZE,
+                 flush_interval: float = PERSISTENCE_FLUSH_INTERVAL, enabled: bool = PERSISTENCE_QUEUE_ENABLED,
+                 max_attempts: int = PERSISTENCE_MAX_ATTEMPTS, retry_delay: float = PERSISTENCE_RETRY_DELAY,
+                 spool_path: Optional[str] = PERSISTENCE_SPOOL_PATH):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = retry_delay
+        self.spool_path = spool_path or None
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._pending: Dict[int, Dict] = {}
+        # Failed attempts per pending id, records waiting to be retried (due
+        # time, values), the ids that used up their attempts and those spooled
+        self._attempts: Dict[int, int] = {}
+        self._retry_due: List[Tuple[float, Dict]] = []
+        self._failed: set = set()
+        self._spooled: set = set()
+        self._stopping = False
+        self._next_id: Optional[int] = None
+        self._app = None
+        self._thread: Optional[threading.Thread] = None
+        self._exit_hook = False
+
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+        self.retries = 0
+        self.inline_writes = 0
+        self.max_depth = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, app):
+        """Write for this Flask app (flushing what was queued for a previous one)"""
+        if not self.enabled:
+            return
+        if self._app is not None and self._app is not app:
+            self.flush()
+        with self._lock:
+            self._app = app
+            self._next_id = None
+            self._stopping = False
+        self._replay_spool()
+        if not self.running:
+            self._thread = threading.Thread(target=self._run, name='persistence-queue', daemon=True)
+            self._thread.start()
+            if not self._exit_hook:
+                atexit.register(self.stop)
+                self._exit_hook = True
+
+    def _replay_spool(self):
+        """Queue the records spooled by an earlier run again (their ids stay reserved meanwhile)"""
+        if self.spool_path is None or not os.path.exists(self.spool_path):
+            return
+        with open(self.spool_path, encoding='utf-8') as spool:
+            records = [decode_values(line) for line in spool if line.strip()]
+        with self._lock:
+            records = [values for values in records if values['id'] not in self._pending]
+            for values in records:
+                self._pending[values['id']] = values
+                self._spooled.add(values['id'])
+        for values in records:
+            self._queue.put(values)
+        if records:
+            logger.warning(f"Replaying {len(records)} spooled sessions from {self.spool_path}")
+
+    def _write_spool(self):
+        """Rewrite the spool file with the spooled records that are still pending (caller holds the lock)"""
+        if self.spool_path is None:
+            return
+        records = [self._pending[session_id] for session_id in sorted(self._spooled) if session_id in self._pending]
+        if not records:
+            if os.path.exists(self.spool_path):
+                os.remove(self.spool_path)
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.spool_path)), exist_ok=True)
+        temporary = f"{self.spool_path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as spool:
+            spool.writelines(encode_values(values) + '\n' for values in records)
+            spool.flush()
+            os.fsync(spool.fileno())
+        os.replace(temporary, self.spool_path)
+
+    def _allocate_id(self) -> int:
+        """Next session id (caller holds the lock and an app context)"""
+        if db.engine.dialect.name == 'postgresql':
+            return db.session.execute(
+                text("SELECT nextval(pg_get_serial_sequence('speech_session', 'id'))")
+            ).scalar()
+        if self._next_id is None:
+            stored = db.session.query(func.max(SpeechSession.id)).scalar() or 0
+            self._next_id = max([stored] + list(self._pending)) + 1
+        allocated = self._next_id
+        self._next_id += 1
+        return allocated
+
+    def save(self, record: SpeechSession) -> int:
+        """
+        Persist a new session; returns its id.
+
+        Queued when the writer is running, committed inline otherwise (or
+        when the queue stays full).
+        """
+        if record.created_at is None:
+            record.created_at = datetime.utcnow()
+        if record.updated_at is None:
+            record.updated_at = record.created_at
+        if not self.running:
+            save_with_retry(record)
+            return record.id
+
+        with self._lock:
+            record.id = self._allocate_id()
+            values = column_values(record)
+            self._pending[record.id] = values
+        try:
+            self._queue.put(values, timeout=ENQUEUE_TIMEOUT)
+        except queue.Full:
+            with self._lock:
+                self._pending.pop(record.id, None)
+            save_with_retry(record)
+            with self._lock:
+                self.inline_writes += 1
+            return record.id
+
+        with self._lock:
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+        return record.id
+
+    def get_pending(self, session_id: int) -> Optional[SpeechSession]:
+        """A queued (or failed) session that is not committed yet, as a detached SpeechSession"""
+        with self._lock:
+            values = self._pending.get(session_id)
+        return SpeechSession(**values) if values is not None else None
+
+    def _next_batch(self) -> List:
+        """Up to batch_size records; waits for the first one"""
+        try:
+            first = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return []
+        batch = [first]
+        while len(batch) < self.batch_size and first is not _STOP:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, batch: List[Dict]):
+        """Commit a batch in one transaction, falling back to one record at a time"""
+        committed = []
+        with self._app.app_context():
+            try:
+                save_with_retry(*[SpeechSession(**values) for values in batch])
+                committed = batch
+                self.written += len(batch)
+                self.batches += 1
+            except Exception as e:
+                logger.error(f"Batch of {len(batch)} sessions failed ({e}); writing them one at a time")
+                for values in batch:
+                    try:
+                        save_with_retry(SpeechSession(**values))
+                        committed.append(values)
+                        self.written += 1
+                    except Exception as record_error:
+                        self._record_failure(values, record_error)
+            finally:
+                db.session.remove()
+                with self._lock:
+                    unspooled = False
+                    for values in committed:
+                        self._pending.pop(values['id'], None)
+                        self._attempts.pop(values['id'], None)
+                        self._failed.discard(values['id'])
+                        if values['id'] in self._spooled:
+                            self._spooled.discard(values['id'])
+                            unspooled = True
+                    if unspooled:
+                        self._write_spool()
+
+    def _record_failure(self, values: Dict, error: Exception):
+        """Retry a record that failed to commit after a delay, or spool it once it is out of attempts"""
+        session_id = values['id']
+        with self._lock:
+            attempts = self._attempts[session_id] = self._attempts.get(session_id, 0) + 1
+            if attempts < self.max_attempts and not self._stopping:
+                delay = self.retry_delay * 2 ** (attempts - 1)
+                self._retry_due.append((time.time() + delay, values))
+                self.retries += 1
+                logger.warning(f"Could not save session {session_id} (attempt {attempts}): {error}; "
+                               f"retrying in {delay:.1f}s")
+                return
+            self._failed.add(session_id)
+            self._spooled.add(session_id)
+            self.failed += 1
+            try:
+                self._write_spool()
+                kept = f"spooled to {self.spool_path}" if self.spool_path else "kept in memory only"
+            except OSError as spool_error:
+                kept = f"could not be spooled ({spool_error})"
+        logger.error(f"Could not save session {session_id} after {attempts} attempts: {error}; "
+                     f"it stays pending and {kept}")
+
+    def _take_retries(self, everything: bool = False) -> List[Dict]:
+        """Failed records whose retry delay is over (all of them when stopping)"""
+        now = time.time()
+        with self._lock:
+            due = [values for when, values in self._retry_due if everything or when <= now]
+            self._retry_due = [(when, values) for when, values in self._retry_due if not (everything or when <= now)]
+        return due
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = self._next_batch()
+            if _STOP in batch:
+                stopping = True
+                with self._lock:
+                    # Records failing from here on are spooled, not retried later
+                    self._stopping = True
+                batch = [values for values in batch if values is not _STOP]
+                # Drain whatever is still queued behind the stop marker
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+            batch.extend(self._take_retries(everything=stopping))
+            for start in range(0, len(batch), self.batch_size):
+                self._write_batch(batch[start:start + self.batch_size])
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every queued session is committed or has failed for good; False on timeout"""
+        deadline = time.time() + timeout
+        while True:
+            with self._lock:
+                if len(self._pending) == len(self._failed):
+                    return True
+            if time.time() >= deadline or not self.running:
+                return False
+            time.sleep(0.01)
+
+    def stop(self, timeout: float = 10.0):
+        """Write out the queue and stop the writer (registered to run at exit)"""
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            pending = len(self._pending)
+            spooled = len(self._spooled)
+        return {
+            'enabled': self.enabled,
+            'running': self.running,
+            'queue_depth': self._queue.qsize(),
+            'max_depth': self.max_depth,
+            'pending': pending,
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'batches': self.batches,
+            'avg_batch_size': round(self.written / self.batches, 1) if self.batches else None,
+            'failed': self.failed,
+            'retries': self.retries,
+            'spooled': spooled,
+            'inline_writes': self.inline_writes
+        }
+
+
+# Global queue used by the analysis routes
+persistence_queue = PersistenceQueue()
@@ -0,0 +1,285 @@
+"""
+Token-Budgeted Prompt Builder for the OpenAI Chatbots
+
+Builds the ChatCompletion messages for a conversation within a per-request
+token budget. The system prompt and the current message are always sent.
+The most recent turns are added newest first while they fit; older turns
+are folded into a short running summary that is cached in the
+conversation's context (so each turn is only summarized once). Repeated
+messages, including the copy of the current message already in the
+history, are dropped.
+
+Tokens are counted with tiktoken when it is installed and estimated
+otherwise. Configure with PROMPT_TOKEN_BUDGET, PROMPT_RECENT_MESSAGES and
+PROMPT_SUMMARY_TOKENS.
+"""
+
+import os
+import re
+import threading
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', '1500'))
+PROMPT_RECENT_MESSAGES = int(os.getenv('PROMPT_RECENT_MESSAGES', '6'))
+PROMPT_SUMMARY_TOKENS = int(os.getenv('PROMPT_SUMMARY_TOKENS', '200'))
+
+# Context key the running summary is cached under
+SUMMARY_CONTEXT_KEY = 'history_summary'
+
+# ChatCompletion framing: tokens per message and for priming the reply
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_PRIMING_TOKENS = 3
+
+# Words kept from each turn folded into the summary
+SUMMARY_LINE_WORDS = 30
+
+# Prompt sizes kept for the percentile report
+STATS_WINDOW = 500
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s')
+_MARKDOWN = re.compile(r'[*_`#•]+')
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    """tiktoken encoding for a model, or None if tiktoken is not installed"""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding('cl100k_base')
+
+
+def tokenizer_name(model: str = 'gpt-3.5-turbo') -> str:
+    encoding = _encoding(model)
+    return encoding.name if encoding is not None else 'estimate'
+
+
+def count_tokens(text: str, model: str = 'gpt-3.5-turbo') -> int:
+    """Tokens in a text (estimated from words and punctuation without tiktoken)"""
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    # BPE splits long words; roughly 4 characters per token for English text
+    return sum(max(1, (len(piece) + 3) // 4) for piece in _TOKEN_PATTERN.findall(text))
+
+
+def count_message_tokens(messages: List[Dict], model: str = 'gpt-3.5-turbo') -> int:
+    """Prompt tokens for a list of chat messages, including message framing"""
+    return sum(MESSAGE_OVERHEAD_TOKENS + count_tokens(m['content'], model) for m in messages) + REPLY_PRIMING_TOKENS
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = 'gpt-3.5-turbo') -> str:
+    """Longest prefix of the text (cut at a word) that fits in max_tokens"""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    words = text.split()
+    low, high = 0, len(words)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(' '.join(words[:middle]), model) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return ' '.join(words[:low])
+
+
+def summary_line(message: Dict) -> str:
+    """One summary line for a turn: who spoke and the opening of what they said"""
+    text = ' '.join(_MARKDOWN.sub('', message['content']).split())
+    first_sentence = _SENTENCE_END.split(text, 1)[0]
+    words = first_sentence.split()
+    if len(words) > SUMMARY_LINE_WORDS:
+        first_sentence = ' '.join(words[:SUMMARY_LINE_WORDS]) + '...'
+    speaker = 'User' if message['role'] == 'user' else 'Assistant'
+    return f"{speaker}: {first_sentence}"
+
+
+@dataclass
+class PromptPlan:
+    """Messages to send and what was done to fit them in the budget"""
+    messages: List[Dict]
+    summary: Optional[Dict]
+    prompt_tokens: int
+    history_messages: int
+    folded_messages: int = 0
+    truncated: bool = False
+
+
+@dataclass
+class _Summary:
+    through: float = 0.0
+    lines: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_context(cls, value: Optional[Dict]) -> '_Summary':
+        if not value:
+            return cls()
+        return cls(float(value.get('through', 0.0)), list(value.get('lines', [])))
+
+    def to_context(self) -> Dict:
+        return {'through': self.through, 'lines': list(self.lines)}
+
+
+class PromptBuilder:
+    """
+    Fits system prompt, running summary, recent history and the current
+    message into a token budget
+    """
+
+    def __init__(self, model: str = 'gpt-3.5-turbo', max_prompt_tokens: int = PROMPT_TOKEN_BUDGET,
+                 recent_messages: int = PROMPT_RECENT_MESSAGES, summary_tokens: int = PROMPT_SUMMARY_TOKENS):
+        """
+        Args:
+            model: Model whose tokenizer is used for counting
+            max_prompt_tokens: Budget for the whole prompt
+            recent_messages: Most history messages sent verbatim
+            summary_tokens: Budget for the summary of older turns
+        """
+        self.model = model
+        self.max_prompt_tokens = max_prompt_tokens
+        self.recent_messages = recent_messages
+        self.summary_tokens = summary_tokens
+
+        self._lock = threading.Lock()
+        self.prompts = 0
+        self.folded_messages = 0
+        self.dropped_duplicates = 0
+        self.truncated = 0
+        self._sizes: deque = deque(maxlen=STATS_WINDOW)
+
+    def _tokens(self, text: str) -> int:
+        return count_tokens(text, self.model)
+
+    def _message_tokens(self, message: Dict) -> int:
+        return MESSAGE_OVERHEAD_TOKENS + self._tokens(message['content'])
+
+    def _dedupe(self, history: List[Dict], user_message: str) -> List[Dict]:
+        """User/assistant turns without repeats or the trailing copy of the current message"""
+        turns = []
+        for message in history:
+            if message.get('role') not in ('user', 'assistant'):
+                continue
+            if turns and turns[-1]['role'] == message['role'] and turns[-1]['content'] == message['content']:
+                self.dropped_duplicates += 1
+                continue
+            turns.append(message)
+        if turns and turns[-1]['role'] == 'user' and turns[-1]['content'] == user_message:
+            turns.pop()
+        return turns
+
+    def _fold(self, summary: _Summary, turns: List[Dict]) -> int:
+        """Add turns that are not summarized yet; returns how many were added"""
+        added = 0
+        for message in turns:
+            timestamp = message.get('timestamp', 0.0)
+            if timestamp and timestamp <= summary.through:
+                continue
+            summary.lines.append(summary_line(message))
+            summary.through = max(summary.through, timestamp)
+            added += 1
+        # Oldest lines give way first
+        while summary.lines and self._tokens('\n'.join(summary.lines)) > self.summary_tokens:
+            summary.lines.pop(0)
+        return added
+
+    def build(self, system_prompt: str, history: List[Dict], user_message: str,
+              summary: Optional[Dict] = None) -> PromptPlan:
+        """
+        Build the messages for one request.
+
+        Args:
+            system_prompt: System prompt including any session context
+            history: Conversation messages, oldest first (may include the current message)
+            user_message: The message being answered
+            summary: Running summary returned by the previous build for this conversation
+
+        Returns:
+            PromptPlan; store plan.summary with the conversation for the next build
+        """
+        system = {"role": "system", "content": system_prompt}
+        current = {"role": "user", "content": user_message}
+        truncated = False
+
+        with self._lock:
+            turns = self._dedupe(history, user_message)
+
+        required = self._message_tokens(system) + REPLY_PRIMING_TOKENS
+        available = self.max_prompt_tokens - required
+        if self._message_tokens(current) > available:
+            current['content'] = truncate_to_tokens(user_message, max(1, available - MESSAGE_OVERHEAD_TOKENS),
+                                                    self.model)
+            truncated = True
+        available -= self._message_tokens(current)
+
+        # Newest turns first while they fit
+        candidates = turns[-self.recent_messages:] if self.recent_messages > 0 else []
+        kept, used = [], 0
+        for message in reversed(candidates):
+            if used + self._message_tokens(message) > available:
+                break
+            kept.insert(0, message)
+            used += self._message_tokens(message)
+
+        # Older turns go to the summary, which needs room of its own
+        state = _Summary.from_context(summary)
+        if state.lines or len(kept) < len(turns):
+            while kept and used > available - self.summary_tokens - MESSAGE_OVERHEAD_TOKENS:
+                used -= self._message_tokens(kept.pop(0))
+        available -= used
+
+        folded = self._fold(state, turns[:len(turns) - len(kept)])
+        messages = [system]
+        if state.lines:
+            summary_text = "Summary of the earlier conversation:\n" + '\n'.join(state.lines)
+            if self._tokens(summary_text) + MESSAGE_OVERHEAD_TOKENS <= available:
+                messages.append({"role": "system", "content": summary_text})
+        messages.extend({"role": m['role'], "content": m['content']} for m in kept)
+        messages.append(current)
+
+        plan = PromptPlan(
+            messages=messages,
+            summary=state.to_context() if state.lines else None,
+            prompt_tokens=count_message_tokens(messages, self.model),
+            history_messages=len(kept),
+            folded_messages=folded,
+            truncated=truncated
+        )
+        with self._lock:
+            self.prompts += 1
+            self.folded_messages += folded
+            self.truncated += int(truncated)
+            self._sizes.append(plan.prompt_tokens)
+        return plan
+
+    def get_stats(self) -> Dict:
+        """Prompt size percentiles and what was done to stay within the budget"""
+        with self._lock:
+            sizes = sorted(self._sizes)
+        pick = lambda q: sizes[min(len(sizes) - 1, int(q * len(sizes)))] if sizes else None
+        return {
+            'tokenizer': tokenizer_name(self.model),
+            'budget_tokens': self.max_prompt_tokens,
+            'prompts': self.prompts,
+            'prompt_tokens': {
+                'p50': pick(0.5),
+                'p95': pick(0.95),
+                'max': sizes[-1] if sizes else None,
+                'avg': round(sum(sizes) / len(sizes), 1) if sizes else None
+            },
+            'folded_messages': self.folded_messages,
+            'dropped_duplicates': self.dropped_duplicates,
+            'truncated_messages': self.truncated
+        }
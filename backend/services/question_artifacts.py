@@ -0,0 +1,196 @@
+"""
+Precomputed Per-Question Artifacts
+
+Everything the semantic relevance analyzer derives from a question alone
+(question type, expected answer elements, extracted topics and the
+embeddings of the question and its topics) is computed once for the whole
+interview question bank at deploy time and written to a versioned artifact
+file. The service memory-maps that file at startup, so analyzing a bank
+question only does work on the answer side.
+"""
+
+import os
+import time
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .artifact_store import write_artifact, load_artifact, ArtifactVersionError
+from .embeddings import DEFAULT_MODEL_NAME
+from .question_classifier import normalize_question
+
+logger = logging.getLogger(__name__)
+
+ARTIFACTS_KIND = 'question_artifacts'
+ARTIFACTS_VERSION = 1
+
+DEFAULT_ARTIFACTS_PATH = os.getenv(
+    'QUESTION_ARTIFACTS_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'question_artifacts.bin')
+)
+
+
+@dataclass
+class QuestionArtifact:
+    """Precomputed question-side data for one bank question"""
+    question: str
+    question_type: str
+    expected_elements: List[str]
+    topics: List[str]
+    embedding: np.ndarray          # Question embedding, as produced by get_sentence_embeddings
+    topic_embeddings: np.ndarray   # One row per topic
+
+
+class QuestionArtifactStore:
+    """
+    Lookup of precomputed artifacts by normalized question text
+    """
+
+    def __init__(self, artifacts: List[QuestionArtifact], model_name: str = DEFAULT_MODEL_NAME,
+                 artifact=None):
+        self.model_name = model_name
+        self._by_question: Dict[str, QuestionArtifact] = {
+            normalize_question(item.question): item for item in artifacts
+        }
+        # Keeps the memory map alive for as long as the store is in use
+        self._artifact = artifact
+
+    def __len__(self) -> int:
+        return len(self._by_question)
+
+    def get(self, question: str) -> Optional[QuestionArtifact]:
+        """Return the artifacts for a bank question, or None for ad-hoc questions"""
+        if not question:
+            return None
+        return self._by_question.get(normalize_question(question))
+
+    def save(self, path: str = DEFAULT_ARTIFACTS_PATH) -> int:
+        """Write the store to a versioned artifact file"""
+        items = list(self._by_question.values())
+        entries = []
+        topic_blocks = []
+        topic_offset = 0
+        for item in items:
+            entries.append({
+                'question': item.question,
+                'question_type': item.question_type,
+                'expected_elements': item.expected_elements,
+                'topics': item.topics,
+                'topic_offset': topic_offset
+            })
+            topic_blocks.append(np.asarray(item.topic_embeddings, dtype=np.float32))
+            topic_offset += len(item.topics)
+
+        dimension = items[0].embedding.shape[0] if items else 0
+        arrays = {
+            'question_embeddings': np.stack([np.asarray(item.embedding, dtype=np.float32) for item in items])
+            if items else np.zeros((0, dimension), dtype=np.float32),
+            'topic_embeddings': np.concatenate(topic_blocks) if topic_offset else np.zeros((0, dimension), dtype=np.float32)
+        }
+        meta = {'model_name': self.model_name, 'questions': entries}
+        return write_artifact(path, ARTIFACTS_KIND, ARTIFACTS_VERSION, meta, arrays)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_ARTIFACTS_PATH) -> 'QuestionArtifactStore':
+        """Memory-map a store written by save()"""
+        artifact = load_artifact(path, ARTIFACTS_KIND, ARTIFACTS_VERSION)
+        question_embeddings = artifact.arrays['question_embeddings']
+        topic_embeddings = artifact.arrays['topic_embeddings']
+
+        items = []
+        for row, entry in enumerate(artifact.meta['questions']):
+            start = entry['topic_offset']
+            items.append(QuestionArtifact(
+                question=entry['question'],
+                question_type=entry['question_type'],
+                expected_elements=entry['expected_elements'],
+                topics=entry['topics'],
+                embedding=question_embeddings[row],
+                topic_embeddings=topic_embeddings[start:start + len(entry['topics'])]
+            ))
+        return cls(items, model_name=artifact.meta.get('model_name', DEFAULT_MODEL_NAME), artifact=artifact)
+
+
+def compute_question_artifacts(questions: Iterable[str], engine=None, pattern_matcher=None) -> QuestionArtifactStore:
+    """
+    Derive the question-side artifacts for a list of questions.
+
+    Args:
+        questions: Questions to precompute (duplicates after normalization are skipped)
+        engine: SemanticSimilarityEngine used for topics and embeddings
+        pattern_matcher: QuestionPatternMatcher used for type and expected elements
+    """
+    if engine is None:
+        from .semantic_similarity import SemanticSimilarityEngine
+        engine = SemanticSimilarityEngine()
+    if pattern_matcher is None:
+        from .question_patterns import QuestionPatternMatcher
+        pattern_matcher = QuestionPatternMatcher()
+
+    items = []
+    seen = set()
+    for question in questions:
+        key = normalize_question(question)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+
+        pattern = pattern_matcher.match_pattern(question)
+        topics = engine._extract_key_topics(question)
+        items.append(QuestionArtifact(
+            question=question,
+            question_type=pattern.question_type.value,
+            expected_elements=[element.element_type for element in pattern.expected_elements],
+            topics=topics,
+            embedding=np.asarray(engine.get_sentence_embeddings(question), dtype=np.float32),
+            topic_embeddings=np.asarray(engine.get_sentence_embeddings_batch(topics), dtype=np.float32)
+        ))
+    return QuestionArtifactStore(items, model_name=engine.model_name)
+
+
+def build_question_artifacts(path: str = DEFAULT_ARTIFACTS_PATH, questions: Optional[Iterable[str]] = None,
+                             model_name: str = DEFAULT_MODEL_NAME) -> QuestionArtifactStore:
+    """Precompute artifacts for the interview question bank and write the file"""
+    from .semantic_similarity import SemanticSimilarityEngine
+
+    if questions is None:
+        from utils.interview_questions import get_all_questions
+        questions = get_all_questions()
+
+    store = compute_question_artifacts(questions, engine=SemanticSimilarityEngine(model_name))
+    size = store.save(path)
+    logger.info(f"Wrote artifacts for {len(store)} questions ({size} bytes) to {path}")
+    return store
+
+
+_loaded_store = None
+_load_attempted = False
+
+
+def load_question_artifacts(path: str = DEFAULT_ARTIFACTS_PATH) -> Optional[QuestionArtifactStore]:
+    """
+    Load the question artifact store once per process.
+
+    Returns:
+        The store, or None if it has not been built
+    """
+    global _loaded_store, _load_attempted
+    if _load_attempted:
+        return _loaded_store
+
+    _load_attempted = True
+    if not os.path.exists(path):
+        logger.info(f"Question artifacts not found at {path}; question-side analysis runs per request")
+        return None
+
+    try:
+        start_time = time.time()
+        _loaded_store = QuestionArtifactStore.load(path)
+        logger.info(f"Loaded artifacts for {len(_loaded_store)} questions "
+                    f"in {(time.time() - start_time) * 1000:.1f}ms")
+    except (ArtifactVersionError, OSError, KeyError) as e:
+        logger.error(f"Failed to load question artifacts: {e}")
+        _loaded_store = None
+    return _loaded_store
@@ -0,0 +1,132 @@
+"""
+Inverted-Index Question Classifier
+
+Maps question keywords and phrases to question types through a single
+PhraseMatcher, so classifying an ad-hoc question costs one pass over its
+tokens. Results are memoized by normalized question text; the interview
+question bank can be classified up front with warm() so bank questions
+are a dictionary lookup.
+"""
+
+import threading
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence
+
+from .keyword_automaton import PhraseMatcher, tokenize
+
+# Selection modes
+FIRST_MATCH = "first"   # First type (in declaration order) with any keyword hit
+MOST_MATCHES = "most"   # Type with the most distinct keyword hits, ties go to the earlier type
+
+
+def normalize_question(question: str) -> str:
+    """Normalize question text for memo lookups (case, punctuation and spacing)"""
+    return ' '.join(tokenize(question))
+
+
+class QuestionClassifier:
+    """
+    Keyword-to-type inverted index with a normalized-question memo
+    """
+
+    def __init__(self, type_keywords: Dict[Hashable, Sequence[str]], default: Hashable,
+                 mode: str = FIRST_MATCH, max_memo_size: int = 4096):
+        """
+        Build the index.
+
+        Args:
+            type_keywords: Keywords and phrases for each question type, in priority order
+            default: Type returned when no keyword matches
+            mode: FIRST_MATCH or MOST_MATCHES
+            max_memo_size: Cap on memoized ad-hoc questions (warmed questions are always kept)
+        """
+        if mode not in (FIRST_MATCH, MOST_MATCHES):
+            raise ValueError(f"Unknown classification mode: {mode}")
+
+        self.default = default
+        self.mode = mode
+        self.max_memo_size = max_memo_size
+        self._types: List[Hashable] = list(type_keywords)
+        self._matcher = PhraseMatcher()
+        for rank, question_type in enumerate(self._types):
+            for keyword in type_keywords[question_type]:
+                # Inflections keep e.g. "explain" matching "explained" on word boundaries
+                self._matcher.add(keyword, (rank, keyword), expand_inflections=True)
+
+        self._memo: Dict[str, Hashable] = {}
+        self._warm_keys = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def classify(self, question: str) -> Hashable:
+        """
+        Classify a question, using the memo when possible.
+
+        Args:
+            question: The interview question
+
+        Returns:
+            The matched question type, or the default type
+        """
+        if not question:
+            return self.default
+
+        key = normalize_question(question)
+        question_type = self._memo.get(key)
+        if question_type is not None:
+            self.hits += 1
+            return question_type
+
+        self.misses += 1
+        question_type = self._classify_tokens(key.split())
+        with self._lock:
+            if len(self._memo) - len(self._warm_keys) < self.max_memo_size:
+                self._memo[key] = question_type
+        return question_type
+
+    def _classify_tokens(self, tokens: List[str]) -> Hashable:
+        """Classify from the inverted index without consulting the memo"""
+        matches = self._matcher.match_tokens(tokens)
+        if not matches:
+            return self.default
+
+        if self.mode == FIRST_MATCH:
+            return self._types[min(rank for rank, _ in matches)]
+
+        counts: Dict[int, int] = {}
+        for rank, _ in matches:
+            counts[rank] = counts.get(rank, 0) + 1
+        best_rank = min(counts, key=lambda rank: (-counts[rank], rank))
+        return self._types[best_rank]
+
+    def warm(self, questions: Iterable[str]) -> int:
+        """
+        Pre-classify known questions so later lookups skip the index.
+
+        Args:
+            questions: Questions to memoize (e.g. the interview question bank)
+
+        Returns:
+            Number of questions memoized
+        """
+        count = 0
+        with self._lock:
+            for question in questions:
+                key = normalize_question(question)
+                if not key:
+                    continue
+                self._memo[key] = self._classify_tokens(key.split())
+                self._warm_keys.add(key)
+                count += 1
+        return count
+
+    def get_stats(self) -> Dict:
+        """Memo size and hit rate"""
+        total = self.hits + self.misses
+        return {
+            'memo_size': len(self._memo),
+            'warm_questions': len(self._warm_keys),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else None
+        }
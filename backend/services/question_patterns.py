@@ -7,10 +7,12 @@ validation for different types of interview questions.
 
 import re
 from enum import Enum
-from typing import List, Dict, Optional, Set
+from typing import List, Dict, Optional, Set, Iterable
 from dataclasses import dataclass
 import logging
 
+from .question_classifier import QuestionClassifier, MOST_MATCHES
+
 logger = logging.getLogger(__name__)
 
 class QuestionType(Enum):
@@ -55,6 +57,11 @@ class QuestionPatternMatcher:
     def __init__(self):
         """Initialize the question pattern matcher with predefined patterns"""
         self.patterns = self._initialize_patterns()
+        self.classifier = QuestionClassifier(
+            {question_type: pattern.keywords for question_type, pattern in self.patterns.items()},
+            default=QuestionType.GENERAL,
+            mode=MOST_MATCHES
+        )
     
     def _initialize_patterns(self) -> Dict[QuestionType, QuestionPattern]:
         """Initialize predefined question patterns"""
@@ -197,24 +204,20 @@ class QuestionPatternMatcher:
         Returns:
             QuestionPattern that best matches the question
         """
-        if not question:
-            return self.patterns[QuestionType.GENERAL]
-        
-        question_lower = question.lower()
-        best_match = QuestionType.GENERAL
-        best_score = 0
+        question_type = self.classifier.classify(question)
+        return self.patterns.get(question_type, self.patterns[QuestionType.GENERAL])
+    
+    def warm(self, questions: Iterable[str]) -> int:
+        """
+        Pre-classify known questions (e.g. the interview question bank).
         
-        for question_type, pattern in self.patterns.items():
-            score = 0
-            for keyword in pattern.keywords:
-                if keyword in question_lower:
-                    score += 1
+        Args:
+            questions: Questions to memoize
             
-            if score > best_score:
-                best_score = score
-                best_match = question_type
-        
-        return self.patterns.get(best_match, self.patterns[QuestionType.GENERAL])
+        Returns:
+            Number of questions memoized
+        """
+        return self.classifier.warm(questions)
     
     def get_expected_elements(self, pattern: QuestionPattern) -> List[ExpectedElement]:
         """
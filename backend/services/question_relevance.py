@@ -8,10 +8,12 @@ are relevant to the questions asked, providing scores, classifications, and feed
 import time
 from enum import Enum
 from typing import List, Dict, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import logging
 
 from .semantic_similarity import SemanticSimilarityEngine, SemanticOverlap
+from .exemplar_index import load_exemplar_index, ExemplarMatch
+from .question_artifacts import load_question_artifacts
 from .question_patterns import QuestionPatternMatcher, QuestionType, QuestionPattern, StructureValidation
 
 logger = logging.getLogger(__name__)
@@ -60,6 +62,8 @@ class RelevanceResult:
     structure_validation: StructureValidation
     feedback: RelevanceFeedback
     processing_time: float
+    exemplar_similarity: float = 0.0  # Cosine similarity to the closest known-good answer
+    nearest_exemplars: List[ExemplarMatch] = field(default_factory=list)
 
 class QuestionRelevanceAnalyzer:
     """
@@ -71,6 +75,11 @@ class QuestionRelevanceAnalyzer:
         self.semantic_engine = SemanticSimilarityEngine()
         self.pattern_matcher = QuestionPatternMatcher()
         self.feedback_generator = FeedbackGenerator()
+        self.exemplar_index = load_exemplar_index()
+        self.question_artifacts = load_question_artifacts()
+        if self.question_artifacts is not None and self.question_artifacts.model_name != self.semantic_engine.model_name:
+            logger.warning("Question artifacts were built with a different model; ignoring them")
+            self.question_artifacts = None
     
     def analyze_relevance(self, question: str, answer: str) -> RelevanceResult:
         """
@@ -86,15 +95,30 @@ class QuestionRelevanceAnalyzer:
         start_time = time.time()
         
         try:
+            # Bank questions have their question-side work precomputed
+            artifact = self.question_artifacts.get(question) if self.question_artifacts is not None else None
+            answer_embedding = self.semantic_engine.get_sentence_embeddings(answer)
+            
             # Step 1: Classify question type
-            question_pattern = self.pattern_matcher.match_pattern(question)
-            question_type = question_pattern.question_type
+            if artifact is not None:
+                question_type = QuestionType(artifact.question_type)
+                question_pattern = self.pattern_matcher.patterns[question_type]
+                question_embedding = artifact.embedding
+            else:
+                question_pattern = self.pattern_matcher.match_pattern(question)
+                question_type = question_pattern.question_type
+                question_embedding = self.semantic_engine.get_sentence_embeddings(question)
             
             # Step 2: Calculate semantic similarity
-            semantic_similarity = self.semantic_engine.calculate_similarity(question, answer)
+            semantic_similarity = self.semantic_engine.similarity_from_embeddings(question_embedding, answer_embedding)
             
             # Step 3: Analyze topic overlap
-            topic_overlap = self.semantic_engine.find_semantic_overlap(question, answer)
+            if artifact is not None:
+                topic_overlap = self.semantic_engine.find_semantic_overlap(
+                    question, answer, artifact.topics, artifact.topic_embeddings
+                )
+            else:
+                topic_overlap = self.semantic_engine.find_semantic_overlap(question, answer)
             
             # Step 4: Validate answer structure
             structure_validation = self.pattern_matcher.validate_answer_structure(answer, question_pattern)
@@ -116,6 +140,10 @@ class QuestionRelevanceAnalyzer:
                 topic_overlap, structure_validation, topic_drift
             )
             
+            # Step 9: Compare against known-good exemplar answers
+            nearest_exemplars = self.find_nearest_exemplars(answer, answer_embedding=answer_embedding)
+            exemplar_similarity = nearest_exemplars[0].similarity if nearest_exemplars else 0.0
+            
             processing_time = time.time() - start_time
             
             return RelevanceResult(
@@ -127,7 +155,9 @@ class QuestionRelevanceAnalyzer:
                 topic_drift=topic_drift,
                 structure_validation=structure_validation,
                 feedback=feedback,
-                processing_time=processing_time
+                processing_time=processing_time,
+                exemplar_similarity=exemplar_similarity,
+                nearest_exemplars=nearest_exemplars
             )
             
         except Exception as e:
@@ -137,8 +167,37 @@ class QuestionRelevanceAnalyzer:
             # Return fallback result
             return self._create_fallback_result(question, answer, processing_time)
     
+    def find_nearest_exemplars(self, answer: str, k: int = 3, answer_embedding=None) -> List[ExemplarMatch]:
+        """
+        Find the known-good answers closest to the given answer.
+        
+        Args:
+            answer: The user's answer
+            k: Number of exemplars to return
+            answer_embedding: The answer's embedding, if already computed
+            
+        Returns:
+            Exemplar matches, empty if the exemplar index has not been built
+        """
+        if self.exemplar_index is None or not answer or not answer.strip():
+            return []
+        
+        try:
+            if self.exemplar_index.model_name != self.semantic_engine.model_name:
+                return self.exemplar_index.search_text(answer, k)
+            if answer_embedding is None:
+                answer_embedding = self.semantic_engine.get_sentence_embeddings(answer)
+            return self.exemplar_index.search(answer_embedding, k)
+        except Exception as e:
+            logger.error(f"Error searching exemplar index: {e}")
+            return []
+    
     def classify_question_type(self, question: str) -> QuestionType:
         """Classify the type of interview question"""
+        if self.question_artifacts is not None:
+            artifact = self.question_artifacts.get(question)
+            if artifact is not None:
+                return QuestionType(artifact.question_type)
         pattern = self.pattern_matcher.match_pattern(question)
         return pattern.question_type
     
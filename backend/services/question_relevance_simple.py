@@ -5,9 +5,12 @@ Uses lightweight keyword matching instead of heavy ML models
 
 import time
 from enum import Enum
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable, Set, Tuple
 from dataclasses import dataclass
 
+from .keyword_automaton import PhraseMatcher
+from .question_classifier import QuestionClassifier, FIRST_MATCH
+
 class RelevanceClassification(Enum):
     """Classification levels for answer relevance"""
     HIGHLY_RELEVANT = "Highly Relevant"      # 80-100%
@@ -52,6 +55,55 @@ class RelevanceResult:
     topic_overlap_percentage: float
     feedback: RelevanceFeedback
     processing_time: float
+    decided_by: str = "keyword"  # Analyzer tier that produced this result
+    escalation_reason: Optional[str] = None
+
+# Synonyms that count as a match for an expected keyword
+SYNONYMS = {
+    "skills": ["skill", "ability", "abilities", "capable", "capabilities", "talents", "expertise", "competencies", "strengths", "good at", "excel", "proficient", "analytical", "thinking"],
+    "experience": ["experienced", "background", "work", "history", "tenure", "years", "time", "decade", "developer", "engineer", "professional", "career", "worked"],
+    "value": ["bring", "contribute", "offer", "provide", "add", "help", "assist", "drive", "forward", "addition", "asset", "benefit", "valuable"],
+    "achieve": ["deliver", "accomplish", "complete", "quality", "success", "results", "outcome", "finish", "successful", "completed", "delivered", "accomplished", "met"],
+    "situation": ["scenario", "circumstance", "case", "instance", "problem", "issue", "challenge", "encountered"],
+    "action": ["steps", "took", "did", "implemented", "approached", "handled", "managed", "initiative", "stepped", "reorganized"],
+    "challenge": ["challenging", "difficult", "tough", "complex", "demanding", "hard", "problem"],
+    "team": ["teamwork", "collaboration", "group", "colleagues", "together", "cooperative"],
+    "leadership": ["lead", "leading", "manage", "managing", "guide", "direct", "supervise", "leader"],
+    "learning": ["learn", "grow", "development", "improve", "adapt", "education", "training"],
+    "goal": ["goals", "vision", "future", "aspire", "aim", "objective", "plan", "direction"],
+    "background": ["history", "past", "previous", "former", "education", "training"]
+}
+
+# Additional variations checked for a few keywords
+KEYWORD_VARIATIONS = {
+    "skills": ["good at", "excel at", "talented", "proficient"],
+    "experience": ["worked", "career", "professional", "developer", "engineer"],
+    "value": ["benefit", "asset", "addition", "valuable"],
+    "achieve": ["successful", "completed", "delivered", "accomplished"]
+}
+
+# Narrower variations used when listing covered topics in feedback
+FEEDBACK_VARIATIONS = {
+    "skills": ["skill", "ability", "abilities"],
+    "value": ["bring", "contribute", "offer"],
+    "achieve": ["deliver", "quality", "dedication"]
+}
+FEEDBACK_LABELS = {"achieve": "achievements"}
+
+DEFAULT_EXPECTED_KEYWORDS = ["work", "experience", "skills"]
+
+VALUE_INDICATORS = ["hire", "because", "bring", "contribute", "deliver", "quality", "dedication", "responsibility", "enthusiasm"]
+
+OFF_TOPIC_WORDS = ["pizza", "weather", "color", "movie", "dog", "cat", "food", "music", "sports", "hobby"]
+FEEDBACK_OFF_TOPIC_WORDS = ["pizza", "weather", "color", "movie", "dog", "cat"]
+
+# Match tags produced by the answer automaton
+EXPECTED = "expected"
+FEEDBACK = "feedback"
+FEEDBACK_VARIATION = "feedback_variation"
+VALUE_INDICATOR = "value_indicator"
+OFF_TOPIC = "off_topic"
+FEEDBACK_OFF_TOPIC = "feedback_off_topic"
 
 class QuestionRelevanceAnalyzer:
     """
@@ -61,6 +113,15 @@ class QuestionRelevanceAnalyzer:
     def __init__(self):
         """Initialize the relevance analyzer"""
         self.question_patterns = self._initialize_patterns()
+        self.answer_matcher = self._compile_answer_matcher()
+        self.question_classifier = QuestionClassifier(
+            {q_type: pattern["keywords"] for q_type, pattern in self.question_patterns.items()},
+            default=QuestionType.GENERAL,
+            mode=FIRST_MATCH
+        )
+        self._value_indicator_tags = frozenset((VALUE_INDICATOR, word) for word in VALUE_INDICATORS)
+        self._off_topic_tags = frozenset((OFF_TOPIC, word) for word in OFF_TOPIC_WORDS)
+        self._feedback_off_topic_tags = frozenset((FEEDBACK_OFF_TOPIC, word) for word in FEEDBACK_OFF_TOPIC_WORDS)
     
     def _initialize_patterns(self):
         """Initialize question patterns for classification"""
@@ -87,7 +148,41 @@ class QuestionRelevanceAnalyzer:
             }
         }
     
-    def analyze_relevance(self, question: str, answer: str) -> RelevanceResult:
+    def _compile_answer_matcher(self) -> PhraseMatcher:
+        """
+        Compile expected keywords, synonyms and off-topic terms into one automaton.
+        
+        Every phrase maps to a (tag, canonical keyword) pair, so a single pass
+        over an answer yields everything the scorer and feedback need.
+        """
+        matcher = PhraseMatcher()
+        
+        expected_keywords = set(DEFAULT_EXPECTED_KEYWORDS)
+        for pattern in self.question_patterns.values():
+            expected_keywords.update(pattern["expected"])
+        
+        for keyword in expected_keywords:
+            terms = [keyword] + SYNONYMS.get(keyword, []) + KEYWORD_VARIATIONS.get(keyword, [])
+            matcher.add_all(terms, (EXPECTED, keyword), expand_inflections=True)
+            matcher.add(keyword, (FEEDBACK, keyword), expand_inflections=True)
+            matcher.add_all(FEEDBACK_VARIATIONS.get(keyword, []), (FEEDBACK_VARIATION, keyword),
+                            expand_inflections=True)
+        
+        for indicator in VALUE_INDICATORS:
+            matcher.add(indicator, (VALUE_INDICATOR, indicator), expand_inflections=True)
+        for word in OFF_TOPIC_WORDS:
+            matcher.add(word, (OFF_TOPIC, word), expand_inflections=True)
+        for word in FEEDBACK_OFF_TOPIC_WORDS:
+            matcher.add(word, (FEEDBACK_OFF_TOPIC, word), expand_inflections=True)
+        
+        return matcher
+    
+    def _match_answer(self, answer: str) -> Set[Tuple[str, str]]:
+        """Scan the answer once and return the (tag, keyword) pairs it contains"""
+        return self.answer_matcher.match(answer)
+    
+    def analyze_relevance(self, question: str, answer: str,
+                          question_type: Optional[QuestionType] = None) -> RelevanceResult:
         """
         Analyze the relevance between a question and answer.
         """
@@ -95,16 +190,21 @@ class QuestionRelevanceAnalyzer:
         
         try:
             # Step 1: Classify question type
-            question_type = self._classify_question(question)
+            if question_type is None:
+                question_type = self._classify_question(question)
+            
+            # Step 2: Match expected keywords, synonyms and off-topic terms in one pass
+            matches = self._match_answer(answer)
             
-            # Step 2: Calculate relevance score
-            relevance_score = self._calculate_relevance_score(question, answer, question_type)
+            # Step 3: Calculate relevance score
+            relevance_score = self._calculate_relevance_score(question, answer, question_type, matches)
             
-            # Step 3: Classify relevance level
+            # Step 4: Classify relevance level
             classification = self._classify_relevance(relevance_score)
             
-            # Step 4: Generate feedback
-            feedback = self._generate_feedback(question, answer, question_type, relevance_score, classification)
+            # Step 5: Generate feedback
+            feedback = self._generate_feedback(question, answer, question_type, relevance_score,
+                                               classification, matches)
             
             processing_time = time.time() - start_time
             
@@ -122,90 +222,56 @@ class QuestionRelevanceAnalyzer:
             processing_time = time.time() - start_time
             return self._create_fallback_result(processing_time)
     
+    def analyze_batch(self, pairs: Iterable[Tuple[str, str]]) -> List[RelevanceResult]:
+        """
+        Analyze many (question, answer) pairs, classifying each distinct question once.
+        """
+        question_types = {}
+        results = []
+        for question, answer in pairs:
+            if question not in question_types:
+                question_types[question] = self._classify_question(question)
+            results.append(self.analyze_relevance(question, answer, question_types[question]))
+        return results
+    
+    def score_batch(self, pairs: Iterable[Tuple[str, str]]) -> List[float]:
+        """Score many (question, answer) pairs without generating feedback"""
+        question_types = {}
+        scores = []
+        for question, answer in pairs:
+            if question not in question_types:
+                question_types[question] = self._classify_question(question)
+            scores.append(self._calculate_relevance_score(question, answer, question_types[question]))
+        return scores
+    
     def _classify_question(self, question: str) -> QuestionType:
         """Classify the type of interview question"""
-        question_lower = question.lower()
-        
-        for q_type, pattern in self.question_patterns.items():
-            for keyword in pattern["keywords"]:
-                if keyword in question_lower:
-                    return q_type
-        
-        return QuestionType.GENERAL
+        return self.question_classifier.classify(question)
+    
+    def warm_question_types(self, questions: Iterable[str]) -> int:
+        """Pre-classify a bank of known questions so they are looked up instead of matched"""
+        return self.question_classifier.warm(questions)
     
-    def _calculate_relevance_score(self, question: str, answer: str, question_type: QuestionType) -> float:
+    def _calculate_relevance_score(self, question: str, answer: str, question_type: QuestionType,
+                                   matches: Optional[Set[Tuple[str, str]]] = None) -> float:
         """Calculate relevance score based on keyword matching"""
         if not answer or not answer.strip():
             return 0.0
         
-        question_lower = question.lower()
-        answer_lower = answer.lower()
+        if matches is None:
+            matches = self._match_answer(answer)
         
         # Get expected keywords for this question type
         if question_type in self.question_patterns:
             expected_keywords = self.question_patterns[question_type]["expected"]
         else:
-            expected_keywords = ["work", "experience", "skills"]
+            expected_keywords = DEFAULT_EXPECTED_KEYWORDS
         
-        # Count keyword matches with more generous matching
-        matches = 0
-        matched_keywords = []
-        
-        # Count keyword matches with more generous matching
-        matches = 0
-        matched_keywords = []
-        
-        # Expanded synonym dictionary for better matching
-        synonyms = {
-            "skills": ["skill", "ability", "abilities", "capable", "capabilities", "talents", "expertise", "competencies", "strengths", "good at", "excel", "proficient", "analytical", "thinking"],
-            "experience": ["experienced", "background", "work", "history", "tenure", "years", "time", "decade", "developer", "engineer", "professional", "career", "worked"],
-            "value": ["bring", "contribute", "offer", "provide", "add", "help", "assist", "drive", "forward", "addition", "asset", "benefit", "valuable"],
-            "achieve": ["deliver", "accomplish", "complete", "quality", "success", "results", "outcome", "finish", "successful", "completed", "delivered", "accomplished", "met"],
-            "situation": ["scenario", "circumstance", "case", "instance", "problem", "issue", "challenge", "encountered"],
-            "action": ["steps", "took", "did", "implemented", "approached", "handled", "managed", "initiative", "stepped", "reorganized"],
-            "challenge": ["challenging", "difficult", "tough", "complex", "demanding", "hard", "problem"],
-            "team": ["teamwork", "collaboration", "group", "colleagues", "together", "cooperative"],
-            "leadership": ["lead", "leading", "manage", "managing", "guide", "direct", "supervise", "leader"],
-            "learning": ["learn", "grow", "development", "improve", "adapt", "education", "training"],
-            "goal": ["goals", "vision", "future", "aspire", "aim", "objective", "plan", "direction"],
-            "background": ["history", "past", "previous", "former", "education", "training"]
-        }
-        
-        for keyword in expected_keywords:
-            found_match = False
-            
-            # Check for exact match
-            if keyword in answer_lower:
-                matches += 1
-                matched_keywords.append(keyword)
-                found_match = True
-            else:
-                # Check for synonym matches
-                if keyword in synonyms:
-                    for synonym in synonyms[keyword]:
-                        if synonym in answer_lower:
-                            matches += 1
-                            matched_keywords.append(keyword)
-                            found_match = True
-                            break
-                
-                # Additional specific checks for common variations
-                if not found_match:
-                    if keyword == "skills" and any(term in answer_lower for term in ["good at", "excel at", "talented", "proficient"]):
-                        matches += 1
-                        matched_keywords.append("skills")
-                    elif keyword == "experience" and any(term in answer_lower for term in ["worked", "career", "professional", "developer", "engineer"]):
-                        matches += 1
-                        matched_keywords.append("experience")
-                    elif keyword == "value" and any(term in answer_lower for term in ["benefit", "asset", "addition", "valuable"]):
-                        matches += 1
-                        matched_keywords.append("value")
-                    elif keyword == "achieve" and any(term in answer_lower for term in ["successful", "completed", "delivered", "accomplished"]):
-                        matches += 1
-                        matched_keywords.append("achievements")
+        # A keyword counts if it, one of its synonyms or a known variation appeared
+        matches_count = sum(1 for keyword in expected_keywords if (EXPECTED, keyword) in matches)
         
         # Calculate base score from keyword matches
-        keyword_score = (matches / len(expected_keywords)) * 60  # Max 60 points from keywords
+        keyword_score = (matches_count / len(expected_keywords)) * 60  # Max 60 points from keywords
         
         # Add bonus points for comprehensive answers
         word_count = len(answer.split())
@@ -218,20 +284,18 @@ class QuestionRelevanceAnalyzer:
         question_bonus = 0
         if question_type == QuestionType.VALUE_PROPOSITION:
             # Look for value proposition indicators
-            value_indicators = ["hire", "because", "bring", "contribute", "deliver", "quality", "dedication", "responsibility", "enthusiasm"]
-            value_matches = sum(1 for indicator in value_indicators if indicator in answer_lower)
+            value_matches = len(matches & self._value_indicator_tags)
             question_bonus = min(15, value_matches * 3)  # Up to 15 bonus points
         
         # Check for off-topic content (penalty)
-        off_topic_words = ["pizza", "weather", "color", "movie", "dog", "cat", "food", "music", "sports", "hobby"]
-        off_topic_count = sum(1 for word in off_topic_words if word in answer_lower)
+        off_topic_count = len(matches & self._off_topic_tags)
         off_topic_penalty = off_topic_count * 20  # 20 point penalty per off-topic word
         
         # Calculate final score
         relevance_score = keyword_score + length_bonus + question_bonus - off_topic_penalty
         
         # Ensure minimum score for reasonable answers
-        if matches > 0 and word_count >= 10 and off_topic_count == 0:
+        if matches_count > 0 and word_count >= 10 and off_topic_count == 0:
             relevance_score = max(relevance_score, 50)  # Minimum 50% for decent relevant answers
         
         # Cap at 100%
@@ -253,9 +317,13 @@ class QuestionRelevanceAnalyzer:
             return RelevanceClassification.OFF_TOPIC
     
     def _generate_feedback(self, question: str, answer: str, question_type: QuestionType,
-                          relevance_score: float, classification: RelevanceClassification) -> RelevanceFeedback:
+                          relevance_score: float, classification: RelevanceClassification,
+                          matches: Optional[Set[Tuple[str, str]]] = None) -> RelevanceFeedback:
         """Generate comprehensive feedback"""
         
+        if matches is None:
+            matches = self._match_answer(answer)
+        
         # Determine priority
         if relevance_score >= 80:
             priority = FeedbackPriority.LOW
@@ -282,23 +350,17 @@ class QuestionRelevanceAnalyzer:
         suggestions = []
         examples = []
         
-        answer_lower = answer.lower()
-        
         # Check for relevant content
         if question_type in self.question_patterns:
             expected = self.question_patterns[question_type]["expected"]
             found_keywords = []
             
             for kw in expected:
-                if kw in answer_lower:
+                if (FEEDBACK, kw) in matches:
                     found_keywords.append(kw)
                 # Check for related terms
-                elif kw == "skills" and any(term in answer_lower for term in ["skill", "ability", "abilities"]):
-                    found_keywords.append("skills")
-                elif kw == "value" and any(term in answer_lower for term in ["bring", "contribute", "offer"]):
-                    found_keywords.append("value")
-                elif kw == "achieve" and any(term in answer_lower for term in ["deliver", "quality", "dedication"]):
-                    found_keywords.append("achievements")
+                elif (FEEDBACK_VARIATION, kw) in matches:
+                    found_keywords.append(FEEDBACK_LABELS.get(kw, kw))
             
             if found_keywords:
                 strengths.append(f"You covered relevant topics: {', '.join(found_keywords[:3])}")
@@ -315,8 +377,7 @@ class QuestionRelevanceAnalyzer:
             improvements.append("Focus more directly on answering the specific question asked")
         
         # Check for off-topic content
-        off_topic_words = ["pizza", "weather", "color", "movie", "dog", "cat"]
-        if any(word in answer_lower for word in off_topic_words):
+        if not matches.isdisjoint(self._feedback_off_topic_tags):
             improvements.append("Avoid discussing unrelated topics")
         
         # Generate question-specific suggestions
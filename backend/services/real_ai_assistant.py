@@ -7,27 +7,16 @@ import os
 import json
 import logging
 from typing import Dict, List, Optional
-import torch
-from transformers import (
-    AutoTokenizer, 
-    AutoModelForCausalLM, 
-    pipeline,
-    GPT2LMHeadModel,
-    GPT2Tokenizer
-)
 import warnings
+from .conversation_store import ConversationStore, DEFAULT_CONVERSATION_KEY
+from .local_generation import local_generator
 warnings.filterwarnings("ignore")
 
 class RealAIInterviewAssistant:
     def __init__(self):
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.model = None
-        self.tokenizer = None
-        self.generator = None
-        self.conversation_history = []
-        
-        # Initialize the AI model
-        self._initialize_model()
+        # Shared local model, loaded on the first AI response
+        self.generator = local_generator
+        self.conversations = ConversationStore('real_ai')
         
         # Interview context and prompts
         self.system_prompt = """You are an experienced professional being interviewed for a job. You should:
@@ -40,92 +29,27 @@ class RealAIInterviewAssistant:
 
 Background: You are a software developer with 5+ years experience in web development, team leadership, and problem-solving."""
 
-    def _initialize_model(self):
-        """Initialize the AI model for text generation"""
-        try:
-            print("🤖 Initializing Real AI Model...")
-            
-            # Try to use a lightweight but capable model
-            model_name = "microsoft/DialoGPT-medium"
-            
-            # Alternative models to try if the first fails
-            fallback_models = [
-                "gpt2",
-                "distilgpt2",
-                "microsoft/DialoGPT-small"
-            ]
-            
-            models_to_try = [model_name] + fallback_models
-            
-            for model_name in models_to_try:
-                try:
-                    print(f"Trying to load model: {model_name}")
-                    
-                    # Load tokenizer and model
-                    self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-                    self.model = AutoModelForCausalLM.from_pretrained(
-                        model_name,
-                        torch_dtype=torch.float16 if self.device == "cuda" else torch.float32,
-                        device_map="auto" if self.device == "cuda" else None
-                    )
-                    
-                    # Add padding token if it doesn't exist
-                    if self.tokenizer.pad_token is None:
-                        self.tokenizer.pad_token = self.tokenizer.eos_token
-                    
-                    # Create text generation pipeline
-                    self.generator = pipeline(
-                        "text-generation",
-                        model=self.model,
-                        tokenizer=self.tokenizer,
-                        device=0 if self.device == "cuda" else -1,
-                        torch_dtype=torch.float16 if self.device == "cuda" else torch.float32
-                    )
-                    
-                    print(f"✅ Successfully loaded model: {model_name}")
-                    print(f"Device: {self.device}")
-                    break
-                    
-                except Exception as e:
-                    print(f"❌ Failed to load {model_name}: {e}")
-                    continue
-            
-            if self.model is None:
-                raise Exception("Failed to load any AI model")
-                
-        except Exception as e:
-            print(f"❌ Error initializing AI model: {e}")
-            print("Falling back to rule-based responses...")
-            self.model = None
-            self.tokenizer = None
-            self.generator = None
-
     def generate_ai_response(self, question: str, context: Dict = None) -> str:
         """Generate AI response using the language model"""
         
-        if self.generator is None:
+        if not self.generator.ensure_loaded():
             return self._get_fallback_response(question)
         
         try:
             # Prepare the prompt
             prompt = self._build_prompt(question, context)
             
-            # Generate response
-            response = self.generator(
+            # Generate response (batched with other concurrent prompts)
+            generated_text = self.generator.generate(
                 prompt,
-                max_length=len(prompt.split()) + 100,  # Limit response length
-                min_length=len(prompt.split()) + 20,   # Ensure minimum response
-                num_return_sequences=1,
+                max_new_tokens=100,  # Limit response length
+                min_new_tokens=20,   # Ensure minimum response
                 temperature=0.7,
                 do_sample=True,
-                pad_token_id=self.tokenizer.eos_token_id,
                 repetition_penalty=1.2,
                 no_repeat_ngram_size=3
             )
             
-            # Extract the generated text
-            generated_text = response[0]['generated_text']
-            
             # Clean up the response
             answer = self._clean_response(generated_text, prompt)
             
@@ -231,24 +155,23 @@ Candidate:"""
         else:
             return "I believe my combination of technical expertise, problem-solving skills, and collaborative approach makes me well-suited for this role. I'm committed to delivering high-quality work while contributing positively to team goals and company success."
 
-    def get_response(self, question: str, context: Dict = None) -> str:
+    @property
+    def conversation_history(self) -> List[Dict]:
+        """History of the default conversation"""
+        return self.conversations.history(DEFAULT_CONVERSATION_KEY)
+
+    def get_response(self, question: str, context: Dict = None,
+                     conversation_key: str = DEFAULT_CONVERSATION_KEY) -> str:
         """Main method to get AI response"""
         
-        # Add to conversation history
-        self.conversation_history.append({
-            'question': question,
-            'context': context,
-            'timestamp': 'now'
-        })
+        # Add to this user's conversation history
+        self.conversations.append(conversation_key, 'user', question, context=context)
         
         # Generate AI response
         response = self.generate_ai_response(question, context)
         
         # Add response to history
-        self.conversation_history.append({
-            'response': response,
-            'timestamp': 'now'
-        })
+        self.conversations.append(conversation_key, 'assistant', response)
         
         return response
 
@@ -266,20 +189,23 @@ Candidate:"""
     def get_model_info(self) -> Dict:
         """Get information about the loaded model"""
         
-        if self.model is None:
+        model = self.generator.model
+        if model is None:
             return {
                 'model_loaded': False,
                 'model_name': 'None (using fallback)',
                 'device': 'CPU',
-                'ai_powered': False
+                'ai_powered': False,
+                'generation': self.generator.get_stats()
             }
         
         return {
             'model_loaded': True,
-            'model_name': self.model.config.name_or_path if hasattr(self.model.config, 'name_or_path') else 'Unknown',
-            'device': self.device,
+            'model_name': self.generator.model_name,
+            'device': self.generator.device,
             'ai_powered': True,
-            'parameters': self.model.num_parameters() if hasattr(self.model, 'num_parameters') else 'Unknown'
+            'parameters': model.num_parameters() if hasattr(model, 'num_parameters') else 'Unknown',
+            'generation': self.generator.get_stats()
         }
 
 # Global instance
@@ -0,0 +1,266 @@
+"""
+Adaptive Two-Tier Relevance Cascade
+
+Runs the cheap keyword analyzer on every answer and escalates to the
+semantic (sentence transformer) analyzer only when the keyword score is
+ambiguous or the answer is long. Each result records which tier decided it.
+
+A small fraction of keyword-decided answers is also scored by the semantic
+tier in the background ("shadow" runs) so the report can show how much
+accuracy the cascade keeps while skipping the expensive tier.
+"""
+
+import time
+import random
+import threading
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, List, Optional
+
+from .question_relevance_simple import (
+    QuestionRelevanceAnalyzer as KeywordRelevanceAnalyzer,
+    RelevanceResult, RelevanceFeedback, RelevanceClassification,
+    QuestionType, FeedbackPriority
+)
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_TIER = "keyword"
+SEMANTIC_TIER = "semantic"
+
+
+@dataclass
+class CascadeConfig:
+    """Thresholds controlling when the cascade escalates"""
+    ambiguous_low: float = 25.0        # Keyword scores inside [low, high) are ambiguous
+    ambiguous_high: float = 55.0
+    long_answer_words: int = 150       # Answers at least this long always escalate
+    max_escalation_rate: float = 0.3   # Cap on the share of recent requests that escalate
+    escalation_window: int = 200       # Number of recent requests the cap is measured over
+    shadow_rate: float = 0.05          # Share of keyword-decided answers re-scored in the background
+    semantic_enabled: bool = True
+
+
+class RelevanceCascade:
+    """
+    Keyword-first relevance analysis with selective semantic escalation
+    """
+
+    def __init__(self, config: Optional[CascadeConfig] = None):
+        """Initialize the cascade; the semantic analyzer is loaded on first escalation"""
+        self.config = config or CascadeConfig()
+        self.keyword_analyzer = KeywordRelevanceAnalyzer()
+        self._semantic_analyzer = None
+        self._semantic_failed = False
+        self._known_questions: List[str] = []
+        self._semantic_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._recent_escalations = deque(maxlen=self.config.escalation_window)
+        self._tier_counts = {KEYWORD_TIER: 0, SEMANTIC_TIER: 0}
+        self._tier_latency = {KEYWORD_TIER: 0.0, SEMANTIC_TIER: 0.0}
+        self._semantic_runs = 0
+        self._semantic_latency = 0.0
+        self._escalation_reasons: Dict[str, int] = {}
+        self._shadow_samples = 0
+        self._shadow_agreements = 0
+        self._shadow_score_diff = 0.0
+        self._shadow_executor = None
+
+    def analyze_relevance(self, question: str, answer: str) -> RelevanceResult:
+        """
+        Analyze relevance, escalating to the semantic tier when needed.
+
+        Args:
+            question: The interview question
+            answer: The user's answer
+
+        Returns:
+            RelevanceResult with decided_by set to the tier that produced it
+        """
+        start_time = time.time()
+        keyword_result = self.keyword_analyzer.analyze_relevance(question, answer)
+        keyword_time = time.time() - start_time
+
+        reason = self._escalation_reason(keyword_result, answer)
+        result = None
+        semantic_time = 0.0
+
+        if reason:
+            semantic_start = time.time()
+            result = self._run_semantic(question, answer)
+            semantic_time = time.time() - semantic_start
+
+        if result is not None:
+            result = replace(result, decided_by=SEMANTIC_TIER, escalation_reason=reason,
+                             processing_time=time.time() - start_time)
+        else:
+            result = replace(keyword_result, decided_by=KEYWORD_TIER, escalation_reason=None)
+            if not reason:
+                self._maybe_shadow(question, answer, keyword_result)
+
+        self._record(result.decided_by, reason if result.decided_by == SEMANTIC_TIER else None,
+                     keyword_time, semantic_time)
+        return result
+
+    def warm_question_types(self, questions: Iterable[str]):
+        """
+        Pre-classify a bank of known questions in both tiers.
+
+        The semantic tier is warmed when it is first loaded.
+        """
+        self._known_questions = list(questions)
+        self.keyword_analyzer.warm_question_types(self._known_questions)
+        if self._semantic_analyzer is not None:
+            self._semantic_analyzer.pattern_matcher.warm(self._known_questions)
+
+    def _escalation_reason(self, keyword_result: RelevanceResult, answer: str) -> Optional[str]:
+        """Decide whether the keyword result needs a second opinion"""
+        config = self.config
+        if not config.semantic_enabled or self._semantic_failed:
+            return None
+
+        if len(answer.split()) >= config.long_answer_words:
+            reason = "long_answer"
+        elif config.ambiguous_low <= keyword_result.relevance_score < config.ambiguous_high:
+            reason = "ambiguous_score"
+        else:
+            return None
+
+        with self._stats_lock:
+            window = self._recent_escalations
+            if window and sum(window) / len(window) >= config.max_escalation_rate:
+                self._escalation_reasons["budget_exhausted"] = \
+                    self._escalation_reasons.get("budget_exhausted", 0) + 1
+                return None
+        return reason
+
+    def _get_semantic_analyzer(self):
+        """Load the semantic analyzer once; disable escalation if it cannot load"""
+        if self._semantic_analyzer is not None or self._semantic_failed:
+            return self._semantic_analyzer
+
+        with self._semantic_lock:
+            if self._semantic_analyzer is None and not self._semantic_failed:
+                try:
+                    from .question_relevance import QuestionRelevanceAnalyzer as SemanticRelevanceAnalyzer
+                    analyzer = SemanticRelevanceAnalyzer()
+                    analyzer.pattern_matcher.warm(self._known_questions)
+                    self._semantic_analyzer = analyzer
+                except Exception as e:
+                    logger.error(f"Semantic relevance tier unavailable, using keyword tier only: {e}")
+                    self._semantic_failed = True
+        return self._semantic_analyzer
+
+    def _run_semantic(self, question: str, answer: str) -> Optional[RelevanceResult]:
+        """Run the semantic tier and convert its result to the keyword result shape"""
+        analyzer = self._get_semantic_analyzer()
+        if analyzer is None:
+            return None
+
+        semantic_start = time.time()
+        semantic_result = analyzer.analyze_relevance(question, answer)
+        with self._stats_lock:
+            self._semantic_runs += 1
+            self._semantic_latency += time.time() - semantic_start
+
+        # The semantic analyzer reports internal failures as a zero-score fallback
+        if semantic_result.feedback.summary.startswith("Analysis failed"):
+            return None
+        return _convert_semantic_result(semantic_result)
+
+    def _maybe_shadow(self, question: str, answer: str, keyword_result: RelevanceResult):
+        """Re-score a sample of keyword-decided answers off the request path"""
+        if not self.config.semantic_enabled or self._semantic_failed:
+            return
+        if random.random() >= self.config.shadow_rate:
+            return
+
+        if self._shadow_executor is None:
+            with self._semantic_lock:
+                if self._shadow_executor is None:
+                    self._shadow_executor = ThreadPoolExecutor(max_workers=1)
+        self._shadow_executor.submit(self._shadow_compare, question, answer, keyword_result)
+
+    def _shadow_compare(self, question: str, answer: str, keyword_result: RelevanceResult):
+        try:
+            semantic_result = self._run_semantic(question, answer)
+            if semantic_result is None:
+                return
+            with self._stats_lock:
+                self._shadow_samples += 1
+                if semantic_result.classification == keyword_result.classification:
+                    self._shadow_agreements += 1
+                self._shadow_score_diff += abs(semantic_result.relevance_score - keyword_result.relevance_score)
+        except Exception as e:
+            logger.error(f"Shadow relevance comparison failed: {e}")
+
+    def _record(self, tier: str, reason: Optional[str], keyword_time: float, semantic_time: float):
+        with self._stats_lock:
+            self._tier_counts[tier] += 1
+            self._tier_latency[tier] += keyword_time + semantic_time
+            self._recent_escalations.append(1 if tier == SEMANTIC_TIER else 0)
+            if reason:
+                self._escalation_reasons[reason] = self._escalation_reasons.get(reason, 0) + 1
+
+    def get_report(self) -> Dict:
+        """
+        Summarize the tier mix, latency saved and accuracy kept.
+
+        Latency saved is estimated as the number of keyword-decided requests
+        times the measured mean semantic latency. Accuracy kept is the
+        classification agreement between tiers on shadow samples.
+        """
+        with self._stats_lock:
+            total = sum(self._tier_counts.values())
+            keyword_count = self._tier_counts[KEYWORD_TIER]
+            semantic_count = self._tier_counts[SEMANTIC_TIER]
+            mean_semantic_ms = (self._semantic_latency / self._semantic_runs * 1000) if self._semantic_runs else None
+
+            return {
+                'requests': total,
+                'tier_counts': dict(self._tier_counts),
+                'escalation_rate': round(semantic_count / total, 3) if total else 0.0,
+                'escalation_reasons': dict(self._escalation_reasons),
+                'mean_latency_ms': {
+                    tier: round(self._tier_latency[tier] / count * 1000, 2) if count else None
+                    for tier, count in self._tier_counts.items()
+                },
+                'mean_semantic_tier_ms': round(mean_semantic_ms, 2) if mean_semantic_ms is not None else None,
+                'estimated_latency_saved_ms': round(keyword_count * mean_semantic_ms, 1) if mean_semantic_ms is not None else None,
+                'accuracy_kept': {
+                    'shadow_samples': self._shadow_samples,
+                    'classification_agreement': round(self._shadow_agreements / self._shadow_samples, 3) if self._shadow_samples else None,
+                    'mean_score_difference': round(self._shadow_score_diff / self._shadow_samples, 1) if self._shadow_samples else None
+                },
+                'config': {
+                    'ambiguous_band': [self.config.ambiguous_low, self.config.ambiguous_high],
+                    'long_answer_words': self.config.long_answer_words,
+                    'max_escalation_rate': self.config.max_escalation_rate,
+                    'shadow_rate': self.config.shadow_rate,
+                    'semantic_enabled': self.config.semantic_enabled and not self._semantic_failed
+                }
+            }
+
+
+def _convert_semantic_result(result) -> RelevanceResult:
+    """Map a semantic analyzer result onto the keyword analyzer's result type"""
+    feedback = result.feedback
+    return RelevanceResult(
+        relevance_score=result.relevance_score,
+        classification=RelevanceClassification(result.classification.value),
+        question_type=QuestionType(result.question_type.value),
+        semantic_similarity=result.semantic_similarity,
+        topic_overlap_percentage=result.topic_overlap.overlap_percentage,
+        feedback=RelevanceFeedback(
+            summary=feedback.summary,
+            strengths=feedback.strengths,
+            improvements=feedback.improvements,
+            specific_suggestions=feedback.specific_suggestions,
+            example_elements=feedback.example_elements,
+            priority_level=FeedbackPriority(feedback.priority_level.value)
+        ),
+        processing_time=result.processing_time
+    )
@@ -0,0 +1,289 @@
+"""
+Response Cache for Chatbot Replies
+
+Caches generated chatbot replies so repeated practice questions and stage
+prompts do not each cost a full OpenAI round trip. Entries are keyed by a
+hash of the normalized message, the context fields that shape the reply
+and the model parameters, expire after a TTL and are evicted least
+recently used once the cache is full.
+
+Two backends are available: an in-process LRU (default) and a local
+SQLite file that survives restarts and is shared between worker
+processes. Configure with RESPONSE_CACHE_BACKEND (memory, sqlite or none),
+RESPONSE_CACHE_PATH, RESPONSE_CACHE_TTL and RESPONSE_CACHE_MAX_ENTRIES.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'memory').lower()
+CACHE_PATH = os.getenv(
+    'RESPONSE_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'response_cache.db')
+)
+CACHE_TTL_SECONDS = float(os.getenv('RESPONSE_CACHE_TTL', '86400'))
+CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '2000'))
+
+# Width of the relevance score buckets used for stage response keys
+SCORE_BUCKET_WIDTH = 20
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase and collapse whitespace so trivially different messages share a key"""
+    return ' '.join((message or '').lower().split())
+
+
+def score_bucket(score, width: int = SCORE_BUCKET_WIDTH) -> int:
+    """Map a 0-100 score to the lower bound of its bucket (e.g. 73 -> 60)"""
+    try:
+        score = float(score)
+    except (TypeError, ValueError):
+        score = 0.0
+    score = max(0.0, min(100.0, score))
+    return min(int(score // width) * width, 100 - width)
+
+
+class MemoryCacheBackend:
+    """In-process LRU store of (expires_at, value) entries"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """Local SQLite store; survives restarts and is shared across processes"""
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS response_cache ('
+            ' key TEXT PRIMARY KEY, value TEXT NOT NULL,'
+            ' expires_at REAL NOT NULL, last_access REAL NOT NULL)'
+        )
+        self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS ix_response_cache_last_access ON response_cache (last_access)'
+        )
+        self._connection.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT value, expires_at FROM response_cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._connection.execute('DELETE FROM response_cache WHERE key = ?', (key,))
+                self._connection.commit()
+                return None
+            self._connection.execute('UPDATE response_cache SET last_access = ? WHERE key = ?', (now, key))
+            self._connection.commit()
+            return row[0]
+
+    def set(self, key: str, value: str, ttl: float):
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO response_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)',
+                (key, value, now + ttl, now)
+            )
+            # Drop expired rows, then the least recently used ones beyond the cap
+            self._connection.execute('DELETE FROM response_cache WHERE expires_at <= ?', (now,))
+            self._connection.execute(
+                'DELETE FROM response_cache WHERE key IN ('
+                ' SELECT key FROM response_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+            self._connection.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._connection.execute('DELETE FROM response_cache WHERE key = ?', (key,))
+            self._connection.commit()
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute('DELETE FROM response_cache')
+            self._connection.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM response_cache').fetchone()[0]
+
+
+class ResponseCache:
+    """
+    TTL cache for generated responses with hit/miss accounting
+    """
+
+    def __init__(self, backend=None, ttl_seconds: float = CACHE_TTL_SECONDS, enabled: bool = True):
+        """
+        Initialize the cache.
+
+        Args:
+            backend: MemoryCacheBackend or SQLiteCacheBackend (in-process LRU by default)
+            ttl_seconds: Lifetime of an entry
+            enabled: When False every lookup misses and nothing is stored
+        """
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    @staticmethod
+    def make_key(namespace: str, message: str = '', context: Optional[Dict] = None,
+                 params: Optional[Dict] = None) -> str:
+        """
+        Build a cache key.
+
+        Args:
+            namespace: Kind of response (e.g. "chat" or "stage")
+            message: User message; normalized before hashing
+            context: Context fields that change the response
+            params: Model parameters that change the response
+        """
+        payload = json.dumps(
+            [namespace, normalize_message(message), context or {}, params or {}],
+            sort_keys=True, default=str
+        )
+        return f"{namespace}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    def stage_key(self, stage: str, category: Optional[str] = None, relevance_score=None,
+                  params: Optional[Dict] = None) -> str:
+        """Cache key for an interview stage response: (stage, category, score bucket)"""
+        bucket = score_bucket(relevance_score) if relevance_score is not None else None
+        return self.make_key('stage', stage, {'category': category, 'score_bucket': bucket}, params)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached response, or None"""
+        if not self.enabled:
+            return None
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.error(f"Response cache read failed: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        """Store a response"""
+        if not self.enabled or not value:
+            return
+        try:
+            self.backend.set(key, value, ttl if ttl is not None else self.ttl_seconds)
+        except Exception as e:
+            logger.error(f"Response cache write failed: {e}")
+
+    def lookup(self, key: str, use_cache: bool = True) -> Optional[str]:
+        """Like get(), but counts a bypass instead of a lookup when use_cache is False"""
+        if not use_cache:
+            self.bypassed += 1
+            return None
+        return self.get(key)
+
+    def get_or_compute(self, key: str, compute: Callable[[], str], use_cache: bool = True) -> Tuple[str, bool]:
+        """
+        Return the cached response or compute and store a fresh one.
+
+        Args:
+            key: Cache key from make_key()
+            compute: Produces the response on a miss
+            use_cache: False bypasses the lookup (the fresh response is still stored)
+
+        Returns:
+            (response, served_from_cache)
+        """
+        cached = self.lookup(key, use_cache)
+        if cached is not None:
+            return cached, True
+
+        response = compute()
+        self.set(key, response)
+        return response, False
+
+    def clear(self):
+        self.backend.clear()
+
+    def get_stats(self) -> Dict:
+        """Hit rate and size"""
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'backend': type(self.backend).__name__,
+            'entries': len(self.backend),
+            'hits': self.hits,
+            'misses': self.misses,
+            'bypassed': self.bypassed,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None
+        }
+
+
+def create_response_cache() -> ResponseCache:
+    """Create the cache configured by the RESPONSE_CACHE_* environment variables"""
+    if CACHE_BACKEND == 'none':
+        return ResponseCache(enabled=False)
+    if CACHE_BACKEND == 'sqlite':
+        try:
+            return ResponseCache(SQLiteCacheBackend(CACHE_PATH, CACHE_MAX_ENTRIES), CACHE_TTL_SECONDS)
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Could not open SQLite response cache at {CACHE_PATH}, using memory: {e}")
+    return ResponseCache(MemoryCacheBackend(CACHE_MAX_ENTRIES), CACHE_TTL_SECONDS)
+
+
+# Global response cache shared by the chatbots
+response_cache = create_response_cache()
@@ -6,12 +6,13 @@ using sentence transformers and cosine similarity.
 """
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 from typing import List, Dict, Tuple, Optional
 import logging
 from dataclasses import dataclass
 
+from .embeddings import get_sentence_model, DEFAULT_MODEL_NAME
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,7 +31,7 @@ class SemanticSimilarityEngine:
     sentence transformers and cosine similarity.
     """
     
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME):
         """
         Initialize the semantic similarity engine.
         
@@ -44,9 +45,8 @@ class SemanticSimilarityEngine:
     def _initialize_model(self):
         """Initialize the sentence transformer model"""
         try:
-            logger.info(f"Loading sentence transformer model: {self.model_name}")
-            self._model = SentenceTransformer(self.model_name)
-            logger.info("Sentence transformer model loaded successfully")
+            # Shared with other embedding consumers so the weights load once
+            self._model = get_sentence_model(self.model_name)
         except Exception as e:
             logger.error(f"Failed to load sentence transformer model: {e}")
             raise
@@ -79,6 +79,33 @@ class SemanticSimilarityEngine:
             # Return zero vector as fallback
             return np.zeros(self._model.get_sentence_embedding_dimension())
     
+    def get_sentence_embeddings_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate sentence embeddings for several texts in one model call.
+        
+        Args:
+            texts: Input texts
+            
+        Returns:
+            numpy array with one embedding row per text (zero rows for empty texts)
+        """
+        if not self._model:
+            raise RuntimeError("Sentence transformer model not initialized")
+        
+        dimension = self._model.get_sentence_embedding_dimension()
+        embeddings = np.zeros((len(texts), dimension), dtype=np.float32)
+        cleaned = [self._clean_text(text) for text in texts]
+        rows = [i for i, text in enumerate(cleaned) if text.strip()]
+        if not rows:
+            return embeddings
+        
+        try:
+            encoded = self._model.encode([cleaned[i] for i in rows])
+            embeddings[rows] = encoded
+        except Exception as e:
+            logger.error(f"Failed to generate embeddings: {e}")
+        return embeddings
+    
     def calculate_similarity(self, text1: str, text2: str) -> float:
         """
         Calculate cosine similarity between two text strings.
@@ -95,7 +122,16 @@ class SemanticSimilarityEngine:
             embedding1 = self.get_sentence_embeddings(text1)
             embedding2 = self.get_sentence_embeddings(text2)
             
-            # Calculate cosine similarity
+            return self.similarity_from_embeddings(embedding1, embedding2)
+        except Exception as e:
+            logger.error(f"Failed to calculate similarity: {e}")
+            return 0.0
+    
+    def similarity_from_embeddings(self, embedding1: np.ndarray, embedding2: np.ndarray) -> float:
+        """
+        Cosine similarity between two precomputed embeddings, clamped to 0-1.
+        """
+        try:
             similarity = cosine_similarity([embedding1], [embedding2])[0][0]
             
             # Ensure similarity is between 0 and 1
@@ -106,7 +142,9 @@ class SemanticSimilarityEngine:
             logger.error(f"Failed to calculate similarity: {e}")
             return 0.0
     
-    def find_semantic_overlap(self, question: str, answer: str) -> SemanticOverlap:
+    def find_semantic_overlap(self, question: str, answer: str,
+                              question_topics: Optional[List[str]] = None,
+                              question_topic_embeddings: Optional[np.ndarray] = None) -> SemanticOverlap:
         """
         Find semantic overlap between question and answer by analyzing
         key topics and concepts.
@@ -114,26 +152,38 @@ class SemanticSimilarityEngine:
         Args:
             question: The interview question
             answer: The user's answer
+            question_topics: Precomputed topics of the question, if available
+            question_topic_embeddings: Precomputed embeddings of those topics
             
         Returns:
             SemanticOverlap object containing overlap analysis
         """
         try:
             # Extract key topics from both texts
-            question_topics = self._extract_key_topics(question)
+            if question_topics is None:
+                question_topics = self._extract_key_topics(question)
+                question_topic_embeddings = None
             answer_topics = self._extract_key_topics(answer)
             
+            # Embed every topic once and compare them all in one matrix product
+            if question_topic_embeddings is None:
+                question_topic_embeddings = self.get_sentence_embeddings_batch(question_topics)
+            answer_topic_embeddings = self.get_sentence_embeddings_batch(answer_topics)
+            similarities = np.clip(
+                cosine_similarity(question_topic_embeddings, answer_topic_embeddings), 0.0, 1.0
+            ) if question_topics and answer_topics else None
+            
             # Find overlapping topics using semantic similarity
             shared_topics = []
             question_only_topics = []
             answer_only_topics = list(answer_topics)
             
-            for q_topic in question_topics:
+            for q_index, q_topic in enumerate(question_topics):
                 best_match = None
                 best_similarity = 0.0
                 
-                for a_topic in answer_topics:
-                    similarity = self.calculate_similarity(q_topic, a_topic)
+                for a_index, a_topic in enumerate(answer_topics):
+                    similarity = float(similarities[q_index, a_index])
                     if similarity > best_similarity:
                         best_similarity = similarity
                         best_match = a_topic
@@ -8,64 +8,23 @@ import json
 import logging
 from typing import Dict, List, Optional
 import warnings
+from .conversation_store import ConversationStore, DEFAULT_CONVERSATION_KEY
+from .local_generation import local_generator
 warnings.filterwarnings("ignore")
 
 class SmartAIInterviewAssistant:
     def __init__(self):
-        self.ai_available = False
-        self.model = None
-        self.tokenizer = None
-        self.generator = None
-        self.conversation_history = []
-        
-        # Try to initialize AI model
-        self._try_initialize_ai()
+        # Shared local model, loaded on the first AI response
+        self.generator = local_generator
+        self.conversations = ConversationStore('smart_ai')
         
         # Enhanced fallback responses
         self._initialize_fallback_responses()
 
-    def _try_initialize_ai(self):
-        """Try to initialize AI model, fall back gracefully if not available"""
-        try:
-            print("🤖 Attempting to load Real AI model...")
-            
-            # Try importing AI libraries
-            import torch
-            from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
-            
-            print("✅ AI libraries available")
-            
-            # Try loading a lightweight model
-            model_name = "distilgpt2"  # Smaller, more compatible model
-            
-            print(f"Loading {model_name}...")
-            
-            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-            self.model = AutoModelForCausalLM.from_pretrained(model_name)
-            
-            # Add padding token if needed
-            if self.tokenizer.pad_token is None:
-                self.tokenizer.pad_token = self.tokenizer.eos_token
-            
-            # Create pipeline
-            self.generator = pipeline(
-                "text-generation",
-                model=self.model,
-                tokenizer=self.tokenizer,
-                device=-1  # Force CPU to avoid CUDA issues
-            )
-            
-            self.ai_available = True
-            print("✅ Real AI model loaded successfully!")
-            
-        except ImportError as e:
-            print(f"ℹ️  AI libraries not available: {e}")
-            print("Using enhanced fallback responses")
-            self.ai_available = False
-        except Exception as e:
-            print(f"⚠️  AI model loading failed: {e}")
-            print("Using enhanced fallback responses")
-            self.ai_available = False
+    @property
+    def ai_available(self) -> bool:
+        """Whether the shared local model has been loaded"""
+        return self.generator.is_loaded
 
     def _initialize_fallback_responses(self):
         """Initialize enhanced fallback response system"""
@@ -103,17 +62,19 @@ class SmartAIInterviewAssistant:
             ]
         }
 
-    def get_response(self, question: str, context: Dict = None) -> str:
+    @property
+    def conversation_history(self) -> List[Dict]:
+        """History of the default conversation"""
+        return self.conversations.history(DEFAULT_CONVERSATION_KEY)
+
+    def get_response(self, question: str, context: Dict = None,
+                     conversation_key: str = DEFAULT_CONVERSATION_KEY) -> str:
         """Get AI response - real AI if available, enhanced fallback otherwise"""
         
-        # Add to conversation history
-        self.conversation_history.append({
-            'question': question,
-            'context': context,
-            'timestamp': 'now'
-        })
+        # Add to this user's conversation history
+        self.conversations.append(conversation_key, 'user', question, context=context)
         
-        if self.ai_available:
+        if self.generator.ensure_loaded():
             try:
                 return self._generate_ai_response(question, context)
             except Exception as e:
@@ -128,20 +89,17 @@ class SmartAIInterviewAssistant:
         # Build prompt
         prompt = self._build_ai_prompt(question, context)
         
-        # Generate response
-        response = self.generator(
+        # Generate response (batched with other concurrent prompts)
+        generated_text = self.generator.generate(
             prompt,
-            max_length=len(prompt.split()) + 80,
-            min_length=len(prompt.split()) + 20,
-            num_return_sequences=1,
+            max_new_tokens=80,
+            min_new_tokens=20,
             temperature=0.7,
             do_sample=True,
-            pad_token_id=self.tokenizer.eos_token_id,
             repetition_penalty=1.2
         )
         
         # Clean and return response
-        generated_text = response[0]['generated_text']
         answer = self._clean_ai_response(generated_text, prompt)
         
         return self._validate_response(answer, question)
@@ -290,10 +248,11 @@ Professional Answer:"""
         if self.ai_available:
             return {
                 'model_loaded': True,
-                'model_name': 'distilgpt2',
-                'device': 'cpu',
+                'model_name': self.generator.model_name,
+                'device': self.generator.device,
                 'ai_powered': True,
-                'parameters': '82M'
+                'parameters': self.generator.model.num_parameters() if self.generator.model is not None else 'Unknown',
+                'generation': self.generator.get_stats()
             }
         else:
             return {
@@ -301,7 +260,8 @@ Professional Answer:"""
                 'model_name': 'Enhanced Fallback System',
                 'device': 'cpu',
                 'ai_powered': False,
-                'parameters': 'Rule-based with smart selection'
+                'parameters': 'Rule-based with smart selection',
+                'generation': self.generator.get_stats()
             }
 
 # Global instance
@@ -0,0 +1,178 @@
+"""
+Streaming Helpers for Chatbot Responses
+
+Server-Sent Events formatting, paragraph chunking for the local fallback,
+per-request time-to-first-token / total latency metrics and an offline
+mock of the OpenAI streaming ChatCompletion API.
+"""
+
+import os
+import json
+import time
+import threading
+import logging
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Serve a canned token stream instead of calling OpenAI (offline development and tests)
+MOCK_OPENAI_STREAM = os.getenv('OPENAI_MOCK_STREAM', 'false').lower() == 'true'
+
+# Latency samples kept for the percentile report
+METRICS_WINDOW = 500
+
+
+def sse_event(data: Dict, event: Optional[str] = None) -> str:
+    """Format one Server-Sent Event with a JSON payload"""
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def paragraph_chunks(text: str) -> List[str]:
+    """Split a response into paragraphs, keeping the separators so chunks join back to the text"""
+    if not text:
+        return []
+    parts = text.split("\n\n")
+    return [part + "\n\n" for part in parts[:-1]] + ([parts[-1]] if parts[-1] else [])
+
+
+def chunk_delta(chunk) -> str:
+    """Text carried by one streamed ChatCompletion chunk (empty for role/finish chunks)"""
+    try:
+        return chunk['choices'][0]['delta'].get('content') or ''
+    except (KeyError, IndexError, TypeError):
+        return ''
+
+
+def chunk_finish_reason(chunk) -> Optional[str]:
+    """Why the stream ended ('stop', 'length', ...), carried by its last chunk"""
+    try:
+        return chunk['choices'][0].get('finish_reason')
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return None
+
+
+def mock_chat_completion_stream(text: str, words_per_chunk: int = 3, delay: float = 0.0) -> Iterator[Dict]:
+    """
+    Yield chunks shaped like openai.ChatCompletion.create(stream=True).
+
+    Args:
+        text: Full response to stream
+        words_per_chunk: Words carried by each content delta
+        delay: Seconds to sleep before each chunk, to simulate generation
+    """
+    yield {'choices': [{'index': 0, 'delta': {'role': 'assistant'}, 'finish_reason': None}]}
+    words = text.split(' ')
+    for start in range(0, len(words), words_per_chunk):
+        if delay:
+            time.sleep(delay)
+        piece = ' '.join(words[start:start + words_per_chunk])
+        if start + words_per_chunk < len(words):
+            piece += ' '
+        yield {'choices': [{'index': 0, 'delta': {'content': piece}, 'finish_reason': None}]}
+    yield {'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]}
+
+
+class StreamTimer:
+    """Measures one streamed response"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.started = time.perf_counter()
+        self.first_token: Optional[float] = None
+        self.finished: Optional[float] = None
+        # Set by the producer: the reply reached its end (not cut off by an
+        # error or the token limit), and its prompt carried earlier turns
+        self.completed = False
+        self.with_history = False
+
+    def mark_token(self):
+        if self.first_token is None:
+            self.first_token = time.perf_counter()
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    @property
+    def ttft_ms(self) -> Optional[float]:
+        return round((self.first_token - self.started) * 1000, 1) if self.first_token else None
+
+    @property
+    def total_ms(self) -> Optional[float]:
+        return round((self.finished - self.started) * 1000, 1) if self.finished else None
+
+
+class StreamMetrics:
+    """
+    Rolling window of time-to-first-token and total latency per response source
+    """
+
+    def __init__(self, window: int = METRICS_WINDOW):
+        self._samples: Dict[str, deque] = {}
+        self._window = window
+        self._lock = threading.Lock()
+
+    def record(self, timer: StreamTimer):
+        with self._lock:
+            samples = self._samples.setdefault(timer.source, deque(maxlen=self._window))
+            samples.append((timer.ttft_ms, timer.total_ms))
+        logger.info(f"Streamed {timer.source} response: ttft={timer.ttft_ms}ms total={timer.total_ms}ms")
+
+    def get_stats(self) -> Dict:
+        """p50/p95 of both latencies per source"""
+        with self._lock:
+            snapshot = {source: list(samples) for source, samples in self._samples.items()}
+        return {
+            source: {
+                'requests': len(samples),
+                'ttft_ms': _percentiles(s[0] for s in samples),
+                'total_ms': _percentiles(s[1] for s in samples)
+            }
+            for source, samples in snapshot.items()
+        }
+
+
+def sse_stream(pieces: Iterable[str], timer: StreamTimer, metrics: Optional[StreamMetrics] = None) -> Iterator[str]:
+    """
+    Turn a stream of response text into SSE events.
+
+    Emits a "token" event per piece, then a "done" event with the full
+    response and its latency, or an "error" event if generation fails.
+    """
+    metrics = metrics or stream_metrics
+    parts = []
+    try:
+        for piece in pieces:
+            timer.mark_token()
+            parts.append(piece)
+            yield sse_event({'text': piece}, event='token')
+    except Exception as e:
+        logger.error(f"Streaming response failed: {e}")
+        yield sse_event({'error': 'Response generation failed'}, event='error')
+    timer.finish()
+    metrics.record(timer)
+    yield sse_event({
+        'response': ''.join(parts).strip(),
+        'source': timer.source,
+        'ttft_ms': timer.ttft_ms,
+        'total_ms': timer.total_ms
+    }, event='done')
+
+
+def _percentiles(values: Iterable[Optional[float]]) -> Dict:
+    ordered = sorted(v for v in values if v is not None)
+    if not ordered:
+        return {'p50': None, 'p95': None}
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {'p50': pick(0.5), 'p95': pick(0.95)}
+
+
+# Global metrics shared by the streaming endpoints
+stream_metrics = StreamMetrics()
+
+# Response headers that keep proxies from buffering the event stream
+SSE_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
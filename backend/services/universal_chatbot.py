@@ -6,11 +6,21 @@ Provides intelligent responses to any type of question, not just interview-relat
 import os
 import json
 import re
+import hashlib
 import random
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 import openai
 from .interview_chatbot import interview_chatbot as fallback_chatbot
 from .comprehensive_knowledge_base import comprehensive_kb
+from .knowledge_retrieval import retrieve_answer
+from .response_cache import response_cache
+from .conversation_store import ConversationStore, DEFAULT_CONVERSATION_KEY
+from .llm_client import llm_client, REMOTE
+from .prompt_builder import PromptBuilder, SUMMARY_CONTEXT_KEY
+from .intent_router import intent_router
+from .streaming import (
+    StreamTimer, paragraph_chunks, chunk_delta, chunk_finish_reason, mock_chat_completion_stream, MOCK_OPENAI_STREAM
+)
 
 class UniversalChatbot:
     def __init__(self):
@@ -23,12 +33,38 @@ class UniversalChatbot:
             self.openai_available = False
             print("Warning: OPENAI_API_KEY not found. Using enhanced fallback chatbot.")
         
-        self.conversation_history = []
-        self.user_context = {
+        self.cache = response_cache
+        self.llm = llm_client
+        self.model_params = {
+            'model': "gpt-3.5-turbo",  # or "gpt-4" if available
+            'max_tokens': 800,  # Increased for more comprehensive responses
+            'temperature': 0.7,
+            'top_p': 1,
+            'frequency_penalty': 0.2,
+            'presence_penalty': 0.1
+        }
+        self.prompts = PromptBuilder(model=self.model_params['model'])
+        
+        # Bounded history and context per user conversation
+        self.conversations = ConversationStore('universal', default_context={
             'selected_category': None,
             'selected_question': None,
             'analysis_results': None,
             'session_stage': 'initial'
+        })
+        
+        # Handler for each intent of the general-question router
+        self._intent_handlers = {
+            'programming': self._get_programming_response,
+            'science': self._get_science_response,
+            'business': self._get_business_response,
+            'health': self._get_health_response,
+            'education': self._get_education_response,
+            'creative': self._get_creative_response,
+            'communication': self._get_communication_response,
+            'problem_solving': self._get_problem_solving_response,
+            'greeting': self._get_greeting_response,
+            'thanks': self._get_thanks_response
         }
         
         # Universal system prompt that can handle any question
@@ -54,75 +90,186 @@ You have expertise in many areas including:
 
 When someone asks about interviews specifically, provide detailed interview coaching. For other topics, provide helpful, accurate information. Always aim to be genuinely helpful and provide value in your responses."""
 
-    def update_context(self, **kwargs):
-        """Update the chatbot's context about the user's session"""
-        self.user_context.update(kwargs)
+    @property
+    def conversation_history(self) -> List[Dict]:
+        """History of the default conversation"""
+        return self.conversations.history(DEFAULT_CONVERSATION_KEY)
+
+    @property
+    def user_context(self) -> Dict:
+        """Context of the default conversation (a copy; use update_context to change it)"""
+        return self.conversations.get_context(DEFAULT_CONVERSATION_KEY)
+
+    def update_context(self, conversation_key: str = DEFAULT_CONVERSATION_KEY, **kwargs):
+        """Update the chatbot's context about one user's session"""
+        self.conversations.update_context(conversation_key, **kwargs)
 
-    def get_response(self, user_message: str) -> str:
+    def get_response(self, user_message: str, use_cache: bool = True,
+                     conversation_key: str = DEFAULT_CONVERSATION_KEY) -> str:
         """Generate an intelligent response using OpenAI or enhanced fallback"""
+        response, _ = self.respond(user_message, use_cache=use_cache, conversation_key=conversation_key)
+        return response
+
+    def respond(self, user_message: str, use_cache: bool = True,
+                conversation_key: str = DEFAULT_CONVERSATION_KEY,
+                timer: Optional[StreamTimer] = None) -> Tuple[str, str]:
+        """
+        Like get_response, but also reports where the reply came from.
+
+        Args:
+            timer: Optional StreamTimer; completed / with_history are reported
+                on it as by stream_response
+
+        Returns:
+            (response, source) with source 'cache', 'openai' or 'fallback'
+        """
+        timer = timer or StreamTimer('chat')
         
-        # Add to conversation history
-        self.conversation_history.append({
-            'role': 'user',
-            'content': user_message,
-            'timestamp': 'now'
-        })
+        # Add to this user's conversation history
+        self.conversations.append(conversation_key, 'user', user_message)
+        context = self.conversations.get_context(conversation_key)
         
         # Try OpenAI first, fallback to enhanced local chatbot if unavailable
         if self.openai_available:
-            try:
-                response = self._get_openai_response(user_message)
-                self.conversation_history.append({
-                    'role': 'assistant',
-                    'content': response,
-                    'timestamp': 'now'
-                })
-                return response
-            except Exception as e:
-                print(f"OpenAI API error: {e}")
-                # Fall back to enhanced local chatbot
-                return self._get_enhanced_fallback_response(user_message)
+            messages = self._build_openai_messages(user_message, conversation_key, context)
+            cache_key = self._cache_key(user_message, context, messages, conversation_key)
+            timer.with_history = bool(messages[1:-1])
+            timer.completed = True
+            cached = self.cache.lookup(cache_key, use_cache)
+            if cached is not None:
+                timer.source = 'cache'
+                self.conversations.append(conversation_key, 'assistant', cached)
+                return cached, 'cache'
+            
+            # The local answer is served if OpenAI fails, its breaker is open or it
+            # misses the latency budget; a late OpenAI answer is still cached
+            response, source = self.llm.hedged_chat(
+                messages,
+                fallback=lambda: self._get_enhanced_fallback_response(user_message, conversation_key),
+                on_late_result=lambda late: self.cache.set(cache_key, late),
+                **self.model_params
+            )
+            if source == REMOTE:
+                timer.source = 'openai'
+                self.cache.set(cache_key, response)
+                self.conversations.append(conversation_key, 'assistant', response)
+                return response, 'openai'
+            timer.source = 'fallback'
+            return response, 'fallback'
         else:
             # Use enhanced fallback chatbot
-            return self._get_enhanced_fallback_response(user_message)
+            timer.source = 'fallback'
+            timer.completed = True
+            return self._get_enhanced_fallback_response(user_message, conversation_key), 'fallback'
 
-    def _get_openai_response(self, user_message: str) -> str:
-        """Get response from OpenAI GPT model"""
-        
-        # Build context-aware prompt
-        context_info = self._build_context_prompt()
-        
-        # Prepare messages for OpenAI
-        messages = [
-            {"role": "system", "content": self.system_prompt + context_info}
-        ]
-        
-        # Add recent conversation history (last 8 messages to stay within token limits)
-        recent_history = self.conversation_history[-8:] if len(self.conversation_history) > 8 else self.conversation_history
-        for msg in recent_history:
-            if msg['role'] in ['user', 'assistant']:
-                messages.append({
-                    "role": msg['role'],
-                    "content": msg['content']
-                })
-        
-        # Add current user message
-        messages.append({"role": "user", "content": user_message})
-        
-        # Call OpenAI API
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",  # or "gpt-4" if available
-            messages=messages,
-            max_tokens=800,  # Increased for more comprehensive responses
-            temperature=0.7,
-            top_p=1,
-            frequency_penalty=0.2,
-            presence_penalty=0.1
+    def _cache_key(self, user_message: str, context: Dict, messages: List[Dict],
+                   conversation_key: str) -> str:
+        """
+        Cache key for a reply: normalized message, session context and model
+        parameters. A prompt that carries earlier turns (a running summary or
+        recent history) only matches the same conversation with the same turns,
+        so follow-ups are never answered from another user's context.
+        """
+        key_context = {
+            'selected_category': context.get('selected_category'),
+            'selected_question': context.get('selected_question'),
+            'session_stage': context.get('session_stage')
+        }
+        # Everything between the system prompt and the current message
+        earlier = messages[1:-1]
+        if earlier:
+            key_context['conversation'] = conversation_key
+            key_context['history'] = hashlib.sha256(
+                json.dumps(earlier, sort_keys=True).encode('utf-8')
+            ).hexdigest()
+        return self.cache.make_key('chat', user_message, key_context, self.model_params)
+
+    def stream_response(self, user_message: str, use_cache: bool = True,
+                        conversation_key: str = DEFAULT_CONVERSATION_KEY,
+                        timer: Optional[StreamTimer] = None) -> Iterator[str]:
+        """
+        Stream a response as it is generated.
+
+        OpenAI tokens are forwarded as they arrive; cached replies and the local
+        fallback are streamed by paragraph. The full reply is cached and added to
+        the conversation once the stream completes.
+
+        Args:
+            user_message: The user's message
+            use_cache: False forces a fresh reply
+            conversation_key: Conversation from conversation_key()
+            timer: Optional StreamTimer; its source is set to openai, mock, cache or
+                fallback, and completed / with_history are reported on it
+        """
+        timer = timer or StreamTimer('chat')
+        self.conversations.append(conversation_key, 'user', user_message)
+        context = self.conversations.get_context(conversation_key)
+
+        if self.openai_available or MOCK_OPENAI_STREAM:
+            messages = self._build_openai_messages(user_message, conversation_key, context)
+            cache_key = self._cache_key(user_message, context, messages, conversation_key)
+            timer.with_history = bool(messages[1:-1])
+            cached = self.cache.lookup(cache_key, use_cache)
+            if cached is not None:
+                timer.source = 'cache'
+                yield from paragraph_chunks(cached)
+                self.conversations.append(conversation_key, 'assistant', cached)
+                timer.completed = True
+                return
+
+            # Canned mock text is reported as its own source and never cached or banked
+            source = 'mock' if MOCK_OPENAI_STREAM else 'openai'
+            pieces = []
+            finish_reason = None
+            try:
+                for chunk in self._create_openai_stream(user_message, conversation_key, messages):
+                    finish_reason = chunk_finish_reason(chunk) or finish_reason
+                    text = chunk_delta(chunk)
+                    if text:
+                        timer.source = source
+                        pieces.append(text)
+                        yield text
+            except Exception as e:
+                print(f"OpenAI streaming error: {e}")
+                if pieces:
+                    # The user already has part of the reply; end the stream there
+                    return
+
+            if pieces:
+                response = ''.join(pieces).strip()
+                # A reply cut off at the token limit is shown but not reused
+                timer.completed = finish_reason != 'length'
+                if source == 'openai' and timer.completed:
+                    self.cache.set(cache_key, response)
+                self.conversations.append(conversation_key, 'assistant', response)
+                return
+
+        timer.source = 'fallback'
+        yield from paragraph_chunks(self._get_enhanced_fallback_response(user_message, conversation_key))
+        timer.completed = True
+
+    def _build_openai_messages(self, user_message: str, conversation_key: str, context: Dict) -> List[Dict]:
+        """System prompt with session context, summarized and recent history and the current message"""
+        
+        # Older turns are folded into a running summary cached in the conversation context
+        plan = self.prompts.build(
+            self.system_prompt + self._build_context_prompt(context),
+            self.conversations.history(conversation_key),
+            user_message,
+            summary=context.get(SUMMARY_CONTEXT_KEY)
         )
-        
-        return response.choices[0].message.content.strip()
+        if plan.summary != context.get(SUMMARY_CONTEXT_KEY):
+            self.conversations.update_context(conversation_key, **{SUMMARY_CONTEXT_KEY: plan.summary})
+        return plan.messages
 
-    def _get_enhanced_fallback_response(self, user_message: str) -> str:
+    def _create_openai_stream(self, user_message: str, conversation_key: str, messages: List[Dict]):
+        """Start a streaming ChatCompletion (or the offline mock when OPENAI_MOCK_STREAM is set)"""
+        if MOCK_OPENAI_STREAM:
+            return mock_chat_completion_stream(self._get_enhanced_fallback_response(user_message, conversation_key))
+        return self.llm.stream_chat(messages, **self.model_params)
+
+    def _get_enhanced_fallback_response(self, user_message: str,
+                                        conversation_key: str = DEFAULT_CONVERSATION_KEY) -> str:
         """Enhanced fallback response system that can handle any question"""
         
         user_message_lower = user_message.lower().strip()
@@ -141,7 +288,12 @@ When someone asks about interviews specifically, provide detailed interview coac
         
         if any(keyword in user_message_lower for keyword in interview_keywords):
             # Use the specialized interview chatbot for interview questions
-            return fallback_chatbot.get_response(user_message)
+            return fallback_chatbot.get_response(user_message, conversation_key=conversation_key)
+        
+        # Paraphrased questions: closest knowledge base entry by embedding similarity
+        retrieved = retrieve_answer(user_message)
+        if retrieved:
+            return retrieved
         
         # Handle general questions with comprehensive responses
         return self._handle_general_question(user_message_lower, user_message)
@@ -149,49 +301,19 @@ When someone asks about interviews specifically, provide detailed interview coac
     def _handle_general_question(self, user_message_lower: str, original_message: str) -> str:
         """Handle general non-interview questions with helpful responses"""
         
-        # Programming and Technology
-        if any(word in user_message_lower for word in ['programming', 'code', 'coding', 'python', 'javascript', 'java', 'react', 'node', 'database', 'sql', 'api', 'web development', 'software']):
-            return self._get_programming_response(user_message_lower, original_message)
-        
-        # Science and Mathematics
-        elif any(word in user_message_lower for word in ['math', 'mathematics', 'science', 'physics', 'chemistry', 'biology', 'calculate', 'formula', 'equation']):
-            return self._get_science_response(user_message_lower, original_message)
-        
-        # Business and Finance
-        elif any(word in user_message_lower for word in ['business', 'marketing', 'finance', 'investment', 'startup', 'entrepreneur', 'money', 'budget', 'economics']):
-            return self._get_business_response(user_message_lower, original_message)
-        
-        # Health and Wellness
-        elif any(word in user_message_lower for word in ['health', 'fitness', 'exercise', 'diet', 'nutrition', 'wellness', 'mental health', 'stress']):
-            return self._get_health_response(user_message_lower, original_message)
-        
-        # Education and Learning
-        elif any(word in user_message_lower for word in ['learn', 'study', 'education', 'school', 'university', 'course', 'tutorial', 'skill']):
-            return self._get_education_response(user_message_lower, original_message)
-        
-        # Creative and Writing
-        elif any(word in user_message_lower for word in ['write', 'writing', 'creative', 'story', 'blog', 'content', 'design', 'art']):
-            return self._get_creative_response(user_message_lower, original_message)
-        
-        # Communication and Social
-        elif any(word in user_message_lower for word in ['communication', 'social', 'relationship', 'team', 'leadership', 'presentation', 'public speaking']):
-            return self._get_communication_response(user_message_lower, original_message)
-        
-        # Problem-solving and Decision-making
-        elif any(word in user_message_lower for word in ['problem', 'solve', 'decision', 'choose', 'help me', 'advice', 'what should i']):
-            return self._get_problem_solving_response(user_message_lower, original_message)
-        
-        # Greetings and Social
-        elif any(word in user_message_lower for word in ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'how are you']):
-            return "Hello! I'm here to help you with any questions you have. Whether it's about interviews, technology, learning, problem-solving, or any other topic, feel free to ask me anything. What would you like to know about today?"
-        
-        # Thanks and Appreciation
-        elif any(word in user_message_lower for word in ['thank', 'thanks', 'appreciate']):
-            return "You're very welcome! I'm glad I could help. If you have any other questions about anything - whether it's interviews, technology, learning, or any other topic - feel free to ask anytime!"
-        
-        # Default comprehensive response
-        else:
+        # All topics are scored in one pass; the best-scoring intent picks the handler
+        match = intent_router.route(user_message_lower)
+        if match is None:
             return self._get_comprehensive_default_response(original_message)
+        return self._intent_handlers[match.intent](user_message_lower, original_message)
+    
+    def _get_greeting_response(self, user_message_lower: str, original_message: str) -> str:
+        """Handle greetings"""
+        return "Hello! I'm here to help you with any questions you have. Whether it's about interviews, technology, learning, problem-solving, or any other topic, feel free to ask me anything. What would you like to know about today?"
+    
+    def _get_thanks_response(self, user_message_lower: str, original_message: str) -> str:
+        """Handle thanks and appreciation"""
+        return "You're very welcome! I'm glad I could help. If you have any other questions about anything - whether it's interviews, technology, learning, or any other topic - feel free to ask anytime!"
     
     def _get_programming_response(self, user_message_lower: str, original_message: str) -> str:
         """Handle programming and technology questions"""
@@ -282,17 +404,17 @@ When someone asks about interviews specifically, provide detailed interview coac
         """Provide a comprehensive default response for unmatched questions"""
         return f"I'd be happy to help you with that! While I may not have caught the specific topic of your question '{original_message}', I can assist with a wide range of subjects:\n\n**Popular topics I can help with**:\n• **Technology & Programming**: Coding, web development, software tools\n• **Career & Professional**: Interview prep, skill development, workplace advice\n• **Learning & Education**: Study strategies, course recommendations, skill building\n• **Business & Finance**: Strategy, marketing, personal finance, entrepreneurship\n• **Communication**: Writing, presentations, leadership, teamwork\n• **Problem-Solving**: Decision-making, planning, overcoming challenges\n• **Creative Projects**: Writing, content creation, design thinking\n• **Health & Wellness**: Fitness, nutrition, stress management, work-life balance\n\nCould you provide a bit more detail about what you're looking for? I'm here to give you practical, helpful information on almost any topic!"
 
-    def _build_context_prompt(self) -> str:
-        """Build context-aware prompt based on current session state"""
+    def _build_context_prompt(self, context: Dict) -> str:
+        """Build context-aware prompt based on the user's session state"""
         context_parts = []
         
-        if self.user_context.get('selected_category'):
-            context_parts.append(f"User is currently in interview practice mode, category: {self.user_context['selected_category']}")
+        if context.get('selected_category'):
+            context_parts.append(f"User is currently in interview practice mode, category: {context['selected_category']}")
         
-        if self.user_context.get('selected_question'):
-            context_parts.append(f"Current interview question: {self.user_context['selected_question']}")
+        if context.get('selected_question'):
+            context_parts.append(f"Current interview question: {context['selected_question']}")
         
-        stage = self.user_context.get('session_stage', 'initial')
+        stage = context.get('session_stage', 'initial')
         if stage == 'practicing':
             context_parts.append("User is currently practicing their interview answer")
         elif stage == 'completed':
@@ -0,0 +1,87 @@
+"""
+Largest-Triangle-Three-Buckets downsampling for the progress chart series
+
+The chart's series share one x axis (one label per session), so a single
+set of points is chosen for all of them: each series is scaled to [0, 1]
+and a point's triangle area is summed over the series. The first and last
+sessions are always kept; between them every bucket contributes the
+session that best preserves the shape of the combined series.
+"""
+
+import numpy as np
+
+# Fewest and most points a client may ask for
+MIN_CHART_POINTS = 3
+MAX_CHART_POINTS = 2000
+
+
+def parse_max_points(value):
+    """max_points query parameter as an int, or None when absent; raises ValueError if invalid"""
+    if value in (None, ''):
+        return None
+    try:
+        max_points = int(value)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid max_points: {value}") from e
+    if not MIN_CHART_POINTS <= max_points <= MAX_CHART_POINTS:
+        raise ValueError(f"max_points must be between {MIN_CHART_POINTS} and {MAX_CHART_POINTS}")
+    return max_points
+
+
+def _scaled(series):
+    """Series as columns of a float matrix scaled to [0, 1]; missing values become 0"""
+    values = np.array([[np.nan if v is None else v for v in s] for s in series], dtype=float).T
+    missing = np.isnan(values)
+    low = np.where(missing, np.inf, values).min(axis=0)
+    high = np.where(missing, -np.inf, values).max(axis=0)
+    low, high = np.where(np.isfinite(low), low, 0.0), np.where(np.isfinite(high), high, 0.0)
+    span = np.where(high > low, high - low, 1.0)
+    return np.where(missing, 0.0, (values - low) / span)
+
+
+def lttb_indices(series, max_points):
+    """
+    Indices of the points to keep from equally long series.
+
+    Args:
+        series: Sequences of numbers (None for missing) sharing one x axis
+        max_points: Points to keep (at least 3)
+
+    Returns:
+        Sorted numpy array of indices, including the first and last point
+    """
+    n = len(series[0]) if series else 0
+    if max_points >= n:
+        return np.arange(n)
+
+    y = _scaled(series)
+    x = np.arange(n, dtype=float)
+
+    # Interior points 1..n-2 split into max_points - 2 buckets [edges[b], edges[b + 1])
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    counts = np.diff(edges)[:, None]
+    avg_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts[:, 0]
+    avg_y = np.add.reduceat(y[:n - 1], edges[:-1], axis=0) / counts
+    # Each bucket is compared against the average of the next one (the last point after the last bucket)
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.vstack([avg_y[1:], y[-1:]])
+
+    selected = np.empty(max_points, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for b in range(max_points - 2):
+        low, high = edges[b], edges[b + 1]
+        # Twice the triangle area (a, candidate, next average), summed over the series
+        area = np.abs(
+            (x[a] - next_x[b]) * (y[low:high] - y[a])
+            - (x[a] - x[low:high])[:, None] * (next_y[b] - y[a])
+        ).sum(axis=1)
+        a = low + int(np.argmax(area))
+        selected[b + 1] = a
+    return selected
+
+
+def downsample(labels, series, max_points):
+    """Labels and series reduced to at most max_points shared points"""
+    keep = lttb_indices(series, max_points)
+    return [labels[i] for i in keep], [[s[i] for i in keep] for s in series]
@@ -36,6 +36,68 @@ INTERVIEW_QUESTIONS = {
     ]
 }
 
+# Common questions offered on the Smart AI Assistant page
+PRACTICE_QUESTIONS = [
+    {
+        'category': 'General',
+        'questions': [
+            'Tell me about yourself',
+            'Why do you want to work here?',
+            'What are your greatest strengths?',
+            'What is your biggest weakness?',
+            'Where do you see yourself in 5 years?',
+            'Why are you leaving your current job?',
+            'Do you have any questions for us?'
+        ]
+    },
+    {
+        'category': 'Behavioral',
+        'questions': [
+            'Tell me about a time you showed leadership',
+            'Describe a challenging situation you faced at work',
+            'Give me an example of when you worked in a team',
+            'Tell me about a time you failed',
+            'Describe a time you had to learn something new quickly',
+            'Tell me about a conflict you had with a coworker',
+            'Give me an example of when you went above and beyond'
+        ]
+    },
+    {
+        'category': 'Technical',
+        'questions': [
+            'What programming languages are you most comfortable with?',
+            'How do you approach debugging a complex problem?',
+            'Explain your experience with databases',
+            'What development methodologies have you used?',
+            'How do you ensure code quality?',
+            'Describe your experience with version control',
+            'What tools do you use for testing?'
+        ]
+    },
+    {
+        'category': 'Situational',
+        'questions': [
+            'How would you handle a tight deadline?',
+            'What would you do if you disagreed with your manager?',
+            'How do you prioritize multiple tasks?',
+            'What would you do if you made a mistake?',
+            'How do you handle criticism?',
+            'What would you do if a project was falling behind?',
+            'How do you stay updated with new technologies?'
+        ]
+    }
+]
+
+# Job roles whose answer variants are precomputed in the answer bank
+COMMON_JOB_ROLES = [
+    'Software Engineer',
+    'Data Scientist',
+    'Frontend Developer',
+    'Backend Developer',
+    'Product Manager',
+    'DevOps Engineer'
+]
+
 def get_questions_by_category(category):
     """Get questions for a specific category"""
     return INTERVIEW_QUESTIONS.get(category, [])
@@ -44,6 +106,14 @@ def get_all_categories():
     """Get all available interview categories"""
     return list(INTERVIEW_QUESTIONS.keys())
 
+def get_all_questions():
+    """Get every question in the bank across all categories"""
+    return [question for questions in INTERVIEW_QUESTIONS.values() for question in questions]
+
+def get_practice_questions():
+    """Get every practice question across all practice categories"""
+    return [question for group in PRACTICE_QUESTIONS for question in group['questions']]
+
 def get_random_question(category=None):
     """Get a random question from a category or all categories"""
     import random
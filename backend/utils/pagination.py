@@ -0,0 +1,90 @@
+"""
+Keyset pagination and field projection helpers for the history API
+"""
+
+import base64
+import binascii
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Columns a client may request with fields=
+SESSION_COLUMNS = [
+    'transcript', 'wpm', 'fillers', 'sentiment', 'confidence', 'emotion',
+    'word_count', 'filler_percentage', 'grammar_score', 'vocabulary_diversity', 'unique_words',
+    'pronunciation_clarity', 'engagement_level', 'skill_level',
+    'pace_assessment', 'filler_assessment', 'grammar_assessment', 'vocabulary_assessment',
+    'tone_assessment', 'general_impression',
+    'strengths', 'improvements', 'actionable_tips', 'grammar_errors'
+]
+
+# Columns holding JSON lists (loaded only when requested)
+JSON_COLUMNS = {'strengths', 'improvements', 'actionable_tips', 'grammar_errors'}
+
+# Always returned: they identify the session and make up the cursor
+KEY_FIELDS = ['id', 'created_at', 'created_at_chart']
+
+
+class PaginationError(ValueError):
+    """Raised for a malformed cursor, limit or field list"""
+    pass
+
+
+def encode_cursor(created_at: datetime, session_id: int) -> str:
+    """Opaque cursor for the position after a session"""
+    raw = f"{created_at.isoformat()}|{session_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    """(created_at, id) encoded by encode_cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, session_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(session_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise PaginationError(f"Invalid cursor: {cursor}") from e
+
+
+def parse_limit(value, default: int = DEFAULT_PAGE_SIZE) -> int:
+    """Page size from a query parameter, clamped to MAX_PAGE_SIZE"""
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError) as e:
+        raise PaginationError(f"Invalid limit: {value}") from e
+    if limit < 1:
+        raise PaginationError("limit must be at least 1")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_offset(value, maximum: int = None) -> int:
+    """Number of results to skip from a query parameter (for ranked results, which have no cursor)"""
+    if value in (None, ''):
+        return 0
+    try:
+        offset = int(value)
+    except (TypeError, ValueError) as e:
+        raise PaginationError(f"Invalid offset: {value}") from e
+    if offset < 0 or (maximum is not None and offset > maximum):
+        raise PaginationError(f"offset must be between 0 and {maximum}" if maximum is not None
+                              else "offset must not be negative")
+    return offset
+
+
+def parse_fields(value):
+    """
+    Requested columns from a comma-separated fields= parameter.
+
+    Returns:
+        Column names in SESSION_COLUMNS order, or every column if value is empty
+    """
+    if not value:
+        return list(SESSION_COLUMNS)
+    requested = {field.strip() for field in value.split(',') if field.strip()}
+    unknown = requested - set(SESSION_COLUMNS) - set(KEY_FIELDS)
+    if unknown:
+        raise PaginationError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [column for column in SESSION_COLUMNS if column in requested]
@@ -0,0 +1,192 @@
+"""
+Compressed storage for long session text (transcripts and assessments)
+
+On SQLite a value is stored as a blob: a two-byte marker, the id of the
+preset dictionary it was compressed with (0 for none) and the raw deflate
+stream. Preset dictionaries are trained from stored sessions by
+migrations/v006 and kept in the compression_dictionary table, so the
+phrases every assessment repeats cost a few bytes per row. Values that do
+not shrink, and rows written before compression, stay plain text and are
+returned as they are. The speech_text() SQL function decompresses inside
+queries (the full-text index reads transcripts through it).
+
+retrain_compression_dictionary.py stores a newer dictionary (e.g. once a
+fresh install has enough sessions); values keep the id of the dictionary
+they were written with, so older rows still decompress.
+"""
+
+import zlib
+from collections import Counter
+
+from config import TEXT_COMPRESSION_LEVEL, TEXT_COMPRESSION_MIN_BYTES
+
+# Marks a compressed value; text never starts with a NUL byte
+MAGIC = b'\x00Z'
+
+# zlib looks back at most 32 KB, so a longer dictionary is never used
+MAX_DICTIONARY_BYTES = 32 * 1024
+
+# Longest phrase, in words, considered when training a dictionary, and the
+# words read from the start of each sample
+MAX_PHRASE_WORDS = 12
+MAX_SAMPLE_WORDS = 300
+
+# Session columns stored compressed
+COMPRESSED_COLUMNS = (
+    'transcript', 'pace_assessment', 'filler_assessment', 'grammar_assessment',
+    'vocabulary_assessment', 'tone_assessment', 'general_impression',
+)
+
+# Sessions sampled to train a stored dictionary, and the fewest texts worth training on
+TRAINING_ROWS = 500
+MIN_TRAINING_TEXTS = 50
+
+# Preset dictionaries by id, loaded from the database at startup, and a
+# compressor primed with each (copying one is much cheaper than priming)
+_dictionaries = {}
+_compressors = {}
+
+
+def _new_compressor(dictionary=None):
+    if dictionary is None:
+        return zlib.compressobj(TEXT_COMPRESSION_LEVEL, zlib.DEFLATED, -15)
+    return zlib.compressobj(TEXT_COMPRESSION_LEVEL, zlib.DEFLATED, -15, zdict=dictionary)
+
+
+class CompressionError(ValueError):
+    """Raised for a compressed value that cannot be read"""
+    pass
+
+
+def register_dictionary(dictionary_id, data):
+    """Make a preset dictionary available; the highest id is used for new values"""
+    if not 0 < dictionary_id < 256:
+        raise ValueError(f"Dictionary id must be between 1 and 255, got {dictionary_id}")
+    _dictionaries[dictionary_id] = bytes(data)
+    _compressors[dictionary_id] = _new_compressor(_dictionaries[dictionary_id])
+
+
+def use_dictionaries(rows):
+    """Replace the registered dictionaries with (id, data) rows of one database"""
+    _dictionaries.clear()
+    _compressors.clear()
+    for dictionary_id, data in rows:
+        register_dictionary(dictionary_id, data)
+
+
+def current_dictionary_id():
+    """Id of the dictionary new values are compressed with (0 when there is none)"""
+    return max(_dictionaries, default=0)
+
+
+def load_dictionaries(engine):
+    """Use the dictionaries stored in an engine's SQLite database; returns how many were loaded"""
+    rows = []
+    if engine.dialect.name == 'sqlite':
+        connection = engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'compression_dictionary'")
+            if cursor.fetchone() is not None:
+                cursor.execute('SELECT id, data FROM compression_dictionary')
+                rows = cursor.fetchall()
+        finally:
+            connection.close()
+    use_dictionaries(rows)
+    return len(rows)
+
+
+def train_dictionary(samples, size=MAX_DICTIONARY_BYTES):
+    """
+    Preset dictionary of the phrases that recur across samples.
+
+    Phrases of up to MAX_PHRASE_WORDS words are scored by the number of
+    samples containing them times their length, and the best ones are
+    packed into size bytes, most valuable last (zlib reaches the end of the
+    dictionary with the shortest distances).
+    """
+    counts = Counter()
+    for text in samples:
+        words = text.split()[:MAX_SAMPLE_WORDS]
+        phrases = {' '.join(words[i:i + n]) for n in range(2, MAX_PHRASE_WORDS + 1) for i in range(len(words) - n + 1)}
+        counts.update(phrases)
+
+    # Phrases in a single sample are no help to the others
+    candidates = [(-count * len(phrase), phrase) for phrase, count in counts.items() if count > 1]
+    candidates.sort()
+
+    chosen, packed = [], ''
+    for _, phrase in candidates:
+        if len(packed) >= size:
+            break
+        if len(packed) + len(phrase) + 1 > size or phrase in packed:
+            continue
+        chosen.append(phrase)
+        packed += phrase + '\n'
+    return '\n'.join(reversed(chosen)).encode()[-size:]
+
+
+def train_stored_dictionary(cursor, rows=TRAINING_ROWS, min_texts=MIN_TRAINING_TEXTS):
+    """
+    Train a dictionary from the most recent sessions of a sqlite3 cursor's
+    database, store it in compression_dictionary under the next id and
+    register it; returns the id, or None when there are fewer than
+    min_texts texts
+    """
+    cursor.execute(
+        f'SELECT {", ".join(COMPRESSED_COLUMNS)} FROM speech_session ORDER BY id DESC LIMIT ?', (rows,)
+    )
+    samples = [decompress_text(value) for row in cursor.fetchall() for value in row if value]
+    if len(samples) < min_texts:
+        return None
+    data = train_dictionary(samples)
+    cursor.execute('SELECT coalesce(max(id), 0) + 1 FROM compression_dictionary')
+    dictionary_id = cursor.fetchone()[0]
+    # Checks the id before anything is stored
+    register_dictionary(dictionary_id, data)
+    cursor.execute(
+        'INSERT INTO compression_dictionary (id, data, sample_texts, created_at) VALUES (?, ?, ?, CURRENT_TIMESTAMP)',
+        (dictionary_id, data, len(samples))
+    )
+    return dictionary_id
+
+
+def compress_text(text, dictionary_id=None):
+    """
+    Stored form of a text: compressed bytes, or the text itself when it is
+    short or would not shrink
+    """
+    raw = text.encode('utf-8')
+    if len(raw) < TEXT_COMPRESSION_MIN_BYTES:
+        return text
+    if dictionary_id is None:
+        dictionary_id = current_dictionary_id()
+    compressor = _compressors[dictionary_id].copy() if dictionary_id else _new_compressor()
+    stored = MAGIC + bytes([dictionary_id]) + compressor.compress(raw) + compressor.flush()
+    return stored if len(stored) < len(raw) else text
+
+
+def decompress_text(value):
+    """Text of a stored value (plain text and None are returned unchanged)"""
+    if not isinstance(value, (bytes, memoryview)):
+        return value
+    value = bytes(value)
+    if not value.startswith(MAGIC):
+        # A blob written by something else: read it as text
+        return value.decode('utf-8', errors='replace')
+    dictionary_id = value[len(MAGIC)]
+    try:
+        if dictionary_id:
+            decompressor = zlib.decompressobj(-15, zdict=_dictionaries[dictionary_id])
+        else:
+            decompressor = zlib.decompressobj(-15)
+        return (decompressor.decompress(value[len(MAGIC) + 1:]) + decompressor.flush()).decode('utf-8')
+    except KeyError as e:
+        raise CompressionError(f"Compression dictionary {dictionary_id} is not loaded") from e
+    except zlib.error as e:
+        raise CompressionError(f"Corrupt compressed value: {e}") from e
+
+
+def register_sql_functions(dbapi_connection):
+    """Add speech_text(value), which decompresses a stored value, to a sqlite3 connection"""
+    dbapi_connection.create_function('speech_text', 1, decompress_text, deterministic=True)
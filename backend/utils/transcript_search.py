@@ -0,0 +1,104 @@
+"""
+Full-text search over a user's stored transcripts
+
+Uses the speech_session_fts index (migrations/v004) on SQLite and the
+transcript tsvector index on PostgreSQL. Results are ranked by relevance
+(bm25 / ts_rank) and carry an HTML-escaped snippet with the matched terms
+wrapped in <mark>.
+"""
+
+import re
+import html
+from sqlalchemy import DateTime, text
+
+# Longest accepted query, in characters, and most terms used from it
+MAX_QUERY_LENGTH = 200
+MAX_QUERY_TERMS = 10
+
+# Deepest page offset served (ranking has to score every match before it)
+MAX_SEARCH_OFFSET = 1000
+
+# Words of context around the matches in a snippet
+SNIPPET_WORDS = 16
+
+# Private-use markers around matches, swapped for <mark> after escaping
+_MATCH_START, _MATCH_END = '\ue000', '\ue001'
+
+_TERM = re.compile(r'\w+\*?')
+
+_SQLITE_SEARCH = text(
+    'SELECT s.id, s.created_at, s.wpm, s.confidence,'
+    ' snippet(speech_session_fts, 0, :start, :end, :ellipsis, :words) AS snippet,'
+    ' bm25(speech_session_fts, 1.0, 0.0) AS score'
+    ' FROM speech_session_fts JOIN speech_session s ON s.id = speech_session_fts.rowid'
+    ' WHERE speech_session_fts MATCH :query'
+    ' ORDER BY score, s.id DESC LIMIT :limit OFFSET :offset'
+).columns(created_at=DateTime)
+
+_POSTGRES_SEARCH = text(
+    "SELECT s.id, s.created_at, s.wpm, s.confidence,"
+    " ts_headline('english', s.transcript, q, :options) AS snippet,"
+    " -ts_rank(to_tsvector('english', coalesce(s.transcript, '')), q) AS score"
+    " FROM speech_session s, to_tsquery('english', :query) q"
+    " WHERE s.user_id = :user_id AND to_tsvector('english', coalesce(s.transcript, '')) @@ q"
+    " ORDER BY score, s.id DESC LIMIT :limit OFFSET :offset"
+).columns(created_at=DateTime)
+
+
+class SearchError(ValueError):
+    """Raised for an empty, overlong or wordless search query"""
+    pass
+
+
+def parse_terms(query):
+    """Search terms of a query (a trailing * makes a term a prefix); raises SearchError if none"""
+    if not query or len(query) > MAX_QUERY_LENGTH:
+        raise SearchError(f"q must be 1 to {MAX_QUERY_LENGTH} characters")
+    terms = _TERM.findall(query.lower())[:MAX_QUERY_TERMS]
+    if not terms:
+        raise SearchError("q has no searchable words")
+    return terms
+
+
+def fts5_query(terms, user_id):
+    """FTS5 MATCH expression: every term in the transcript, within one user's sessions"""
+    phrases = ' '.join(f'"{t.rstrip("*")}"*' if t.endswith('*') else f'"{t}"' for t in terms)
+    return f'user_id:"{int(user_id)}" AND transcript:({phrases})'
+
+
+def tsquery(terms):
+    """PostgreSQL to_tsquery expression requiring every term"""
+    return ' & '.join(f"{t.rstrip('*')}:*" if t.endswith('*') else t for t in terms)
+
+
+def highlight(snippet):
+    """Escape a snippet and turn the match markers into <mark> tags"""
+    escaped = html.escape(snippet or '')
+    return escaped.replace(_MATCH_START, '<mark>').replace(_MATCH_END, '</mark>')
+
+
+def search_transcripts(session, user_id, query, limit, offset=0):
+    """
+    One page of a user's sessions matching a query, best match first.
+
+    Args:
+        session: SQLAlchemy session
+        user_id: Owner of the sessions searched
+        query: Search text
+        limit: Page size
+        offset: Matches to skip
+
+    Returns:
+        (rows, has_more); each row has id, created_at, wpm, confidence, snippet and score
+    """
+    terms = parse_terms(query)
+    params = {'limit': limit + 1, 'offset': offset}
+    if session.get_bind().dialect.name == 'postgresql':
+        options = f'StartSel={_MATCH_START}, StopSel={_MATCH_END}, MaxWords={SNIPPET_WORDS}'
+        rows = session.execute(_POSTGRES_SEARCH, dict(params, query=tsquery(terms), user_id=user_id,
+                                                      options=options)).fetchall()
+    else:
+        rows = session.execute(_SQLITE_SEARCH, dict(params, query=fts5_query(terms, user_id),
+                                                    start=_MATCH_START, end=_MATCH_END, ellipsis='…',
+                                                    words=SNIPPET_WORDS)).fetchall()
+    return rows[:limit], len(rows) > limit
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Build the precomputed answer bank served by /ai-assistant/answer
+Run this offline (e.g. at deploy time) with OPENAI_API_KEY set; answers that
+only come from the local fallback are not stored
+"""
+
+import sys
+import argparse
+sys.path.append('backend')
+
+from services.answer_bank import AnswerBank, build_answer_bank, ANSWER_BANK_PATH
+from utils.interview_questions import COMMON_JOB_ROLES, get_all_questions, get_practice_questions
+
+ANSWER_BANK_CONVERSATION = 'answer-bank'
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the precomputed answer bank")
+    parser.add_argument('--output', default=ANSWER_BANK_PATH, help="SQLite file to fill")
+    parser.add_argument('--roles', default=','.join(COMMON_JOB_ROLES),
+                        help="Comma-separated job roles to precompute variants for")
+    parser.add_argument('--refresh', action='store_true', help="Regenerate answers that are already stored")
+    args = parser.parse_args()
+
+    from services.universal_chatbot import universal_chatbot
+
+    questions = list(dict.fromkeys(get_practice_questions() + get_all_questions()))
+    roles = [role.strip() for role in args.roles.split(',') if role.strip()]
+
+    print("🔨 BUILDING ANSWER BANK")
+    print("=" * 50)
+    print(f"📝 {len(questions)} questions × {len(roles) + 1} job role variants")
+
+    def generate(message):
+        # Each answer starts a fresh conversation, so none sees the previous questions as history
+        universal_chatbot.conversations.clear(ANSWER_BANK_CONVERSATION)
+        return universal_chatbot.respond(message, use_cache=True, conversation_key=ANSWER_BANK_CONVERSATION)
+
+    bank = AnswerBank(args.output)
+    counts = build_answer_bank(bank, questions, roles, generate=generate, skip_existing=not args.refresh)
+    universal_chatbot.conversations.clear(ANSWER_BANK_CONVERSATION)
+
+    print(f"✅ Generated {counts['generated']} answers, kept {counts['skipped']} existing")
+    if counts['not_stored']:
+        print(f"⚠️ {counts['not_stored']} answers came from the local fallback and were not stored")
+    print(f"   File: {args.output} ({len(bank)} answers)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Build the exemplar answer index used for nearest-exemplar relevance scoring
+Run this offline (e.g. at deploy time) whenever the exemplar answers change
+"""
+
+import sys
+import argparse
+sys.path.append('backend')
+
+from services.exemplar_index import build_exemplar_index, DEFAULT_INDEX_PATH
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the exemplar answer index")
+    parser.add_argument('--output', default=DEFAULT_INDEX_PATH, help="Index file to write")
+    parser.add_argument('--curated', help="JSON file of curated user answers to include")
+    parser.add_argument('--lists', type=int, default=None,
+                        help="Number of IVF lists (0 forces a flat index, default picks automatically)")
+    args = parser.parse_args()
+
+    print("🔨 BUILDING EXEMPLAR INDEX")
+    print("=" * 50)
+
+    index = build_exemplar_index(args.output, curated_path=args.curated, n_lists=args.lists)
+
+    print(f"✅ Indexed {len(index)} exemplar answers")
+    print(f"   Type: {'IVF' if index.is_ivf else 'flat'}")
+    print(f"   File: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Build the knowledge base embedding index used for chatbot retrieval
+Run this offline (e.g. at deploy time) whenever the knowledge bases change
+"""
+
+import sys
+import argparse
+sys.path.append('backend')
+
+from services.knowledge_retrieval import build_knowledge_index, DEFAULT_INDEX_PATH
+from services.embeddings import DEFAULT_MODEL_NAME
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the knowledge base embedding index")
+    parser.add_argument('--output', default=DEFAULT_INDEX_PATH, help="Index file to write")
+    parser.add_argument('--model', default=DEFAULT_MODEL_NAME, help="Sentence transformer model")
+    args = parser.parse_args()
+
+    print("🔨 BUILDING KNOWLEDGE INDEX")
+    print("=" * 50)
+
+    retriever = build_knowledge_index(args.output, model_name=args.model)
+
+    print(f"✅ Embedded {len(retriever)} knowledge base entries")
+    print(f"   File: {args.output}")
+
+if __name__ == "__main__":
+    main()
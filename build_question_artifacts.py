@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Precompute per-question artifacts (type, expected elements, topics, embeddings)
+for the interview question bank. Run this at deploy time whenever the bank changes
+"""
+
+import sys
+import argparse
+sys.path.append('backend')
+
+from services.question_artifacts import build_question_artifacts, DEFAULT_ARTIFACTS_PATH
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the per-question artifact file")
+    parser.add_argument('--output', default=DEFAULT_ARTIFACTS_PATH, help="Artifact file to write")
+    args = parser.parse_args()
+
+    print("🔨 BUILDING QUESTION ARTIFACTS")
+    print("=" * 50)
+
+    store = build_question_artifacts(args.output)
+
+    print(f"✅ Precomputed artifacts for {len(store)} questions")
+    print(f"   File: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Shared fixtures: the Flask app on a fresh SQLite database, and a test client
+logged in as user 1. A test module seeds the database by overriding
+seed_sessions.
+"""
+
+import sys
+sys.path.append('backend')
+
+import pytest
+
+@pytest.fixture
+def seed_sessions():
+    """SpeechSession rows stored before each test"""
+    return []
+
+@pytest.fixture
+def app(tmp_path, monkeypatch, request):
+    pytest.importorskip("flask_sqlalchemy")
+    import backend.app as app_module
+    from database import db
+    from middleware.conditional_get import history_responses
+
+    monkeypatch.setattr(app_module, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'app.db'}")
+    app = app_module.create_app()
+    # Cached history bodies belong to the previous test's database
+    history_responses.clear()
+    # Requested here so seed fixtures can import the models
+    seed_sessions = request.getfixturevalue('seed_sessions')
+    if seed_sessions:
+        with app.app_context():
+            db.session.add_all(seed_sessions)
+            db.session.commit()
+    return app
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = 1
+    return client
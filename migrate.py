@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Apply, inspect or roll back the versioned schema migrations
+The app applies pending migrations at startup; use this to check a
+database or to roll it back to an earlier version
+"""
+
+import os
+import sys
+import sqlite3
+import logging
+import argparse
+sys.path.append('backend')
+
+from migrations import upgrade, downgrade, applied_versions, load_migrations
+
+DEFAULT_DATABASE = os.path.join('backend', 'app.db')
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage schema migrations")
+    parser.add_argument('command', choices=['status', 'upgrade', 'downgrade'])
+    parser.add_argument('--database', default=DEFAULT_DATABASE, help="SQLite database file")
+    parser.add_argument('--to', type=int, help="Target version (required for downgrade)")
+    args = parser.parse_args()
+    # Migrations report what they changed (e.g. the space compression saved)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.command == 'downgrade' and args.to is None:
+        parser.error("downgrade needs --to VERSION")
+    if not os.path.exists(args.database):
+        print(f"❌ Database not found: {args.database}")
+        sys.exit(1)
+
+    connection = sqlite3.connect(args.database)
+    try:
+        if args.command == 'upgrade':
+            applied = upgrade(connection, args.to)
+            print(f"✅ Applied migrations {applied}" if applied else "✅ Database is already up to date")
+        elif args.command == 'downgrade':
+            rolled_back = downgrade(connection, args.to)
+            print(f"✅ Rolled back migrations {rolled_back}" if rolled_back else "✅ Nothing to roll back")
+
+        done = set(applied_versions(connection))
+        print("\n📋 MIGRATIONS")
+        for migration in load_migrations():
+            mark = "✅" if migration.VERSION in done else "⏳"
+            print(f"  {mark} {migration.VERSION:03d} {migration.DESCRIPTION}")
+    finally:
+        connection.close()
+
+if __name__ == "__main__":
+    main()
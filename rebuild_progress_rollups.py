@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Recompute the per-user progress rollups from the stored sessions
+Use after backfills or bulk edits of speech_session rows
+"""
+
+import sys
+import argparse
+sys.path.append('backend')
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild progress rollups")
+    parser.add_argument('--user-id', type=int, help="Only rebuild this user's rollups")
+    args = parser.parse_args()
+
+    from backend.app import create_app
+    from models.progress_rollup import rebuild_progress_rollups
+
+    print("🔨 REBUILDING PROGRESS ROLLUPS")
+    print("=" * 50)
+
+    app = create_app()
+    with app.app_context():
+        count = rebuild_progress_rollups(user_id=args.user_id)
+
+    scope = f"user {args.user_id}" if args.user_id is not None else "all users"
+    print(f"✅ Aggregated {count} sessions for {scope}")
+
+if __name__ == "__main__":
+    main()
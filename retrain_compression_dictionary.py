@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Train a new preset dictionary for compressed session text from the stored sessions
+Use once a fresh install (or a database that was small when migration v006 ran)
+has enough sessions, or when the assessments have changed. The app compresses new
+sessions with it after a restart; existing rows keep the dictionary they were
+written with
+"""
+
+import sys
+import argparse
+sys.path.append('backend')
+
+from utils.text_compression import TRAINING_ROWS, MIN_TRAINING_TEXTS
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a compression dictionary")
+    parser.add_argument('--rows', type=int, default=TRAINING_ROWS, help="Most recent sessions to train on")
+    args = parser.parse_args()
+
+    from backend.app import create_app
+    from database import db
+    from utils.text_compression import train_stored_dictionary
+
+    print("🔨 TRAINING COMPRESSION DICTIONARY")
+    print("=" * 50)
+
+    app = create_app()
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            print("ℹ️ Session text is only compressed on SQLite; nothing to do")
+            return
+        connection = db.engine.raw_connection()
+        try:
+            dictionary_id = train_stored_dictionary(connection.cursor(), rows=args.rows)
+            connection.commit()
+        finally:
+            connection.close()
+
+    if dictionary_id is None:
+        print(f"⚠️ Fewer than {MIN_TRAINING_TEXTS} stored texts; no dictionary trained")
+        return
+    print(f"✅ Stored dictionary {dictionary_id}; restart the app to compress new sessions with it")
+
+if __name__ == "__main__":
+    main()
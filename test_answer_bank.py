@@ -0,0 +1,82 @@
+"""
+Tests for the precomputed answer bank
+"""
+
+import sys
+sys.path.append('backend')
+
+import pytest
+
+from services.answer_bank import AnswerBank, build_answer_bank, answer_prompt
+
+@pytest.fixture
+def bank(tmp_path):
+    return AnswerBank(str(tmp_path / "answer_bank.db"))
+
+def test_answers_are_keyed_by_normalized_question_and_role(bank):
+    bank.put("Tell me about yourself", "General answer")
+    bank.put("Tell me about yourself", "Engineer answer", job_role="Software Engineer")
+
+    assert bank.get("  tell me about YOURSELF?") == "General answer"
+    assert bank.get("Tell me about yourself", job_role="software engineer") == "Engineer answer"
+    assert bank.get("Tell me about yourself", job_role="Data Scientist") is None
+    assert bank.get("Tell me about yourself", company="Acme") is None
+
+    stats = bank.get_stats()
+    assert stats['answers'] == 2 and stats['hits'] == 2 and stats['misses'] == 2
+
+def test_answers_survive_reopening(tmp_path):
+    path = str(tmp_path / "answer_bank.db")
+    AnswerBank(path).put("Why do you want to work here?", "Stored answer")
+    assert AnswerBank(path).get("Why do you want to work here?") == "Stored answer"
+
+def test_build_stores_only_model_answers_and_skips_existing(bank):
+    calls = []
+    def generate(message):
+        calls.append(message)
+        return (f"answer: {message}", 'fallback' if 'Weakness' in message else 'openai')
+
+    questions = ["Tell me about yourself", "What is your biggest Weakness?"]
+    counts = build_answer_bank(bank, questions, ["Product Manager"], generate)
+
+    assert counts == {'generated': 2, 'skipped': 0, 'not_stored': 2}
+    assert answer_prompt("Tell me about yourself", "Product Manager") in calls
+    assert bank.get("Tell me about yourself", job_role="Product Manager") == \
+        "answer: " + answer_prompt("Tell me about yourself", "Product Manager")
+    assert bank.get("What is your biggest Weakness?") is None
+
+    calls.clear()
+    counts = build_answer_bank(bank, questions, ["Product Manager"], generate)
+    assert counts['skipped'] == 2 and len(calls) == 2
+
+def test_disabled_bank_stores_nothing():
+    bank = AnswerBank(enabled=False)
+    bank.put("Tell me about yourself", "answer")
+    assert bank.get("Tell me about yourself") is None
+    assert len(bank) == 0
+
+def test_answer_endpoint_banks_only_answers_written_without_history(client, bank, monkeypatch):
+    openai = pytest.importorskip("openai")
+    from types import SimpleNamespace
+    import routes.ai_assistant as ai_assistant
+    from services.universal_chatbot import universal_chatbot
+    from services.response_cache import ResponseCache, MemoryCacheBackend
+    from services.conversation_store import ConversationStore
+
+    monkeypatch.setattr(openai.ChatCompletion, "create", lambda **kwargs: SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="Model answer"))]))
+    monkeypatch.setattr(universal_chatbot, 'openai_available', True)
+    monkeypatch.setattr(universal_chatbot, 'cache', ResponseCache(MemoryCacheBackend(), ttl_seconds=60))
+    monkeypatch.setattr(universal_chatbot, 'conversations', ConversationStore('test', persist_path=None))
+    monkeypatch.setattr(ai_assistant, 'answer_bank', bank)
+
+    ask = lambda question: client.post('/ai-assistant/answer', json={'question': question, 'conversation_id': 'c1'})
+    assert ask("Tell me about yourself").get_json()['answer'] == "Model answer"
+    assert bank.get("Tell me about yourself") == "Model answer"
+
+    # Asked mid-conversation, the answer was written with this user's earlier turns
+    assert ask("Why should we hire you?").get_json()['answer'] == "Model answer"
+    assert bank.get("Why should we hire you?") is None
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,91 @@
+"""
+Tests for LTTB downsampling of the progress chart series
+"""
+
+import sys
+import math
+import random
+from datetime import datetime, timedelta
+sys.path.append('backend')
+
+import pytest
+
+from utils.downsampling import lttb_indices, downsample, parse_max_points
+
+def reference_lttb(y, max_points):
+    """Textbook single-series LTTB over x = 0..n-1"""
+    n = len(y)
+    bucket = (n - 2) / (max_points - 2)
+    selected, a = [0], 0
+    for b in range(max_points - 2):
+        low, high = int(b * bucket) + 1, int((b + 1) * bucket) + 1
+        next_low, next_high = high, min(int((b + 2) * bucket) + 1, n)
+        if b == max_points - 3:
+            next_low, next_high = n - 1, n
+        cx = sum(range(next_low, next_high)) / (next_high - next_low)
+        cy = sum(y[next_low:next_high]) / (next_high - next_low)
+        areas = [abs((a - cx) * (y[p] - y[a]) - (a - p) * (cy - y[a])) for p in range(low, high)]
+        a = low + areas.index(max(areas))
+        selected.append(a)
+    return selected + [n - 1]
+
+def test_matches_reference_for_a_single_series():
+    random.seed(3)
+    y = [math.sin(i / 15) * 40 + random.uniform(-5, 5) + 50 for i in range(1000)]
+    for max_points in (3, 10, 57, 200):
+        assert list(lttb_indices([y], max_points)) == reference_lttb(y, max_points)
+
+def test_keeps_endpoints_and_spikes():
+    y = [50.0] * 500
+    y[137] = 95.0
+    keep = lttb_indices([y, [120] * 500, [2] * 500], 20)
+    assert len(keep) == 20 and keep[0] == 0 and keep[-1] == 499
+    assert list(keep) == sorted(set(keep))
+    assert 137 in keep
+
+def test_short_series_and_missing_values():
+    assert list(lttb_indices([[1, 2, 3]], 10)) == [0, 1, 2]
+    labels, (confidence, wpm) = downsample([str(i) for i in range(50)], [[None] * 50, list(range(50))], 5)
+    assert len(labels) == len(confidence) == len(wpm) == 5
+    assert all(value is None for value in confidence)
+
+def test_max_points_parameter():
+    assert parse_max_points(None) is None
+    assert parse_max_points("100") == 100
+    for bad in ("2", "abc", "100000"):
+        with pytest.raises(ValueError):
+            parse_max_points(bad)
+
+@pytest.fixture
+def seed_sessions():
+    from models.session import SpeechSession
+
+    start = datetime(2024, 1, 1)
+    return [SpeechSession(user_id=1, confidence=50 + i % 30, wpm=120 + i % 17, fillers=i % 5,
+                          created_at=start + timedelta(hours=i)) for i in range(300)]
+
+def test_chart_endpoint_downsamples_and_caches(client):
+    full = client.get('/api/history/chart').get_json()
+    assert full['points'] == full['total_sessions'] == 300
+
+    data = client.get('/api/history/chart?max_points=40').get_json()
+    assert data['points'] == 40 and data['total_sessions'] == 300 and not data['cached']
+    chart = data['chart_data']
+    assert len(chart['labels']) == len(chart['confidence']) == len(chart['wpm']) == len(chart['fillers']) == 40
+    assert chart['labels'][0] == full['chart_data']['labels'][0]
+    assert chart['labels'][-1] == full['chart_data']['labels'][-1]
+    assert client.get('/api/history/chart?max_points=40').get_json()['cached']
+
+    # A new session changes the cache key
+    from database import db
+    from models.session import SpeechSession
+    with client.application.app_context():
+        db.session.add(SpeechSession(user_id=1, confidence=99, wpm=150, fillers=0, created_at=datetime(2025, 1, 1)))
+        db.session.commit()
+    data = client.get('/api/history/chart?max_points=40').get_json()
+    assert not data['cached'] and data['total_sessions'] == 301 and data['chart_data']['confidence'][-1] == 99
+
+    assert client.get('/api/history/chart?max_points=1').status_code == 400
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
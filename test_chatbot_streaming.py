@@ -0,0 +1,130 @@
+"""
+Tests for streamed chatbot responses, using the offline OpenAI stream mock
+"""
+
+import sys
+import json
+sys.path.append('backend')
+
+import pytest
+
+from services.streaming import (
+    StreamTimer, StreamMetrics, sse_stream, paragraph_chunks, mock_chat_completion_stream, chunk_delta
+)
+from services.response_cache import ResponseCache, MemoryCacheBackend
+from services.conversation_store import ConversationStore
+
+REPLY = "Use the STAR method.\n\nDescribe the situation, task, action and result."
+
+def parse_events(stream):
+    events = []
+    for raw in stream:
+        lines = dict(line.split(": ", 1) for line in raw.strip().split("\n"))
+        events.append((lines.get('event'), json.loads(lines['data'])))
+    return events
+
+@pytest.fixture
+def chatbot(monkeypatch):
+    openai = pytest.importorskip("openai")
+    from services.universal_chatbot import UniversalChatbot
+
+    calls = []
+    def fake_create(**kwargs):
+        calls.append(kwargs)
+        assert kwargs['stream'] is True
+        return mock_chat_completion_stream(REPLY, words_per_chunk=2, delay=0.01)
+    monkeypatch.setattr(openai.ChatCompletion, "create", fake_create)
+
+    bot = UniversalChatbot()
+    bot.openai_available = True
+    bot.cache = ResponseCache(MemoryCacheBackend(), ttl_seconds=60)
+    bot.conversations = ConversationStore('test', persist_path=None)
+    bot.calls = calls
+    return bot
+
+def test_mock_stream_reassembles_to_the_reply():
+    assert ''.join(chunk_delta(c) for c in mock_chat_completion_stream(REPLY)) == REPLY
+    assert ''.join(paragraph_chunks(REPLY)) == REPLY
+    assert paragraph_chunks("one\n\ntwo\n\n") == ["one\n\n", "two\n\n"]
+
+def test_openai_tokens_are_forwarded_as_they_arrive(chatbot):
+    timer = StreamTimer('chat')
+    metrics = StreamMetrics()
+    events = parse_events(sse_stream(chatbot.stream_response("How do I answer?", timer=timer), timer, metrics))
+
+    tokens = [data['text'] for event, data in events if event == 'token']
+    done = events[-1][1]
+    assert len(tokens) == 5
+    assert ''.join(tokens) == REPLY
+    assert done['response'] == REPLY and done['source'] == 'openai'
+    assert done['ttft_ms'] < done['total_ms']
+    assert metrics.get_stats()['openai']['requests'] == 1
+
+    # The assembled reply is cached and replayed by paragraph to another conversation
+    timer = StreamTimer('chat')
+    stream = chatbot.stream_response("how do i answer?", timer=timer, conversation_key='other')
+    events = parse_events(sse_stream(stream, timer, metrics))
+    assert [data['text'] for event, data in events if event == 'token'] == paragraph_chunks(REPLY)
+    assert events[-1][1]['source'] == 'cache'
+    assert len(chatbot.calls) == 1
+    assert [m['role'] for m in chatbot.conversation_history] == ['user', 'assistant']
+    assert [m['role'] for m in chatbot.conversations.history('other')] == ['user', 'assistant']
+
+def test_fallback_streams_by_paragraph(chatbot):
+    chatbot.openai_available = False
+    timer = StreamTimer('chat')
+    pieces = list(chatbot.stream_response("Tell me about the STAR method for interviews", timer=timer))
+
+    assert timer.source == 'fallback'
+    assert len(pieces) > 1
+    assert ''.join(pieces) == chatbot._get_enhanced_fallback_response("Tell me about the STAR method for interviews")
+    assert chatbot.calls == []
+
+def test_mock_streams_are_not_cached_or_banked(chatbot, monkeypatch):
+    import services.universal_chatbot as universal_module
+    from services.answer_bank import should_store
+
+    monkeypatch.setattr(universal_module, 'MOCK_OPENAI_STREAM', True)
+    for _ in range(2):
+        timer = StreamTimer('chat')
+        assert ''.join(chatbot.stream_response("Tell me about the STAR method", timer=timer, conversation_key='new'))
+        assert timer.source == 'mock'
+    assert len(chatbot.cache.backend) == 0 and chatbot.calls == []
+    assert not should_store(timer.source)
+
+def test_only_complete_replies_without_history_are_banked(chatbot, monkeypatch, tmp_path):
+    pytest.importorskip("flask")
+    import openai
+    import routes.ai_assistant as ai_assistant
+    from services.answer_bank import AnswerBank
+
+    bank = AnswerBank(str(tmp_path / "answer_bank.db"))
+    monkeypatch.setattr(ai_assistant, 'answer_bank', bank)
+
+    def ask(question, conversation):
+        timer = StreamTimer('chat')
+        pieces = chatbot.stream_response(question, conversation_key=conversation, timer=timer)
+        return ''.join(ai_assistant._banking_stream(question, '', '', pieces, timer)), timer
+
+    # A reply cut off at the token limit is shown but neither cached nor banked
+    complete = openai.ChatCompletion.create
+    def truncated(**kwargs):
+        yield {'choices': [{'index': 0, 'delta': {'content': 'Use the STAR'}, 'finish_reason': None}]}
+        yield {'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'length'}]}
+    monkeypatch.setattr(openai.ChatCompletion, "create", truncated)
+    text, timer = ask("What is the STAR method?", 'a')
+    assert text == 'Use the STAR' and not timer.completed
+    assert bank.get("What is the STAR method?") is None and len(chatbot.cache.backend) == 0
+
+    monkeypatch.setattr(openai.ChatCompletion, "create", complete)
+    text, timer = ask("What is the STAR method?", 'b')
+    assert timer.completed and not timer.with_history
+    assert bank.get("What is the STAR method?") == REPLY
+
+    # A follow-up depends on the earlier turns
+    text, timer = ask("Can you give an example?", 'b')
+    assert timer.completed and timer.with_history
+    assert bank.get("Can you give an example?") is None
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,146 @@
+"""
+Tests for ETag/Last-Modified handling and response caching of the history endpoints
+"""
+
+import sys
+from datetime import datetime, timedelta
+sys.path.append('backend')
+
+import pytest
+
+@pytest.fixture
+def seed_sessions():
+    from models.session import SpeechSession
+
+    start = datetime(2024, 1, 1)
+    sessions = [SpeechSession(user_id=1, transcript=f"session {i}", wpm=100 + i, confidence=60 + i,
+                              fillers=i, sentiment=0.2, created_at=start + timedelta(hours=i))
+                for i in range(5)]
+    return sessions + [SpeechSession(user_id=2, transcript="other user", created_at=start)]
+
+def count_queries(app):
+    from sqlalchemy import event
+    from database import db
+
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', lambda conn, cursor, statement, *args: statements.append(statement))
+    return statements
+
+def test_unchanged_history_is_not_modified(app, client):
+    first = client.get('/api/history')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert etag.startswith('W/"') and first.headers['Last-Modified']
+    assert 'private' in first.headers['Cache-Control']
+
+    statements = count_queries(app)
+    again = client.get('/api/history', headers={'If-None-Match': etag})
+    assert again.status_code == 304 and again.data == b''
+    # Only the watermark lookup ran
+    assert len([s for s in statements if s.lstrip().upper().startswith('SELECT')]) == 1
+
+    by_date = client.get('/api/history', headers={'If-Modified-Since': first.headers['Last-Modified']})
+    assert by_date.status_code == 304
+
+def test_cached_body_is_served_until_sessions_change(app, client):
+    from database import db
+    from models.session import SpeechSession
+    from middleware.conditional_get import history_responses
+
+    first = client.get('/api/history?limit=2')
+    statements = count_queries(app)
+    cached = client.get('/api/history?limit=2')
+    assert cached.data == first.data and cached.headers['ETag'] == first.headers['ETag']
+    assert len(statements) == 1 and history_responses.get_stats()['hits'] == 1
+
+    # Different URLs are versioned separately
+    assert client.get('/api/history?limit=3').headers['ETag'] != first.headers['ETag']
+
+    with app.app_context():
+        db.session.add(SpeechSession(user_id=1, transcript="new one", created_at=datetime(2024, 2, 1)))
+        db.session.commit()
+    fresh = client.get('/api/history?limit=2', headers={'If-None-Match': first.headers['ETag']})
+    assert fresh.status_code == 200 and fresh.headers['ETag'] != first.headers['ETag']
+    assert fresh.get_json()['sessions'][0]['transcript'] == "new one"
+
+def test_other_users_changes_do_not_invalidate(app, client):
+    from database import db
+    from models.session import SpeechSession
+
+    etag = client.get('/history').headers['ETag']
+    with app.app_context():
+        db.session.add(SpeechSession(user_id=2, transcript="someone else", created_at=datetime(2024, 3, 1)))
+        db.session.commit()
+    assert client.get('/history', headers={'If-None-Match': etag}).status_code == 304
+
+def test_session_detail_tracks_edits(app, client):
+    from database import db
+    from models.session import SpeechSession
+
+    with app.app_context():
+        session_id = SpeechSession.query.filter_by(user_id=1).first().id
+    response = client.get(f'/session/{session_id}')
+    etag = response.headers['ETag']
+
+    with app.app_context():
+        session = SpeechSession.query.get(session_id)
+        session.transcript = "edited"
+        db.session.commit()
+    edited = client.get(f'/session/{session_id}', headers={'If-None-Match': etag})
+    assert edited.status_code == 200 and edited.get_json()['transcript'] == "edited"
+
+    missing = client.get('/session/99999')
+    assert missing.status_code == 404 and 'ETag' not in missing.headers
+
+def test_only_known_query_parameters_are_cached(app, client):
+    from middleware.conditional_get import history_responses
+
+    first = client.get('/api/history?limit=2&fields=wpm')
+    hits = history_responses.get_stats()['hits']
+    # Same parameters in another order: the cached body
+    assert client.get('/api/history?fields=wpm&limit=2').get_data() == first.get_data()
+    assert history_responses.get_stats()['hits'] == hits + 1
+
+    # Parameters the view ignores are tagged but never stored
+    tracked = client.get('/api/history?limit=2&fields=wpm&utm_source=mail')
+    assert tracked.status_code == 200 and tracked.headers['ETag']
+    assert history_responses.get_stats()['responses'] == 1
+
+def test_cache_is_bounded_per_user_and_in_bytes():
+    pytest.importorskip("flask_sqlalchemy")
+    from middleware.conditional_get import HistoryResponseCache
+
+    cache = HistoryResponseCache(max_users=10, max_variants=2, max_bytes=1000)
+    for page in range(3):
+        cache.set(1, f'/api/history?cursor={page}', 'w', b'x' * 100, 'application/json')
+    assert cache.get(1, '/api/history?cursor=0', 'w') is None
+    assert cache.get(1, '/api/history?cursor=2', 'w') is not None
+    assert cache.get_stats()['bytes'] == 200
+
+    # Over the byte budget the least recently used users go first
+    for user_id in range(2, 7):
+        cache.set(user_id, '/api/history', 'w', b'x' * 200, 'application/json')
+    stats = cache.get_stats()
+    assert stats['bytes'] <= 1000 and cache.get(1, '/api/history?cursor=2', 'w') is None
+    assert cache.get(6, '/api/history', 'w') is not None
+
+    # A body over a quarter of the budget is not kept at all
+    cache.set(7, '/api/history', 'w', b'x' * 300, 'application/json')
+    assert cache.get(7, '/api/history', 'w') is None
+    cache.clear()
+    assert cache.get_stats()['bytes'] == 0
+
+def test_watermark_query_uses_the_covering_index(app):
+    from sqlalchemy import text
+    from database import db
+
+    with app.app_context():
+        plan = db.session.execute(text(
+            "EXPLAIN QUERY PLAN SELECT max(id), count(id), max(updated_at) FROM speech_session WHERE user_id = 1"
+        )).fetchall()
+    detail = ' '.join(row[-1] for row in plan)
+    assert 'COVERING INDEX ix_speech_session_user_updated' in detail
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
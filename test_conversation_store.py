@@ -0,0 +1,80 @@
+"""
+Tests for the per-user conversation store
+"""
+
+import sys
+import time
+sys.path.append('backend')
+
+import pytest
+
+from services.conversation_store import ConversationStore, conversation_key
+
+def test_histories_are_ring_buffers():
+    store = ConversationStore('test', max_messages=3, persist_path=None)
+    key = conversation_key(1)
+    for i in range(5):
+        store.append(key, 'user', f"message {i}")
+
+    assert [m['content'] for m in store.history(key)] == ["message 2", "message 3", "message 4"]
+    assert [m['content'] for m in store.history(key, limit=2)] == ["message 3", "message 4"]
+
+def test_users_do_not_share_history_or_context():
+    store = ConversationStore('test', default_context={'session_stage': 'initial'}, persist_path=None)
+    alice, bob = conversation_key(1), conversation_key(2)
+    store.append(alice, 'user', "hello from alice")
+    store.update_context(alice, session_stage='practicing')
+
+    assert store.history(bob) == []
+    assert store.get_context(bob) == {'session_stage': 'initial'}
+    assert store.get_context(alice) == {'session_stage': 'practicing'}
+    assert conversation_key(1, 'tab-2') != alice
+
+def test_memory_is_bounded_by_lru_eviction_and_idle_expiry():
+    store = ConversationStore('test', max_conversations=2, idle_ttl=0.05, max_message_chars=10, persist_path=None)
+    store.append("a", 'user', "x" * 100)
+    store.append("b", 'user', "b")
+    store.get("a")
+    store.append("c", 'user', "c")
+
+    assert len(store) == 2
+    assert store.history("a")[0]['content'] == "x" * 10
+    assert store.get_stats()['evictions'] == 1
+
+    time.sleep(0.06)
+    store.get("d")
+    assert len(store) == 1
+    assert store.get_stats()['expirations'] == 2
+
+def test_sqlite_tier_reloads_evicted_conversations(tmp_path):
+    path = str(tmp_path / "conversations.db")
+    store = ConversationStore('test', max_messages=2, max_conversations=1, persist_path=path)
+    store.append("a", 'user', "first")
+    store.append("a", 'assistant', "second")
+    store.append("a", 'user', "third")
+    store.update_context("a", selected_category='technical')
+    store.append("b", 'user', "evicts a")
+
+    assert [m['content'] for m in store.history("a")] == ["second", "third"]
+    assert store.get_context("a") == {'selected_category': 'technical'}
+
+    other = ConversationStore('other', persist_path=path)
+    assert other.history("a") == []
+
+def test_chatbot_keeps_context_per_conversation():
+    pytest.importorskip("openai")
+    from services.universal_chatbot import UniversalChatbot
+
+    chatbot = UniversalChatbot()
+    chatbot.openai_available = False
+    chatbot.conversations = ConversationStore('test', default_context={'session_stage': 'initial'}, persist_path=None)
+
+    chatbot.update_context(conversation_key(1), selected_category='behavioral')
+    chatbot.get_response("hello", conversation_key=conversation_key(1))
+
+    assert chatbot.conversations.get_context(conversation_key(2)).get('selected_category') is None
+    assert len(chatbot.conversations.history(conversation_key(1))) == 1
+    assert chatbot.conversation_history == []
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,98 @@
+"""
+Tests for the exemplar answer index (flat and IVF search, mmap persistence)
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from backend.services.exemplar_index import ExemplarIndex, Exemplar
+
+DIMENSION = 384
+
+def make_bank(count, clusters=64, seed=0):
+    """Generate clustered random vectors, similar in shape to sentence embeddings"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, DIMENSION)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=count)
+    vectors = centers[labels] + 0.4 * rng.normal(size=(count, DIMENSION)).astype(np.float32)
+    exemplars = [Exemplar(f"answer {i}", "test", f"cluster-{labels[i]}") for i in range(count)]
+    return vectors.astype(np.float32), exemplars
+
+def test_flat_index_returns_exact_neighbours():
+    vectors, exemplars = make_bank(500)
+    index = ExemplarIndex.build(vectors, exemplars)
+    assert not index.is_ivf
+
+    matches = index.search(vectors[42], k=3)
+    assert matches[0].text == "answer 42"
+    assert matches[0].similarity == pytest.approx(1.0, abs=1e-5)
+    assert [m.similarity for m in matches] == sorted([m.similarity for m in matches], reverse=True)
+
+def test_ivf_index_recall_against_brute_force():
+    vectors, exemplars = make_bank(20000)
+    index = ExemplarIndex.build(vectors, exemplars, n_lists=128)
+    assert index.is_ivf
+
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    rng = np.random.default_rng(1)
+    hits = 0
+    queries = rng.choice(len(vectors), 50, replace=False)
+    for query_id in queries:
+        query = vectors[query_id] + 0.1 * rng.normal(size=DIMENSION).astype(np.float32)
+        query /= np.linalg.norm(query)
+        expected = set(np.argsort(-(normalized @ query))[:5])
+        found = {int(m.text.split()[1]) for m in index.search(query, k=5)}
+        hits += len(expected & found)
+
+    recall = hits / (5 * len(queries))
+    print(f"IVF recall@5: {recall:.2%}")
+    assert recall >= 0.9
+
+def test_save_and_load_roundtrip(tmp_path):
+    vectors, exemplars = make_bank(6000)
+    index = ExemplarIndex.build(vectors, exemplars, n_lists=32)
+    path = str(tmp_path / "exemplars.bin")
+    index.save(path)
+
+    loaded = ExemplarIndex.load(path)
+    assert len(loaded) == len(index)
+    assert loaded.is_ivf
+    assert loaded.search(vectors[7], k=1)[0].text == index.search(vectors[7], k=1)[0].text
+
+def test_texts_are_stored_outside_the_header(tmp_path):
+    from backend.services.artifact_store import load_artifact
+    from backend.services.exemplar_index import INDEX_KIND, INDEX_VERSION
+
+    vectors, exemplars = make_bank(300)
+    exemplars[5] = Exemplar("Unicode answer: café, 日本語", "curated", "general")
+    path = str(tmp_path / "exemplars.bin")
+    ExemplarIndex.build(vectors, exemplars).save(path)
+
+    artifact = load_artifact(path, INDEX_KIND, INDEX_VERSION)
+    assert 'exemplars' not in artifact.meta and "answer 7" not in str(artifact.meta)
+    artifact.close()
+
+    loaded = ExemplarIndex.load(path)
+    assert loaded.exemplars[5] == exemplars[5] and loaded.exemplars[-1] == exemplars[-1]
+    assert loaded.search(vectors[5], k=1)[0].text == "Unicode answer: café, 日本語"
+
+def test_search_latency_for_100k_bank():
+    vectors, exemplars = make_bank(100000, clusters=256)
+    index = ExemplarIndex.build(vectors, exemplars, kmeans_iterations=5)
+
+    rng = np.random.default_rng(2)
+    queries = rng.normal(size=(200, DIMENSION)).astype(np.float32)
+    index.search(queries[0], k=5)  # warm up
+
+    start = time.perf_counter()
+    for query in queries:
+        index.search(query, k=5)
+    average_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+    print(f"Average top-5 search over 100k exemplars: {average_ms:.3f}ms")
+    assert average_ms < 1.0
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,79 @@
+"""
+Tests for cursor pagination, field projection and the chart endpoint of the history API
+"""
+
+import sys
+from datetime import datetime, timedelta
+sys.path.append('backend')
+
+import pytest
+
+from utils.pagination import (
+    encode_cursor, decode_cursor, parse_limit, parse_fields, PaginationError, SESSION_COLUMNS, MAX_PAGE_SIZE
+)
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 3, 1, 12, 30, 5, 123456)
+    cursor = encode_cursor(created_at, 42)
+    assert '|' not in cursor and '=' not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+    with pytest.raises(PaginationError):
+        decode_cursor("not-a-cursor")
+
+def test_limit_and_fields_parsing():
+    assert parse_limit(None) == 20
+    assert parse_limit("5") == 5
+    assert parse_limit("100000") == MAX_PAGE_SIZE
+    for bad in ("0", "abc"):
+        with pytest.raises(PaginationError):
+            parse_limit(bad)
+
+    assert parse_fields(None) == SESSION_COLUMNS
+    assert parse_fields("wpm, confidence,id") == ['wpm', 'confidence']
+    with pytest.raises(PaginationError):
+        parse_fields("wpm,password_hash")
+
+@pytest.fixture
+def seed_sessions():
+    from models.session import SpeechSession
+
+    start = datetime(2024, 1, 1)
+    # Pairs of sessions share a timestamp to exercise the id tie-break
+    sessions = [SpeechSession(user_id=1, transcript=f"session {i}", wpm=100 + i, confidence=i,
+                              fillers=i % 3, strengths='["clear"]', created_at=start + timedelta(hours=i // 2))
+                for i in range(25)]
+    return sessions + [SpeechSession(user_id=2, transcript="other user", created_at=start)]
+
+def test_pages_cover_every_session_once(client):
+    seen, cursor = [], None
+    while True:
+        url = '/api/history?limit=10' + (f'&cursor={cursor}' if cursor else '')
+        data = client.get(url).get_json()
+        seen.extend(s['transcript'] for s in data['sessions'])
+        cursor = data['next_cursor']
+        if not data['has_more']:
+            break
+
+    assert len(seen) == 25 and len(set(seen)) == 25
+    assert seen[0] == "session 24" and seen[-1] == "session 0"
+
+def test_fields_projection(client):
+    data = client.get('/api/history?limit=3&fields=wpm,strengths').get_json()
+    session = data['sessions'][0]
+    assert set(session) == {'id', 'wpm', 'strengths', 'created_at', 'created_at_chart'}
+    assert session['strengths'] == ['clear']
+    assert client.get('/api/history?fields=bogus').status_code == 400
+
+def test_unpaginated_response_is_unchanged(client):
+    data = client.get('/api/history').get_json()
+    assert data['total_sessions'] == 25 and len(data['sessions']) == 25
+    assert data['chart_data']['confidence'] == list(range(25))
+    assert 'transcript' in data['sessions'][0]
+
+def test_chart_endpoint(client):
+    data = client.get('/api/history/chart').get_json()
+    assert data['chart_data']['wpm'] == [100 + i for i in range(25)]
+    assert len(data['chart_data']['labels']) == 25
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
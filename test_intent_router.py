@@ -0,0 +1,94 @@
+"""
+Tests and benchmark for the general-question intent router
+"""
+
+import sys
+import time
+sys.path.append('backend')
+
+import pytest
+
+from services.intent_router import IntentRouter, GENERAL_INTENTS
+
+def legacy_route(message):
+    """The substring if/elif cascade the router replaced"""
+    lower = message.lower()
+    for name, keywords in GENERAL_INTENTS:
+        if any(word in lower for word in keywords):
+            return name
+    return None
+
+MESSAGES = [
+    "How do I start learning Python programming?",
+    "Can you explain what an API is?",
+    "What is the formula for compound interest in math?",
+    "How should I budget my money as a student?",
+    "Give me some marketing ideas for my startup",
+    "How can I reduce stress before exams?",
+    "What diet and exercise plan is good for beginners?",
+    "What is the best way to study for a university course?",
+    "Can you help me write a short story?",
+    "How do I improve my public speaking and presentation skills?",
+    "How do I become better at leadership in my team?",
+    "I need advice on a difficult decision",
+    "Hello there",
+    "Good morning, how are you?",
+    "Thanks a lot for the help",
+    "I really appreciate it",
+    "What is the capital of France?",
+    "Explain SQL joins with an example",
+    "What is physics about?",
+    "Tips for designing a blog?",
+    "What should I do about a problem with my landlord?",
+    "How do you calculate the area of a circle?",
+    "What is react used for?",
+    "How does chemistry relate to biology?",
+]
+
+def test_routes_each_topic():
+    router = IntentRouter()
+    assert router.route("How do I learn Python programming?").intent == 'programming'
+    assert router.route("Thanks so much!").intent == 'thanks'
+    assert router.route("hello").intent == 'greeting'
+    assert router.route("What is the capital of France?") is None
+
+def test_word_boundaries_fix_substring_false_positives():
+    router = IntentRouter()
+    # The cascade matched 'hi' inside 'this' and 'api' inside 'rapid'
+    assert legacy_route("Is this a rapid change?") == 'programming'
+    assert router.route("Is this a rapid change?") is None
+    # Inflections of keywords still match
+    assert router.route("I am writing stories").intent == 'creative'
+
+def test_confidence_reflects_competing_intents():
+    router = IntentRouter()
+    single = router.route("Explain SQL joins")
+    assert single.confidence == 1.0
+    mixed = router.route("Should I study Python or math at university?")
+    assert mixed.intent == 'education' and mixed.confidence < 1.0
+    assert set(mixed.scores) == {'programming', 'science', 'education'}
+
+def test_chatbot_uses_the_router():
+    from services.universal_chatbot import UniversalChatbot
+    chatbot = UniversalChatbot()
+    response = chatbot._handle_general_question("thanks a lot", "Thanks a lot")
+    assert response == chatbot._get_thanks_response("thanks a lot", "Thanks a lot")
+
+def test_benchmark_against_cascade():
+    router = IntentRouter()
+    messages = MESSAGES * 200
+
+    start = time.perf_counter()
+    legacy = [legacy_route(m) for m in messages]
+    legacy_us = (time.perf_counter() - start) / len(messages) * 1e6
+
+    start = time.perf_counter()
+    routed = [router.route(m) for m in messages]
+    router_us = (time.perf_counter() - start) / len(messages) * 1e6
+
+    agreement = sum(a == (b.intent if b else None) for a, b in zip(legacy, routed)) / len(messages)
+    print(f"cascade {legacy_us:.1f}us, router {router_us:.1f}us per message, agreement {agreement:.0%}")
+    assert agreement >= 0.75
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,64 @@
+"""
+Tests for the precompiled keyword automaton used by the simple relevance analyzer
+"""
+
+import sys
+sys.path.append('backend')
+
+from services.keyword_automaton import PhraseMatcher, tokenize
+from services.question_relevance_simple import QuestionRelevanceAnalyzer, QuestionType
+
+def test_phrase_matcher_respects_word_boundaries():
+    matcher = PhraseMatcher()
+    matcher.add("cat", "off_topic")
+    matcher.add("good at", "skills")
+    matcher.add("achieve", "achieve", expand_inflections=True)
+
+    assert matcher.match("I communicate with dedication") == set()
+    assert matcher.match("My cat is great") == {"off_topic"}
+    assert matcher.match("I am good at Python and achieved a lot") == {"skills", "achieve"}
+    assert matcher.match("goodat") == set()
+
+def test_tokenize_strips_punctuation():
+    assert tokenize("Hello, world! It's—fine.") == ["hello", "world", "it", "s", "fine"]
+
+def test_synonyms_map_to_canonical_keywords():
+    analyzer = QuestionRelevanceAnalyzer()
+    matches = analyzer._match_answer("I worked as a professional engineer and I am good at analytical thinking.")
+    assert ("expected", "experience") in matches
+    assert ("expected", "skills") in matches
+
+def test_substring_false_positives_are_not_penalized():
+    analyzer = QuestionRelevanceAnalyzer()
+    result = analyzer.analyze_relevance(
+        "Why should we hire you?",
+        "You should hire me because I bring dedication, quality and enthusiasm. "
+        "I can contribute to the team and deliver value."
+    )
+    assert "Avoid discussing unrelated topics" not in result.feedback.improvements
+    assert result.relevance_score >= 60
+
+def test_off_topic_words_are_penalized():
+    analyzer = QuestionRelevanceAnalyzer()
+    result = analyzer.analyze_relevance("Tell me about yourself", "I love my dog and my cat, and music is my hobby.")
+    assert result.relevance_score == 0
+    assert "Avoid discussing unrelated topics" in result.feedback.improvements
+
+def test_batch_matches_single_analysis():
+    analyzer = QuestionRelevanceAnalyzer()
+    pairs = [
+        ("Tell me about yourself", "I have experience in software development and my goal is to grow as a leader."),
+        ("Why should we hire you?", "I bring quality and dedication to every project I deliver."),
+        ("Tell me about yourself", "I like pizza and the weather is nice."),
+    ]
+    batch = analyzer.analyze_batch(pairs)
+    single = [analyzer.analyze_relevance(q, a) for q, a in pairs]
+
+    assert [r.relevance_score for r in batch] == [r.relevance_score for r in single]
+    assert [r.question_type for r in batch] == [r.question_type for r in single]
+    assert batch[1].question_type == QuestionType.VALUE_PROPOSITION
+    assert analyzer.score_batch(pairs) == [r.relevance_score for r in single]
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,92 @@
+"""
+Tests and benchmark for the automaton-indexed knowledge base lookup
+"""
+
+import sys
+import time
+import random
+sys.path.append('backend')
+
+from services.keyword_automaton import AhoCorasick
+from services.comprehensive_knowledge_base import ComprehensiveKnowledgeBase
+
+def legacy_get_response(knowledge_base, question):
+    """The original scan over every keyword of every topic"""
+    question_lower = question.lower().strip()
+    best_match = None
+    best_match_length = 0
+    for topic, data in knowledge_base.items():
+        for keyword in data['keywords']:
+            if keyword in question_lower:
+                if len(keyword) > best_match_length:
+                    best_match = data['response']
+                    best_match_length = len(keyword)
+    return best_match
+
+def test_automaton_finds_highest_priority_substring():
+    automaton = AhoCorasick()
+    automaton.add("he", "he", (2,))
+    automaton.add("she", "she", (3,))
+    automaton.add("hers", "hers", (4,))
+    automaton.add("his", "his", (3,))
+
+    assert automaton.best_match("ushers") == "hers"
+    assert automaton.best_match("ahishe") == "his"
+    assert automaton.best_match("xyz") is None
+
+    automaton.remove("hers", "hers")
+    assert automaton.best_match("ushers") == "she"
+    assert len(automaton) == 3
+
+def test_matches_legacy_lookup_on_builtin_topics():
+    kb = ComprehensiveKnowledgeBase()
+    questions = [
+        "What is a DBMS?", "Explain database management", "what are variables in python",
+        "Tell me about machine learning and deep learning", "How does recursion work?",
+        "hello there", "What is big data analytics?", "explain oops concepts", "",
+    ]
+    keywords = [k for data in kb.knowledge_base.values() for k in data['keywords']]
+    random.seed(0)
+    for _ in range(200):
+        questions.append("please explain " + " and ".join(random.sample(keywords, 3)))
+
+    for question in questions:
+        assert kb.get_response(question) == legacy_get_response(kb.knowledge_base, question)
+
+def test_add_knowledge_updates_the_index():
+    kb = ComprehensiveKnowledgeBase()
+    kb.add_knowledge('quantum', ['quantum computing'], "Qubits")
+    assert kb.get_response("What is quantum computing?") == "Qubits"
+
+    kb.add_knowledge('quantum', ['qubit'], "Replaced")
+    assert kb.get_response("What is quantum computing?") == legacy_get_response(kb.knowledge_base, "What is quantum computing?")
+    assert kb.get_response("what is a qubit") == "Replaced"
+
+def test_benchmark_10k_topics():
+    kb = ComprehensiveKnowledgeBase()
+    random.seed(1)
+    vocabulary = [''.join(random.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(random.randint(4, 9)))
+                  for _ in range(3000)]
+    for i in range(10000 - len(kb.knowledge_base)):
+        words = random.sample(vocabulary, 3)
+        kb.add_knowledge(f"topic_{i}", [words[0], f"{words[0]} {words[1]}", f"what is {words[2]}"], f"response {i}")
+    assert len(kb.get_all_topics()) == 10000
+
+    messages = [f"Can you explain {' '.join(random.sample(vocabulary, 4))} to me please?" for _ in range(50)]
+
+    start = time.perf_counter()
+    legacy = [legacy_get_response(kb.knowledge_base, m) for m in messages]
+    legacy_ms = (time.perf_counter() - start) / len(messages) * 1000
+
+    kb.get_response("warm up")
+    start = time.perf_counter()
+    indexed = [kb.get_response(m) for m in messages]
+    indexed_ms = (time.perf_counter() - start) / len(messages) * 1000
+
+    print(f"10k topics: legacy scan {legacy_ms:.2f}ms, automaton {indexed_ms:.3f}ms per message")
+    assert indexed == legacy
+    assert indexed_ms * 10 < legacy_ms
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v", "-s"])
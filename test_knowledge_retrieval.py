@@ -0,0 +1,162 @@
+"""
+Tests for embedding retrieval over the knowledge bases (with a deterministic fake encoder)
+"""
+
+import sys
+import time
+import threading
+sys.path.append('backend')
+
+import numpy as np
+import pytest
+
+from services.knowledge_retrieval import KnowledgeRetriever, KnowledgeEntry, collect_knowledge_entries
+
+DIMENSION = 256
+
+def hashing_encoder(texts):
+    """Bag-of-words hashed into a fixed number of dimensions"""
+    vectors = np.zeros((len(texts), DIMENSION), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.lower().replace(',', ' ').replace('.', ' ').replace(':', ' ').split():
+            vectors[row, hash(word) % DIMENSION] += 1.0
+    return vectors
+
+ENTRIES = [
+    KnowledgeEntry('comprehensive', 'dbms', ['database management system'], "A DBMS stores and manages data."),
+    KnowledgeEntry('comprehensive', 'recursion', ['recursion', 'recursive function'], "A function that calls itself."),
+    KnowledgeEntry('interview', 'salary', ['salary', 'negotiate pay'], "Research market rates first."),
+]
+
+def test_retrieves_the_closest_entry_above_threshold():
+    retriever = KnowledgeRetriever.from_entries(ENTRIES, encoder=hashing_encoder, threshold=0.3)
+
+    match = retriever.answer("how do I negotiate my salary and pay")
+    assert match.topic == 'salary' and match.source == 'interview'
+    assert [m.topic for m in retriever.retrieve("recursive function calls itself", k=2)][0] == 'recursion'
+    assert retriever.answer("zebra giraffe elephant") is None
+
+def test_query_embeddings_are_cached():
+    calls = []
+    def counting_encoder(texts):
+        calls.append(list(texts))
+        return hashing_encoder(texts)
+
+    retriever = KnowledgeRetriever.from_entries(ENTRIES, encoder=counting_encoder)
+    retriever.retrieve("What is recursion?")
+    retriever.retrieve("what is   RECURSION?")
+    assert len(calls) == 2
+    assert retriever.get_stats()['query_cache_hits'] == 1
+
+def test_sync_embeds_only_new_or_changed_entries(tmp_path):
+    retriever = KnowledgeRetriever.from_entries(ENTRIES, encoder=hashing_encoder)
+    path = str(tmp_path / "knowledge.bin")
+    retriever.save(path)
+
+    loaded = KnowledgeRetriever.load(path, encoder=hashing_encoder, threshold=0.3)
+    assert len(loaded) == 3
+    assert loaded.sync(ENTRIES) == 0
+
+    updated = ENTRIES[:2] + [
+        KnowledgeEntry('interview', 'salary', ['compensation offer'], "Anchor high."),
+        KnowledgeEntry('comprehensive', 'quantum', ['quantum computing', 'qubit'], "Qubits."),
+    ]
+    assert loaded.sync(updated) == 2
+    assert len(loaded) == 4
+    assert loaded.answer("explain quantum computing qubit").topic == 'quantum'
+    assert loaded.answer("compensation offer").response == "Anchor high."
+
+def test_entries_are_stored_outside_the_header(tmp_path):
+    from services.artifact_store import load_artifact
+    from services.knowledge_retrieval import INDEX_KIND, INDEX_VERSION, StoredKnowledgeEntries
+
+    entries = ENTRIES + [KnowledgeEntry('interview', 'unicode', [], "Café, 日本語.")]
+    path = str(tmp_path / "knowledge.bin")
+    KnowledgeRetriever.from_entries(entries, encoder=hashing_encoder).save(path)
+
+    artifact = load_artifact(path, INDEX_KIND, INDEX_VERSION)
+    assert 'entries' not in artifact.meta and "calls itself" not in str(artifact.meta)
+    artifact.close()
+
+    loaded = KnowledgeRetriever.load(path, encoder=hashing_encoder, threshold=0.3)
+    assert isinstance(loaded.entries, StoredKnowledgeEntries)
+    assert list(loaded.entries) == entries and loaded.entries[-1].keywords == []
+    assert loaded.answer("what is a recursive function").response == "A function that calls itself."
+
+def test_builtin_knowledge_bases_are_collected():
+    entries = collect_knowledge_entries()
+    sources = {entry.source for entry in entries}
+    assert sources == {'comprehensive', 'interview'}
+    assert all(entry.document() for entry in entries)
+
+def test_search_over_50k_entries_is_one_matrix_product():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((50000, 384)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    entries = [KnowledgeEntry('comprehensive', f"topic_{i}", [], f"response {i}") for i in range(50000)]
+    retriever = KnowledgeRetriever(entries, vectors)
+
+    query = vectors[1234] + 0.01 * rng.standard_normal(384).astype(np.float32)
+    retriever.search(query)
+    start = time.perf_counter()
+    for _ in range(20):
+        matches = retriever.search(query, k=3)
+    elapsed_ms = (time.perf_counter() - start) / 20 * 1000
+
+    print(f"50k entries: {elapsed_ms:.2f}ms per query")
+    assert matches[0].topic == "topic_1234"
+    assert elapsed_ms < 50
+
+@pytest.fixture
+def shared_retriever(monkeypatch):
+    """A fresh process-wide retriever slot"""
+    import services.knowledge_retrieval as knowledge_retrieval
+    monkeypatch.setattr(knowledge_retrieval, 'RETRIEVAL_ENABLED', True)
+    monkeypatch.setattr(knowledge_retrieval, '_retriever', None)
+    monkeypatch.setattr(knowledge_retrieval, '_retriever_thread', None)
+    monkeypatch.setattr(knowledge_retrieval, '_sync_attempted_version', None)
+    return knowledge_retrieval
+
+def test_retriever_opens_off_the_request_path_and_failures_are_final(shared_retriever, monkeypatch, tmp_path):
+    calls = []
+    release = threading.Event()
+
+    def failing_build(cls, entries, **kwargs):
+        calls.append(len(entries))
+        release.wait(2)
+        raise RuntimeError("model download failed")
+    monkeypatch.setattr(KnowledgeRetriever, 'from_entries', classmethod(failing_build))
+    path = str(tmp_path / "missing.bin")
+
+    # Requests while the index is being embedded get no retrieved answer instead of waiting
+    start = time.perf_counter()
+    assert shared_retriever.retrieve_answer("What is recursion?") is None
+    assert time.perf_counter() - start < 0.5
+    release.set()
+
+    assert shared_retriever.get_knowledge_retriever(path, wait=True) is None
+    assert shared_retriever.retrieve_answer("What is recursion?") is None
+    assert len(calls) == 1
+
+def test_failed_sync_is_not_retried_until_the_knowledge_changes(shared_retriever, monkeypatch, tmp_path):
+    from services.comprehensive_knowledge_base import comprehensive_kb
+    retriever = KnowledgeRetriever.from_entries(ENTRIES, encoder=hashing_encoder)
+    retriever.synced_version = -1
+    syncs = []
+
+    def failing_sync(entries):
+        syncs.append(len(entries))
+        raise RuntimeError("encoder unavailable")
+    monkeypatch.setattr(retriever, 'sync', failing_sync)
+    monkeypatch.setattr(shared_retriever, '_open_retriever', lambda path: retriever)
+
+    for _ in range(3):
+        assert shared_retriever.get_knowledge_retriever(str(tmp_path / "k.bin"), wait=True) is retriever
+    assert len(syncs) == 1
+
+    monkeypatch.setattr(comprehensive_kb, 'version', comprehensive_kb.version + 1)
+    shared_retriever.get_knowledge_retriever(str(tmp_path / "k.bin"))
+    assert len(syncs) == 2
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
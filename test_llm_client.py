@@ -0,0 +1,157 @@
+"""
+Tests for the shared LLM client against a local fake OpenAI server
+"""
+
+import sys
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append('backend')
+
+import pytest
+
+pytest.importorskip("openai")
+from services.llm_client import LLMClient, CircuitBreaker, CircuitOpenError, REMOTE, FALLBACK
+
+MESSAGES = [{"role": "user", "content": "How do I answer behavioral questions?"}]
+
+class FakeOpenAI(BaseHTTPRequestHandler):
+    """Answers /v1/chat/completions after `delay` seconds with `status`"""
+    delay = 0.0
+    status = 200
+    requests = 0
+
+    def do_POST(self):
+        type(self).requests += 1
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        time.sleep(self.delay)
+        if self.status != 200:
+            payload = {"error": {"message": "server error", "type": "server_error"}}
+        else:
+            payload = {
+                "id": "chatcmpl-test", "object": "chat.completion", "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": " Use the STAR method. "}}]
+            }
+        data = json.dumps(payload).encode()
+        try:
+            self.send_response(self.status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    FakeOpenAI.delay, FakeOpenAI.status, FakeOpenAI.requests = 0.0, 200, 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenAI)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/v1"
+    httpd.shutdown()
+
+def make_client(api_base, **kwargs):
+    kwargs.setdefault('breaker', CircuitBreaker(failure_threshold=2, reset_timeout=0.2))
+    return LLMClient(api_key="test-key", api_base=api_base, pool_size=4, **kwargs)
+
+def test_chat_returns_the_remote_answer(server):
+    client = make_client(server)
+    assert client.chat(MESSAGES, model="gpt-3.5-turbo") == "Use the STAR method."
+    assert client.hedged_chat(MESSAGES, fallback=lambda: "local", model="gpt-3.5-turbo") == ("Use the STAR method.", REMOTE)
+    assert client.get_stats()['calls'] == 2
+
+def test_deadline_bounds_a_slow_call(server):
+    FakeOpenAI.delay = 1.0
+    client = make_client(server, read_timeout=0.2)
+    start = time.perf_counter()
+    with pytest.raises(Exception):
+        client.chat(MESSAGES, model="gpt-3.5-turbo")
+    assert time.perf_counter() - start < 0.8
+
+def test_breaker_opens_after_failures_and_recovers(server):
+    FakeOpenAI.status = 500
+    client = make_client(server)
+    for _ in range(2):
+        with pytest.raises(Exception):
+            client.chat(MESSAGES, model="gpt-3.5-turbo")
+    assert client.breaker.state == CircuitBreaker.OPEN
+
+    # While open, callers get the local answer without touching the server
+    requests_before = FakeOpenAI.requests
+    assert client.hedged_chat(MESSAGES, fallback=lambda: "local", model="gpt-3.5-turbo") == ("local", FALLBACK)
+    with pytest.raises(CircuitOpenError):
+        client.chat(MESSAGES, model="gpt-3.5-turbo")
+    assert FakeOpenAI.requests == requests_before
+
+    # After the cool-down one trial call goes through and closes the breaker
+    FakeOpenAI.status = 200
+    time.sleep(0.25)
+    assert client.chat(MESSAGES, model="gpt-3.5-turbo") == "Use the STAR method."
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+def test_hedged_call_serves_local_answer_within_budget(server):
+    FakeOpenAI.delay = 0.5
+    client = make_client(server)
+    late = []
+    arrived = threading.Event()
+
+    start = time.perf_counter()
+    response, source = client.hedged_chat(
+        MESSAGES, fallback=lambda: "local answer", budget=0.1,
+        on_late_result=lambda text: (late.append(text), arrived.set()), model="gpt-3.5-turbo"
+    )
+    assert (response, source) == ("local answer", FALLBACK)
+    assert time.perf_counter() - start < 0.4
+
+    assert arrived.wait(2)
+    assert late == ["Use the STAR method."]
+    assert client.get_stats()['hedged'] == 1
+
+def test_hedged_calls_carry_a_deadline_and_are_bounded(server):
+    FakeOpenAI.delay = 1.0
+    client = make_client(server, late_result_grace=0.1, max_pending=2)
+    late = []
+
+    start = time.perf_counter()
+    for _ in range(3):
+        response, source = client.hedged_chat(MESSAGES, fallback=lambda: "local", budget=0.05,
+                                              on_late_result=late.append, model="gpt-3.5-turbo")
+        assert (response, source) == ("local", FALLBACK)
+    assert time.perf_counter() - start < 0.5
+    # The third call found two pending and never reached the pool
+    assert client.get_stats()['rejected'] == 1
+
+    # The workers time out at budget + grace instead of waiting for the slow answer
+    time.sleep(0.6)
+    assert late == [] and client.get_stats()['failures'] == 2
+    assert client.hedged_chat(MESSAGES, fallback=lambda: "local", budget=0.05, model="gpt-3.5-turbo")[1] == FALLBACK
+    assert client.get_stats()['rejected'] == 1
+
+def test_abandoned_stream_still_settles_a_half_open_breaker(server, monkeypatch):
+    from types import SimpleNamespace
+    import openai
+
+    client = make_client(server)
+    client.breaker.state = CircuitBreaker.OPEN
+    client.breaker.opened_at = time.monotonic() - 1
+
+    def fake_stream(**kwargs):
+        for word in ("Use ", "the ", "STAR ", "method."):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta={"content": word})])
+    monkeypatch.setattr(openai.ChatCompletion, "create", fake_stream)
+
+    stream = client.stream_chat(MESSAGES, model="gpt-3.5-turbo")
+    next(stream)
+    assert client.breaker.state == CircuitBreaker.HALF_OPEN
+    # The client disconnects mid-stream
+    stream.close()
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,94 @@
+"""
+Tests for the shared local text-generation service (with a fake model)
+"""
+
+import sys
+import time
+import threading
+sys.path.append('backend')
+
+import pytest
+
+from services.local_generation import LocalGenerationService, GenerationUnavailable
+
+class FakeModel:
+    """Echoes each prompt; records the batches it was given"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.batches = []
+
+    def __call__(self, prompts, max_new_tokens, params):
+        self.batches.append((list(prompts), max_new_tokens, dict(params)))
+        time.sleep(self.delay)
+        return [(f"answer to {prompt}", 5) for prompt in prompts]
+
+def generate_concurrently(service, prompts, **params):
+    results = {}
+    def worker(prompt):
+        results[prompt] = service.generate(prompt, timeout=5, **params)
+    threads = [threading.Thread(target=worker, args=(p,)) for p in prompts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_concurrent_prompts_are_batched():
+    model = FakeModel()
+    service = LocalGenerationService(batch_size=4, batch_wait=0.05, batch_generator=model)
+    prompts = [f"question {i}" for i in range(8)]
+
+    results = generate_concurrently(service, prompts, temperature=0.7)
+
+    assert results == {p: f"answer to {p}" for p in prompts}
+    assert sum(len(batch[0]) for batch in model.batches) == 8
+    assert len(model.batches) < 8
+    assert all(len(batch[0]) <= 4 for batch in model.batches)
+
+    stats = service.get_stats()
+    assert stats['requests'] == 8 and stats['avg_batch_size'] > 1
+    assert stats['tokens_per_second'] > 0
+    assert stats['queue_wait_ms']['p50'] is not None
+
+def test_max_new_tokens_is_capped_and_params_split_batches():
+    model = FakeModel(delay=0.01)
+    service = LocalGenerationService(max_new_tokens=50, batch_size=8, batch_wait=0.05, batch_generator=model)
+
+    def run(prompt, temperature):
+        service.generate(prompt, max_new_tokens=500, timeout=5, temperature=temperature)
+    threads = [threading.Thread(target=run, args=(f"q{i}", 0.7 if i % 2 else 0.2)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert {batch[1] for batch in model.batches} == {50}
+    for prompts, _, params in model.batches:
+        expected = 0.7 if int(prompts[0][1:]) % 2 else 0.2
+        assert params == {'temperature': expected}
+
+def test_failures_reach_every_caller_in_the_batch():
+    def broken(prompts, max_new_tokens, params):
+        raise RuntimeError("out of memory")
+    service = LocalGenerationService(batch_wait=0, batch_generator=broken)
+    with pytest.raises(RuntimeError):
+        service.generate("question", timeout=5)
+
+def test_unavailable_model_is_reported():
+    service = LocalGenerationService(model_candidates=[])
+    service._load_attempted = True
+    service.load_error = "no model"
+    with pytest.raises(GenerationUnavailable):
+        service.generate("question")
+
+def test_assistants_share_the_service():
+    from services.smart_ai_assistant import SmartAIInterviewAssistant
+
+    assistant = SmartAIInterviewAssistant()
+    assistant.generator = LocalGenerationService(batch_wait=0, batch_generator=FakeModel(delay=0))
+    assert assistant.ai_available
+    assert assistant.get_model_info()['generation']['model_loaded'] is True
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,91 @@
+"""
+Tests for the versioned schema migrations and the history query plans
+"""
+
+import sys
+import sqlite3
+sys.path.append('backend')
+
+import pytest
+
+from migrations import upgrade, downgrade, current_version, applied_versions, column_names, MigrationError
+
+# speech_session as created before the extended analysis fields existed
+LEGACY_SCHEMA = """
+CREATE TABLE user (id INTEGER PRIMARY KEY, email VARCHAR(120) UNIQUE NOT NULL, created_at DATETIME);
+CREATE TABLE speech_session (
+    id INTEGER PRIMARY KEY, transcript TEXT, wpm FLOAT, fillers INTEGER, sentiment FLOAT,
+    confidence INTEGER, emotion VARCHAR(50), created_at DATETIME
+);
+"""
+
+HISTORY_QUERY = "SELECT * FROM speech_session WHERE user_id = 1 ORDER BY created_at DESC"
+
+def query_plan(connection, sql):
+    return ' | '.join(row[-1] for row in connection.execute(f"EXPLAIN QUERY PLAN {sql}"))
+
+@pytest.fixture
+def connection(tmp_path):
+    connection = sqlite3.connect(str(tmp_path / "app.db"))
+    connection.executescript(LEGACY_SCHEMA)
+    yield connection
+    connection.close()
+
+def test_upgrade_adds_columns_and_index(connection):
+    assert upgrade(connection)[:2] == [1, 2]
+    assert current_version(connection) >= 2
+
+    columns = column_names(connection.cursor(), 'speech_session')
+    assert {'user_id', 'word_count', 'grammar_errors'} <= set(columns)
+    assert {'first_name', 'password_hash', 'is_active'} <= set(column_names(connection.cursor(), 'user'))
+
+    # Running again is a no-op
+    assert upgrade(connection) == []
+
+def test_history_queries_use_the_index(connection):
+    upgrade(connection)
+    connection.executemany(
+        "INSERT INTO speech_session (user_id, created_at) VALUES (?, ?)",
+        [(i % 50, f"2024-01-{1 + i % 28:02d} 10:{i % 60:02d}:00") for i in range(2000)]
+    )
+    connection.execute("ANALYZE")
+
+    for sql in (HISTORY_QUERY, HISTORY_QUERY.replace("DESC", "ASC")):
+        plan = query_plan(connection, sql)
+        assert "ix_speech_session_user_created" in plan
+        assert "TEMP B-TREE" not in plan
+
+    plan = query_plan(connection, "SELECT * FROM speech_session WHERE id = 5 AND user_id = 1")
+    assert "INTEGER PRIMARY KEY" in plan
+
+def test_downgrade_removes_the_index(connection):
+    upgrade(connection)
+    assert downgrade(connection, 1)[-1] == 2
+    assert applied_versions(connection) == [1]
+    plan = query_plan(connection, HISTORY_QUERY)
+    assert "ix_speech_session_user_created" not in plan and "TEMP B-TREE" in plan
+
+    assert upgrade(connection, target=2) == [2]
+
+def test_failed_migration_is_rolled_back(connection, monkeypatch):
+    import migrations.v002_speech_session_indexes as v002
+
+    def broken(cursor):
+        cursor.execute('CREATE INDEX ix_partial ON speech_session (created_at)')
+        raise RuntimeError("boom")
+    monkeypatch.setattr(v002, 'upgrade', broken)
+
+    with pytest.raises(MigrationError):
+        upgrade(connection)
+    assert applied_versions(connection) == [1]
+    indexes = [row[1] for row in connection.execute("PRAGMA index_list(speech_session)")]
+    assert 'ix_partial' not in indexes
+
+def test_model_declares_the_index():
+    pytest.importorskip("flask_sqlalchemy")
+    from models.session import SpeechSession
+    names = {index.name for index in SpeechSession.__table__.indexes}
+    assert 'ix_speech_session_user_created' in names
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
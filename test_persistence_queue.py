@@ -0,0 +1,166 @@
+"""
+Tests for the write-behind persistence queue of analysis results
+"""
+
+import sys
+import time
+import threading
+sys.path.append('backend')
+
+import pytest
+
+def make_session(i, user_id=1):
+    from models.session import SpeechSession
+    return SpeechSession(user_id=user_id, transcript=f"session {i}", wpm=110 + i, confidence=60 + i,
+                         fillers=i % 4, strengths=["clear"], grammar_errors=[])
+
+def test_queued_sessions_are_committed_in_batches(app):
+    from services.persistence_queue import PersistenceQueue
+    from models.session import SpeechSession
+    from models.progress_rollup import ProgressRollup
+
+    writer = PersistenceQueue(batch_size=10, flush_interval=0.05)
+    writer.start(app)
+    try:
+        with app.test_request_context():
+            ids = [writer.save(make_session(i)) for i in range(45)]
+        assert ids == sorted(set(ids))
+        assert writer.flush()
+    finally:
+        writer.stop()
+
+    stats = writer.get_stats()
+    assert stats['written'] == 45 and stats['failed'] == 0 and stats['pending'] == 0
+    assert stats['batches'] < 45
+    with app.app_context():
+        stored = {s.id: s for s in SpeechSession.query.all()}
+        assert sorted(stored) == ids
+        assert stored[ids[0]].get_strengths_list() == ["clear"]
+        assert ProgressRollup.query.filter_by(user_id=1, period='day').one().session_count == 45
+
+def test_stop_flushes_the_queue(app):
+    from services.persistence_queue import PersistenceQueue
+    from models.session import SpeechSession
+
+    writer = PersistenceQueue(batch_size=5, flush_interval=0.5)
+    writer.start(app)
+    with app.test_request_context():
+        for i in range(12):
+            writer.save(make_session(i))
+    writer.stop()
+
+    assert not writer.running
+    with app.app_context():
+        assert SpeechSession.query.count() == 12
+
+def test_session_endpoint_reads_its_own_queued_write(app, monkeypatch):
+    from services.persistence_queue import persistence_queue
+    from middleware.conditional_get import history_responses
+    from models.session import SpeechSession
+
+    # Hold the writer so the session is still queued when it is read back
+    release = threading.Event()
+    write_batch = persistence_queue._write_batch
+    monkeypatch.setattr(persistence_queue, '_write_batch', lambda batch: (release.wait(5), write_batch(batch)))
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = 1
+    with app.test_request_context():
+        session_id = persistence_queue.save(make_session(1))
+
+    try:
+        response = client.get(f'/session/{session_id}')
+        data = response.get_json()
+        assert data['id'] == session_id and data['transcript'] == "session 1"
+        assert data['strengths'] == ["clear"]
+        # Served from the queue: neither tagged nor cached
+        assert 'ETag' not in response.headers and response.headers['Cache-Control'] == 'no-store'
+        assert history_responses.get_stats()['responses'] == 0
+
+        # Other users cannot read it while it is pending
+        with client.session_transaction() as sess:
+            sess['user_id'] = 2
+        assert client.get(f'/session/{session_id}').status_code == 404
+        assert client.get('/api/history/persistence').get_json()['persistence_queue']['pending'] == 1
+    finally:
+        release.set()
+        assert persistence_queue.flush()
+
+    with app.app_context():
+        assert SpeechSession.query.get(session_id).transcript == "session 1"
+
+def test_full_queue_commits_inline(app):
+    from services.persistence_queue import PersistenceQueue
+    from models.session import SpeechSession
+
+    writer = PersistenceQueue(maxsize=1, flush_interval=0.05)
+    writer.start(app)
+    hold = threading.Event()
+    write_batch = writer._write_batch
+    writer._write_batch = lambda batch: (hold.wait(5), write_batch(batch))
+    try:
+        with app.test_request_context():
+            ids = [writer.save(make_session(i)) for i in range(5)]
+        assert writer.get_stats()['inline_writes'] >= 1
+    finally:
+        hold.set()
+        writer.stop()
+
+    with app.app_context():
+        assert sorted(s.id for s in SpeechSession.query.all()) == sorted(ids)
+
+def test_failed_records_are_retried_then_spooled_and_replayed(app, monkeypatch, tmp_path):
+    import services.persistence_queue as queue_module
+    from services.persistence_queue import PersistenceQueue
+    from models.session import SpeechSession
+
+    # Session "1" fails twice, session "2" until the restart
+    failures = {"session 1": 2, "session 2": 99}
+    save = queue_module.save_with_retry
+    def flaky_save(*records):
+        for record in records:
+            if failures.get(record.transcript, 0) > 0:
+                failures[record.transcript] -= 1
+                raise RuntimeError("disk I/O error")
+        return save(*records)
+    monkeypatch.setattr(queue_module, 'save_with_retry', flaky_save)
+
+    spool = tmp_path / "spool.jsonl"
+    settings = dict(batch_size=5, flush_interval=0.02, max_attempts=3, retry_delay=0.05, spool_path=str(spool))
+    writer = PersistenceQueue(**settings)
+    writer.start(app)
+    try:
+        with app.test_request_context():
+            ids = [writer.save(make_session(i)) for i in range(4)]
+        start = time.perf_counter()
+        assert writer.flush()
+        # Retries wait 0.05s, then 0.1s
+        assert time.perf_counter() - start >= 0.15
+    finally:
+        writer.stop()
+
+    stats = writer.get_stats()
+    assert stats['failed'] == 1 and stats['pending'] == 1 and stats['spooled'] == 1
+    # The id handed out for the failed session still resolves, and survives on disk
+    assert writer.get_pending(ids[2]).transcript == "session 2"
+    assert spool.read_text().count('\n') == 1
+    with app.app_context():
+        assert sorted(s.id for s in SpeechSession.query.all()) == [ids[0], ids[1], ids[3]]
+
+    # After a restart the spooled id is not handed out again, and the record is written
+    failures["session 2"] = 0
+    restarted = PersistenceQueue(**settings)
+    restarted.start(app)
+    try:
+        with app.test_request_context():
+            assert restarted.save(make_session(9)) > ids[3]
+        assert restarted.flush()
+    finally:
+        restarted.stop()
+    assert not spool.exists() and restarted.get_stats()['spooled'] == 0
+    with app.app_context():
+        assert SpeechSession.query.get(ids[2]).transcript == "session 2"
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
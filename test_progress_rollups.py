@@ -0,0 +1,92 @@
+"""
+Tests for the incrementally maintained per-user progress rollups
+"""
+
+import sys
+import random
+from datetime import datetime, timedelta, date
+sys.path.append('backend')
+
+import pytest
+
+pytest.importorskip("flask_sqlalchemy")
+
+def add_sessions(db, count, user_id=1, seed=0):
+    from models.session import SpeechSession
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, 9)
+    for i in range(count):
+        db.session.add(SpeechSession(
+            user_id=user_id, confidence=rng.randint(40, 95), wpm=rng.uniform(90, 170), fillers=rng.randint(0, 8),
+            grammar_score=None if i % 5 == 0 else rng.uniform(50, 100),
+            created_at=start + timedelta(hours=7 * i)
+        ))
+        # Commit in small batches so rows update existing rollups
+        if i % 3 == 2:
+            db.session.commit()
+    db.session.commit()
+
+def snapshot(user_id=1):
+    from models.progress_rollup import ProgressRollup
+    rows = ProgressRollup.query.filter_by(user_id=user_id).order_by(
+        ProgressRollup.period, ProgressRollup.period_start).all()
+    return [row.to_dict() for row in rows]
+
+def test_rollups_track_inserts(app):
+    from database import db
+    from models.progress_rollup import query_rollups
+    with app.app_context():
+        add_sessions(db, 40)
+        days = query_rollups(1, 'day')
+        weeks = query_rollups(1, 'week')
+
+        assert sum(r.session_count for r in days) == 40
+        assert sum(r.session_count for r in weeks) == 40
+        assert len(days) < 40 and all(w.period_start.weekday() == 0 for w in weeks)
+
+        first = days[0]
+        assert first.period_start == date(2024, 1, 1)
+        assert first.confidence_min <= first.mean('confidence') <= first.confidence_max
+
+def test_incremental_rollups_match_rebuild(app):
+    from database import db
+    from models.progress_rollup import rebuild_progress_rollups
+    with app.app_context():
+        add_sessions(db, 60)
+        add_sessions(db, 10, user_id=2, seed=1)
+        incremental = snapshot()
+
+        assert rebuild_progress_rollups() == 70
+        rebuilt = snapshot()
+        for a, b in zip(incremental, rebuilt):
+            for metric in ('confidence', 'wpm', 'fillers', 'grammar_score'):
+                assert a[metric]['mean'] == pytest.approx(b[metric]['mean'])
+                assert a[metric]['min'] == pytest.approx(b[metric]['min'])
+        assert [r['session_count'] for r in incremental] == [r['session_count'] for r in rebuilt]
+
+def test_rolled_back_insert_leaves_rollups_unchanged(app):
+    from database import db
+    from models.session import SpeechSession
+    with app.app_context():
+        add_sessions(db, 5)
+        before = snapshot()
+        db.session.add(SpeechSession(user_id=1, confidence=99, created_at=datetime(2024, 1, 1, 12)))
+        db.session.flush()
+        db.session.rollback()
+        assert snapshot() == before
+
+def test_chart_endpoint_serves_rollups(app):
+    from database import db
+    with app.app_context():
+        add_sessions(db, 30)
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = 1
+
+    data = client.get('/api/history/chart?period=week').get_json()
+    assert data['total_sessions'] == 30
+    assert {'period_start', 'session_count', 'wpm'} <= set(data['rollups'][0])
+    assert client.get('/api/history/chart?period=month').status_code == 400
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
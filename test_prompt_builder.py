@@ -0,0 +1,81 @@
+"""
+Tests for the token-budgeted prompt builder
+"""
+
+import sys
+sys.path.append('backend')
+
+import pytest
+
+from services.prompt_builder import PromptBuilder, count_message_tokens, count_tokens, truncate_to_tokens
+
+SYSTEM = "You are a helpful interview coach."
+
+def conversation(turns, start=1000.0):
+    """Alternating user/assistant messages with increasing timestamps"""
+    messages = []
+    for i in range(turns):
+        messages.append({'role': 'user', 'content': f"Question number {i} about interviews?", 'timestamp': start + 2 * i})
+        messages.append({'role': 'assistant', 'content': f"Answer number {i}. " + "Details follow. " * 20,
+                         'timestamp': start + 2 * i + 1})
+    return messages
+
+def test_current_message_is_sent_once():
+    builder = PromptBuilder()
+    history = conversation(1) + [{'role': 'user', 'content': "How do I answer?", 'timestamp': 2000.0}]
+    plan = builder.build(SYSTEM, history, "How do I answer?")
+
+    contents = [m['content'] for m in plan.messages]
+    assert contents.count("How do I answer?") == 1
+    assert plan.messages[0] == {'role': 'system', 'content': SYSTEM}
+    assert plan.messages[-1] == {'role': 'user', 'content': "How do I answer?"}
+    assert plan.history_messages == 2 and plan.summary is None
+
+def test_long_conversation_stays_within_budget_and_is_summarized():
+    builder = PromptBuilder(max_prompt_tokens=400, recent_messages=6, summary_tokens=80)
+    history = conversation(10)
+    plan = builder.build(SYSTEM, history, "And what about salary?")
+
+    assert plan.prompt_tokens <= 400
+    assert plan.prompt_tokens == count_message_tokens(plan.messages)
+    assert plan.folded_messages > 0 and plan.summary['lines']
+    summary = plan.messages[1]
+    assert summary['role'] == 'system' and summary['content'].startswith("Summary of the earlier conversation")
+    assert plan.messages[-2]['content'] == history[-1]['content']
+
+def test_summary_is_extended_incrementally():
+    builder = PromptBuilder(max_prompt_tokens=400, recent_messages=4, summary_tokens=200)
+    history = conversation(6)
+    first = builder.build(SYSTEM, history, "Next question")
+
+    # Feeding the cached summary back only folds turns that are new since then
+    same = builder.build(SYSTEM, history, "Next question", summary=first.summary)
+    assert same.folded_messages == 0 and same.summary == first.summary
+
+    history += conversation(1, start=5000.0)
+    later = builder.build(SYSTEM, history, "Another question", summary=first.summary)
+    assert later.folded_messages == 2
+    assert later.summary['lines'][:len(first.summary['lines'])] == first.summary['lines']
+
+def test_oversized_message_is_truncated():
+    builder = PromptBuilder(max_prompt_tokens=100)
+    plan = builder.build(SYSTEM, [], "word " * 500)
+    assert plan.truncated and plan.prompt_tokens <= 100
+    assert builder.get_stats()['truncated_messages'] == 1
+
+def test_token_helpers():
+    assert count_tokens("") == 0
+    assert count_tokens("Tell me about yourself.") > 0
+    text = "one two three four five six seven eight nine ten"
+    assert count_tokens(truncate_to_tokens(text, 4)) <= 4
+
+def test_stats_report_prompt_sizes():
+    builder = PromptBuilder()
+    for turns in range(1, 5):
+        builder.build(SYSTEM, conversation(turns), "Question?")
+    stats = builder.get_stats()
+    assert stats['prompts'] == 4
+    assert stats['prompt_tokens']['p50'] <= stats['prompt_tokens']['max'] <= stats['budget_tokens']
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,72 @@
+"""
+Tests for the precomputed per-question artifact store
+"""
+
+import sys
+import zlib
+sys.path.append('backend')
+
+import numpy as np
+
+from services.question_artifacts import compute_question_artifacts, QuestionArtifactStore
+from services.question_patterns import QuestionPatternMatcher
+from utils.interview_questions import get_all_questions
+
+DIMENSION = 16
+
+class FakeEngine:
+    """Deterministic stand-in for the sentence-transformer engine"""
+    model_name = "fake-model"
+
+    def _embed(self, text):
+        rng = np.random.default_rng(zlib.crc32(text.encode()))
+        return rng.normal(size=DIMENSION).astype(np.float32)
+
+    def get_sentence_embeddings(self, text):
+        return self._embed(text)
+
+    def get_sentence_embeddings_batch(self, texts):
+        return np.array([self._embed(t) for t in texts], dtype=np.float32).reshape(len(texts), DIMENSION)
+
+    def _extract_key_topics(self, text):
+        return [word for word in text.lower().rstrip('.?').split() if len(word) > 5][:3]
+
+def test_roundtrip_preserves_question_side_artifacts(tmp_path):
+    questions = get_all_questions()
+    engine = FakeEngine()
+    matcher = QuestionPatternMatcher()
+    store = compute_question_artifacts(questions + ["Tell me about yourself!"], engine=engine, pattern_matcher=matcher)
+    assert len(store) == len(questions)
+
+    path = str(tmp_path / "question_artifacts.bin")
+    store.save(path)
+    loaded = QuestionArtifactStore.load(path)
+    assert loaded.model_name == "fake-model"
+    assert len(loaded) == len(questions)
+
+    for question in questions:
+        artifact = loaded.get(question)
+        pattern = matcher.match_pattern(question)
+        assert artifact.question_type == pattern.question_type.value
+        assert artifact.expected_elements == [e.element_type for e in pattern.expected_elements]
+        assert artifact.topics == engine._extract_key_topics(question)
+        assert np.allclose(artifact.embedding, engine.get_sentence_embeddings(question))
+        assert artifact.topic_embeddings.shape == (len(artifact.topics), DIMENSION)
+        if artifact.topics:
+            assert np.allclose(artifact.topic_embeddings[0], engine.get_sentence_embeddings(artifact.topics[0]))
+
+def test_lookup_is_normalized_and_misses_ad_hoc_questions(tmp_path):
+    store = compute_question_artifacts(["Explain REST APIs."], engine=FakeEngine(), pattern_matcher=QuestionPatternMatcher())
+    path = str(tmp_path / "question_artifacts.bin")
+    store.save(path)
+    loaded = QuestionArtifactStore.load(path)
+
+    assert loaded.get("  explain rest APIs ") is not None
+    assert loaded.get("Explain GraphQL.") is None
+    assert loaded.get("") is None
+    # Embeddings are served straight from the memory map
+    assert not loaded.get("Explain REST APIs.").embedding.flags.writeable
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
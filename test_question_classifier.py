@@ -0,0 +1,71 @@
+"""
+Tests for the inverted-index question classifier and its memo
+"""
+
+import sys
+sys.path.append('backend')
+
+from services.question_classifier import QuestionClassifier, FIRST_MATCH, MOST_MATCHES, normalize_question
+from services.question_patterns import QuestionPatternMatcher, QuestionType
+from services.question_relevance_simple import QuestionRelevanceAnalyzer
+from utils.interview_questions import get_all_questions
+
+TYPE_KEYWORDS = {
+    "behavioral": ["tell me about a time", "difficult", "conflict"],
+    "technical": ["explain", "design", "conflict"],
+    "personal": ["yourself", "background"],
+}
+
+def legacy_first_match(question):
+    question_lower = question.lower()
+    for question_type, keywords in TYPE_KEYWORDS.items():
+        if any(keyword in question_lower for keyword in keywords):
+            return question_type
+    return "general"
+
+def test_first_match_mode_follows_declaration_order():
+    classifier = QuestionClassifier(TYPE_KEYWORDS, default="general", mode=FIRST_MATCH)
+    for question in ["Explain how you resolved a conflict.", "Tell me about yourself.",
+                     "How would you design an API?", "What is your favourite colour?"]:
+        assert classifier.classify(question) == legacy_first_match(question)
+
+def test_most_matches_mode_counts_distinct_keywords():
+    classifier = QuestionClassifier(TYPE_KEYWORDS, default="general", mode=MOST_MATCHES)
+    assert classifier.classify("Explain a design conflict") == "technical"
+    assert classifier.classify("Tell me about a time you had a conflict") == "behavioral"
+    assert classifier.classify("") == "general"
+
+def test_memo_is_keyed_by_normalized_text():
+    classifier = QuestionClassifier(TYPE_KEYWORDS, default="general")
+    assert normalize_question("  Tell me about   YOURSELF? ") == "tell me about yourself"
+
+    classifier.warm(["Tell me about yourself."])
+    assert classifier.classify("tell me about yourself") == "personal"
+    assert classifier.get_stats()['hits'] == 1
+    assert classifier.get_stats()['misses'] == 0
+
+def test_ad_hoc_memo_is_bounded():
+    classifier = QuestionClassifier(TYPE_KEYWORDS, default="general", max_memo_size=2)
+    classifier.warm(["Tell me about yourself."])
+    for i in range(10):
+        classifier.classify(f"Explain topic number {i}")
+    assert classifier.get_stats()['memo_size'] == 3
+
+def test_bank_questions_are_memoized_in_both_analyzers():
+    questions = get_all_questions()
+    matcher = QuestionPatternMatcher()
+    analyzer = QuestionRelevanceAnalyzer()
+    assert matcher.warm(questions) == len(questions)
+    assert analyzer.warm_question_types(questions) == len(questions)
+
+    for question in questions:
+        matcher.match_pattern(question)
+        analyzer._classify_question(question)
+
+    assert matcher.classifier.get_stats()['hit_rate'] == 1.0
+    assert analyzer.question_classifier.get_stats()['hit_rate'] == 1.0
+    assert matcher.match_pattern("Tell me about a time you failed").question_type == QuestionType.BEHAVIORAL
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,94 @@
+"""
+Tests for the adaptive two-tier relevance cascade
+"""
+
+import sys
+from types import SimpleNamespace
+sys.path.append('backend')
+
+from services.relevance_cascade import RelevanceCascade, CascadeConfig, KEYWORD_TIER, SEMANTIC_TIER
+
+class FakeSemanticAnalyzer:
+    """Stands in for the sentence-transformer analyzer"""
+
+    def __init__(self, score=75.0):
+        self.score = score
+        self.calls = 0
+
+    def analyze_relevance(self, question, answer):
+        self.calls += 1
+        return SimpleNamespace(
+            relevance_score=self.score,
+            classification=SimpleNamespace(value="Mostly Relevant"),
+            question_type=SimpleNamespace(value="personal"),
+            semantic_similarity=0.7,
+            topic_overlap=SimpleNamespace(overlap_percentage=55.0),
+            feedback=SimpleNamespace(
+                summary="Good job!",
+                strengths=[],
+                improvements=[],
+                specific_suggestions=[],
+                example_elements=[],
+                priority_level=SimpleNamespace(value="medium")
+            ),
+            processing_time=0.05
+        )
+
+def make_cascade(**overrides):
+    config = CascadeConfig(shadow_rate=0.0, **overrides)
+    cascade = RelevanceCascade(config)
+    cascade._semantic_analyzer = FakeSemanticAnalyzer()
+    return cascade
+
+def test_clear_answers_stay_on_keyword_tier():
+    cascade = make_cascade(ambiguous_low=25.0, ambiguous_high=55.0)
+    result = cascade.analyze_relevance(
+        "Tell me about yourself",
+        "I have five years of experience as a software engineer with strong skills in Python "
+        "and my goal is to grow my career in backend development and leadership."
+    )
+    assert result.decided_by == KEYWORD_TIER
+    assert cascade._semantic_analyzer.calls == 0
+
+def test_ambiguous_scores_escalate():
+    cascade = make_cascade(ambiguous_low=0.0, ambiguous_high=101.0)
+    result = cascade.analyze_relevance("Tell me about yourself", "I like working.")
+    assert result.decided_by == SEMANTIC_TIER
+    assert result.escalation_reason == "ambiguous_score"
+    assert result.relevance_score == 75.0
+    assert result.classification.value == "Mostly Relevant"
+
+def test_long_answers_escalate():
+    cascade = make_cascade(ambiguous_low=0.0, ambiguous_high=0.0, long_answer_words=20)
+    result = cascade.analyze_relevance("Tell me about yourself", "word " * 25)
+    assert result.decided_by == SEMANTIC_TIER
+    assert result.escalation_reason == "long_answer"
+
+def test_escalation_rate_is_capped():
+    cascade = make_cascade(ambiguous_low=0.0, ambiguous_high=101.0, max_escalation_rate=0.5)
+    tiers = [cascade.analyze_relevance("Why should we hire you?", "Because.").decided_by for _ in range(20)]
+    assert tiers.count(SEMANTIC_TIER) <= 11
+    report = cascade.get_report()
+    assert report['escalation_reasons'].get('budget_exhausted', 0) > 0
+
+def test_disabled_semantic_tier_never_escalates():
+    cascade = make_cascade(semantic_enabled=False, ambiguous_low=0.0, ambiguous_high=101.0)
+    result = cascade.analyze_relevance("Tell me about yourself", "I like working.")
+    assert result.decided_by == KEYWORD_TIER
+
+def test_report_counts_tiers_and_latency_saved():
+    cascade = make_cascade(ambiguous_low=0.0, ambiguous_high=30.0)
+    cascade.analyze_relevance("Tell me about yourself", "pizza")
+    cascade.analyze_relevance(
+        "Tell me about yourself",
+        "I have experience in software development and my goal is to grow as a leader in my career."
+    )
+    report = cascade.get_report()
+    assert report['requests'] == 2
+    assert report['tier_counts'][SEMANTIC_TIER] == 1
+    assert report['tier_counts'][KEYWORD_TIER] == 1
+    assert report['estimated_latency_saved_ms'] is not None
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
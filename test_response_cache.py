@@ -0,0 +1,98 @@
+"""
+Tests for the chatbot response cache
+"""
+
+import sys
+import time
+from types import SimpleNamespace
+sys.path.append('backend')
+
+import pytest
+
+from services.response_cache import (
+    ResponseCache, MemoryCacheBackend, SQLiteCacheBackend, score_bucket
+)
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryCacheBackend(max_entries=3)
+    return SQLiteCacheBackend(str(tmp_path / "cache.db"), max_entries=3)
+
+def test_keys_normalize_messages_and_include_context():
+    key = ResponseCache.make_key('chat', "  What is  STAR? ", {'category': 'hr'}, {'model': 'gpt'})
+    assert key == ResponseCache.make_key('chat', "what is star?", {'category': 'hr'}, {'model': 'gpt'})
+    assert key != ResponseCache.make_key('chat', "what is star?", {'category': 'technical'}, {'model': 'gpt'})
+    assert key != ResponseCache.make_key('chat', "what is star?", {'category': 'hr'}, {'model': 'gpt-4'})
+
+def test_score_buckets():
+    assert [score_bucket(s) for s in (0, 19.9, 20, 59, 60, 79, 80, 100, None)] == [0, 0, 20, 40, 60, 60, 80, 80, 0]
+
+def test_ttl_expiry(backend):
+    cache = ResponseCache(backend, ttl_seconds=0.05)
+    cache.set("k", "v")
+    assert cache.get("k") == "v"
+    time.sleep(0.06)
+    assert cache.get("k") is None
+
+def test_least_recently_used_entries_are_evicted(backend):
+    cache = ResponseCache(backend, ttl_seconds=60)
+    for key in ("a", "b", "c"):
+        cache.set(key, key.upper())
+        time.sleep(0.001)
+    cache.get("a")
+    time.sleep(0.001)
+    cache.set("d", "D")
+
+    assert len(backend) == 3
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+
+def test_get_or_compute_and_bypass():
+    cache = ResponseCache(MemoryCacheBackend(), ttl_seconds=60)
+    calls = []
+    compute = lambda: calls.append(1) or f"reply {len(calls)}"
+
+    assert cache.get_or_compute("k", compute) == ("reply 1", False)
+    assert cache.get_or_compute("k", compute) == ("reply 1", True)
+    assert cache.get_or_compute("k", compute, use_cache=False) == ("reply 2", False)
+    assert cache.get_or_compute("k", compute) == ("reply 2", True)
+
+    stats = cache.get_stats()
+    assert stats['hits'] == 2 and stats['bypassed'] == 1
+
+def test_universal_chatbot_reuses_openai_replies(monkeypatch):
+    openai = pytest.importorskip("openai")
+    from services.universal_chatbot import UniversalChatbot
+
+    calls = []
+    def fake_create(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=" Use the STAR method. "))])
+    monkeypatch.setattr(openai.ChatCompletion, "create", fake_create)
+
+    chatbot = UniversalChatbot()
+    chatbot.openai_available = True
+    chatbot.cache = ResponseCache(MemoryCacheBackend(), ttl_seconds=60)
+
+    # Opening questions carry no history, so other conversations share the reply
+    assert chatbot.get_response("How do I answer behavioral questions?", conversation_key='a') == "Use the STAR method."
+    assert chatbot.get_response("how do I answer  behavioral questions?", conversation_key='b') == "Use the STAR method."
+    assert len(calls) == 1
+
+    # A follow-up depends on the conversation it is asked in
+    chatbot.get_response("Explain that again", conversation_key='a')
+    chatbot.get_response("Explain that again", conversation_key='b')
+    assert len(calls) == 3
+    # Not even the opening message of a new conversation gets their answers
+    chatbot.get_response("Explain that again", conversation_key='c')
+    assert len(calls) == 4
+
+    chatbot.update_context('d', selected_category='technical')
+    chatbot.get_response("How do I answer behavioral questions?", conversation_key='d')
+    chatbot.get_response("How do I answer behavioral questions?", use_cache=False, conversation_key='e')
+    assert len(calls) == 6
+    assert calls[0]['max_tokens'] == 800
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
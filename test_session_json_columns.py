@@ -0,0 +1,73 @@
+"""
+Tests for the list-typed JSON columns of SpeechSession
+"""
+
+import sys
+sys.path.append('backend')
+
+import pytest
+
+def test_lists_round_trip_and_legacy_text_loads(app):
+    from sqlalchemy import text
+    from database import db
+    from models.session import SpeechSession
+
+    with app.app_context():
+        db.session.add(SpeechSession(user_id=1, transcript="new", strengths=["clear", "calm"],
+                                     actionable_tips=[{"title": "Pace", "description": "Slow down"}]))
+        # Rows written before the type change hold JSON text, sometimes empty or broken
+        db.session.execute(text(
+            "INSERT INTO speech_session (user_id, transcript, strengths, improvements, grammar_errors) "
+            "VALUES (1, 'legacy', '[\"loud\"]', 'not json', '')"
+        ))
+        db.session.commit()
+        db.session.expunge_all()
+
+        new = SpeechSession.query.filter_by(transcript="new").one()
+        assert new.strengths == ["clear", "calm"]
+        assert new.get_actionable_tips_list()[0]["title"] == "Pace"
+        assert new.improvements == [] and new.get_grammar_errors_list() == []
+
+        legacy = SpeechSession.query.filter_by(transcript="legacy").one()
+        assert legacy.get_strengths_list() == ["loud"]
+        assert legacy.improvements == [] and legacy.grammar_errors == []
+
+        raw = db.session.execute(text("SELECT strengths FROM speech_session WHERE transcript = 'new'")).scalar()
+        assert raw == '["clear", "calm"]'
+
+def test_unflushed_json_strings_are_still_parsed():
+    from models.session import SpeechSession
+
+    session = SpeechSession(strengths='["a", "b"]', grammar_errors='{broken')
+    assert session.get_strengths_list() == ["a", "b"]
+    assert session.get_grammar_errors_list() == []
+
+def test_listing_does_not_load_unrequested_json_columns(app):
+    from sqlalchemy import event
+    from database import db
+    from models.session import SpeechSession
+
+    with app.app_context():
+        db.session.add(SpeechSession(user_id=1, transcript="one", wpm=120, strengths=["clear"],
+                                     grammar_errors=["their/there"]))
+        db.session.commit()
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            client = app.test_client()
+            with client.session_transaction() as sess:
+                sess['user_id'] = 1
+            data = client.get('/api/history?limit=5&fields=wpm').get_json()
+            listing = [s for s in statements if 'speech_session' in s]
+            detail = client.get(f"/session/{data['sessions'][0]['id']}").get_json()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+    assert listing and all('strengths' not in s and 'grammar_errors' not in s for s in listing)
+    assert detail['strengths'] == ["clear"] and detail['grammar_errors'] == ["their/there"]
+    assert detail['improvements'] == []
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
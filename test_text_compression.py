@@ -0,0 +1,148 @@
+"""
+Tests for compressed storage of transcripts and assessment text
+"""
+
+import sys
+import logging
+sys.path.append('backend')
+
+import pytest
+
+from utils.text_compression import (
+    compress_text, decompress_text, train_dictionary, use_dictionaries, CompressionError, MAGIC
+)
+
+ASSESSMENTS = [
+    "Your speaking pace is good - clear and easy to follow.",
+    "Excellent! You used very few filler words, showing strong fluency.",
+    "Good grammar with minor errors. Review the highlighted issues.",
+    "Good vocabulary variety. Try incorporating more diverse words.",
+    "Positive and engaging tone. Your enthusiasm comes through well.",
+]
+
+def transcript(i):
+    return (f"In session {i} I talked about how our team handled a difficult project deadline. "
+            "I made sure everyone knew their responsibilities and we met every week to review progress. ") * 3
+
+@pytest.fixture(autouse=True)
+def no_dictionaries():
+    use_dictionaries([])
+    yield
+    use_dictionaries([])
+
+def test_round_trip_and_plain_values():
+    text = transcript(1) + " Unicode too: café, naïve, 日本語."
+    stored = compress_text(text)
+    assert isinstance(stored, bytes) and stored.startswith(MAGIC) and len(stored) < len(text)
+    assert decompress_text(stored) == text
+
+    # Short text and rows written before compression are stored and read as they are
+    assert compress_text("Good pace") == "Good pace"
+    assert decompress_text("legacy plain text") == "legacy plain text"
+    assert decompress_text(None) is None
+
+def test_dictionary_shrinks_short_repeated_text():
+    dictionary = train_dictionary(ASSESSMENTS * 10 + [transcript(i) for i in range(10)])
+    assert 0 < len(dictionary) <= 32 * 1024
+    assert b"showing strong fluency" in dictionary
+
+    without = compress_text(ASSESSMENTS[1], 0)
+    use_dictionaries([(1, dictionary)])
+    stored = compress_text(ASSESSMENTS[1])
+    assert stored[len(MAGIC)] == 1 and len(stored) < len(ASSESSMENTS[1].encode()) / 3
+    assert not isinstance(without, bytes) or len(stored) < len(without)
+    assert decompress_text(stored) == ASSESSMENTS[1]
+
+    # Values need the dictionary they were written with
+    use_dictionaries([])
+    with pytest.raises(CompressionError):
+        decompress_text(stored)
+
+@pytest.fixture
+def seed_sessions():
+    from models.session import SpeechSession
+
+    return [
+        SpeechSession(user_id=1, transcript=transcript(i), sentiment=0.2,
+                      **{field: ASSESSMENTS[(i + n) % len(ASSESSMENTS)] for n, field in enumerate(
+                          ('pace_assessment', 'filler_assessment', 'grammar_assessment',
+                           'vocabulary_assessment', 'tone_assessment', 'general_impression'))})
+        for i in range(40)
+    ]
+
+def stored_bytes(db):
+    from sqlalchemy import text
+    return db.session.execute(text(
+        "SELECT sum(length(transcript) + length(pace_assessment) + length(filler_assessment)"
+        " + length(grammar_assessment) + length(vocabulary_assessment) + length(tone_assessment)"
+        " + length(general_impression)) FROM speech_session"
+    )).scalar()
+
+def test_migration_compresses_existing_rows_and_keeps_search_working(app, client, caplog):
+    from database import db
+    from migrations import upgrade, downgrade
+    from models.session import SpeechSession
+
+    with app.app_context():
+        connection = db.engine.raw_connection()
+        try:
+            # Back to plain text, then compress again with a dictionary trained on the rows
+            downgrade(connection, 5)
+            plain = stored_bytes(db)
+            with caplog.at_level(logging.INFO):
+                upgrade(connection)
+        finally:
+            connection.close()
+        db.session.remove()
+
+        assert stored_bytes(db) < plain / 5
+        assert any('smaller, dictionary 1' in message for message in caplog.messages)
+        session = SpeechSession.query.order_by(SpeechSession.id).first()
+        assert session.transcript == transcript(0) and session.general_impression == ASSESSMENTS[0]
+
+    results = client.get('/api/history/search?q=deadline&limit=50').get_json()['results']
+    assert len(results) == 40 and '<mark>deadline</mark>' in results[0]['snippet']
+    detail = client.get(f"/session/{results[0]['id']}").get_json()
+    assert detail['pace_assessment'] in ASSESSMENTS
+
+def test_retrain_command_adds_a_dictionary_for_new_sessions(app, monkeypatch, capsys):
+    from database import db
+    from models.session import SpeechSession
+    from utils.text_compression import current_dictionary_id
+    import retrain_compression_dictionary
+
+    # The seeded sessions arrived after v006 ran on the empty database
+    assert current_dictionary_id() == 0
+    monkeypatch.setattr(sys, 'argv', ['retrain_compression_dictionary.py'])
+    retrain_compression_dictionary.main()
+    assert 'Stored dictionary 1' in capsys.readouterr().out
+    assert current_dictionary_id() == 1
+
+    with app.app_context():
+        db.session.add(SpeechSession(user_id=1, transcript=transcript(99), pace_assessment=ASSESSMENTS[0]))
+        db.session.commit()
+        raw = db.session.execute(db.text(
+            "SELECT pace_assessment FROM speech_session ORDER BY id DESC LIMIT 1")).scalar()
+        assert isinstance(raw, bytes) and raw[len(MAGIC)] == 1
+
+    # A second run stores another dictionary; rows written with the first still read
+    retrain_compression_dictionary.main()
+    assert current_dictionary_id() == 2
+    with app.app_context():
+        db.session.remove()
+        sessions = SpeechSession.query.order_by(SpeechSession.id).all()
+        assert sessions[0].transcript == transcript(0) and sessions[-1].pace_assessment == ASSESSMENTS[0]
+
+def test_text_is_loaded_only_when_accessed(app):
+    from database import db
+    from models.session import SpeechSession
+
+    with app.app_context():
+        session = SpeechSession.query.filter_by(user_id=1).first()
+        assert 'transcript' not in session.__dict__ and 'tone_assessment' not in session.__dict__
+        assert session.tone_assessment in ASSESSMENTS
+        # One access loads the assessments together, still without the transcript
+        assert 'pace_assessment' in session.__dict__ and 'transcript' not in session.__dict__
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
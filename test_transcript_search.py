@@ -0,0 +1,81 @@
+"""
+Tests for full-text search over stored transcripts
+"""
+
+import sys
+sys.path.append('backend')
+
+import pytest
+
+from utils.transcript_search import parse_terms, fts5_query, tsquery, highlight, SearchError
+
+def test_query_parsing():
+    assert parse_terms('Leadership, "team" work!') == ['leadership', 'team', 'work']
+    assert fts5_query(['lead*', 'team'], 7) == 'user_id:"7" AND transcript:("lead"* "team")'
+    assert tsquery(['lead*', 'team']) == 'lead:* & team'
+    for bad in ('', '!!!', 'x' * 500):
+        with pytest.raises(SearchError):
+            parse_terms(bad)
+
+def test_snippets_are_escaped_before_highlighting():
+    assert highlight('<b>lead</b>') == '&lt;b&gt;<mark>lead</mark>&lt;/b&gt;'
+
+@pytest.fixture
+def seed_sessions():
+    from models.session import SpeechSession
+
+    transcripts = [
+        (1, "I showed leadership when our team missed a deadline and I reorganized the work"),
+        (1, "My greatest strength is communication with stakeholders"),
+        (1, "Leadership means listening. Good leadership builds trust in the team"),
+        (1, "I enjoy <b>design</b> and leading small projects"),
+        (2, "Leadership is my strength too, says another user"),
+    ]
+    return [SpeechSession(user_id=user, transcript=text) for user, text in transcripts]
+
+def test_search_is_ranked_and_scoped_to_the_user(client):
+    data = client.get('/api/history/search?q=leadership').get_json()
+    assert data['success'] and len(data['results']) == 2
+    # Two mentions outrank one
+    assert data['results'][0]['snippet'].count('<mark>') == 2
+    assert all('another user' not in r['snippet'] for r in data['results'])
+    assert data['results'][0]['score'] >= data['results'][1]['score']
+
+def test_stemming_prefixes_and_escaping(client):
+    # "leading" stems to "lead"; "leadership" only matches as a prefix
+    assert len(client.get('/api/history/search?q=lead').get_json()['results']) == 1
+    assert len(client.get('/api/history/search?q=lead*').get_json()['results']) == 3
+    design = client.get('/api/history/search?q=design').get_json()['results'][0]['snippet']
+    assert '&lt;b&gt;<mark>design</mark>&lt;/b&gt;' in design
+
+def test_paging_and_bad_requests(client):
+    first = client.get('/api/history/search?q=team&limit=1').get_json()
+    assert first['has_more'] and first['next_offset'] == 1
+    second = client.get('/api/history/search?q=team&limit=1&offset=1').get_json()
+    assert not second['has_more'] and second['results'][0]['id'] != first['results'][0]['id']
+
+    assert client.get('/api/history/search?q=').status_code == 400
+    assert client.get('/api/history/search?q=team&offset=-1').status_code == 400
+    assert client.get('/api/history/search?q=team&limit=abc').status_code == 400
+
+def test_triggers_keep_the_index_in_sync(app, client):
+    from sqlalchemy import func
+    from database import db
+    from models.session import SpeechSession
+
+    # Transcripts are stored compressed; SQL reads them through speech_text()
+    transcript = func.speech_text(SpeechSession.transcript)
+    with app.app_context():
+        session = SpeechSession.query.filter(transcript.like('%stakeholders%')).one()
+        session.transcript = "I negotiated with vendors"
+        db.session.commit()
+        removed = SpeechSession.query.filter(transcript.like('%reorganized%')).one()
+        db.session.delete(removed)
+        db.session.commit()
+
+    assert client.get('/api/history/search?q=stakeholders').get_json()['results'] == []
+    assert len(client.get('/api/history/search?q=vendors').get_json()['results']) == 1
+    assert len(client.get('/api/history/search?q=leadership').get_json()['results']) == 1
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])